@@ -0,0 +1,167 @@
+"""
+Benchmark the creation of content update notification emails for a large space.
+
+Adds --members members (1 000 by default) with individual email notifications to the given
+space, then compares the legacy way of creating notification emails (one translator, one
+template rendering and one mention parsing per recipient) with
+EmailManager.notify_content_update (rendering shared by recipients of a same language).
+
+Emails are only created, not sent. Everything is done in a single transaction which is
+rolled back at the end, the database is left unchanged.
+
+Usage:
+    TRACIM_CONF_PATH=development.ini python load_tests/benchmark_content_notification_emails.py \
+        --content-id 1
+"""
+import argparse
+import random
+import string
+import time
+
+from tracim_backend.app_models.contents import ContentTypeSlug
+from tracim_backend.lib.core.content import ContentApi
+from tracim_backend.lib.core.mention import DescriptionMentionParser
+from tracim_backend.lib.core.workspace import WorkspaceApi
+from tracim_backend.lib.mail_notifier.notifier import EmailManager
+from tracim_backend.lib.mail_notifier.notifier import get_email_manager
+from tracim_backend.lib.mail_notifier.utils import EmailAddress
+from tracim_backend.lib.mail_notifier.utils import EmailNotificationMessage
+from tracim_backend.lib.utils.daemon import initialize_config_from_environment
+from tracim_backend.lib.utils.translation import Translator
+from tracim_backend.models.auth import User
+from tracim_backend.models.data import Content
+from tracim_backend.models.data import EmailNotificationType
+from tracim_backend.models.data import UserRoleInWorkspace
+from tracim_backend.models.roles import WorkspaceRoles
+from tracim_backend.models.setup_models import get_engine
+from tracim_backend.models.setup_models import get_session_factory
+from tracim_backend.models.tracim_session import TracimSession
+
+LANGS = ("en", "fr", "pt", "de")
+
+
+def populate(session: TracimSession, workspace_id: int, member_count: int) -> None:
+    """Add member_count members with individual email notifications to the space."""
+    marker = "".join(random.choice(string.ascii_lowercase) for _ in range(8))
+    session.bulk_insert_mappings(
+        User,
+        [
+            {
+                "email": "benchmark-{}-{}@test.test".format(marker, index),
+                "username": "benchmark-{}-{}".format(marker, index),
+                "display_name": "Benchmark {} {}".format(marker, index),
+                "lang": LANGS[index % len(LANGS)],
+            }
+            for index in range(member_count)
+        ],
+    )
+    user_ids = [
+        user_id
+        for (user_id,) in session.query(User.user_id).filter(
+            User.username.like("benchmark-{}-%".format(marker))
+        )
+    ]
+    session.bulk_insert_mappings(
+        UserRoleInWorkspace,
+        [
+            {
+                "user_id": user_id,
+                "workspace_id": workspace_id,
+                "role": WorkspaceRoles.CONTRIBUTOR.level,
+                "email_notification_type": EmailNotificationType.INDIVIDUAL,
+            }
+            for user_id in user_ids
+        ],
+    )
+
+
+def legacy_create_emails(email_manager: EmailManager, actor: User, content: Content) -> int:
+    content_api = ContentApi(
+        current_user=actor, session=email_manager.session, config=email_manager.config
+    )
+    workspace_api = WorkspaceApi(
+        current_user=actor, session=email_manager.session, config=email_manager.config
+    )
+    workspace_in_context = workspace_api.get_workspace_with_context(content.workspace)
+    roles = workspace_api.get_notifiable_roles(content.workspace)
+    for role in roles:
+        translator = Translator(app_config=email_manager.config, default_lang=role.user.lang)
+        parent_in_context = None
+        if content.parent_id:
+            parent_in_context = content_api.get_content_in_context(content.parent)
+        body_html = email_manager._build_email_body_for_content(
+            email_manager.config.EMAIL__NOTIFICATION__CONTENT_UPDATE__TEMPLATE__HTML,
+            role,
+            content_api.get_content_in_context(content),
+            parent_in_context,
+            workspace_in_context,
+            actor,
+            translator,
+        )
+        body_html = DescriptionMentionParser.get_email_html_from_html_with_mention_tags(
+            session=email_manager.session,
+            cfg=email_manager.config,
+            translator=translator,
+            html=body_html,
+        )
+        EmailNotificationMessage(
+            subject=content.label,
+            from_header=email_manager._get_sender(actor),
+            to_header=EmailAddress(role.user.display_name, role.user.email),
+            body_html=body_html,
+            lang=translator.default_lang,
+        )
+    return len(roles)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--content-id", type=int, required=True)
+    parser.add_argument("--actor-id", type=int, default=1)
+    parser.add_argument("--members", type=int, default=1000)
+    args = parser.parse_args()
+
+    app_config = initialize_config_from_environment()
+    app_config.EMAIL__NOTIFICATION__ACTIVATED = False
+    app_config.JOBS__PROCESSING_MODE = app_config.CST.SYNC
+    session = get_session_factory(get_engine(app_config))()
+    try:
+        actor = session.query(User).get(args.actor_id)
+        content = ContentApi(
+            current_user=actor,
+            session=session,
+            config=app_config,
+            show_archived=True,
+            show_deleted=True,
+        ).get_one(args.content_id, ContentTypeSlug.ANY.value)
+        populate(session, content.workspace_id, args.members)
+        session.flush()
+        session.expire(content.workspace, ["roles"])
+        email_manager = get_email_manager(app_config, session)
+
+        start = time.perf_counter()
+        legacy_count = legacy_create_emails(email_manager, actor, content)
+        legacy_duration = time.perf_counter() - start
+
+        start = time.perf_counter()
+        email_manager.notify_content_update(actor.user_id, content.content_id)
+        shared_duration = time.perf_counter() - start
+    finally:
+        session.rollback()
+        session.close()
+
+    print("notified members: {}".format(legacy_count))
+    print(
+        "legacy rendering: {:.3f}s, {:.2f}ms per recipient".format(
+            legacy_duration, legacy_duration * 1000 / max(legacy_count, 1)
+        )
+    )
+    print(
+        "shared rendering: {:.3f}s, {:.2f}ms per recipient".format(
+            shared_duration, shared_duration * 1000 / max(legacy_count, 1)
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Benchmark the publication of one event to many receivers.
+
+Compares the legacy path (one serialization and one publish call per receiver)
+with LiveMessagesLib.publish_messages (one serialization per payload, batched publish).
+
+Usage:
+    TRACIM_CONF_PATH=development.ini python load_tests/benchmark_live_messages_fanout.py
+
+By default live messages are published to the pushpin instance configured with
+live_messages.control_zmq_uri, use --no-publish to only measure serialization.
+"""
+import argparse
+from datetime import datetime
+import time
+
+from tracim_backend.lib.core import live_messages
+from tracim_backend.lib.core.live_messages import LiveMessagesLib
+from tracim_backend.lib.utils.daemon import initialize_config_from_environment
+from tracim_backend.models.event import EntityType
+from tracim_backend.models.event import Event
+from tracim_backend.models.event import Message
+from tracim_backend.models.event import OperationType
+
+
+class NullPubControl:
+    def publish(self, channel, item, blocking=False, callback=None):
+        item.export(True, True)
+
+    def publish_http_stream(self, channel, http_stream, blocking=False, callback=None):
+        pass
+
+
+def build_messages(receiver_count: int):
+    event = Event(
+        event_id=1,
+        entity_type=EntityType.CONTENT,
+        operation=OperationType.MODIFIED,
+        entity_subtype="html-document",
+        fields={
+            "author": {"user_id": 1, "public_name": "Global manager", "username": "TheAdmin"},
+            "client_token": None,
+            "workspace": {"workspace_id": 1, "label": "Benchmark space", "slug": "benchmark"},
+            "content": {
+                "content_id": 1,
+                "parent_id": None,
+                "label": "Benchmark note",
+                "raw_content": "<p>{}</p>".format("lorem ipsum " * 200),
+            },
+        },
+        created=datetime.utcnow(),
+    )
+    return [
+        Message(
+            receiver_id=receiver_id, event=event, event_id=event.event_id, sent=datetime.utcnow()
+        )
+        for receiver_id in range(1, receiver_count + 1)
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--receivers", type=int, default=10000)
+    parser.add_argument("--no-publish", action="store_true", default=False)
+    args = parser.parse_args()
+
+    app_config = initialize_config_from_environment()
+    live_message_lib = LiveMessagesLib(app_config)
+    if args.no_publish:
+        live_messages._grip_pub_control = NullPubControl()
+    messages = build_messages(args.receivers)
+
+    start = time.perf_counter()
+    for message in messages:
+        live_message_lib.publish_message_to_user(message)
+    legacy_duration = time.perf_counter() - start
+
+    start = time.perf_counter()
+    live_message_lib.publish_messages(messages)
+    fanout_duration = time.perf_counter() - start
+
+    print("receivers: {}".format(args.receivers))
+    print("per receiver publish: {:.3f}s".format(legacy_duration))
+    print("fan-out publish: {:.3f}s".format(fanout_duration))
+
+
+if __name__ == "__main__":
+    main()
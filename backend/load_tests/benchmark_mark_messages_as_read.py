@@ -0,0 +1,124 @@
+"""
+Benchmark marking all messages of a user as read.
+
+Creates --messages unread messages (100 000 by default) for the given user, then compares
+the legacy way of marking them as read (loading every message in the session and setting
+its read date) with EventApi.mark_user_messages_as_read_or_unread (set-based updates).
+
+Everything is done in a single transaction which is rolled back at the end, the database
+is left unchanged.
+
+Usage:
+    TRACIM_CONF_PATH=development.ini python load_tests/benchmark_mark_messages_as_read.py \
+        --user-id 1
+"""
+import argparse
+from datetime import datetime
+import random
+from sqlalchemy import literal
+from sqlalchemy import null
+import string
+import time
+
+from tracim_backend.lib.core.event import EventApi
+from tracim_backend.lib.core.messages_counters import MessagesCountersLib
+from tracim_backend.lib.utils.daemon import initialize_config_from_environment
+from tracim_backend.models.event import EntityType
+from tracim_backend.models.event import Event
+from tracim_backend.models.event import Message
+from tracim_backend.models.event import OperationType
+from tracim_backend.models.event import ReadStatus
+from tracim_backend.models.setup_models import get_engine
+from tracim_backend.models.setup_models import get_session_factory
+from tracim_backend.models.tracim_session import TracimSession
+
+EVENTS_INSERT_BATCH_SIZE = 5000
+
+
+def populate(session: TracimSession, user_id: int, message_count: int) -> None:
+    """Create message_count events with an unread message for the user."""
+    marker = "benchmark-{}".format("".join(random.choice(string.ascii_lowercase) for _ in range(8)))
+    now = datetime.utcnow()
+    for start in range(0, message_count, EVENTS_INSERT_BATCH_SIZE):
+        session.bulk_insert_mappings(
+            Event,
+            [
+                {
+                    "entity_type": EntityType.CONTENT,
+                    "operation": OperationType.MODIFIED,
+                    "entity_subtype": marker,
+                    "fields": {},
+                    "created": now,
+                }
+                for _ in range(min(EVENTS_INSERT_BATCH_SIZE, message_count - start))
+            ],
+        )
+    messages = Message.__table__
+    session.execute(
+        messages.insert().from_select(
+            ["receiver_id", "event_id", "sent"],
+            session.query(literal(user_id), Event.event_id, literal(now))
+            .filter(Event.entity_subtype == marker)
+            .subquery()
+            .select(),
+        )
+    )
+    MessagesCountersLib(session).rebuild_counters([user_id])
+
+
+def legacy_mark_as_read(session: TracimSession, user_id: int) -> int:
+    messages = (
+        session.query(Message)
+        .join(Event)
+        .filter(Message.receiver_id == user_id)
+        .filter(Message.sent != null())
+        .filter(Message.read == null())
+        .all()
+    )
+    read = datetime.utcnow()
+    for message in messages:
+        message.read = read
+    session.flush()
+    return len(messages)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--user-id", type=int, default=1)
+    parser.add_argument("--messages", type=int, default=100000)
+    args = parser.parse_args()
+
+    app_config = initialize_config_from_environment()
+    session = get_session_factory(get_engine(app_config))()
+    try:
+        start = time.perf_counter()
+        populate(session, args.user_id, args.messages)
+        session.flush()
+        print("populated {} messages in {:.3f}s".format(args.messages, time.perf_counter() - start))
+
+        event_api = EventApi(current_user=None, session=session, config=app_config)
+        unread_count = event_api.get_messages_count(args.user_id, ReadStatus.UNREAD)
+
+        start = time.perf_counter()
+        marked_count = len(event_api.mark_user_messages_as_read_or_unread(args.user_id))
+        set_based_duration = time.perf_counter() - start
+
+        event_api.mark_user_messages_as_read_or_unread(args.user_id, is_read=False)
+        session.expunge_all()
+
+        start = time.perf_counter()
+        legacy_marked_count = legacy_mark_as_read(session, args.user_id)
+        legacy_duration = time.perf_counter() - start
+    finally:
+        session.rollback()
+        session.close()
+
+    print("unread messages: {}".format(unread_count))
+    print(
+        "legacy mark as read: {} messages in {:.3f}s".format(legacy_marked_count, legacy_duration)
+    )
+    print("set-based mark as read: {} messages in {:.3f}s".format(marked_count, set_based_duration))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Benchmark the CalDAV proxy against a local Radicale server.
+
+Sends --requests PROPFIND requests (1 000 by default) to the given agenda path of Radicale
+from --threads threads, first the legacy way (a new connection per request and a fully
+buffered response) then through Proxy (keep-alive connections pool, streamed bodies).
+
+Radicale must be running, for example with:
+    tracimcli caldav start
+
+Usage:
+    python load_tests/benchmark_radicale_proxy.py --base-url http://localhost:5232 \
+        --path /agenda/user/1/
+"""
+from urllib.parse import urljoin
+
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from pyramid.request import Request
+import requests
+from requests.auth import HTTPBasicAuth
+import time
+import typing
+
+from tracim_backend.lib.proxy.proxy import DEFAULT_TIMEOUT
+from tracim_backend.lib.proxy.proxy import Proxy
+
+PROPFIND_BODY = b"""<?xml version="1.0" encoding="utf-8" ?>
+<propfind xmlns="DAV:"><prop><getetag/><displayname/></prop></propfind>"""
+HEADERS = {"Depth": "1", "Content-Type": "application/xml"}
+AUTH = ("tracim", "tracimpass")
+
+
+def legacy_request(base_url: str, path: str) -> int:
+    response = requests.request(
+        method="PROPFIND",
+        headers=HEADERS,
+        data=PROPFIND_BODY,
+        url=urljoin(base_url, path),
+        auth=HTTPBasicAuth(*AUTH),
+    )
+    return len(response.content)
+
+
+def proxy_request(proxy: Proxy, path: str) -> int:
+    request = Request.blank(path, method="PROPFIND", headers=HEADERS, body=PROPFIND_BODY)
+    response = proxy.get_response_for_request(request, path)
+    try:
+        return sum(len(chunk) for chunk in response.app_iter)
+    finally:
+        response.app_iter.close()
+
+
+def run(
+    name: str, send_request: typing.Callable[[], int], request_count: int, thread_count: int
+) -> None:
+    start = time.perf_counter()
+    with ThreadPoolExecutor(thread_count) as executor:
+        sizes = list(executor.map(lambda _: send_request(), range(request_count)))
+    duration = time.perf_counter() - start
+    print(
+        "{}: {:.3f}s, {:.2f}ms per request, {} bytes received".format(
+            name, duration, duration * 1000 / request_count, sum(sizes)
+        )
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--base-url", default="http://localhost:5232")
+    parser.add_argument("--path", required=True)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--pool-size", type=int, default=10)
+    args = parser.parse_args()
+
+    proxy = Proxy(
+        base_address=args.base_url,
+        auth=HTTPBasicAuth(*AUTH),
+        pool_size=args.pool_size,
+        timeout=DEFAULT_TIMEOUT,
+    )
+    run(
+        "legacy proxy",
+        lambda: legacy_request(args.base_url, args.path),
+        args.requests,
+        args.threads,
+    )
+    run("pooled proxy", lambda: proxy_request(proxy, args.path), args.requests, args.threads)
+
+
+if __name__ == "__main__":
+    main()
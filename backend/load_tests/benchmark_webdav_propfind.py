@@ -0,0 +1,161 @@
+"""
+Benchmark WebDAV PROPFIND requests on a big space.
+
+Creates a new space containing a folder hierarchy of --depth levels with --files files
+spread in its folders (10 000 by default), then sends --requests PROPFIND requests with
+"Depth: 1" on the deepest folder and on files of it, reporting response times.
+
+Run it against a webdav server started with the default webdav.path_cache.ttl, then with
+webdav.path_cache.ttl = 0 to compare with the path resolution without cache.
+
+Usage:
+    python load_tests/benchmark_webdav_propfind.py --base http://localhost:7999 \
+        --webdav http://localhost:3030
+    # reuse a space populated by a previous run
+    python load_tests/benchmark_webdav_propfind.py --folder-path "<path printed by first run>"
+"""
+from urllib.parse import quote
+from urllib.parse import urljoin
+
+import argparse
+import random
+import requests
+import statistics
+import string
+import time
+import typing
+from xml.etree import ElementTree
+
+PROPFIND_BODY = (
+    '<?xml version="1.0" encoding="utf-8"?>'
+    '<propfind xmlns="DAV:"><prop>'
+    "<getcontentlength/><getlastmodified/><resourcetype/>"
+    "</prop></propfind>"
+)
+
+
+def random_label(length: int = 10) -> str:
+    return "".join(random.choice(string.ascii_lowercase) for _ in range(length))
+
+
+def populate(session: requests.Session, base: str, depth: int, file_count: int) -> str:
+    """
+    Create a space with a folder hierarchy and files spread in its folders.
+    :return: WebDAV path of the deepest folder
+    """
+    space_label = "webdav benchmark {}".format(random_label(6))
+    response = session.post(
+        "{}/api/workspaces".format(base),
+        json={
+            "label": space_label,
+            "description": "",
+            "access_type": "confidential",
+            "default_user_role": "reader",
+        },
+    )
+    response.raise_for_status()
+    space_id = response.json()["workspace_id"]
+
+    folder_ids = []  # type: typing.List[int]
+    path_parts = ["{}.space".format(space_label)]
+    for level in range(depth):
+        label = "folder {} {}".format(level, random_label(4))
+        response = session.post(
+            "{}/api/workspaces/{}/contents".format(base, space_id),
+            json={
+                "content_namespace": "content",
+                "content_type": "folder",
+                "label": label,
+                "parent_id": folder_ids[-1] if folder_ids else None,
+            },
+        )
+        response.raise_for_status()
+        folder_ids.append(response.json()["content_id"])
+        path_parts.append(label)
+
+    for index in range(file_count):
+        response = session.post(
+            "{}/api/workspaces/{}/files".format(base, space_id),
+            data={"parent_id": folder_ids[index % len(folder_ids)]},
+            files={"files": ("file_{}.txt".format(index), b"benchmark content", "text/plain")},
+        )
+        response.raise_for_status()
+        if index and index % 1000 == 0:
+            print("{} files created".format(index))
+    return "/".join(path_parts)
+
+
+def get_hrefs(response: requests.Response) -> typing.List[str]:
+    return [href.text for href in ElementTree.fromstring(response.content).iter("{DAV:}href")]
+
+
+def propfind(session: requests.Session, url: str) -> float:
+    start = time.perf_counter()
+    response = session.request(
+        "PROPFIND", url, data=PROPFIND_BODY, headers={"Depth": "1", "Content-Type": "text/xml"}
+    )
+    duration = time.perf_counter() - start
+    if response.status_code != 207:
+        raise RuntimeError("PROPFIND {} returned {}".format(url, response.status_code))
+    return duration
+
+
+def print_durations(title: str, durations: typing.List[float]) -> None:
+    durations = sorted(durations)
+    print(
+        "{}: {} requests, mean {:.1f}ms, median {:.1f}ms, p95 {:.1f}ms".format(
+            title,
+            len(durations),
+            statistics.mean(durations) * 1000,
+            statistics.median(durations) * 1000,
+            durations[int(len(durations) * 0.95) - 1] * 1000,
+        )
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--base", default="http://localhost:7999")
+    parser.add_argument("--webdav", default="http://localhost:3030")
+    parser.add_argument("--login", default="admin@admin.admin")
+    parser.add_argument("--password", default="admin@admin.admin")
+    parser.add_argument(
+        "--folder-path",
+        default=None,
+        help="WebDAV path of the deepest folder of an already populated space",
+    )
+    parser.add_argument("--depth", type=int, default=10)
+    parser.add_argument("--files", type=int, default=10000)
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    folder_path = args.folder_path
+    if not folder_path:
+        api_session = requests.Session()
+        api_session.post(
+            "{}/api/auth/login".format(args.base),
+            json={"email": args.login, "password": args.password},
+        ).raise_for_status()
+        folder_path = populate(api_session, args.base, args.depth, args.files)
+        print('populated, use --folder-path "{}" to run again on this space'.format(folder_path))
+
+    webdav_session = requests.Session()
+    webdav_session.auth = (args.login, args.password)
+    folder_url = "{}/{}/".format(args.webdav.rstrip("/"), quote(folder_path.strip("/")))
+
+    folder_durations = [propfind(webdav_session, folder_url) for _ in range(args.requests)]
+    print_durations("PROPFIND depth 1 on deepest folder", folder_durations)
+
+    response = webdav_session.request(
+        "PROPFIND", folder_url, data=PROPFIND_BODY, headers={"Depth": "1"}
+    )
+    file_urls = [urljoin(folder_url, href) for href in get_hrefs(response) if href.endswith(".txt")]
+    file_durations = [
+        propfind(webdav_session, random.choice(file_urls or [folder_url]))
+        for _ in range(args.requests)
+    ]
+    print_durations("PROPFIND depth 1 on files of deepest folder", file_durations)
+
+
+if __name__ == "__main__":
+    main()
@@ -150,8 +150,14 @@
             "db update-naming-conventions = tracim_backend.command.database:UpdateNamingConventionsV1ToV2Command",
             "db migrate-mysql-charset = tracim_backend.command.database:MigrateMysqlCharsetCommand",
             "db migrate-storage = tracim_backend.command.database:MigrateStorageCommand",
+            "db update-used-space = tracim_backend.command.database:UpdateUsedSpaceCommand",
+            "db deduplicate-files = tracim_backend.command.database:DeduplicateFilesCommand",
+            "db update-preview-metadata = tracim_backend.command.database:UpdatePreviewMetadataCommand",
+            "db update-messages-counters = tracim_backend.command.database:UpdateMessagesCountersCommand",
             # periodically
             "periodic send-summary-mails = tracim_backend.command.periodic:SendMailSummariesCommand",
+            "periodic prune-messages = tracim_backend.command.periodic:PruneMessagesCommand",
+            "periodic archive-events = tracim_backend.command.periodic:ArchiveEventsCommand",
             # search
             "search index-create = tracim_backend.command.search:SearchIndexInitCommand",
             "search index-populate = tracim_backend.command.search:SearchIndexIndexCommand",
@@ -40,6 +40,7 @@
 from tracim_backend.extensions import hapic
 from tracim_backend.lib.core.application import ApplicationApi
 from tracim_backend.lib.core.plugins import init_plugin_manager
+from tracim_backend.lib.core.url_preview import get_url_preview_cache_settings
 from tracim_backend.lib.utils.authentification import ApiTokenAuthentificationPolicy
 from tracim_backend.lib.utils.authentification import BASIC_AUTH_WEBUI_REALM
 from tracim_backend.lib.utils.authentification import CookieSessionAuthentificationPolicy
@@ -147,15 +148,7 @@ def web(global_config: OrderedDict, **local_settings) -> Router:
     )
     configurator.set_session_factory(session_factory)
 
-    # TODO - G.M - 2021-03-31 Make beaker cache configurable like sessions
-    #  through tracim config, see https://github.com/tracim/tracim/issues/4386
-    cached_region_settings = {
-        "cache.enabled": "True",
-        "cache.regions": "url_preview",
-        "cache.type": "memory",
-        "cache.url_preview.expire": "1800",  # = 30 min
-    }
-    pyramid_beaker.set_cache_regions_from_settings(cached_region_settings)
+    pyramid_beaker.set_cache_regions_from_settings(get_url_preview_cache_settings(app_config))
 
     # Add AuthPolicy
     configurator.include("pyramid_multiauth")
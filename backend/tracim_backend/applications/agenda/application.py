@@ -25,6 +25,15 @@ def load_config(self, app_config: CFG) -> None:
         app_config.CALDAV__RADICALE_PROXY__BASE_URL = app_config.get_raw_config(
             "caldav.radicale_proxy.base_url", "http://localhost:5232"
         )
+        app_config.CALDAV__RADICALE_PROXY__POOL_SIZE = int(
+            app_config.get_raw_config("caldav.radicale_proxy.pool_size", "10")
+        )
+        app_config.CALDAV__RADICALE_PROXY__CONNECT_TIMEOUT = float(
+            app_config.get_raw_config("caldav.radicale_proxy.connect_timeout", "5")
+        )
+        app_config.CALDAV__RADICALE_PROXY__READ_TIMEOUT = float(
+            app_config.get_raw_config("caldav.radicale_proxy.read_timeout", "60")
+        )
         default_caldav_storage_dir = app_config.here_macro_replace("%(here)s/radicale_storage")
         app_config.CALDAV__RADICALE__STORAGE__FILESYSTEM_FOLDER = app_config.get_raw_config(
             "caldav.radicale.storage.filesystem_folder", default_caldav_storage_dir
@@ -64,6 +73,17 @@ def check_config(self, app_config: CFG) -> None:
             app_config.CALDAV__RADICALE_PROXY__BASE_URL,
             when_str="when caldav feature is enabled",
         )
+        for param_name in (
+            "CALDAV__RADICALE_PROXY__POOL_SIZE",
+            "CALDAV__RADICALE_PROXY__CONNECT_TIMEOUT",
+            "CALDAV__RADICALE_PROXY__READ_TIMEOUT",
+        ):
+            if getattr(app_config, param_name) <= 0:
+                raise ConfigurationError(
+                    'ERROR  "{}" should be a strictly positive value (currently "{}")'.format(
+                        param_name, getattr(app_config, param_name)
+                    )
+                )
         # TODO - G.M - 2019-05-06 - convert "caldav.radicale.storage.filesystem_folder"
         # as tracim global parameter
         app_config.check_mandatory_param(
@@ -122,7 +142,12 @@ def load_controllers(
         context.handle_exception(CaldavNotAuthenticated, HTTPStatus.UNAUTHORIZED)
         # controller
         radicale_proxy_controller = RadicaleProxyController(
-            proxy_base_address=app_config.CALDAV__RADICALE_PROXY__BASE_URL
+            proxy_base_address=app_config.CALDAV__RADICALE_PROXY__BASE_URL,
+            proxy_pool_size=app_config.CALDAV__RADICALE_PROXY__POOL_SIZE,
+            proxy_timeout=(
+                app_config.CALDAV__RADICALE_PROXY__CONNECT_TIMEOUT,
+                app_config.CALDAV__RADICALE_PROXY__READ_TIMEOUT,
+            ),
         )
         agenda_controller = AgendaController()
         configurator.include(agenda_controller.bind, route_prefix=BASE_API)
@@ -5,6 +5,7 @@
 from pyramid.httpexceptions import HTTPMovedPermanently
 from pyramid.response import Response
 from requests.auth import HTTPBasicAuth
+import typing
 
 from tracim_backend.applications.agenda.authorization import can_access_to_agenda_list
 from tracim_backend.applications.agenda.authorization import can_access_user_agenda_event
@@ -14,6 +15,8 @@
 from tracim_backend.applications.agenda.utils.determiner import CaldavAuthorizationDeterminer
 from tracim_backend.exceptions import WorkspaceAgendaDisabledException
 from tracim_backend.extensions import hapic
+from tracim_backend.lib.proxy.proxy import DEFAULT_POOL_SIZE
+from tracim_backend.lib.proxy.proxy import DEFAULT_TIMEOUT
 from tracim_backend.lib.proxy.proxy import Proxy
 from tracim_backend.lib.utils.authorization import check_right
 from tracim_backend.lib.utils.request import TracimRequest
@@ -36,12 +39,27 @@ class RadicaleProxyController(Controller):
     def __init__(
         self,
         proxy_base_address,
+        proxy_pool_size: int = DEFAULT_POOL_SIZE,
+        proxy_timeout: typing.Tuple[float, float] = DEFAULT_TIMEOUT,
     ):
         self._authorization = CaldavAuthorizationDeterminer()
         self.proxy_base_address = proxy_base_address
+        self.proxy_pool_size = proxy_pool_size
+        self.proxy_timeout = proxy_timeout
         self._proxy = Proxy(
             base_address=proxy_base_address,
             auth=HTTPBasicAuth(RADICALE_HTTP_AUTH_USERNAME, RADICALE_HTTP_AUTH_PASSWORD),
+            pool_size=proxy_pool_size,
+            timeout=proxy_timeout,
+        )
+
+    def _get_user_resource_proxy(self, user_resource_dir_name: str) -> Proxy:
+        # INFO - proxies of all users share the same pool of connections to radicale
+        return Proxy(
+            base_address=self.proxy_base_address,
+            auth=HTTPBasicAuth(user_resource_dir_name, "tracim"),
+            pool_size=self.proxy_pool_size,
+            timeout=self.proxy_timeout,
         )
 
     @hapic.with_api_doc(disable_doc=True)
@@ -141,10 +159,7 @@ def radicale_proxy__user_resource(
         user_resource_dir_name = request.app_config.RADICALE__USER_RESOURCE_DIR_PATTERN.format(
             user_id=request.candidate_user.user_id
         )
-        proxy = Proxy(
-            base_address=self.proxy_base_address,
-            auth=HTTPBasicAuth(user_resource_dir_name, "tracim"),
-        )
+        proxy = self._get_user_resource_proxy(user_resource_dir_name)
         return proxy.get_response_for_request(
             request,
             "/{}/".format(user_resource_dir_name),
@@ -170,10 +185,7 @@ def radicale_proxy__user_resource_user_subitems(
             owner_id=hapic_data.path.dest_user_id,
             resource_type=hapic_data.path.type,
         )
-        proxy = Proxy(
-            base_address=self.proxy_base_address,
-            auth=HTTPBasicAuth(user_resource_dir_name, "tracim"),
-        )
+        proxy = self._get_user_resource_proxy(user_resource_dir_name)
         path = request.app_config.RADICALE__USER_RESOURCE_PATH_PATTERN.format(
             user_resource_dir=user_resource_dir_name, user_resource=user_resource_name
         )
@@ -200,10 +212,7 @@ def radicale_proxy__user_resource_user_subitems_x(
             owner_id=hapic_data.path.dest_user_id,
             resource_type=hapic_data.path.type,
         )
-        proxy = Proxy(
-            base_address=self.proxy_base_address,
-            auth=HTTPBasicAuth(user_resource_dir_name, "tracim"),
-        )
+        proxy = self._get_user_resource_proxy(user_resource_dir_name)
         user_resource_path = request.app_config.RADICALE__USER_RESOURCE_PATH_PATTERN.format(
             user_resource_dir=user_resource_dir_name,
             user_resource=user_resource_name,
@@ -234,10 +243,7 @@ def radicale_proxy__user_resource_workspace_subitems(
             owner_id=hapic_data.path.workspace_id,
             resource_type=hapic_data.path.type,
         )
-        proxy = Proxy(
-            base_address=self.proxy_base_address,
-            auth=HTTPBasicAuth(user_resource_dir_name, "tracim"),
-        )
+        proxy = self._get_user_resource_proxy(user_resource_dir_name)
         path = request.app_config.RADICALE__USER_RESOURCE_PATH_PATTERN.format(
             user_resource_dir=user_resource_dir_name, user_resource=user_resource_name
         )
@@ -264,10 +270,7 @@ def radicale_proxy__user_resource_workspace_subitems_x(
             owner_id=hapic_data.path.workspace_id,
             resource_type=hapic_data.path.type,
         )
-        proxy = Proxy(
-            base_address=self.proxy_base_address,
-            auth=HTTPBasicAuth(user_resource_dir_name, "tracim"),
-        )
+        proxy = self._get_user_resource_proxy(user_resource_dir_name)
         user_resource_path = request.app_config.RADICALE__USER_RESOURCE_PATH_PATTERN.format(
             user_resource_dir=user_resource_dir_name,
             user_resource=user_resource_name,
@@ -377,10 +380,7 @@ def root_discovery(self, context, request: TracimRequest) -> Response:
         user_resource_dir_name = request.app_config.RADICALE__USER_RESOURCE_DIR_PATTERN.format(
             user_id=request.current_user.user_id
         )
-        proxy = Proxy(
-            base_address=self.proxy_base_address,
-            auth=HTTPBasicAuth(user_resource_dir_name, "tracim"),
-        )
+        proxy = self._get_user_resource_proxy(user_resource_dir_name)
         return proxy.get_response_for_request(
             request, "/", extra_request_headers=RADICALE_PROXY_EXTRA_HEADERS
         )
@@ -2,10 +2,13 @@
 from alembic import command as alembic_command
 from alembic.config import Config
 import argparse
+from depot.fields.upload import UploadedFile
 from depot.io.utils import FileIntent
 from depot.manager import DepotManager
+import hashlib
 import pluggy
 from pyramid.paster import get_appsettings
+from pyramid.scripting import AppEnvironment
 import re
 from sqlalchemy import text
 from sqlalchemy.engine import reflection
@@ -21,19 +24,27 @@
 from tracim_backend.exceptions import ForceArgumentNeeded
 from tracim_backend.fixtures import FixturesLoader
 from tracim_backend.fixtures.content import Content as ContentFixture
+from tracim_backend.lib.core.content import ContentApi
+from tracim_backend.lib.core.messages_counters import MessagesCountersLib
 from tracim_backend.lib.core.plugins import init_plugin_manager
 from tracim_backend.lib.core.user import UserApi
+from tracim_backend.lib.core.workspace import WorkspaceApi
 from tracim_backend.lib.utils.logger import logger
 from tracim_backend.lib.utils.request import TracimContext
+from tracim_backend.lib.utils.utils import FILE_HASH_CHUNK_SIZE
 from tracim_backend.models.auth import Profile
 from tracim_backend.models.auth import User
+from tracim_backend.models.data import Content
 from tracim_backend.models.data import ContentRevisionRO
+from tracim_backend.models.data import Workspace
 from tracim_backend.models.meta import DeclarativeBase
+from tracim_backend.models.preview import RevisionPreviewMetadata
 from tracim_backend.models.setup_models import create_dbsession_for_context
 from tracim_backend.models.setup_models import get_engine
 from tracim_backend.models.setup_models import get_session_factory
 from tracim_backend.models.setup_models import get_tm_session
 from tracim_backend.models.tracim_session import TracimSession
+from tracim_backend.models.types import SharedUploadedFile
 
 
 # FIXEME: Factorize with CustomTracimContext in monitor.py
@@ -374,17 +385,31 @@ def get_parser(self, prog_name: str) -> argparse.ArgumentParser:
         )
         return parser
 
-    def _reupload_depot_file(self, db_object, field_names: typing.List[str], dbsession: Session):
+    def _reupload_depot_file(
+        self,
+        db_object,
+        field_names: typing.List[str],
+        dbsession: Session,
+        reuploaded_files: typing.Optional[typing.Dict[str, UploadedFile]] = None,
+    ):
+        """
+        :param reuploaded_files: new file of each already reuploaded file path, used to keep
+        files shared between revisions shared in the new storage.
+        """
         for field_name in field_names:
             field_value = getattr(db_object, field_name)
             if field_value:
-                setattr(
-                    db_object,
-                    field_name,
-                    FileIntent(field_value.file, field_value.filename, field_value.content_type),
-                )
+                if reuploaded_files is not None and field_value.path in reuploaded_files:
+                    new_value = SharedUploadedFile(reuploaded_files[field_value.path])
+                else:
+                    new_value = FileIntent(
+                        field_value.file, field_value.filename, field_value.content_type
+                    )
+                setattr(db_object, field_name, new_value)
                 dbsession.add(db_object)
                 dbsession.flush()
+                if reuploaded_files is not None:
+                    reuploaded_files.setdefault(field_value.path, getattr(db_object, field_name))
 
     def take_action(self, parsed_args: argparse.Namespace) -> None:
         super(MigrateStorageCommand, self).take_action(parsed_args)
@@ -427,8 +452,14 @@ def take_action(self, parsed_args: argparse.Namespace) -> None:
         with transaction.manager:
             dbsession = get_tm_session(session_factory, transaction.manager)
             revisions = dbsession.query(ContentRevisionRO).all()
+            reuploaded_files = {}  # type: typing.Dict[str, UploadedFile]
             for revision in revisions:
-                self._reupload_depot_file(revision, field_names=["depot_file"], dbsession=dbsession)
+                self._reupload_depot_file(
+                    revision,
+                    field_names=["depot_file"],
+                    dbsession=dbsession,
+                    reuploaded_files=reuploaded_files,
+                )
             users = dbsession.query(User).all()
             for user in users:
                 self._reupload_depot_file(
@@ -445,3 +476,186 @@ def take_action(self, parsed_args: argparse.Namespace) -> None:
                 new_storage_type,
             )
         )
+
+
+class UpdateUsedSpaceCommand(AppContextCommand):
+    def get_description(self) -> str:
+        return "fill missing file sizes of revisions and update used space of workspaces"
+
+    def take_app_action(self, parsed_args: argparse.Namespace, app_context: AppEnvironment) -> None:
+        session = app_context["request"].dbsession
+        app_config = app_context["registry"].settings["CFG"]
+
+        revisions = (
+            session.query(ContentRevisionRO)
+            .filter(ContentRevisionRO.file_size == None)  # noqa: E711
+            .filter(ContentRevisionRO.depot_file != None)  # noqa: E711
+            .all()
+        )
+        print("Fill file size of {} revision(s)".format(len(revisions)))
+        for revision in revisions:
+            if not revision.depot_file:
+                continue
+            try:
+                file_size = revision.depot_file.file.content_length
+            except IOError:
+                print(
+                    "Cannot get file of revision {} (depot file {})".format(
+                        revision.revision_id, revision.depot_file.file_id
+                    )
+                )
+                continue
+            # INFO - revisions are immutable, update the column without loading them in session
+            session.query(ContentRevisionRO).filter(
+                ContentRevisionRO.revision_id == revision.revision_id
+            ).update({ContentRevisionRO.file_size: file_size}, synchronize_session=False)
+
+        workspace_ids = [row[0] for row in session.query(Workspace.workspace_id)]
+        print("Update used space of {} workspace(s)".format(len(workspace_ids)))
+        wapi = WorkspaceApi(session=session, current_user=None, config=app_config)
+        wapi.update_used_space(workspace_ids)
+
+
+class UpdatePreviewMetadataCommand(AppContextCommand):
+    def get_description(self) -> str:
+        return "compute missing preview information of files of contents"
+
+    def take_app_action(self, parsed_args: argparse.Namespace, app_context: AppEnvironment) -> None:
+        session = app_context["request"].dbsession
+        app_config = app_context["registry"].settings["CFG"]
+
+        revisions = (
+            session.query(ContentRevisionRO)
+            .join(Content, Content.cached_revision_id == ContentRevisionRO.revision_id)
+            .outerjoin(
+                RevisionPreviewMetadata,
+                RevisionPreviewMetadata.revision_id == ContentRevisionRO.revision_id,
+            )
+            .filter(ContentRevisionRO.depot_file != None)  # noqa: E711
+            .filter(RevisionPreviewMetadata.revision_id == None)  # noqa: E711
+            .all()
+        )
+        print("Compute preview information of {} revision(s)".format(len(revisions)))
+        content_api = ContentApi(
+            session=session,
+            current_user=None,
+            config=app_config,
+            show_deleted=True,
+            show_archived=True,
+            show_temporary=True,
+        )
+        for revision in revisions:
+            content_api.update_preview_metadata(revision)
+            # INFO - flush to allow reusing the information for revisions with the same file
+            session.flush()
+
+
+class DeduplicateFilesCommand(AppContextCommand):
+    auto_setup_context = False
+
+    def get_description(self) -> str:
+        return "hash stored files of revisions and share one stored file for identical contents"
+
+    def _get_stored_file_hash(self, depot_file: UploadedFile) -> str:
+        file_hash = hashlib.sha256()
+        stored_file = depot_file.file
+        try:
+            while True:
+                chunk = stored_file.read(FILE_HASH_CHUNK_SIZE)
+                if not chunk:
+                    break
+                file_hash.update(chunk)
+        finally:
+            stored_file.close()
+        return file_hash.hexdigest()
+
+    def _deduplicate_revision_files(self, dbsession: Session) -> typing.Set[str]:
+        """
+        Point revisions with the same file content to the same stored file.
+        :return: paths of stored files no longer used by any revision
+        """
+        files_by_hash = {}  # type: typing.Dict[str, UploadedFile]
+        used_files = set()  # type: typing.Set[str]
+        replaced_files = set()  # type: typing.Set[str]
+        revisions = (
+            dbsession.query(
+                ContentRevisionRO.revision_id,
+                ContentRevisionRO.depot_file,
+                ContentRevisionRO.file_hash,
+            )
+            .filter(ContentRevisionRO.depot_file != None)  # noqa: E711
+            .order_by(ContentRevisionRO.revision_id)
+            .all()
+        )
+        for revision_id, depot_file, file_hash in revisions:
+            if not depot_file:
+                continue
+            new_values = {}
+            if not file_hash:
+                try:
+                    file_hash = self._get_stored_file_hash(depot_file)
+                except IOError:
+                    print(
+                        "Cannot get file of revision {} (depot file {})".format(
+                            revision_id, depot_file.file_id
+                        )
+                    )
+                    continue
+                new_values[ContentRevisionRO.file_hash] = file_hash
+            shared_file = files_by_hash.setdefault(file_hash, depot_file)
+            if shared_file.path != depot_file.path:
+                new_values[ContentRevisionRO.depot_file] = shared_file
+                replaced_files.update(depot_file.files)
+            used_files.update(shared_file.files)
+            if new_values:
+                # INFO - revisions are immutable, update columns without loading them in session
+                dbsession.query(ContentRevisionRO).filter(
+                    ContentRevisionRO.revision_id == revision_id
+                ).update(new_values, synchronize_session=False)
+        return replaced_files - used_files
+
+    def take_action(self, parsed_args: argparse.Namespace) -> None:
+        super(DeduplicateFilesCommand, self).take_action(parsed_args)
+        settings = get_appsettings(parsed_args.config_file)
+        settings.update(settings.global_conf)
+        app_config = CFG(settings)
+        app_config.configure_filedepot()
+        engine = get_engine(app_config)
+        session_factory = get_session_factory(engine)
+        with transaction.manager:
+            dbsession = get_tm_session(session_factory, transaction.manager)
+            unused_files = self._deduplicate_revision_files(dbsession)
+            transaction.commit()
+
+        # INFO - delete files only once revisions do not reference them anymore in database
+        for file_path in sorted(unused_files):
+            depot_name, file_id = file_path.split("/", 1)
+            DepotManager.get(depot_name).delete(file_id)
+        print("{} duplicated file(s) deleted".format(len(unused_files)))
+
+
+class UpdateMessagesCountersCommand(AppContextCommand):
+    def get_description(self) -> str:
+        return "compute again counters of messages and unread messages of users"
+
+    def get_parser(self, prog_name: str) -> argparse.ArgumentParser:
+        parser = super().get_parser(prog_name)
+        parser.add_argument(
+            "-u",
+            "--user-id",
+            help="only update counters of this user, can be given several times",
+            dest="user_ids",
+            type=int,
+            action="append",
+            default=None,
+        )
+        return parser
+
+    def take_app_action(self, parsed_args: argparse.Namespace, app_context: AppEnvironment) -> None:
+        session = app_context["request"].dbsession
+        MessagesCountersLib(session).rebuild_counters(user_ids=parsed_args.user_ids)
+        print(
+            "Messages counters updated for {}".format(
+                "users {}".format(parsed_args.user_ids) if parsed_args.user_ids else "all users"
+            )
+        )
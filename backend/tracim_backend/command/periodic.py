@@ -8,6 +8,7 @@
 
 from tracim_backend.command import AppContextCommand
 from tracim_backend.config import CFG
+from tracim_backend.lib.cleanup.events_retention import EventsRetentionLib
 from tracim_backend.lib.core.event import EventApi
 from tracim_backend.lib.core.user import UserApi
 from tracim_backend.lib.mail_notifier.sender import EmailSender
@@ -147,3 +148,127 @@ def take_app_action(self, parsed_args: argparse.Namespace, app_context: AppEnvir
 
         print(f"Sent {mail_sent} mails")
         print(f"Error on {mail_not_sent} mails")
+
+
+class PruneMessagesCommand(AppContextCommand):
+    def get_description(self) -> str:
+        return """Delete old read messages of users"""
+
+    def get_parser(self, prog_name: str) -> argparse.ArgumentParser:
+        parser = super().get_parser(prog_name)
+        parser.add_argument(
+            "--max-age",
+            help="delete read messages of events older than this number of days, "
+            "default to messages.retention.read_max_age",
+            dest="max_age",
+            type=int,
+            default=None,
+        )
+        parser.add_argument(
+            "--max-count",
+            help="only keep this number of read messages for each user, "
+            "default to messages.retention.read_max_count",
+            dest="max_count",
+            type=int,
+            default=None,
+        )
+        parser.add_argument(
+            "--dry-run",
+            help="dry-run mode, simulate action to be done but do not modify anything",
+            dest="dry_run_mode",
+            default=False,
+            action="store_true",
+        )
+        return parser
+
+    def take_app_action(self, parsed_args: argparse.Namespace, app_context: AppEnvironment) -> None:
+        session = app_context["request"].dbsession
+        config: CFG = app_context["registry"].settings["CFG"]
+        if parsed_args.dry_run_mode:
+            print("(!) Running in dry-run mode, no changes will be applied.")
+            app_context["request"].tm.doom()
+
+        max_age = parsed_args.max_age
+        if max_age is None:
+            max_age = config.MESSAGES__RETENTION__READ_MAX_AGE
+        max_count = parsed_args.max_count
+        if max_count is None:
+            max_count = config.MESSAGES__RETENTION__READ_MAX_COUNT
+
+        retention_lib = EventsRetentionLib(session, config, dry_run_mode=parsed_args.dry_run_mode)
+        if max_age > 0:
+            deleted_messages_count = retention_lib.prune_read_messages_by_age(
+                datetime.utcnow() - timedelta(days=max_age)
+            )
+            print(
+                "{} read messages older than {} days deleted".format(
+                    deleted_messages_count, max_age
+                )
+            )
+        if max_count > 0:
+            deleted_messages_count = retention_lib.prune_read_messages_by_count(max_count)
+            print(
+                "{} read messages deleted to keep {} read messages by user".format(
+                    deleted_messages_count, max_count
+                )
+            )
+        if max_age <= 0 and max_count <= 0:
+            print("Messages retention is disabled, no message deleted")
+
+
+class ArchiveEventsCommand(AppContextCommand):
+    def get_description(self) -> str:
+        return """Archive old events in compressed files and delete them with their messages"""
+
+    def get_parser(self, prog_name: str) -> argparse.ArgumentParser:
+        parser = super().get_parser(prog_name)
+        parser.add_argument(
+            "--max-age",
+            help="archive events older than this number of days, "
+            "default to events.archive.max_age",
+            dest="max_age",
+            type=int,
+            default=None,
+        )
+        parser.add_argument(
+            "--dir",
+            help="directory where archive files are written, default to events.archive.dir",
+            dest="archive_dir",
+            default=None,
+        )
+        parser.add_argument(
+            "--dry-run",
+            help="dry-run mode, simulate action to be done but do not modify anything",
+            dest="dry_run_mode",
+            default=False,
+            action="store_true",
+        )
+        return parser
+
+    def take_app_action(self, parsed_args: argparse.Namespace, app_context: AppEnvironment) -> None:
+        session = app_context["request"].dbsession
+        config: CFG = app_context["registry"].settings["CFG"]
+        if parsed_args.dry_run_mode:
+            print("(!) Running in dry-run mode, no changes will be applied.")
+            app_context["request"].tm.doom()
+
+        max_age = parsed_args.max_age
+        if max_age is None:
+            max_age = config.EVENTS__ARCHIVE__MAX_AGE
+        if max_age <= 0:
+            print("Events archival is disabled, no event archived")
+            return
+
+        retention_lib = EventsRetentionLib(session, config, dry_run_mode=parsed_args.dry_run_mode)
+        result = retention_lib.archive_events(
+            datetime.utcnow() - timedelta(days=max_age),
+            parsed_args.archive_dir or config.EVENTS__ARCHIVE__DIR,
+            transaction_manager=app_context["request"].tm,
+        )
+        print(
+            "{} events older than {} days archived{}".format(
+                result.archived_events_count,
+                max_age,
+                " in {}".format(result.file_path) if result.file_path else "",
+            )
+        )
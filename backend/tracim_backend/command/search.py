@@ -6,15 +6,60 @@
 from tracim_backend.lib.core.content import ContentApi
 from tracim_backend.lib.core.user import UserApi
 from tracim_backend.lib.core.workspace import WorkspaceApi
+from tracim_backend.lib.search.elasticsearch_search.bulk_indexing import DEFAULT_BATCH_SIZE
+from tracim_backend.lib.search.elasticsearch_search.bulk_indexing import ESBulkContentIndexer
 from tracim_backend.lib.search.elasticsearch_search.elasticsearch_search import ESContentIndexer
 from tracim_backend.lib.search.elasticsearch_search.elasticsearch_search import ESUserIndexer
 from tracim_backend.lib.search.elasticsearch_search.elasticsearch_search import ESWorkspaceIndexer
+from tracim_backend.lib.search.search_factory import ELASTICSEARCH__SEARCH_ENGINE_SLUG
+from tracim_backend.lib.search.search_factory import INDEXED__SEARCH_ENGINE_SLUG
 from tracim_backend.lib.search.search_factory import SearchFactory
 from tracim_backend.lib.utils.logger import logger
 from tracim_backend.lib.utils.request import TracimContext
 
 
 class IndexingCommand(AppContextCommand):
+    def get_parser(self, prog_name: str) -> argparse.ArgumentParser:
+        parser = super().get_parser(prog_name)
+        parser.add_argument(
+            "--parallel",
+            help="elasticsearch only: index contents through the bulk API "
+            "using the given number of processes",
+            dest="parallel",
+            required=False,
+            default=None,
+            type=int,
+        )
+        parser.add_argument(
+            "--batch-size",
+            help="elasticsearch only: index contents through the bulk API "
+            "by batches of the given number of contents (default: {})".format(DEFAULT_BATCH_SIZE),
+            dest="batch_size",
+            required=False,
+            default=None,
+            type=int,
+        )
+        parser.add_argument(
+            "--after-content-id",
+            help="elasticsearch only: with bulk indexing, only index contents whose id is "
+            "greater than the given one (to resume an interrupted indexing)",
+            dest="after_content_id",
+            required=False,
+            default=0,
+            type=int,
+        )
+        return parser
+
+    def _setup_bulk_indexing(self, parsed_args: argparse.Namespace) -> None:
+        self._bulk_indexing = bool(
+            parsed_args.parallel or parsed_args.batch_size or parsed_args.after_content_id
+        )
+        self._processes_count = parsed_args.parallel or 1
+        self._batch_size = parsed_args.batch_size or DEFAULT_BATCH_SIZE
+        self._after_content_id = parsed_args.after_content_id
+        if self._processes_count < 1 or self._batch_size < 1:
+            raise ValueError("--parallel and --batch-size must be strictly positive integers")
+
     def _index_one_content(self, content_id: int, context: TracimContext) -> None:
         print('Indexing content "{}"'.format(content_id))
         if context.app_config.SEARCH__ENGINE == "simple":
@@ -23,13 +68,32 @@ def _index_one_content(self, content_id: int, context: TracimContext) -> None:
             current_user=None, session=context.dbsession, config=context.app_config
         )
         content = content_api.get_one(content_id=content_id, content_type=ContentTypeSlug.ANY.value)
-        ESContentIndexer().index_contents([content], context)
+        if context.app_config.SEARCH__ENGINE == INDEXED__SEARCH_ENGINE_SLUG:
+            SearchFactory.get_indexed_search_api(
+                current_user=None, session=context.dbsession, config=context.app_config
+            ).index_content(content)
+        else:
+            ESContentIndexer().index_contents([content], context)
         print('content "{}" correctly indexed.'.format(content_id))
 
     def _index_all_contents(self, context: TracimContext) -> None:
         print("Indexing all contents")
         if context.app_config.SEARCH__ENGINE == "simple":
             return
+        if context.app_config.SEARCH__ENGINE == INDEXED__SEARCH_ENGINE_SLUG:
+            indexed_contents_results = SearchFactory.get_indexed_search_api(
+                current_user=None, session=context.dbsession, config=context.app_config
+            ).index_all_content()
+            print(
+                "{} content(s) were indexed, got {} error(s), relaunch the command with '-d' to see the errors".format(
+                    indexed_contents_results.get_nb_content_correctly_indexed(),
+                    indexed_contents_results.get_nb_index_errors(),
+                )
+            )
+            return
+        if self._bulk_indexing:
+            self._bulk_index_all_contents(context)
+            return
         content_api = ContentApi(
             current_user=None, session=context.dbsession, config=context.app_config
         )
@@ -41,9 +105,46 @@ def _index_all_contents(self, context: TracimContext) -> None:
             )
         )
 
+    def _bulk_index_all_contents(self, context: TracimContext) -> None:
+        bulk_indexer = ESBulkContentIndexer(
+            session=context.dbsession,
+            config=context.app_config,
+            batch_size=self._batch_size,
+            processes_count=self._processes_count,
+        )
+        contents_count = bulk_indexer.get_contents_count(self._after_content_id)
+        print(
+            "Indexing {} content(s) in batches of {} with {} process(es)".format(
+                contents_count, self._batch_size, self._processes_count
+            )
+        )
+        processed_count = 0
+        indexed_count = 0
+        failed_content_ids = []
+        for result in bulk_indexer.index_all(self._after_content_id):
+            processed_count += result.indexed_count + len(result.failed_content_ids)
+            indexed_count += result.indexed_count
+            failed_content_ids.extend(result.failed_content_ids)
+            print(
+                "{}/{} content(s) processed, {} error(s), last content id: {}".format(
+                    processed_count, contents_count, len(failed_content_ids), result.last_content_id
+                )
+            )
+        print(
+            "{} content(s) were indexed, got {} error(s), relaunch the command with '-d' to see the errors".format(
+                indexed_count, len(failed_content_ids)
+            )
+        )
+        if failed_content_ids:
+            print(
+                "Content(s) which could not be indexed: {}".format(
+                    ", ".join(str(content_id) for content_id in failed_content_ids)
+                )
+            )
+
     def _index_all_users(self, context: TracimContext) -> None:
         print("Indexing all users")
-        if context.app_config.SEARCH__ENGINE == "simple":
+        if context.app_config.SEARCH__ENGINE != ELASTICSEARCH__SEARCH_ENGINE_SLUG:
             return
         user_api = UserApi(current_user=None, session=context.dbsession, config=context.app_config)
         indexed_user_count = 0
@@ -54,7 +155,7 @@ def _index_all_users(self, context: TracimContext) -> None:
 
     def _index_all_workspaces(self, context: TracimContext) -> None:
         print("Indexing all workspaces")
-        if context.app_config.SEARCH__ENGINE == "simple":
+        if context.app_config.SEARCH__ENGINE != ELASTICSEARCH__SEARCH_ENGINE_SLUG:
             return
         indexed_workspace_count = 0
         workspace_api = WorkspaceApi(
@@ -65,10 +166,17 @@ def _index_all_workspaces(self, context: TracimContext) -> None:
             indexed_workspace_count += 1
         print("{} space(s) were indexed".format(indexed_workspace_count))
 
+    def _delete_unused_file_data(self, context: TracimContext) -> None:
+        if context.app_config.SEARCH__ENGINE != ELASTICSEARCH__SEARCH_ENGINE_SLUG:
+            return
+        deleted_count = self.search_api.delete_unused_file_data()
+        print("{} unused extracted file text(s) were deleted".format(deleted_count))
+
     def _index_all(self, context: TracimContext) -> None:
         self._index_all_users(context)
         self._index_all_workspaces(context)
         self._index_all_contents(context)
+        self._delete_unused_file_data(context)
 
 
 class SearchIndexInitCommand(IndexingCommand):
@@ -95,6 +203,7 @@ def take_app_action(self, parsed_args: argparse.Namespace, app_context: AppEnvir
         self.search_api = SearchFactory.get_search_lib(
             current_user=None, session=self._session, config=self._app_config
         )
+        self._setup_bulk_indexing(parsed_args)
         self.search_api.create_indices()
         print("Index templates were created")
         if parsed_args.index_all:
@@ -145,6 +254,7 @@ def take_app_action(self, parsed_args: argparse.Namespace, app_context: AppEnvir
         self.search_api = SearchFactory.get_search_lib(
             current_user=None, session=self._session, config=self._app_config
         )
+        self._setup_bulk_indexing(parsed_args)
         if parsed_args.content_id:
             self._index_one_content(parsed_args.content_id, app_context["request"])
         else:
@@ -6,6 +6,7 @@
 import os
 from paste.deploy.converters import asbool
 from paste.deploy.converters import asint
+from sqlalchemy.engine.url import make_url
 import typing
 
 from tracim_backend.app_models.validator import update_validators
@@ -55,6 +56,9 @@
 DEPOT_MEMORY_STORAGE_BACKEND = "depot.io.memory.MemoryFileStorage"
 DEPOT_CONTENT_CONF_PREFIX = "uploaded_files"
 
+# INFO - database backends providing the full text search used by the "indexed" search engine
+INDEXED_SEARCH_DATABASE_BACKENDS = ("sqlite", "postgresql", "mysql")
+
 
 class DepotFileStorageType(Enum):
     LOCAL = ("local", "depot.io.local.LocalFileStorage")
@@ -349,6 +353,8 @@ def load_config(self) -> None:
         self._load_jobs_config()
         self.log_config_header("Live Messages Config parameters:")
         self._load_live_messages_config()
+        self.log_config_header("Messages retention config parameters:")
+        self._load_messages_retention_config()
         self.log_config_header("Email config parameters:")
         self._load_email_config()
         self.log_config_header("LDAP config parameters:")
@@ -559,6 +565,21 @@ def _load_global_config(self) -> None:
         self.URL_PREVIEW__MAX_CONTENT_LENGTH = int(
             self.get_raw_config("url_preview.max_content_length", "1048576")
         )
+        self.URL_PREVIEW__CACHE__TYPE = self.get_raw_config("url_preview.cache.type", "memory")
+        self.URL_PREVIEW__CACHE__URL = self.get_raw_config("url_preview.cache.url")
+        self.URL_PREVIEW__CACHE__DATA_DIR = self.get_raw_config(
+            "url_preview.cache.data_dir", self.here_macro_replace("%(here)s/url_preview_cache")
+        )
+        self.URL_PREVIEW__CACHE__LOCK_DIR = self.get_raw_config(
+            "url_preview.cache.lock_dir",
+            self.here_macro_replace("%(here)s/url_preview_cache_lock"),
+        )
+        self.URL_PREVIEW__CACHE__EXPIRE = int(
+            self.get_raw_config("url_preview.cache.expire", "1800")
+        )
+        self.URL_PREVIEW__CACHE__ERROR_EXPIRE = int(
+            self.get_raw_config("url_preview.cache.error_expire", "300")
+        )
 
         self.UI__SPACES__CREATION__PARENT_SPACE_CHOICE__VISIBLE = asbool(
             self.get_raw_config("ui.spaces.creation.parent_space_choice.visible", "True")
@@ -691,6 +712,31 @@ def _load_live_messages_config(self) -> None:
         self.LIVE_MESSAGES__BLOCKING_PUBLISH = asbool(
             self.get_raw_config("live_messages.blocking_publish", async_processing)
         )
+        self.LIVE_MESSAGES__PUBLISH_BATCH_SIZE = int(
+            self.get_raw_config("live_messages.publish_batch_size", "500")
+        )
+        self.LIVE_MESSAGES__BATCH_PUBLISH = asbool(
+            self.get_raw_config("live_messages.batch_publish", "True")
+        )
+        self.LIVE_MESSAGES__RECEIVER_IDS_CACHE__TTL = int(
+            self.get_raw_config("live_messages.receiver_ids_cache.ttl", "300")
+        )
+        self.LIVE_MESSAGES__REPLAY_MAX_COUNT = int(
+            self.get_raw_config("live_messages.replay_max_count", "1000")
+        )
+
+    def _load_messages_retention_config(self) -> None:
+        self.MESSAGES__RETENTION__READ_MAX_AGE = int(
+            self.get_raw_config("messages.retention.read_max_age", "0")
+        )
+        self.MESSAGES__RETENTION__READ_MAX_COUNT = int(
+            self.get_raw_config("messages.retention.read_max_count", "0")
+        )
+        self.EVENTS__ARCHIVE__MAX_AGE = int(self.get_raw_config("events.archive.max_age", "0"))
+        default_events_archive_dir = self.here_macro_replace("%(here)s/archives/events")
+        self.EVENTS__ARCHIVE__DIR = self.get_raw_config(
+            "events.archive.dir", default_events_archive_dir
+        )
 
     def _load_limitation_config(self) -> None:
         self.LIMITATION__SHAREDSPACE_PER_USER = int(
@@ -822,6 +868,21 @@ def _load_email_config(self) -> None:
         self.EMAIL__NOTIFICATION__SMTP__ENCRYPTION = self.get_raw_config(
             "email.notification.smtp.encryption", default_smtp_encryption
         )
+        self.EMAIL__NOTIFICATION__SMTP__POOL_SIZE = int(
+            self.get_raw_config("email.notification.smtp.pool_size", "4")
+        )
+        self.EMAIL__NOTIFICATION__SMTP__MAX_CONNECTIONS_PER_DOMAIN = int(
+            self.get_raw_config("email.notification.smtp.max_connections_per_domain", "2")
+        )
+        self.EMAIL__NOTIFICATION__SMTP__RETRY__MAX_ATTEMPTS = int(
+            self.get_raw_config("email.notification.smtp.retry.max_attempts", "3")
+        )
+        self.EMAIL__NOTIFICATION__SMTP__RETRY__DELAY = float(
+            self.get_raw_config("email.notification.smtp.retry.delay", "2")
+        )
+        self.EMAIL__NOTIFICATION__SEND_BATCH_SIZE = int(
+            self.get_raw_config("email.notification.send_batch_size", "50")
+        )
 
         self.EMAIL__REPLY__ACTIVATED = asbool(self.get_raw_config("email.reply.activated", "False"))
 
@@ -878,6 +939,10 @@ def _load_webdav_config(self) -> None:
         self.WEBDAV__VERBOSE__LEVEL = int(self.get_raw_config("webdav.verbose.level", "1"))
         self.WEBDAV__ROOT_PATH = self.get_raw_config("webdav.root_path", "/")
         self.WEBDAV__BLOCK_SIZE = int(self.get_raw_config("webdav.block_size", "8192"))
+        self.WEBDAV__PATH_CACHE__TTL = int(self.get_raw_config("webdav.path_cache.ttl", "10"))
+        self.WEBDAV__PATH_CACHE__MAX_SIZE = int(
+            self.get_raw_config("webdav.path_cache.max_size", "10000")
+        )
         self.WEBDAV__DIR_BROWSER__ENABLED = asbool(
             self.get_raw_config("webdav.dir_browser.enabled", "True")
         )
@@ -1068,6 +1133,7 @@ def check_config_validity(self) -> None:
         self._check_global_config_validity()
         self._check_uploaded_files_config_validity()
         self._check_live_messages_config_validity()
+        self._check_messages_retention_config_validity()
         self._check_jobs_config_validity()
         self._check_email_config_validity()
         self._check_ldap_config_validity()
@@ -1230,6 +1296,36 @@ def _check_global_config_validity(self) -> None:
                 )
             )
 
+        if self.URL_PREVIEW__CACHE__EXPIRE < 0:
+            raise ConfigurationError(
+                'ERROR  "{}" should be a positive value (currently "{}")'.format(
+                    "URL_PREVIEW__CACHE__EXPIRE", self.URL_PREVIEW__CACHE__EXPIRE
+                )
+            )
+
+        if self.URL_PREVIEW__CACHE__ERROR_EXPIRE < 0:
+            raise ConfigurationError(
+                'ERROR  "{}" should be a positive value (currently "{}")'.format(
+                    "URL_PREVIEW__CACHE__ERROR_EXPIRE", self.URL_PREVIEW__CACHE__ERROR_EXPIRE
+                )
+            )
+
+        if self.URL_PREVIEW__CACHE__TYPE == "file":
+            self.check_directory_path_param(
+                "URL_PREVIEW__CACHE__DATA_DIR", self.URL_PREVIEW__CACHE__DATA_DIR, writable=True
+            )
+        elif self.URL_PREVIEW__CACHE__TYPE in ["ext:database", "ext:redis", "ext:memcached"]:
+            self.check_mandatory_param(
+                "URL_PREVIEW__CACHE__URL",
+                self.URL_PREVIEW__CACHE__URL,
+                when_str="if url preview cache type is {}".format(self.URL_PREVIEW__CACHE__TYPE),
+            )
+        # INFO - locks of concurrent fetches of a url are files for these cache types
+        if self.URL_PREVIEW__CACHE__TYPE in ["file", "ext:database"]:
+            self.check_directory_path_param(
+                "URL_PREVIEW__CACHE__LOCK_DIR", self.URL_PREVIEW__CACHE__LOCK_DIR, writable=True
+            )
+
         if self.URL_PREVIEW__MAX_CONTENT_LENGTH < 0:
             raise ConfigurationError(
                 'ERROR  "{}" should be a positive value (currently "{}")'.format(
@@ -1296,6 +1392,30 @@ def _check_live_messages_config_validity(self) -> None:
             "LIVE_MESSAGES__STATS_ZMQ_URI", self.LIVE_MESSAGES__STATS_ZMQ_URI
         )
 
+        if self.LIVE_MESSAGES__PUBLISH_BATCH_SIZE < 1:
+            raise ConfigurationError(
+                "ERROR: LIVE_MESSAGES__PUBLISH_BATCH_SIZE must be a strictly positive integer"
+            )
+
+        if self.LIVE_MESSAGES__RECEIVER_IDS_CACHE__TTL < 0:
+            raise ConfigurationError(
+                "ERROR: LIVE_MESSAGES__RECEIVER_IDS_CACHE__TTL must be a positive integer"
+            )
+
+        if self.LIVE_MESSAGES__REPLAY_MAX_COUNT < 1:
+            raise ConfigurationError(
+                "ERROR: LIVE_MESSAGES__REPLAY_MAX_COUNT must be a strictly positive integer"
+            )
+
+    def _check_messages_retention_config_validity(self) -> None:
+        for param_name in (
+            "MESSAGES__RETENTION__READ_MAX_AGE",
+            "MESSAGES__RETENTION__READ_MAX_COUNT",
+            "EVENTS__ARCHIVE__MAX_AGE",
+        ):
+            if getattr(self, param_name) < 0:
+                raise ConfigurationError("ERROR: {} must be a positive integer".format(param_name))
+
     def _check_email_config_validity(self) -> None:
         """
         Check if config is correctly setted for email features
@@ -1381,6 +1501,21 @@ def _check_email_config_validity(self) -> None:
                     )
                 )
 
+            for param_name in (
+                "EMAIL__NOTIFICATION__SMTP__POOL_SIZE",
+                "EMAIL__NOTIFICATION__SMTP__MAX_CONNECTIONS_PER_DOMAIN",
+                "EMAIL__NOTIFICATION__SMTP__RETRY__MAX_ATTEMPTS",
+                "EMAIL__NOTIFICATION__SEND_BATCH_SIZE",
+            ):
+                if getattr(self, param_name) < 1:
+                    raise ConfigurationError(
+                        "ERROR: {} must be a strictly positive integer".format(param_name)
+                    )
+            if self.EMAIL__NOTIFICATION__SMTP__RETRY__DELAY < 0:
+                raise ConfigurationError(
+                    "ERROR: EMAIL__NOTIFICATION__SMTP__RETRY__DELAY must be a positive number"
+                )
+
             # INFO - G.M - 2019-12-10 - check value provided for headers
             self.check_mandatory_param(
                 "EMAIL__NOTIFICATION__FROM__EMAIL",
@@ -1470,7 +1605,7 @@ def _check_ldap_config_validity(self):
             )
 
     def _check_search_config_validity(self):
-        search_engine_valid = ["elasticsearch", "simple"]
+        search_engine_valid = ["elasticsearch", "simple", "indexed"]
         if self.SEARCH__ENGINE not in search_engine_valid:
             search_engine_list_str = ", ".join(
                 '"{}"'.format(engine) for engine in search_engine_valid
@@ -1486,6 +1621,18 @@ def _check_search_config_validity(self):
                 self.SEARCH__ELASTICSEARCH__INDEX_ALIAS_PREFIX,
                 when_str="if elasticsearch search feature is enabled",
             )
+        if self.SEARCH__ENGINE == "indexed":
+            database_backend = make_url(self.SQLALCHEMY__URL).get_backend_name()
+            if database_backend not in INDEXED_SEARCH_DATABASE_BACKENDS:
+                raise ConfigurationError(
+                    'ERROR: "indexed" SEARCH__ENGINE is not available with "{}" database, '
+                    "supported databases are {}.".format(
+                        database_backend,
+                        ", ".join(
+                            '"{}"'.format(backend) for backend in INDEXED_SEARCH_DATABASE_BACKENDS
+                        ),
+                    )
+                )
 
     def _check_webdav_config_validity(self):
         self.check_mandatory_param("WEBDAV__BASE_URL", self.WEBDAV__BASE_URL)
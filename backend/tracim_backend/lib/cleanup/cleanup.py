@@ -146,7 +146,13 @@ def delete_revision(
             "delete revision {} of content {}".format(revision.revision_id, revision.content_id),
         )
         revision_id = revision.revision_id
+        # NOTE - the stored file is shared by revisions with the same file_hash, it is removed
+        # from depot only when the last of them is deleted (see keep_shared_revision_files).
         self.safe_delete(revision)
+        if not self.dry_run_mode and revision.workspace_id is not None:
+            # INFO - the revision size may be counted in the used space of its workspace
+            wapi = WorkspaceApi(current_user=None, session=self.session, config=self.app_config)
+            wapi.invalidate_used_space([revision.workspace_id])
         return revision_id
 
     def delete_content(self, content: Content, recursively: bool = True) -> typing.List[str]:
@@ -0,0 +1,227 @@
+from datetime import datetime
+import gzip
+import json
+import os
+from sqlalchemy import func
+from sqlalchemy import null
+import transaction
+import typing
+
+from tracim_backend.config import CFG
+from tracim_backend.lib.core.messages_counters import MessagesCountersLib
+from tracim_backend.lib.utils.logger import logger
+from tracim_backend.models.event import Event
+from tracim_backend.models.event import Message
+from tracim_backend.models.tracim_session import TracimSession
+
+# INFO - events loaded and deleted per query when archiving events
+ARCHIVE_BATCH_SIZE = 500
+ARCHIVE_FILE_NAME_PATTERN = "events_{}.jsonl.gz"
+
+
+class ArchiveResult(object):
+    def __init__(self, archived_events_count: int, file_path: typing.Optional[str]) -> None:
+        self.archived_events_count = archived_events_count
+        self.file_path = file_path
+
+
+class EventsRetentionLib(object):
+    """
+    Keep events and messages tables from growing without bound: delete old read messages
+    and move old events to compressed archive files.
+
+    Messages counters are kept up to date. The last events of each space are never archived
+    as they are used to create messages history of users joining a space
+    (see EventApi.create_messages_history_for_user).
+    """
+
+    def __init__(self, session: TracimSession, config: CFG, dry_run_mode: bool = False) -> None:
+        self._session = session
+        self._config = config
+        self.dry_run_mode = dry_run_mode
+        self._messages_counters = MessagesCountersLib(session)
+
+    def prune_read_messages_by_age(self, created_before: datetime) -> int:
+        """
+        Delete read messages of events created before the given date.
+        :return: number of deleted messages
+        """
+        old_event_ids = self._session.query(Event.event_id).filter(Event.created < created_before)
+        self._messages_counters.remove_messages(
+            self._session.query(Message)
+            .join(Event)
+            .filter(Message.read != null())
+            .filter(Event.created < created_before)
+        )
+        return (
+            self._session.query(Message)
+            .filter(Message.read != null())
+            .filter(Message.event_id.in_(old_event_ids.subquery()))
+            .delete(synchronize_session=False)
+        )
+
+    def prune_read_messages_by_count(self, max_count: int) -> int:
+        """
+        Only keep the max_count most recent read messages of each user, delete other ones.
+        :return: number of deleted messages
+        """
+        assert max_count > 0
+        user_ids = [
+            user_id
+            for (user_id,) in self._session.query(Message.receiver_id)
+            .filter(Message.read != null())
+            .group_by(Message.receiver_id)
+            .having(func.count(Message.event_id) > max_count)
+        ]
+        deleted_messages_count = 0
+        for user_id in user_ids:
+            oldest_kept_event_id = (
+                self._session.query(Message.event_id)
+                .filter(Message.receiver_id == user_id)
+                .filter(Message.read != null())
+                .order_by(Message.event_id.desc())
+                .offset(max_count - 1)
+                .limit(1)
+                .scalar()
+            )
+            self._messages_counters.remove_messages(
+                self._session.query(Message)
+                .join(Event)
+                .filter(Message.receiver_id == user_id)
+                .filter(Message.read != null())
+                .filter(Message.event_id < oldest_kept_event_id)
+            )
+            deleted_messages_count += (
+                self._session.query(Message)
+                .filter(Message.receiver_id == user_id)
+                .filter(Message.read != null())
+                .filter(Message.event_id < oldest_kept_event_id)
+                .delete(synchronize_session=False)
+            )
+        return deleted_messages_count
+
+    def archive_events(
+        self,
+        created_before: datetime,
+        archive_dir: str,
+        transaction_manager: typing.Optional[transaction.TransactionManager] = None,
+    ) -> ArchiveResult:
+        """
+        Write events created before the given date in a gzip compressed JSON lines file of
+        archive_dir, then delete them with their messages. No file is written in dry-run mode.
+
+        When a transaction manager is given, deletions of each batch of events are committed
+        once the batch is written on disk: an interrupted archival loses no event and does
+        not keep a transaction open during the whole archival.
+        """
+        history_first_event_ids = self._get_history_first_event_ids()
+        file_path = None
+        archive_file = None  # type: typing.Optional[typing.TextIO]
+        if not self.dry_run_mode:
+            os.makedirs(archive_dir, exist_ok=True)
+            file_path = os.path.join(
+                archive_dir,
+                ARCHIVE_FILE_NAME_PATTERN.format(datetime.utcnow().strftime("%Y%m%d%H%M%S")),
+            )
+            archive_file = gzip.open(file_path, "wt", encoding="utf-8")
+
+        archived_events_count = 0
+        last_event_id = 0
+        try:
+            while True:
+                events = (
+                    self._session.query(Event)
+                    .filter(Event.created < created_before)
+                    .filter(Event.event_id > last_event_id)
+                    .order_by(Event.event_id)
+                    .limit(ARCHIVE_BATCH_SIZE)
+                    .all()
+                )
+                if not events:
+                    break
+                last_event_id = events[-1].event_id
+                archived_events = [
+                    event
+                    for event in events
+                    if event.workspace_id not in history_first_event_ids
+                    or event.event_id < history_first_event_ids[event.workspace_id]
+                ]
+                if archive_file:
+                    for event in archived_events:
+                        archive_file.write(json.dumps(self._serialize_event(event)) + "\n")
+                    archive_file.flush()
+                    os.fsync(archive_file.fileno())
+                self._delete_events([event.event_id for event in archived_events])
+                for event in events:
+                    self._session.expunge(event)
+                if transaction_manager and not self.dry_run_mode:
+                    transaction_manager.commit()
+                    transaction_manager.begin()
+                archived_events_count += len(archived_events)
+        finally:
+            if archive_file:
+                archive_file.close()
+
+        if file_path and not archived_events_count:
+            os.remove(file_path)
+            file_path = None
+        logger.info(
+            self,
+            "{} events created before {} archived".format(archived_events_count, created_before),
+        )
+        return ArchiveResult(archived_events_count, file_path)
+
+    def _get_history_first_event_ids(self) -> typing.Dict[int, int]:
+        """
+        Return the id of the oldest event used to create messages history of each space,
+        events of a space from this one are not archived.
+        """
+        max_messages_count = self._config.WORKSPACE__JOIN__MAX_MESSAGES_HISTORY_COUNT
+        # INFO - no history (0) or the whole history of spaces (-1): no event is kept
+        if max_messages_count <= 0:
+            return {}
+        ranked_events = (
+            self._session.query(
+                Event.workspace_id,
+                Event.event_id,
+                func.row_number()
+                .over(partition_by=Event.workspace_id, order_by=Event.event_id.desc())
+                .label("event_rank"),
+            )
+            .filter(Event.workspace_id != null())
+            .subquery()
+        )
+        return dict(
+            self._session.query(ranked_events.c.workspace_id, func.min(ranked_events.c.event_id))
+            .filter(ranked_events.c.event_rank <= max_messages_count)
+            .group_by(ranked_events.c.workspace_id)
+        )
+
+    def _delete_events(self, event_ids: typing.List[int]) -> None:
+        if not event_ids:
+            return
+        self._messages_counters.remove_messages(
+            self._session.query(Message).join(Event).filter(Message.event_id.in_(event_ids))
+        )
+        self._session.query(Message).filter(Message.event_id.in_(event_ids)).delete(
+            synchronize_session=False
+        )
+        self._session.query(Event).filter(Event.event_id.in_(event_ids)).delete(
+            synchronize_session=False
+        )
+
+    @staticmethod
+    def _serialize_event(event: Event) -> typing.Dict[str, typing.Any]:
+        return {
+            "event_id": event.event_id,
+            "created": event.created.isoformat(),
+            "event_type": event.event_type,
+            "entity_type": event.entity_type.value,
+            "operation": event.operation.value,
+            "entity_subtype": event.entity_subtype,
+            "workspace_id": event.workspace_id,
+            "author_id": event.author_id,
+            "content_id": event.content_id,
+            "parent_id": event.parent_id,
+            "fields": event.fields,
+        }
@@ -10,16 +10,24 @@
 from preview_generator.manager import PreviewManager
 from sqlakeyset import Page
 from sqlakeyset import get_page
+from sqlalchemy import DateTime
 from sqlalchemy import Integer
 from sqlalchemy import bindparam
+from sqlalchemy import case
+from sqlalchemy import exists
 from sqlalchemy import func
+from sqlalchemy import literal
 from sqlalchemy import or_
+from sqlalchemy import select
 from sqlalchemy import text
 from sqlalchemy.orm import Query
+from sqlalchemy.orm import aliased
 from sqlalchemy.orm import contains_eager
 from sqlalchemy.orm.attributes import QueryableAttribute
 from sqlalchemy.orm.attributes import get_history
+from sqlalchemy.orm.attributes import set_committed_value
 from sqlalchemy.orm.exc import NoResultFound
+from sqlalchemy.orm.util import identity_key
 from sqlalchemy.sql.elements import and_
 import transaction
 import typing
@@ -48,6 +56,7 @@
 from tracim_backend.exceptions import UnallowedSubContent
 from tracim_backend.exceptions import WorkspacesDoNotMatch
 from tracim_backend.lib.core.notifications import NotifierFactory
+from tracim_backend.lib.core.plugins import hookimpl
 from tracim_backend.lib.core.storage import StorageLib
 from tracim_backend.lib.core.tag import TagLib
 from tracim_backend.lib.core.userworkspace import RoleApi
@@ -59,8 +68,10 @@
 from tracim_backend.lib.utils.sanitizer import HtmlSanitizerConfig
 from tracim_backend.lib.utils.translation import Translator
 from tracim_backend.lib.utils.translation import translator_marker as _
+from tracim_backend.lib.utils.utils import ChunksFileStream
 from tracim_backend.lib.utils.utils import current_date_for_filename
 from tracim_backend.lib.utils.utils import date_as_lang
+from tracim_backend.lib.utils.utils import get_file_hash
 from tracim_backend.models.auth import User
 from tracim_backend.models.context_models import AuthoredContentRevisionsInfos
 from tracim_backend.models.context_models import ContentInContext
@@ -77,14 +88,19 @@
 from tracim_backend.models.data import Workspace
 from tracim_backend.models.event import OperationType
 from tracim_backend.models.favorites import FavoriteContent
+from tracim_backend.models.preview import RevisionPreviewMetadata
 from tracim_backend.models.revision_protection import new_revision
 from tracim_backend.models.tracim_session import TracimSession
+from tracim_backend.models.types import SharedUploadedFile
 
 if typing.TYPE_CHECKING:
     from tracim_backend.lib.utils.request import TracimContext
 
 __author__ = "damien"
 
+HIDDEN_THROUGH_PARENT_UPDATE_CHUNK_SIZE = 500
+MARK_READ_CHUNK_SIZE = 500
+
 
 class AddCopyRevisionsResult(object):
     def __init__(
@@ -1788,10 +1804,54 @@ def update_file_data(
             )
         item.file_name = new_filename
         item.file_mimetype = new_mimetype
-        item.depot_file = FileIntent(new_content, new_filename, new_mimetype)
+        file_hash = get_file_hash(new_content)
+        same_file_revision = self._get_revision_with_file_hash(file_hash) if file_hash else None
+        if same_file_revision:
+            # INFO - same content is already stored, share its file instead of storing it again
+            item.depot_file = SharedUploadedFile(same_file_revision.depot_file)
+        else:
+            item.depot_file = FileIntent(new_content, new_filename, new_mimetype)
+        item.file_hash = file_hash
         item.revision_type = ActionDescription.REVISION
         return item
 
+    def update_file_data_from_chunks(
+        self,
+        item: Content,
+        new_filename: str,
+        new_mimetype: str,
+        chunks: typing.Iterable[bytes],
+    ) -> Content:
+        """
+        Same as update_file_data() for a file given as chunks, which are streamed to the depot
+        without temporary copy. Hash and size are computed while streaming and max file size
+        is checked after each chunk, stopping the upload as soon as it is exceeded.
+
+        If an error is raised, the stored file is deleted when the transaction is aborted.
+        If a revision with the same file exists, its file is shared and the stored one deleted.
+        """
+        file_stream = ChunksFileStream(chunks, check_size=self._check_size_length_limitation)
+        self.update_file_data(item, new_filename, new_mimetype, file_stream)
+        if file_stream.error:
+            raise file_stream.error
+        file_hash = file_stream.file_hash
+        same_file_revision = self._get_revision_with_file_hash(file_hash)
+        if same_file_revision:
+            streamed_file = item.depot_file
+            item.depot_file = SharedUploadedFile(same_file_revision.depot_file)
+            streamed_file.depot.delete(streamed_file.file_id)
+        item.file_hash = file_hash
+        return item
+
+    def _get_revision_with_file_hash(self, file_hash: str) -> typing.Optional[ContentRevisionRO]:
+        return (
+            self._session.query(ContentRevisionRO)
+            .filter(ContentRevisionRO.file_hash == file_hash)
+            .filter(ContentRevisionRO.depot_file != None)  # noqa: E711
+            .order_by(ContentRevisionRO.revision_id)
+            .first()
+        )
+
     def check_upload_size(self, content_length: int, workspace: Workspace) -> None:
         self._check_size_length_limitation(content_length)
         self.check_workspace_size_limitation(content_length, workspace)
@@ -1812,7 +1872,8 @@ def check_workspace_size_limitation(self, content_length: int, workspace: Worksp
         # INFO - G.M - 2019-08-23 - 0 mean no size limit
         if self._config.LIMITATION__WORKSPACE_SIZE == 0:
             return
-        workspace_size = workspace.get_size()
+        wapi = WorkspaceApi(current_user=None, session=self._session, config=self._config)
+        workspace_size = wapi.get_used_space(workspace)
         if workspace_size > self._config.LIMITATION__WORKSPACE_SIZE:
             raise FileSizeOverWorkspaceEmptySpace(
                 'File cannot be added (size "{}") because workspace is full: "{}/{}"'.format(
@@ -1921,6 +1982,9 @@ def undelete(self, content: Content):
         content.revision_type = ActionDescription.UNDELETION
 
     def get_preview_page_nb(self, revision_id: int, file_extension: str) -> typing.Optional[int]:
+        preview_metadata = self.get_stored_preview_metadata(revision_id)
+        if preview_metadata:
+            return preview_metadata.page_nb
         # TODO: - G.M - 2021-01-20 - Refactor this to use new StorageLib, see #4079
         try:
             with self.get_one_revision_filepath(revision_id) as file_path:
@@ -1940,6 +2004,9 @@ def get_preview_page_nb(self, revision_id: int, file_extension: str) -> typing.O
         return nb_pages
 
     def has_pdf_preview(self, revision_id: int, file_extension: str) -> bool:
+        preview_metadata = self.get_stored_preview_metadata(revision_id)
+        if preview_metadata:
+            return preview_metadata.has_pdf_preview
         # TODO: - G.M - 2021-01-20 - Refactor this to use new StorageLib, see #4079
         try:
             with self.get_one_revision_filepath(revision_id) as file_path:
@@ -1958,6 +2025,9 @@ def has_pdf_preview(self, revision_id: int, file_extension: str) -> bool:
             return False
 
     def has_jpeg_preview(self, revision_id: int, file_extension: str) -> bool:
+        preview_metadata = self.get_stored_preview_metadata(revision_id)
+        if preview_metadata:
+            return preview_metadata.has_jpeg_preview
         # TODO: - G.M - 2021-01-20 - Refactor this to use new StorageLib, see #4079
         try:
             with self.get_one_revision_filepath(revision_id) as file_path:
@@ -1975,13 +2045,113 @@ def has_jpeg_preview(self, revision_id: int, file_extension: str) -> bool:
             logger.warning(self, "Unknown Preview_Generator Exception Occured", exc_info=True)
             return False
 
-    def mark_read__all(self, read_datetime: datetime = None, do_flush: bool = True) -> None:
+    def get_stored_preview_metadata(
+        self, revision_id: int
+    ) -> typing.Optional[RevisionPreviewMetadata]:
+        """
+        :return: preview information stored for the revision, None if not computed yet
+        """
+        return self._session.query(RevisionPreviewMetadata).get(revision_id)
+
+    def compute_preview_metadata(
+        self, revision: ContentRevisionRO
+    ) -> typing.Optional[RevisionPreviewMetadata]:
+        """
+        Compute preview information of the file of the revision, getting the file once.
+        Information of a revision with the same file content and extension is reused.
+        :return: preview information, None if the file is not available or if the preview
+        generator failed for another reason than an unsupported mimetype
+        """
+        if revision.file_hash:
+            same_file_preview_metadata = (
+                self._session.query(RevisionPreviewMetadata)
+                .join(
+                    ContentRevisionRO,
+                    ContentRevisionRO.revision_id == RevisionPreviewMetadata.revision_id,
+                )
+                .filter(ContentRevisionRO.file_hash == revision.file_hash)
+                .filter(ContentRevisionRO.file_extension == revision.file_extension)
+                .first()
+            )
+            if same_file_preview_metadata:
+                return RevisionPreviewMetadata(
+                    revision_id=revision.revision_id,
+                    page_nb=same_file_preview_metadata.page_nb,
+                    has_pdf_preview=same_file_preview_metadata.has_pdf_preview,
+                    has_jpeg_preview=same_file_preview_metadata.has_jpeg_preview,
+                )
+
+        try:
+            with self.get_one_revision_filepath(revision.revision_id) as file_path:
+                return RevisionPreviewMetadata(
+                    revision_id=revision.revision_id,
+                    page_nb=self._get_preview_information(
+                        self.preview_manager.get_page_nb, file_path, revision.file_extension
+                    ),
+                    has_pdf_preview=bool(
+                        self._get_preview_information(
+                            self.preview_manager.has_pdf_preview,
+                            file_path,
+                            revision.file_extension,
+                        )
+                    ),
+                    has_jpeg_preview=bool(
+                        self._get_preview_information(
+                            self.preview_manager.has_jpeg_preview,
+                            file_path,
+                            revision.file_extension,
+                        )
+                    ),
+                )
+        except CannotGetDepotFileDepotCorrupted:
+            logger.warning(
+                self,
+                "Unable to get revision filepath, depot is corrupted",
+                exc_info=True,
+            )
+        except Exception:
+            # INFO - the failure may be transient: nothing is returned so that
+            # information is not stored and is computed again next time.
+            logger.warning(
+                self,
+                "Unable to compute preview information of revision {}".format(revision.revision_id),
+                exc_info=True,
+            )
+        return None
+
+    def _get_preview_information(
+        self,
+        preview_manager_method: typing.Callable[..., typing.Any],
+        file_path: str,
+        file_extension: str,
+    ) -> typing.Any:
+        """
+        :return: result of the preview manager method, None if the mimetype is not supported.
+        Other preview generator exceptions are raised.
+        """
+        try:
+            return preview_manager_method(file_path, file_ext=file_extension)
+        except UnsupportedMimeType:
+            return None
+
+    def update_preview_metadata(self, revision: ContentRevisionRO) -> None:
+        """
+        Compute and store preview information of the file of the revision if needed.
+        """
+        if not revision.depot_file or self.get_stored_preview_metadata(revision.revision_id):
+            return
+        preview_metadata = self.compute_preview_metadata(revision)
+        if preview_metadata:
+            self._session.merge(preview_metadata)
+
+    def mark_read__all(
+        self, read_datetime: datetime = None, do_flush: bool = True
+    ) -> typing.List[int]:
         """
         Read content of all workspace visible for the user.
         :param read_datetime: date of readigin
         :param do_flush: flush database
-        :param recursive: mark read subcontent too
-        :return: nothing
+        :return: ids of contents marked as read
         """
 
         return self.mark_read__workspace(None, read_datetime, do_flush)
@@ -1991,18 +2161,18 @@ def mark_read__workspace(
         workspace: typing.Optional[Workspace],
         read_datetime: datetime = None,
         do_flush: bool = True,
-    ) -> None:
+    ) -> typing.List[int]:
         """
         Read content of a workspace visible for the user.
         :param read_datetime: date of readigin
         :param do_flush: flush database
-        :param recursive: mark read subcontent too
-        :return: nothing
+        :return: ids of contents marked as read
         """
 
-        # INFO - G.M - 2020-03-27 - Get all content of workspace
-        resultset = (
-            self.get_all_query(workspaces=[workspace] if workspace else None)
+        # INFO - G.M - 2020-03-27 - Get all content of workspace not read by the user
+        unread_content_ids = [
+            content_id
+            for (content_id,) in self.get_all_query(workspaces=[workspace] if workspace else None)
             .outerjoin(
                 RevisionReadStatus,
                 and_(
@@ -2010,17 +2180,15 @@ def mark_read__workspace(
                     RevisionReadStatus.user_id == self._user_id,
                 ),
             )
-            .options(
-                contains_eager(Content.current_revision).contains_eager(
-                    ContentRevisionRO.revision_read_statuses
-                )
-            )
-        )
+            .filter(RevisionReadStatus.user_id == None)  # noqa: E711
+            .with_entities(Content.id)
+        ]
 
-        # INFO - G.M - 2020-03-27 - Mark all content as read
-        for content in resultset:
-            if content.has_new_information_for(self._user, recursive=False):
-                self.mark_read(content, read_datetime, do_flush, recursive=False)
+        # INFO - G.M - 2020-03-27 - Mark all content as read
+        self._mark_contents_read(unread_content_ids, read_datetime or datetime.datetime.now())
+        if do_flush:
+            self.flush()
+        return unread_content_ids
 
     def mark_read(
         self,
@@ -2039,32 +2207,78 @@ def mark_read(
         assert self._user
         assert content
 
-        # The algorithm is:
-        # 1. define the read datetime
-        # 2. update all revisions related to current Content
-        # 3. do the same for all child revisions
-        #    (ie parent_id is content_id of current content)
-
         if not read_datetime:
             read_datetime = datetime.datetime.now()
 
-        viewed_revisions = (
-            self._session.query(ContentRevisionRO)
-            .filter(ContentRevisionRO.content_id == content.content_id)
-            .all()
-        )
-
-        for revision in viewed_revisions:
-            revision.read_by[self._user] = read_datetime
-
+        # INFO - revisions of the content must exist in database to be marked as read
+        self._session.flush()
+        content_ids = [content.id]
         if recursive:
-            for child in content.recursive_children:
-                self.mark_read(child, read_datetime=read_datetime, do_flush=False, recursive=True)
+            content_ids.extend(content.recursive_children_ids)
+        self._mark_contents_read(content_ids, read_datetime)
 
         if do_flush:
             self.flush()
         return content
 
+    def _mark_contents_read(
+        self, content_ids: typing.List[int], read_datetime: datetime.datetime
+    ) -> None:
+        """
+        Mark all revisions of the given contents as read by the user: update the read datetime
+        of revisions already read then insert read statuses of other ones, without loading
+        revisions or read statuses in the session.
+        """
+        revisions = ContentRevisionRO.__table__
+        read_statuses = RevisionReadStatus.__table__
+        for start in range(0, len(content_ids), MARK_READ_CHUNK_SIZE):
+            end = start + MARK_READ_CHUNK_SIZE
+            chunk_content_ids = content_ids[start:end]
+            self._session.execute(
+                read_statuses.update()
+                .where(read_statuses.c.user_id == self._user_id)
+                .where(
+                    read_statuses.c.revision_id.in_(
+                        select([revisions.c.revision_id]).where(
+                            revisions.c.content_id.in_(chunk_content_ids)
+                        )
+                    )
+                )
+                .values(view_datetime=read_datetime)
+            )
+            already_read = select([read_statuses.c.revision_id]).where(
+                and_(
+                    read_statuses.c.user_id == self._user_id,
+                    read_statuses.c.revision_id == revisions.c.revision_id,
+                )
+            )
+            self._session.execute(
+                read_statuses.insert().from_select(
+                    ["revision_id", "user_id", "view_datetime"],
+                    select(
+                        [
+                            revisions.c.revision_id,
+                            literal(self._user_id, Integer),
+                            literal(read_datetime, DateTime),
+                        ]
+                    )
+                    .where(revisions.c.content_id.in_(chunk_content_ids))
+                    .where(~exists(already_read)),
+                )
+            )
+
+        # INFO - read statuses already loaded in the session are outdated
+        content_ids_set = set(content_ids)
+        for instance in list(self._session.identity_map.values()):
+            if (
+                isinstance(instance, ContentRevisionRO)
+                and "revision_read_statuses" in instance.__dict__
+                and instance.content_id in content_ids_set
+            ):
+                self._session.expire(instance, ["revision_read_statuses"])
+            elif isinstance(instance, RevisionReadStatus) and instance.user_id == self._user_id:
+                self._session.expire(instance)
+
     def mark_unread(self, content: Content, do_flush=True) -> Content:
         assert self._user
         assert content
@@ -2164,20 +2378,151 @@ def get_all_types(self) -> typing.List[TracimContentType]:
         return content_types
 
     def get_deleted_parent_id(self, content: Content) -> typing.Optional[int]:
-        if content.parent:
-            if content.parent.is_deleted:
-                return content.parent_id
-            if content.parent.parent:
-                return self.get_deleted_parent_id(content.parent)
-        return 0
+        return content.deleted_through_parent_id
 
     def get_archived_parent_id(self, content: Content) -> typing.Optional[int]:
-        if content.parent:
-            if content.parent.is_archived:
-                return content.parent_id
-            if content.parent.parent:
-                return self.get_archived_parent_id(content.parent)
-        return 0
+        return content.archived_through_parent_id
+
+    def exclude_hidden_through_parent(self, query: Query) -> Query:
+        """
+        Filter out contents having a deleted/archived ancestor according to
+        show_deleted/show_archived settings.
+        """
+        if not self._show_deleted:
+            query = query.filter(Content.deleted_through_parent_id == 0)
+        if not self._show_archived:
+            query = query.filter(Content.archived_through_parent_id == 0)
+        return query
+
+    def update_hidden_through_parent_ids(self, content: Content) -> None:
+        """
+        Update deleted_through_parent_id/archived_through_parent_id of the given content
+        from its parent, then those of all its children if they are no longer consistent
+        (content moved, deleted/archived or restored).
+        """
+        deleted_through_parent_id = 0
+        archived_through_parent_id = 0
+        parent = content.parent
+        if parent:
+            deleted_through_parent_id = (
+                parent.content_id if parent.is_deleted else parent.deleted_through_parent_id
+            )
+            archived_through_parent_id = (
+                parent.content_id if parent.is_archived else parent.archived_through_parent_id
+            )
+        if (
+            content.deleted_through_parent_id != deleted_through_parent_id
+            or content.archived_through_parent_id != archived_through_parent_id
+        ):
+            self._set_hidden_through_parent_ids(
+                [content.content_id], deleted_through_parent_id, archived_through_parent_id
+            )
+
+        # INFO - values of the children only depend on their parent: if direct children
+        # are consistent, so is the whole tree.
+        children_deleted_through_parent_id = (
+            content.content_id if content.is_deleted else deleted_through_parent_id
+        )
+        children_archived_through_parent_id = (
+            content.content_id if content.is_archived else archived_through_parent_id
+        )
+        inconsistent_child = (
+            self._session.query(Content.id)
+            .join(ContentRevisionRO, Content.cached_revision_id == ContentRevisionRO.revision_id)
+            .filter(ContentRevisionRO.parent_id == content.content_id)
+            .filter(
+                or_(
+                    Content.deleted_through_parent_id != children_deleted_through_parent_id,
+                    Content.archived_through_parent_id != children_archived_through_parent_id,
+                )
+            )
+            .first()
+        )
+        if not inconsistent_child:
+            return
+
+        tree = (
+            self._session.query(
+                Content.id.label("content_id"),
+                ContentRevisionRO.is_deleted.label("is_deleted"),
+                ContentRevisionRO.is_archived.label("is_archived"),
+                literal(children_deleted_through_parent_id).label("deleted_through_parent_id"),
+                literal(children_archived_through_parent_id).label("archived_through_parent_id"),
+            )
+            .join(ContentRevisionRO, Content.cached_revision_id == ContentRevisionRO.revision_id)
+            .filter(ContentRevisionRO.parent_id == content.content_id)
+            .cte("content_tree", recursive=True)
+        )
+        child_content = aliased(Content)
+        child_revision = aliased(ContentRevisionRO)
+        tree = tree.union_all(
+            self._session.query(
+                child_content.id,
+                child_revision.is_deleted,
+                child_revision.is_archived,
+                case(
+                    [(tree.c.is_deleted == True, tree.c.content_id)],  # noqa: E712
+                    else_=tree.c.deleted_through_parent_id,
+                ),
+                case(
+                    [(tree.c.is_archived == True, tree.c.content_id)],  # noqa: E712
+                    else_=tree.c.archived_through_parent_id,
+                ),
+            )
+            .join(child_revision, child_content.cached_revision_id == child_revision.revision_id)
+            .filter(child_revision.parent_id == tree.c.content_id)
+        )
+        content_ids_by_values = {}  # type: typing.Dict[typing.Tuple[int, int], typing.List[int]]
+        for content_id, deleted_through_parent_id, archived_through_parent_id in (
+            self._session.query(
+                tree.c.content_id,
+                tree.c.deleted_through_parent_id,
+                tree.c.archived_through_parent_id,
+            )
+            .join(Content, Content.id == tree.c.content_id)
+            .filter(
+                or_(
+                    Content.deleted_through_parent_id != tree.c.deleted_through_parent_id,
+                    Content.archived_through_parent_id != tree.c.archived_through_parent_id,
+                )
+            )
+        ):
+            content_ids_by_values.setdefault(
+                (deleted_through_parent_id, archived_through_parent_id), []
+            ).append(content_id)
+        for (
+            deleted_through_parent_id,
+            archived_through_parent_id,
+        ), content_ids in content_ids_by_values.items():
+            self._set_hidden_through_parent_ids(
+                content_ids, deleted_through_parent_id, archived_through_parent_id
+            )
+
+    def _set_hidden_through_parent_ids(
+        self,
+        content_ids: typing.List[int],
+        deleted_through_parent_id: int,
+        archived_through_parent_id: int,
+    ) -> None:
+        # INFO - bulk update: modified contents must not be seen as modified by the ORM,
+        # as content modification trigger events. Loaded contents are updated
+        # without being marked as modified.
+        for index in range(0, len(content_ids), HIDDEN_THROUGH_PARENT_UPDATE_CHUNK_SIZE):
+            end = index + HIDDEN_THROUGH_PARENT_UPDATE_CHUNK_SIZE
+            self._session.query(Content).filter(Content.id.in_(content_ids[index:end])).update(
+                {
+                    Content.deleted_through_parent_id: deleted_through_parent_id,
+                    Content.archived_through_parent_id: archived_through_parent_id,
+                },
+                synchronize_session=False,
+            )
+        for content_id in content_ids:
+            content = self._session.identity_map.get(identity_key(Content, content_id))
+            if content is not None:
+                set_committed_value(content, "deleted_through_parent_id", deleted_through_parent_id)
+                set_committed_value(
+                    content, "archived_through_parent_id", archived_through_parent_id
+                )
 
     # TODO - G.M - 2018-07-24 - [Cleanup] Is this method still needed?
     def generate_folder_label(self, workspace: Workspace, parent: Content = None) -> str:
@@ -2372,3 +2717,29 @@ def create_todo(
         self.save(item, ActionDescription.CREATION, do_notify=do_notify)
 
         return item
+
+
+class ContentHiddenAncestorsHooks:
+    """
+    Keep Content.deleted_through_parent_id and Content.archived_through_parent_id up to date
+    when contents are created, moved, deleted, archived or restored.
+    """
+
+    # INFO - called first as other hooks can serialize contents and their children.
+    @hookimpl(tryfirst=True)
+    def on_content_created(self, content: Content, context: "TracimContext") -> None:
+        self._update_hidden_through_parent_ids(content, context)
+
+    @hookimpl(tryfirst=True)
+    def on_content_modified(self, content: Content, context: "TracimContext") -> None:
+        self._update_hidden_through_parent_ids(content, context)
+
+    def _update_hidden_through_parent_ids(self, content: Content, context: "TracimContext") -> None:
+        content_api = ContentApi(
+            session=context.dbsession,
+            current_user=None,
+            config=context.app_config,
+            show_deleted=True,
+            show_archived=True,
+        )
+        content_api.update_hidden_through_parent_ids(content)
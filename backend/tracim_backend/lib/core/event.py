@@ -7,12 +7,15 @@
 from sqlalchemy import event as sqlalchemy_event
 from sqlalchemy import func
 from sqlalchemy import inspect
-from sqlalchemy import not_
 from sqlalchemy import null
 from sqlalchemy import or_
+from sqlalchemy.dialects import mysql
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.orm import Query
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
 from sqlalchemy.orm.exc import NoResultFound
+import time
 import typing
 from typing import Any
 from typing import Callable
@@ -30,6 +33,9 @@
 from tracim_backend.exceptions import UserDoesNotExist
 from tracim_backend.lib.core.content import ContentApi
 from tracim_backend.lib.core.live_messages import LiveMessagesLib
+from tracim_backend.lib.core.membership_cache import get_membership_cache
+from tracim_backend.lib.core.messages_counters import MessagesCountersLib
+from tracim_backend.lib.core.messages_counters import filter_event_types
 from tracim_backend.lib.core.plugins import hookimpl
 from tracim_backend.lib.core.user import UserApi
 from tracim_backend.lib.core.userworkspace import RoleApi
@@ -37,11 +43,11 @@
 from tracim_backend.lib.rq import RqQueueName
 from tracim_backend.lib.rq import get_redis_connection
 from tracim_backend.lib.rq import get_rq_queue
+from tracim_backend.lib.rq import get_rq_queue2
 from tracim_backend.lib.rq.worker import worker_context
 from tracim_backend.lib.utils.logger import logger
 from tracim_backend.lib.utils.request import TracimContext
 from tracim_backend.lib.utils.utils import DEFAULT_NB_ITEM_PAGINATION
-from tracim_backend.models.auth import Profile
 from tracim_backend.models.auth import User
 from tracim_backend.models.call import UserCall
 from tracim_backend.models.data import ActionDescription
@@ -80,6 +86,16 @@
 
 JsonDict = Dict[str, Any]
 
+# INFO - rows per INSERT statement when bulk inserting messages: 4 columns by row keeps
+# statements under the 999 bound parameters limit of older SQLite versions.
+MESSAGES_BULK_INSERT_BATCH_SIZE = 200
+# INFO - events loaded per query when publishing messages of several events
+EVENTS_LOAD_BATCH_SIZE = 500
+# INFO - messages updated per statement when marking messages as read/unread
+MARK_READ_CHUNK_SIZE = 500
+# INFO - messages loaded per query when iterating over many messages
+MESSAGES_PAGE_SIZE = 100
+
 
 class EventApi:
     """Api to query event & messages"""
@@ -106,6 +122,7 @@ def __init__(self, current_user: Optional[User], session: TracimSession, config:
         self._current_user = current_user
         self._session = session
         self._config = config
+        self._messages_counters = MessagesCountersLib(session)
 
     def _filter_event_types(
         self,
@@ -113,37 +130,7 @@ def _filter_event_types(
         event_types: Optional[List[EventTypeDatabaseParameters]],
         exclude: bool,
     ) -> Query:
-        if event_types:
-            event_type_filters = []
-            for event_type in event_types:
-                if event_type.operation:
-                    if event_type.subtype:
-                        event_type_filter = and_(
-                            Event.entity_type == event_type.entity,
-                            Event.operation == event_type.operation,
-                            Event.entity_subtype == event_type.subtype,
-                        )
-                    else:
-                        event_type_filter = and_(
-                            Event.entity_type == event_type.entity,
-                            Event.operation == event_type.operation,
-                        )
-                else:
-                    event_type_filter = Event.entity_type == event_type.entity
-
-                event_type_filters.append(event_type_filter)
-
-            if len(event_type_filters) > 1:
-                f = or_(*event_type_filters)
-            else:
-                f = event_type_filters[0]
-
-            if exclude:
-                f = not_(f)
-
-            return query.filter(f)
-
-        return query
+        return filter_event_types(query, event_types, exclude)
 
     def _base_query(
         self,
@@ -241,9 +228,16 @@ def _base_query(
             query = query.filter(Message.event_id > after_event_id)
         return query
 
-    def get_one_message(self, event_id: int, user_id: int) -> Message:
+    def get_one_message(self, event_id: int, user_id: int, for_update: bool = False) -> Message:
+        """
+        :param for_update: lock the message row until the end of the transaction and
+        reload it, concurrent transactions then see its new values
+        """
+        query = self._base_query(event_ids=[event_id], user_id=user_id)
+        if for_update:
+            query = query.with_for_update(of=Message).populate_existing()
         try:
-            return self._base_query(event_ids=[event_id], user_id=user_id).one()
+            return query.one()
         except NoResultFound as exc:
             raise MessageDoesNotExist(
                 'Message for user {} with event id "{}" not found in database'.format(
@@ -253,7 +247,9 @@ def get_one_message(self, event_id: int, user_id: int) -> Message:
 
     # DEPRECATED - MP - 2022-09-22 - https://github.com/tracim/tracim/issues/5941
     def mark_user_message_as_read(self, event_id: int, user_id: int) -> Message:
-        message = self.get_one_message(event_id, user_id)
+        message = self.get_one_message(event_id, user_id, for_update=True)
+        if message.read is None:
+            self._messages_counters.set_messages_read_status([message], is_read=True)
         message.read = datetime.utcnow()
         self._session.add(message)
         self._session.flush()
@@ -261,7 +257,9 @@ def mark_user_message_as_read(self, event_id: int, user_id: int) -> Message:
 
     # DEPRECATED - MP - 2022-09-22 - https://github.com/tracim/tracim/issues/5941
     def mark_user_message_as_unread(self, event_id: int, user_id: int) -> Message:
-        message = self.get_one_message(event_id, user_id)
+        message = self.get_one_message(event_id, user_id, for_update=True)
+        if message.read is not None:
+            self._messages_counters.set_messages_read_status([message], is_read=False)
         message.read = None
         self._session.add(message)
         self._session.flush()
@@ -275,7 +273,7 @@ def mark_user_messages_as_read_or_unread(
         parent_ids: typing.Optional[List[int]] = None,
         space_ids: typing.Optional[List[int]] = None,
         is_read: bool = True,
-    ) -> List[Message]:
+    ) -> List[int]:
         """Mark messages as read or unread for a user. Will read/unread every messages if there is\
             no filter.
 
@@ -292,25 +290,61 @@ def mark_user_messages_as_read_or_unread(
             is_read (bool, optional): If true, will mark as read. Unread overwise. Defaults to True.
 
         Returns:
-            List[Message]: Every message marked as read
+            List[int]: ids of events of every message marked as read/unread
         """
 
         new_status = ReadStatus.UNREAD if is_read else ReadStatus.READ
         read = datetime.utcnow() if is_read else None
 
-        unread_messages = self._base_query(
-            content_ids=content_ids,
-            event_ids=event_ids,
-            parent_ids=parent_ids,
-            read_status=new_status,
-            user_id=user_id,
-            workspace_ids=space_ids,
-        ).all()
-        for message in unread_messages:
-            message.read = read
-            self._session.add(message)
-        self._session.flush()
-        return unread_messages
+        # INFO - only get columns needed to update counters instead of loading messages.
+        # Message rows are locked (in a stable order) so that a concurrent transaction marking
+        # the same messages waits for this one and then no longer selects them: counters are
+        # only updated for messages whose status is really changed.
+        marked_events = (
+            self._base_query(
+                content_ids=content_ids,
+                event_ids=event_ids,
+                parent_ids=parent_ids,
+                read_status=new_status,
+                user_id=user_id,
+                workspace_ids=space_ids,
+            )
+            .order_by(Message.event_id)
+            .with_for_update(of=Message)
+            .with_entities(
+                Message.event_id,
+                Event.workspace_id,
+                Event.entity_type,
+                Event.operation,
+                Event.entity_subtype,
+                Event.author_id,
+            )
+            .all()
+        )
+        marked_event_ids = [event.event_id for event in marked_events]
+        for start in range(0, len(marked_event_ids), MARK_READ_CHUNK_SIZE):
+            end = start + MARK_READ_CHUNK_SIZE
+            query = self._session.query(Message).filter(
+                Message.receiver_id == user_id,
+                Message.event_id.in_(marked_event_ids[start:end]),
+            )
+            if is_read:
+                query = query.filter(Message.read == null())
+            else:
+                query = query.filter(Message.read != null())
+            query.update({Message.read: read}, synchronize_session=False)
+        self._messages_counters.set_events_read_status(user_id, marked_events, is_read=is_read)
+
+        # INFO - update messages already loaded in the session
+        marked_event_ids_set = set(marked_event_ids)
+        for instance in list(self._session.identity_map.values()):
+            if (
+                isinstance(instance, Message)
+                and instance.receiver_id == user_id
+                and instance.event_id in marked_event_ids_set
+            ):
+                set_committed_value(instance, "read", read)
+        return marked_event_ids
 
     def get_messages_for_user(
         self,
@@ -338,6 +372,27 @@ def get_messages_for_user(
 
         return query.all()
 
+    def iter_messages_for_user(
+        self, user_id: int, after_event_id: int = 0, page_size: int = MESSAGES_PAGE_SIZE
+    ) -> Generator[Message, None, None]:
+        """
+        Iterate over messages of the user sent after the given event, ordered by event id.
+
+        Messages are loaded page by page (keyset pagination on event id) so that only
+        page_size messages are loaded at once whatever the number of messages.
+        """
+        while True:
+            messages = (
+                self._base_query(user_id=user_id, after_event_id=after_event_id)
+                .order_by(Message.event_id)
+                .limit(page_size)
+                .all()
+            )
+            yield from messages
+            if len(messages) < page_size:
+                return
+            after_event_id = messages[-1].event_id
+
     def get_mentions_for_content(self, content_id: int, after_event_id: int = 0) -> List[Message]:
         query = self._base_query(
             content_ids=[content_id],
@@ -358,6 +413,7 @@ def get_paginated_messages_for_user(
         include_not_sent: bool = False,
         workspace_ids: Optional[List[int]] = None,
         related_to_content_ids: Optional[List[int]] = None,
+        after_event_id: int = 0,
     ) -> Page:
         query = self._base_query(
             user_id=user_id,
@@ -368,6 +424,7 @@ def get_paginated_messages_for_user(
             workspace_ids=workspace_ids,
             include_not_sent=include_not_sent,
             related_to_content_ids=related_to_content_ids,
+            after_event_id=after_event_id,
         ).order_by(Message.event_id.desc())
         return get_page(query, per_page=count, page=page_token or False)
 
@@ -382,6 +439,20 @@ def get_messages_count(
         workspace_ids: Optional[List[int]] = None,
         related_to_content_ids: Optional[List[int]] = None,
     ) -> int:
+        if self._messages_counters.can_count(
+            user_id,
+            exclude_author_ids=exclude_author_ids,
+            include_not_sent=include_not_sent,
+            related_to_content_ids=related_to_content_ids,
+        ):
+            return self._messages_counters.count(
+                user_id,
+                read_status,
+                include_event_types=include_event_types,
+                exclude_event_types=exclude_event_types,
+                exclude_author_ids=exclude_author_ids,
+                workspace_ids=workspace_ids,
+            )
         return self._base_query(
             user_id=user_id,
             include_event_types=include_event_types,
@@ -469,10 +540,16 @@ def create_messages_history_for_user(
         user_id: int,
         workspace_ids: List[int],
         max_messages_count: int = -1,
+        excluded_event_ids: Optional[List[int]] = None,
     ) -> List[Message]:
         """
         Generate up to max_messages_count missing messages to ensure the last max_messages_count event
         related to given workspaces exist as message for user given.
+
+        Visibility of events is computed in SQL for entity types received by every member of
+        a space: all those events of spaces the user is a member of are visible. Receivers of
+        other events are computed one event after the other.
+        :param excluded_event_ids: ignore these events (in addition to pending events)
         """
         if not max_messages_count:
             return []
@@ -496,15 +573,28 @@ def create_messages_history_for_user(
         pending_event_ids = [
             event.event_id for event in session.context.pending_events if event.event_id is not None
         ]
+        pending_event_ids.extend(excluded_event_ids or [])
         event_query = (
             session.query(Event)
             .filter(Event.event_id.in_(workspace_event_ids_query.subquery()))
             .filter(Event.event_id.notin_(already_known_event_ids_query.subquery()))
             .filter(Event.event_id.notin_(pending_event_ids))
         )
-        messages = []
+        member_workspace_ids_query = session.query(UserRoleInWorkspace.workspace_id).filter(
+            UserRoleInWorkspace.user_id == user_id
+        )
+        is_visible_to_members = and_(
+            Event.entity_type.in_(BaseLiveMessageBuilder.get_member_visible_entity_types()),
+            Event.workspace_id.in_(member_workspace_ids_query.subquery()),
+        )
+
+        read = datetime.utcnow()
+        messages = [
+            Message(receiver_id=user_id, event=event, event_id=event.event_id, sent=None, read=read)
+            for event in event_query.filter(is_visible_to_members)
+        ]
         with session.cache():
-            for event in event_query:
+            for event in event_query.filter(~is_visible_to_members):
                 try:
                     receiver_ids = BaseLiveMessageBuilder.get_receiver_ids(
                         event, session, self._config
@@ -524,17 +614,109 @@ def create_messages_history_for_user(
                             event=event,
                             event_id=event.event_id,
                             sent=None,
-                            read=datetime.utcnow(),
+                            read=read,
                         )
                     )
-        session.add_all(messages)
+        messages.sort(key=lambda message: message.event_id)
+        return self.bulk_insert_messages(messages)
+
+    def bulk_insert_messages(self, messages: List[Message]) -> List[Message]:
+        """
+        Insert given transient messages using multi-rows INSERT statements.
+
+        Messages are not added to the session: they are neither flushed through the unit of
+        work nor tracked by the identity map, which matters when an event is sent to thousands
+        of users. Related events must already exist in database.
+
+        Messages already existing in database are skipped: messages history of a user joining
+        a space can be created concurrently to messages of the same events by EventPublisher.
+        :return: the messages actually inserted
+        """
+        if not messages:
+            return []
+        start = time.monotonic()
+        dialect_name = self._session.get_bind().dialect.name
+        inserted_messages = []  # type: List[Message]
+        for batch_start in range(0, len(messages), MESSAGES_BULK_INSERT_BATCH_SIZE):
+            batch_end = batch_start + MESSAGES_BULK_INSERT_BATCH_SIZE
+            inserted_messages.extend(
+                self._insert_missing_messages(messages[batch_start:batch_end], dialect_name)
+            )
+        self._messages_counters.add_messages(inserted_messages)
+        duration = time.monotonic() - start
+        logger.debug(
+            self,
+            "Inserted {} messages out of {} in {:.3f}s ({:.0f} rows/s)".format(
+                len(inserted_messages),
+                len(messages),
+                duration,
+                len(messages) / duration if duration else float(len(messages)),
+            ),
+        )
+        return inserted_messages
+
+    def _insert_missing_messages(self, messages: List[Message], dialect_name: str) -> List[Message]:
+        table = Message.__table__
+        if dialect_name == "postgresql":
+            insert_statement = (
+                postgresql.insert(table)
+                .values(self._get_message_rows(messages))
+                .on_conflict_do_nothing(index_elements=["receiver_id", "event_id"])
+                .returning(table.c.receiver_id, table.c.event_id)
+            )
+            inserted_keys = {tuple(row) for row in self._session.execute(insert_statement)}
+            return [
+                message
+                for message in messages
+                if (message.receiver_id, message.event_id) in inserted_keys
+            ]
+
+        # INFO - skipped rows cannot be known from the INSERT statement in these dialects:
+        # existing messages are filtered out first, the INSERT still ignores those committed
+        # in between by a concurrent transaction.
+        existing_keys = set(
+            self._session.query(Message.receiver_id, Message.event_id).filter(
+                Message.receiver_id.in_(sorted({message.receiver_id for message in messages})),
+                Message.event_id.in_(sorted({message.event_id for message in messages})),
+            )
+        )
+        messages = [
+            message
+            for message in messages
+            if (message.receiver_id, message.event_id) not in existing_keys
+        ]
+        if not messages:
+            return []
+        if dialect_name == "mysql":
+            insert_statement = mysql.insert(table).values(self._get_message_rows(messages))
+            insert_statement = insert_statement.on_duplicate_key_update(
+                receiver_id=insert_statement.inserted.receiver_id
+            )
+        else:
+            insert_statement = table.insert().values(self._get_message_rows(messages))
+            if dialect_name == "sqlite":
+                insert_statement = insert_statement.prefix_with("OR IGNORE")
+        self._session.execute(insert_statement)
         return messages
 
+    @staticmethod
+    def _get_message_rows(messages: List[Message]) -> List[Dict[str, Any]]:
+        return [
+            {
+                "receiver_id": message.receiver_id,
+                "event_id": message.event_id,
+                "sent": message.sent,
+                "read": message.read,
+            }
+            for message in messages
+        ]
+
     def delete_message_for_workspace(self, workspace_id: int) -> None:
         query = self._session.query(Message).join(Event)
         query = query.filter(Event.workspace_id == workspace_id)
         for message in query:
             self._session.delete(message)
+        self._messages_counters.delete_counters(workspace_id)
 
     def delete_message_for_user_in_workspace(self, workspace_id: int, user_id: int) -> None:
         query = self._session.query(Message).join(Event)
@@ -543,6 +725,7 @@ def delete_message_for_user_in_workspace(self, workspace_id: int, user_id: int)
         )
         for message in query:
             self._session.delete(message)
+        self._messages_counters.delete_counters(workspace_id, user_id=user_id)
 
     @classmethod
     def get_content_schema_for_type(cls, content_type: str) -> ContentSchema:
@@ -589,8 +772,13 @@ def publish(session: TracimSession, flush_context=None) -> None:
             message_builder = message_builder_class(
                 context=session.context
             )  # type: BaseLiveMessageBuilder
-            for event in session.context.pending_events:
-                message_builder.publish_messages_for_event(event.event_id)
+            event_ids = [event.event_id for event in session.context.pending_events]
+            if self._config.LIVE_MESSAGES__BATCH_PUBLISH:
+                if event_ids:
+                    message_builder.publish_messages_for_events(event_ids)
+            else:
+                for event_id in event_ids:
+                    message_builder.publish_messages_for_event(event_id)
             session.context.pending_events = []
 
         sqlalchemy_event.listen(db_session, commit_event, publish)
@@ -1048,12 +1236,11 @@ def _get_user_event_receiver_ids(event: Event, session: TracimSession, config: C
     - users knowing the user (in same workspace)
     """
     user_api = UserApi(current_user=event.user, session=session, config=config)
-    receiver_ids = user_api.get_user_ids_from_profile(Profile.ADMIN)
+    receiver_ids = set(get_membership_cache(config).get_administrator_ids(session, config))
     event_user_id = get_event_user_id(session, event)
     if event_user_id:
-        receiver_ids.append(event_user_id)
-        same_workspaces_user_ids = user_api.get_users_ids_in_same_workpaces(event_user_id)
-        receiver_ids = set(receiver_ids + same_workspaces_user_ids)
+        receiver_ids.add(event_user_id)
+        receiver_ids.update(user_api.get_users_ids_in_same_workpaces(event_user_id))
     return receiver_ids
 
 
@@ -1064,11 +1251,12 @@ def _get_members_and_administrators_ids(
     Return administrators + members of the event's workspace + user subject of the action if there\
         is one
     """
-    user_api = UserApi(current_user=None, session=session, config=config)
-    administrators = user_api.get_user_ids_from_profile(Profile.ADMIN)
-    role_api = RoleApi(current_user=None, session=session, config=config)
-    workspace_members = role_api.get_workspace_member_ids(event.workspace_id)
-    receiver_ids = set(administrators + workspace_members)
+    membership_cache = get_membership_cache(config)
+    administrators = membership_cache.get_administrator_ids(session, config)
+    workspace_members = membership_cache.get_workspace_member_ids(
+        session, config, event.workspace_id
+    )
+    receiver_ids = set(administrators | workspace_members)
     event_user_id = get_event_user_id(session, event)
     if event_user_id:
         receiver_ids.add(event_user_id)
@@ -1087,8 +1275,7 @@ def _get_workspace_event_receiver_ids(
         # Spaces without access_type are necessarily CONFIDENTIAL
         access_type = WorkspaceAccessType.CONFIDENTIAL
     if access_type in Workspace.ACCESSIBLE_TYPES:
-        user_api = UserApi(current_user=None, session=session, config=config)
-        receiver_ids = set(user_api.get_all_user_ids())
+        receiver_ids = set(get_membership_cache(config).get_all_user_ids(session, config))
     else:
         receiver_ids = _get_members_and_administrators_ids(event, session, config)
     return receiver_ids
@@ -1103,14 +1290,13 @@ def _get_workspace_subscription_event_receiver_ids(
     - administrators
     - workspace manager of the workspace the subscription took place
     """
-    user_api = UserApi(current_user=None, session=session, config=config)
-    administrators = user_api.get_user_ids_from_profile(Profile.ADMIN)
+    membership_cache = get_membership_cache(config)
+    administrators = membership_cache.get_administrator_ids(session, config)
     author = event.subscription["author"]["user_id"]
-    role_api = RoleApi(current_user=None, session=session, config=config)
-    workspace_managers = role_api.get_workspace_member_ids(
-        event.workspace_id, min_role=WorkspaceRoles.WORKSPACE_MANAGER
+    workspace_managers = membership_cache.get_workspace_member_ids(
+        session, config, event.workspace_id, min_role=WorkspaceRoles.WORKSPACE_MANAGER
     )
-    return set(administrators + workspace_managers + [author])
+    return set(administrators | workspace_managers | {author})
 
 
 def _get_content_event_receiver_ids(event: Event, session: TracimSession, config: CFG) -> Set[int]:
@@ -1125,8 +1311,9 @@ def _get_content_event_receiver_ids(event: Event, session: TracimSession, config
     Returns:
         Set[int]: List of user id that will receive the event
     """
-    role_api = RoleApi(current_user=None, session=session, config=config)
-    workspace_members = role_api.get_workspace_member_ids(event.workspace_id)
+    workspace_members = get_membership_cache(config).get_workspace_member_ids(
+        session, config, event.workspace_id
+    )
     return set(workspace_members)
 
 
@@ -1175,6 +1362,31 @@ def get_receiver_ids(cls, event: Event, session: Session, config: CFG) -> Iterab
             raise ValueError("Unknown entity type {}".format(event.entity_type))
         return get_receiver_ids(event, session, config)
 
+    @classmethod
+    def get_member_visible_entity_types(cls) -> List[EntityType]:
+        """Get entity types whose events are received by every member of their space."""
+        return [
+            entity_type
+            for entity_type, get_receiver_ids in cls._get_receiver_ids_callables.items()
+            if get_receiver_ids
+            in (
+                _get_content_event_receiver_ids,
+                _get_members_and_administrators_ids,
+                _get_workspace_event_receiver_ids,
+            )
+        ]
+
+    @classmethod
+    def get_receiver_ids_group_key(cls, event: Event) -> typing.Hashable:
+        """Get a key shared by events having the same receivers.
+
+        Receivers are computed once per key when publishing several events at once.
+        """
+        get_receiver_ids = cls._get_receiver_ids_callables.get(event.entity_type)
+        if get_receiver_ids is _get_content_event_receiver_ids:
+            return (get_receiver_ids, event.workspace_id)
+        return event.event_id
+
     @contextlib.contextmanager
     @abc.abstractmethod
     def context(self) -> Generator[TracimContext, None, None]:
@@ -1184,25 +1396,61 @@ def context(self) -> Generator[TracimContext, None, None]:
     def publish_messages_for_event(self, event_id: int) -> None:
         pass
 
+    def publish_messages_for_events(self, event_ids: List[int]) -> None:
+        """Publish messages for several events, by default one event after the other."""
+        for event_id in event_ids:
+            self.publish_messages_for_event(event_id)
+
     def _publish_messages_for_event(self, event_id: int) -> None:
+        self._publish_messages_for_events([event_id])
+
+    def _publish_messages_for_events(self, event_ids: List[int]) -> None:
         with self.context() as context:
             session = context.dbsession
-            event = session.query(Event).filter(Event.event_id == event_id).one()
-            receiver_ids = self.get_receiver_ids(event, session, self._config)
-            logger.debug(self, f"Sending eventid: {event_id} to users: {receiver_ids}")
-            messages = [
-                Message(
-                    receiver_id=receiver_id,
-                    event=event,
-                    event_id=event.event_id,
-                    sent=datetime.utcnow(),
+            events = []  # type: List[Event]
+            for batch_start in range(0, len(event_ids), EVENTS_LOAD_BATCH_SIZE):
+                batch_end = batch_start + EVENTS_LOAD_BATCH_SIZE
+                batch = event_ids[batch_start:batch_end]
+                events.extend(session.query(Event).filter(Event.event_id.in_(batch)).all())
+            if len(events) != len(set(event_ids)):
+                raise NoResultFound(
+                    "Events {} not found".format(
+                        set(event_ids) - {event.event_id for event in events}
+                    )
                 )
-                for receiver_id in receiver_ids
-            ]
-            session.add_all(messages)
+            events.sort(key=lambda event: event.event_id)
+            receiver_ids_by_group_key = {}  # type: Dict[typing.Hashable, Iterable[int]]
+            sent = datetime.utcnow()
+            messages = []  # type: List[Message]
+            for event in events:
+                group_key = self.get_receiver_ids_group_key(event)
+                try:
+                    receiver_ids = receiver_ids_by_group_key[group_key]
+                except KeyError:
+                    receiver_ids = self.get_receiver_ids(event, session, self._config)
+                    receiver_ids_by_group_key[group_key] = receiver_ids
+                logger.debug(self, f"Sending eventid: {event.event_id} to users: {receiver_ids}")
+                messages.extend(
+                    Message(
+                        receiver_id=receiver_id,
+                        event=event,
+                        event_id=event.event_id,
+                        sent=sent,
+                    )
+                    for receiver_id in receiver_ids
+                )
+            membership_cache = get_membership_cache(self._config)
+            if membership_cache.enabled:
+                logger.debug(
+                    self,
+                    "membership cache: {} hits, {} misses".format(
+                        membership_cache.hits, membership_cache.misses
+                    ),
+                )
+            event_api = EventApi(current_user=None, session=session, config=self._config)
+            messages = event_api.bulk_insert_messages(messages)
             live_message_lib = LiveMessagesLib(self._config)
-            for message in messages:
-                live_message_lib.publish_message_to_user(message)
+            live_message_lib.publish_messages(messages)
 
 
 class AsyncLiveMessageBuilder(BaseLiveMessageBuilder):
@@ -1227,6 +1475,17 @@ def publish_messages_for_event(self, event_id: int) -> None:
         )
         queue.enqueue(self._publish_messages_for_event, event_id)
 
+    def publish_messages_for_events(self, event_ids: List[int]) -> None:
+        redis_connection = get_redis_connection(self._config)
+        queue = get_rq_queue(redis_connection, RqQueueName.EVENT)
+        logger.debug(
+            self,
+            "publish {} events asynchronously to RQ queue {}".format(
+                len(event_ids), RqQueueName.EVENT
+            ),
+        )
+        queue.enqueue(self._publish_messages_for_events, event_ids)
+
 
 class SyncLiveMessageBuilder(BaseLiveMessageBuilder):
     """ "Live message building + sending executed in tracim web application."""
@@ -1243,17 +1502,19 @@ def publish_messages_for_event(self, event_id: int) -> None:
         logger.debug(self, "publish event(id={}) synchronously".format(event_id))
         self._publish_messages_for_event(event_id)
 
+    def publish_messages_for_events(self, event_ids: List[int]) -> None:
+        logger.debug(self, "publish {} events synchronously".format(len(event_ids)))
+        self._publish_messages_for_events(event_ids)
+
 
 class MessageHooks:
     @hookimpl
     def on_user_role_in_workspaces_created(
         self, roles: typing.List[UserRoleInWorkspace], context: TracimContext
     ) -> None:
-        current_user = context.safe_current_user()
-        event_api = EventApi(current_user, context.dbsession, context.app_config)
-        user_id = roles[0].user_id
-        event_api.create_messages_history_for_user(
-            user_id=user_id,
+        self._create_messages_history(
+            context,
+            user_id=roles[0].user_id,
             workspace_ids=[role.workspace_id for role in roles],
             max_messages_count=len(roles)
             * context.app_config.WORKSPACE__JOIN__MAX_MESSAGES_HISTORY_COUNT,
@@ -1273,12 +1534,89 @@ def on_workspace_modified(self, workspace: Workspace, context: TracimContext) ->
             event_api.delete_message_for_workspace(workspace.workspace_id)
         elif has_just_been_undeleted(workspace):
             for role in workspace.roles:
-                event_api.create_messages_history_for_user(
+                self._create_messages_history(
+                    context,
                     user_id=role.user_id,
                     workspace_ids=[workspace.workspace_id],
                     max_messages_count=context.app_config.WORKSPACE__JOIN__MAX_MESSAGES_HISTORY_COUNT,
                 )
 
+    def _create_messages_history(
+        self,
+        context: TracimContext,
+        user_id: int,
+        workspace_ids: List[int],
+        max_messages_count: int,
+    ) -> None:
+        """
+        Create messages history of the user for the given spaces.
+
+        In async mode it is done by a RQ job once the current transaction is committed,
+        created messages are then published to the user.
+        """
+        if not max_messages_count:
+            return
+        if context.app_config.JOBS__PROCESSING_MODE != CFG.CST.ASYNC:
+            event_api = EventApi(context.safe_current_user(), context.dbsession, context.app_config)
+            event_api.create_messages_history_for_user(
+                user_id=user_id,
+                workspace_ids=workspace_ids,
+                max_messages_count=max_messages_count,
+            )
+            return
+
+        queue = get_rq_queue2(context.app_config, RqQueueName.EVENT)
+
+        def create_via_rq_worker(session: TracimSession, flush_context=None) -> None:
+            # INFO - messages of events of the current transaction are created by EventPublisher.
+            # Other events are all considered, including those committed after this transaction
+            # or published before it: messages already created by EventPublisher are skipped.
+            excluded_event_ids = [event.event_id for event in session.context.pending_events]
+            logger.debug(
+                self,
+                "create messages history of user {} asynchronously to RQ queue {}".format(
+                    user_id, RqQueueName.EVENT
+                ),
+            )
+            queue.enqueue(
+                self._create_messages_history_from_worker,
+                user_id,
+                workspace_ids,
+                max_messages_count,
+                excluded_event_ids,
+            )
+
+        # INFO - inserted first to run before EventPublisher which empties pending events.
+        sqlalchemy_event.listen(
+            context.dbsession, "after_commit", create_via_rq_worker, once=True, insert=True
+        )
+
+    def _create_messages_history_from_worker(
+        self,
+        user_id: int,
+        workspace_ids: List[int],
+        max_messages_count: int,
+        excluded_event_ids: List[int],
+    ) -> None:
+        """Create messages history of the user then publish created messages to them.
+        Is exclusively made to be used inside a RQ DatabaseWorker()
+        """
+        with worker_context() as context:
+            event_api = EventApi(
+                current_user=None, session=context.dbsession, config=context.app_config
+            )
+            messages = event_api.create_messages_history_for_user(
+                user_id=user_id,
+                workspace_ids=workspace_ids,
+                max_messages_count=max_messages_count,
+                excluded_event_ids=excluded_event_ids,
+            )
+            logger.info(
+                self,
+                "created {} history messages for user {}".format(len(messages), user_id),
+            )
+            LiveMessagesLib(context.app_config).publish_messages(messages)
+
     @hookimpl
     def on_user_role_in_workspace_deleted(
         self, role: UserRoleInWorkspace, context: TracimContext
@@ -1,13 +1,16 @@
+from datetime import datetime
 import enum
 from gripcontrol import GripPubControl
 from gripcontrol import HttpStreamFormat
 import json
+from pubcontrol import Item
 import threading
 import typing
 
 # TODO - G.M - 2020-05-14 - Use default event "message" for TLM to be usable with
 # "onmessage" EventSource Object in javascript.
 from tracim_backend.config import CFG
+from tracim_backend.lib.utils.logger import logger
 from tracim_backend.models.event import Message
 from tracim_backend.views.core_api.schemas import LiveMessageSchema
 
@@ -17,6 +20,7 @@ class ServerSideEventType(str, enum.Enum):
     STREAM_OPEN = "stream-open"
     KEEPALIVE = "keep-alive"
     STREAM_ERROR = "stream-error"
+    RESYNC = "resync"
 
 
 class JsonServerSideEvent:
@@ -40,6 +44,9 @@ def __str__(self) -> str:
         )
 
 
+# event id and read date of a message, messages sharing them have the same live message payload
+PayloadKey = typing.Tuple[int, typing.Optional[datetime]]
+
 # NOTE S.G - 2020-08-06 - only one GripPubControl instance as it is:
 #  - thread safe
 #  - meant to be used like this (see example usage in fanout django_grip python package).
@@ -60,6 +67,7 @@ def __init__(
         config: CFG,
     ) -> None:
         self._blocking_publish = config.LIVE_MESSAGES__BLOCKING_PUBLISH
+        self._publish_batch_size = config.LIVE_MESSAGES__PUBLISH_BATCH_SIZE
         global _pub_control_create_lock
         global _grip_pub_control
         with _pub_control_create_lock:
@@ -88,6 +96,57 @@ def publish_message_to_user(self, message: Message):
         channel_name = self.user_grip_channel(message.receiver_id)
         self.publish_dict(channel_name, message_as_dict=LiveMessagesLib.message_as_dict(message))
 
+    def publish_messages(self, messages: typing.Iterable[Message]) -> None:
+        """Publish messages to their receivers.
+
+        Messages sharing the same event and read status produce the same server side event,
+        so it is serialized once and the resulting item is published to every receiver channel
+        in batches of LIVE_MESSAGES__PUBLISH_BATCH_SIZE channels.
+        """
+        channels_by_payload = {}  # type: typing.Dict[PayloadKey, typing.List[str]]
+        payload_messages = {}  # type: typing.Dict[PayloadKey, Message]
+        for message in messages:
+            payload_key = (message.event_id, message.read)
+            payload_messages.setdefault(payload_key, message)
+            channels_by_payload.setdefault(payload_key, []).append(
+                self.user_grip_channel(message.receiver_id)
+            )
+        for payload_key, channel_names in channels_by_payload.items():
+            message_as_dict = LiveMessagesLib.message_as_dict(payload_messages[payload_key])
+            self.publish_dict_to_channels(channel_names, message_as_dict)
+
+    def publish_dict_to_channels(
+        self, channel_names: typing.List[str], message_as_dict: typing.Dict[str, typing.Any]
+    ) -> None:
+        item = Item(
+            HttpStreamFormat(
+                str(JsonServerSideEvent(data=message_as_dict, event_type=ServerSideEventType.TLM))
+            )
+        )
+        for start in range(0, len(channel_names), self._publish_batch_size):
+            end = start + self._publish_batch_size
+            batch = channel_names[start:end]
+            if self._blocking_publish:
+                self._publish_item_batch(batch, item)
+            else:
+                # NOTE - one thread per batch instead of letting GripPubControl
+                # start one thread per non-blocking publish.
+                thread = threading.Thread(target=self._publish_item_batch, args=(batch, item))
+                thread.daemon = True
+                thread.start()
+
+    def _publish_item_batch(self, channel_names: typing.List[str], item: Item) -> None:
+        assert _grip_pub_control
+        try:
+            for channel_name in channel_names:
+                _grip_pub_control.publish(channel_name, item, blocking=True)
+        except ValueError:
+            if self._blocking_publish:
+                raise
+            logger.exception(
+                self, "Failed to publish live message to {} channels".format(len(channel_names))
+            )
+
     def close_channel_connections(self, channel: str) -> None:
         _grip_pub_control.publish_http_stream(
             channel, HttpStreamFormat(close=True), blocking=self._blocking_publish
@@ -0,0 +1,244 @@
+import abc
+import functools
+import redis
+from sqlalchemy.event import listen
+import time
+import typing
+
+from tracim_backend.config import CFG
+from tracim_backend.lib.core.plugins import hookimpl
+from tracim_backend.lib.core.user import UserApi
+from tracim_backend.lib.core.userworkspace import RoleApi
+from tracim_backend.lib.utils.request import TracimContext
+from tracim_backend.models.auth import Profile
+from tracim_backend.models.auth import User
+from tracim_backend.models.data import UserRoleInWorkspace
+from tracim_backend.models.data import Workspace
+from tracim_backend.models.roles import WorkspaceRoles
+from tracim_backend.models.tracim_session import TracimSession
+
+USERS_VERSION_KEY = "users"
+PENDING_VERSION_KEYS_SESSION_INFO = "membership_cache_pending_version_keys"
+
+_CacheEntry = typing.Tuple[float, typing.Tuple[int, ...], typing.FrozenSet[int]]
+
+
+def workspace_version_key(workspace_id: int) -> str:
+    return "workspace:{}".format(workspace_id)
+
+
+class MembershipVersionStore(abc.ABC):
+    """Version counters of cached membership sets, incremented on each change."""
+
+    @abc.abstractmethod
+    def get(self, keys: typing.Sequence[str]) -> typing.Tuple[int, ...]:
+        pass
+
+    @abc.abstractmethod
+    def increment(self, keys: typing.Iterable[str]) -> None:
+        pass
+
+
+class LocalMembershipVersionStore(MembershipVersionStore):
+    """Versions only known by the current process."""
+
+    def __init__(self) -> None:
+        self._versions = {}  # type: typing.Dict[str, int]
+
+    def get(self, keys: typing.Sequence[str]) -> typing.Tuple[int, ...]:
+        return tuple(self._versions.get(key, 0) for key in keys)
+
+    def increment(self, keys: typing.Iterable[str]) -> None:
+        for key in keys:
+            self._versions[key] = self._versions.get(key, 0) + 1
+
+
+class RedisMembershipVersionStore(MembershipVersionStore):
+    """Versions shared through redis between web processes and RQ workers."""
+
+    KEY_PREFIX = "tracim:membership_cache:version:"
+
+    def __init__(self, redis_connection: redis.Redis) -> None:
+        self._redis_connection = redis_connection
+
+    def get(self, keys: typing.Sequence[str]) -> typing.Tuple[int, ...]:
+        versions = self._redis_connection.mget([self.KEY_PREFIX + key for key in keys])
+        return tuple(int(version or 0) for version in versions)
+
+    def increment(self, keys: typing.Iterable[str]) -> None:
+        pipeline = self._redis_connection.pipeline()
+        for key in keys:
+            pipeline.incr(self.KEY_PREFIX + key)
+        pipeline.execute()
+
+
+class MembershipCache(object):
+    """
+    Process-wide cache of the user id sets used to find receivers of events:
+    administrators, all users and members of each space.
+
+    Each cached set depends on version keys (users or a given space) which are
+    incremented by MembershipCacheHooks when users or roles change, a set cached
+    with older versions is fetched again. Sets are also fetched again after ttl seconds.
+    """
+
+    def __init__(self, ttl: int, version_store: MembershipVersionStore) -> None:
+        self.ttl = ttl
+        self.version_store = version_store
+        self.hits = 0
+        self.misses = 0
+        self._entries = {}  # type: typing.Dict[str, _CacheEntry]
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    def get(
+        self,
+        key: str,
+        version_keys: typing.Sequence[str],
+        fetch: typing.Callable[[], typing.Iterable[int]],
+    ) -> typing.FrozenSet[int]:
+        if not self.enabled:
+            return frozenset(fetch())
+        versions = self.version_store.get(version_keys)
+        entry = self._entries.get(key)
+        if entry and entry[0] >= time.monotonic() and entry[1] == versions:
+            self.hits += 1
+            return entry[2]
+        self.misses += 1
+        ids = frozenset(fetch())
+        self._entries[key] = (time.monotonic() + self.ttl, versions, ids)
+        return ids
+
+    def clear(self) -> None:
+        self._entries = {}
+
+    def get_administrator_ids(self, session: TracimSession, config: CFG) -> typing.FrozenSet[int]:
+        user_api = UserApi(current_user=None, session=session, config=config)
+        return self.get(
+            "administrators",
+            (USERS_VERSION_KEY,),
+            lambda: user_api.get_user_ids_from_profile(Profile.ADMIN),
+        )
+
+    def get_all_user_ids(self, session: TracimSession, config: CFG) -> typing.FrozenSet[int]:
+        user_api = UserApi(current_user=None, session=session, config=config)
+        return self.get("users", (USERS_VERSION_KEY,), user_api.get_all_user_ids)
+
+    def get_workspace_member_ids(
+        self,
+        session: TracimSession,
+        config: CFG,
+        workspace_id: int,
+        min_role: typing.Optional[WorkspaceRoles] = None,
+    ) -> typing.FrozenSet[int]:
+        role_api = RoleApi(current_user=None, session=session, config=config)
+        return self.get(
+            "workspace_members:{}:{}".format(workspace_id, min_role.level if min_role else None),
+            # INFO - disabled users are not members, the set also depends on users versions
+            (workspace_version_key(workspace_id), USERS_VERSION_KEY),
+            lambda: role_api.get_workspace_member_ids(workspace_id, min_role=min_role),
+        )
+
+
+@functools.lru_cache(maxsize=None)
+def _create_membership_cache(
+    ttl: int, redis_host: typing.Optional[str], redis_port: int, redis_db: int
+) -> MembershipCache:
+    if redis_host:
+        version_store = RedisMembershipVersionStore(
+            redis.Redis(host=redis_host, port=redis_port, db=redis_db)
+        )  # type: MembershipVersionStore
+    else:
+        version_store = LocalMembershipVersionStore()
+    return MembershipCache(ttl, version_store)
+
+
+def get_membership_cache(config: CFG) -> MembershipCache:
+    """
+    Return the membership cache of the current process.
+
+    It is only enabled when jobs are processed asynchronously: versions are then
+    shared through redis so that caches of RQ workers are invalidated by changes
+    made in web processes. Otherwise sets are always fetched from the database.
+    """
+    if config.JOBS__PROCESSING_MODE != CFG.CST.ASYNC:
+        return _create_membership_cache(0, None, 0, 0)
+    return _create_membership_cache(
+        config.LIVE_MESSAGES__RECEIVER_IDS_CACHE__TTL,
+        config.JOBS__ASYNC__REDIS__HOST,
+        config.JOBS__ASYNC__REDIS__PORT,
+        config.JOBS__ASYNC__REDIS__DB,
+    )
+
+
+class MembershipCacheHooks(object):
+    """
+    Increment versions of membership sets changed by users and roles modifications.
+
+    Versions are incremented when the change is done and once again after commit, so that
+    sets cached from the database in-between are not used.
+    """
+
+    # pluggy uses this attribute to name the plugin
+    __name__ = "MembershipCacheHooks"
+
+    def __init__(self, config: CFG) -> None:
+        self._config = config
+
+    # INFO - tryfirst so that the after commit listener runs before the one of EventPublisher,
+    # events of the transaction must not be handled with outdated membership sets.
+    @hookimpl(tryfirst=True)
+    def on_context_session_created(self, db_session: TracimSession, context: TracimContext) -> None:
+        listen(db_session, "after_commit", self._increment_pending_versions)
+        listen(db_session, "after_soft_rollback", self._clear_pending_versions)
+
+    @hookimpl
+    def on_user_created(self, user: User, context: TracimContext) -> None:
+        self._increment_versions(context, [USERS_VERSION_KEY])
+
+    @hookimpl
+    def on_user_modified(self, user: User, context: TracimContext) -> None:
+        self._increment_versions(context, [USERS_VERSION_KEY])
+
+    @hookimpl
+    def on_user_deleted(self, user: User, context: TracimContext) -> None:
+        self._increment_versions(context, [USERS_VERSION_KEY])
+
+    @hookimpl
+    def on_workspace_deleted(self, workspace: Workspace, context: TracimContext) -> None:
+        self._increment_versions(context, [workspace_version_key(workspace.workspace_id)])
+
+    @hookimpl
+    def on_user_role_in_workspace_created(
+        self, role: UserRoleInWorkspace, context: TracimContext
+    ) -> None:
+        self._increment_versions(context, [workspace_version_key(role.workspace_id)])
+
+    @hookimpl
+    def on_user_role_in_workspace_modified(
+        self, role: UserRoleInWorkspace, context: TracimContext
+    ) -> None:
+        self._increment_versions(context, [workspace_version_key(role.workspace_id)])
+
+    @hookimpl
+    def on_user_role_in_workspace_deleted(
+        self, role: UserRoleInWorkspace, context: TracimContext
+    ) -> None:
+        self._increment_versions(context, [workspace_version_key(role.workspace_id)])
+
+    def _increment_versions(self, context: TracimContext, keys: typing.List[str]) -> None:
+        membership_cache = get_membership_cache(self._config)
+        if not membership_cache.enabled:
+            return
+        membership_cache.version_store.increment(keys)
+        context.dbsession.info.setdefault(PENDING_VERSION_KEYS_SESSION_INFO, set()).update(keys)
+
+    def _increment_pending_versions(self, session: TracimSession) -> None:
+        keys = session.info.pop(PENDING_VERSION_KEYS_SESSION_INFO, None)
+        if keys:
+            get_membership_cache(self._config).version_store.increment(keys)
+
+    def _clear_pending_versions(self, session: TracimSession, previous_transaction) -> None:
+        session.info.pop(PENDING_VERSION_KEYS_SESSION_INFO, None)
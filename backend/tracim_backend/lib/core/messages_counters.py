@@ -0,0 +1,322 @@
+import enum
+from sqlalchemy import and_
+from sqlalchemy import case
+from sqlalchemy import false
+from sqlalchemy import func
+from sqlalchemy import not_
+from sqlalchemy import or_
+from sqlalchemy.dialects import mysql
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Query
+import typing
+
+from tracim_backend.models.event import Event
+from tracim_backend.models.event import EventTypeDatabaseParameters
+from tracim_backend.models.event import Message
+from tracim_backend.models.event import ReadStatus
+from tracim_backend.models.event import UserMessagesCounter
+from tracim_backend.models.tracim_session import TracimSession
+
+# INFO - user_id, workspace_id, entity_type, operation, entity_subtype, authored_by_user
+CounterKey = typing.Tuple[int, int, typing.Any, typing.Any, str, bool]
+
+COUNTER_KEY_COLUMNS = (
+    "user_id",
+    "workspace_id",
+    "entity_type",
+    "operation",
+    "entity_subtype",
+    "authored_by_user",
+)
+
+
+def filter_event_types(
+    query: Query,
+    event_types: typing.Optional[typing.List[EventTypeDatabaseParameters]],
+    exclude: bool,
+    entity_type_column=Event.entity_type,
+    operation_column=Event.operation,
+    entity_subtype_column=Event.entity_subtype,
+) -> Query:
+    """Filter the given query to include or exclude the given event types."""
+    if not event_types:
+        return query
+    event_type_filters = []
+    for event_type in event_types:
+        if event_type.operation:
+            if event_type.subtype:
+                event_type_filter = and_(
+                    entity_type_column == event_type.entity,
+                    operation_column == event_type.operation,
+                    entity_subtype_column == event_type.subtype,
+                )
+            else:
+                event_type_filter = and_(
+                    entity_type_column == event_type.entity,
+                    operation_column == event_type.operation,
+                )
+        else:
+            event_type_filter = entity_type_column == event_type.entity
+
+        event_type_filters.append(event_type_filter)
+
+    if len(event_type_filters) > 1:
+        f = or_(*event_type_filters)
+    else:
+        f = event_type_filters[0]
+
+    if exclude:
+        f = not_(f)
+
+    return query.filter(f)
+
+
+def counter_key_sort_key(key: CounterKey) -> typing.Tuple[typing.Any, ...]:
+    """Key giving the same total order of counter rows in every transaction."""
+    return tuple(value.name if isinstance(value, enum.Enum) else value for value in key)
+
+
+class MessagesCountersLib(object):
+    """
+    Maintain and read UserMessagesCounter rows.
+
+    Only sent messages are counted, like messages returned by default by EventApi.
+    """
+
+    def __init__(self, session: TracimSession) -> None:
+        self._session = session
+
+    @staticmethod
+    def get_counter_key(receiver_id: int, event: Event) -> CounterKey:
+        return (
+            receiver_id,
+            event.workspace_id or UserMessagesCounter.NO_WORKSPACE_ID,
+            event.entity_type,
+            event.operation,
+            event.entity_subtype or UserMessagesCounter.NO_ENTITY_SUBTYPE,
+            event.author_id == receiver_id,
+        )
+
+    def add_messages(self, messages: typing.Iterable[Message]) -> None:
+        """Count the given new messages."""
+        deltas = {}  # type: typing.Dict[CounterKey, typing.List[int]]
+        for message in messages:
+            if message.sent is None:
+                continue
+            delta = deltas.setdefault(
+                self.get_counter_key(message.receiver_id, message.event), [0, 0]
+            )
+            delta[0] += 1
+            if message.read is None:
+                delta[1] += 1
+        self._apply_deltas(deltas)
+
+    def set_messages_read_status(self, messages: typing.Iterable[Message], is_read: bool) -> None:
+        """Count the given sent messages as just read (or unread)."""
+        deltas = {}  # type: typing.Dict[CounterKey, typing.List[int]]
+        for message in messages:
+            if message.sent is None:
+                continue
+            delta = deltas.setdefault(
+                self.get_counter_key(message.receiver_id, message.event), [0, 0]
+            )
+            delta[1] += -1 if is_read else 1
+        self._apply_deltas(deltas)
+
+    def set_events_read_status(
+        self, receiver_id: int, events: typing.Iterable[typing.Any], is_read: bool
+    ) -> None:
+        """
+        Count sent messages of the given events as just read (or unread) by the receiver.
+
+        Events can be any objects with workspace_id, entity_type, operation, entity_subtype
+        and author_id attributes like rows of a query on these Event columns.
+        """
+        deltas = {}  # type: typing.Dict[CounterKey, typing.List[int]]
+        for event in events:
+            delta = deltas.setdefault(self.get_counter_key(receiver_id, event), [0, 0])
+            delta[1] += -1 if is_read else 1
+        self._apply_deltas(deltas)
+
+    def delete_counters(self, workspace_id: int, user_id: typing.Optional[int] = None) -> None:
+        """Delete counters of a space, for all users or only the given one."""
+        query = self._session.query(UserMessagesCounter).filter(
+            UserMessagesCounter.workspace_id == workspace_id
+        )
+        if user_id is not None:
+            query = query.filter(UserMessagesCounter.user_id == user_id)
+        query.delete(synchronize_session=False)
+
+    def rebuild_counters(self, user_ids: typing.Optional[typing.List[int]] = None) -> None:
+        """Compute counters again from messages, for all users or only the given ones."""
+        delete_query = self._session.query(UserMessagesCounter)
+        if user_ids is not None:
+            delete_query = delete_query.filter(UserMessagesCounter.user_id.in_(user_ids))
+        delete_query.delete(synchronize_session=False)
+
+        messages_query = self._session.query(Message).join(
+            Event, Message.event_id == Event.event_id
+        )
+        if user_ids is not None:
+            messages_query = messages_query.filter(Message.receiver_id.in_(user_ids))
+        counts_query = self._get_counts_query(messages_query)
+        table = UserMessagesCounter.__table__
+        self._session.execute(
+            table.insert().from_select(
+                [table.c[column] for column in COUNTER_KEY_COLUMNS]
+                + [table.c.messages_count, table.c.unread_messages_count],
+                counts_query.subquery().select(),
+            )
+        )
+
+    def remove_messages(self, messages_query: Query) -> None:
+        """
+        Uncount messages matching the given query on Message joined with Event.
+
+        Must be called before deleting these messages.
+        """
+        deltas = {}  # type: typing.Dict[CounterKey, typing.List[int]]
+        for row in self._get_counts_query(messages_query):
+            messages_count, unread_messages_count = row[-2:]
+            deltas[tuple(row[:-2])] = [-int(messages_count), -int(unread_messages_count or 0)]
+        self._apply_deltas(deltas)
+
+    @staticmethod
+    def _get_counts_query(messages_query: Query) -> Query:
+        """Group sent messages of the given query by counter key and count them."""
+        authored_by_user = case([(Event.author_id == Message.receiver_id, True)], else_=False)
+        workspace_id = func.coalesce(Event.workspace_id, UserMessagesCounter.NO_WORKSPACE_ID)
+        entity_subtype = func.coalesce(Event.entity_subtype, UserMessagesCounter.NO_ENTITY_SUBTYPE)
+        return (
+            messages_query.with_entities(
+                Message.receiver_id,
+                workspace_id,
+                Event.entity_type,
+                Event.operation,
+                entity_subtype,
+                authored_by_user,
+                func.count(Message.event_id),
+                func.sum(case([(Message.read == None, 1)], else_=0)),  # noqa: E711
+            )
+            .filter(Message.sent != None)  # noqa: E711
+            .group_by(
+                Message.receiver_id,
+                workspace_id,
+                Event.entity_type,
+                Event.operation,
+                entity_subtype,
+                authored_by_user,
+            )
+        )
+
+    @staticmethod
+    def can_count(
+        user_id: int,
+        exclude_author_ids: typing.Optional[typing.List[int]] = None,
+        include_not_sent: bool = False,
+        related_to_content_ids: typing.Optional[typing.List[int]] = None,
+    ) -> bool:
+        """Whether messages matching the given filters can be counted from counters."""
+        return (
+            not include_not_sent
+            and not related_to_content_ids
+            and set(exclude_author_ids or []) <= {user_id}
+        )
+
+    def count(
+        self,
+        user_id: int,
+        read_status: ReadStatus,
+        include_event_types: typing.Optional[typing.List[EventTypeDatabaseParameters]] = None,
+        exclude_event_types: typing.Optional[typing.List[EventTypeDatabaseParameters]] = None,
+        exclude_author_ids: typing.Optional[typing.List[int]] = None,
+        workspace_ids: typing.Optional[typing.List[int]] = None,
+    ) -> int:
+        """Count sent messages of a user, filters must be supported (see can_count())."""
+        assert self.can_count(user_id, exclude_author_ids)
+        if read_status == ReadStatus.UNREAD:
+            count = UserMessagesCounter.unread_messages_count
+        elif read_status == ReadStatus.READ:
+            count = UserMessagesCounter.messages_count - UserMessagesCounter.unread_messages_count
+        else:
+            assert read_status == ReadStatus.ALL
+            count = UserMessagesCounter.messages_count
+        query = self._session.query(func.sum(count)).filter(UserMessagesCounter.user_id == user_id)
+        if workspace_ids:
+            query = query.filter(UserMessagesCounter.workspace_id.in_(workspace_ids))
+        if exclude_author_ids:
+            query = query.filter(UserMessagesCounter.authored_by_user == false())
+        # INFO - NULLIF keeps the semantic of filters on a NULL events subtype
+        entity_subtype = func.nullif(
+            UserMessagesCounter.entity_subtype, UserMessagesCounter.NO_ENTITY_SUBTYPE
+        )
+        for event_types, exclude in ((include_event_types, False), (exclude_event_types, True)):
+            query = filter_event_types(
+                query,
+                event_types,
+                exclude,
+                entity_type_column=UserMessagesCounter.entity_type,
+                operation_column=UserMessagesCounter.operation,
+                entity_subtype_column=entity_subtype,
+            )
+        return int(query.scalar() or 0)
+
+    def _apply_deltas(self, deltas: typing.Dict[CounterKey, typing.List[int]]) -> None:
+        # INFO - rows are always written in the same order so that concurrent transactions
+        # updating the same counters wait for each other instead of deadlocking
+        rows = [
+            dict(
+                zip(COUNTER_KEY_COLUMNS, key),
+                messages_count=messages_delta,
+                unread_messages_count=unread_delta,
+            )
+            for key, (messages_delta, unread_delta) in sorted(
+                deltas.items(), key=lambda item: counter_key_sort_key(item[0])
+            )
+            if messages_delta or unread_delta
+        ]
+        if not rows:
+            return
+        table = UserMessagesCounter.__table__
+        dialect_name = self._session.get_bind().dialect.name
+        if dialect_name == "postgresql":
+            insert_statement = postgresql.insert(table).values(rows)
+            self._session.execute(
+                insert_statement.on_conflict_do_update(
+                    index_elements=COUNTER_KEY_COLUMNS,
+                    set_={
+                        "messages_count": table.c.messages_count
+                        + insert_statement.excluded.messages_count,
+                        "unread_messages_count": table.c.unread_messages_count
+                        + insert_statement.excluded.unread_messages_count,
+                    },
+                )
+            )
+        elif dialect_name == "mysql":
+            insert_statement = mysql.insert(table).values(rows)
+            self._session.execute(
+                insert_statement.on_duplicate_key_update(
+                    messages_count=table.c.messages_count
+                    + insert_statement.inserted.messages_count,
+                    unread_messages_count=table.c.unread_messages_count
+                    + insert_statement.inserted.unread_messages_count,
+                )
+            )
+        else:
+            # INFO - no upsert in this dialect: update existing rows and insert missing ones.
+            # This is safe for SQLite as writes of concurrent transactions are serialized.
+            for row in rows:
+                key_filter = and_(
+                    *(table.c[column] == row[column] for column in COUNTER_KEY_COLUMNS)
+                )
+                result = self._session.execute(
+                    table.update()
+                    .where(key_filter)
+                    .values(
+                        messages_count=table.c.messages_count + row["messages_count"],
+                        unread_messages_count=table.c.unread_messages_count
+                        + row["unread_messages_count"],
+                    )
+                )
+                if not result.rowcount:
+                    self._session.execute(table.insert().values(row))
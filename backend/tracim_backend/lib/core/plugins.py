@@ -112,15 +112,23 @@ def init_plugin_manager(app_config: CFG) -> pluggy.PluginManager:
     plugin_manager = create_plugin_manager()
 
     # Static plugins, imported here to avoid circular reference with hookimpl
+    from tracim_backend.lib.core.content import ContentHiddenAncestorsHooks
     from tracim_backend.lib.core.event import EventBuilder
     from tracim_backend.lib.core.event import EventPublisher
     from tracim_backend.lib.core.event import MessageHooks
+    from tracim_backend.lib.core.membership_cache import MembershipCacheHooks
     import tracim_backend.lib.core.mention as mention
+    from tracim_backend.lib.core.preview_metadata import RevisionPreviewMetadataHooks
+    from tracim_backend.lib.core.workspace import WorkspaceUsedSpaceHooks
     from tracim_backend.lib.search.search_factory import SearchFactory
 
     plugin_manager.register(EventBuilder(app_config))
     plugin_manager.register(EventPublisher(app_config))
     plugin_manager.register(MessageHooks())
+    plugin_manager.register(MembershipCacheHooks(app_config))
+    plugin_manager.register(WorkspaceUsedSpaceHooks())
+    plugin_manager.register(ContentHiddenAncestorsHooks())
+    plugin_manager.register(RevisionPreviewMetadataHooks())
     mention.register_tracim_plugin(plugin_manager)
     search_api = SearchFactory.get_search_lib(session=None, config=app_config, current_user=None)
     search_api.register_plugins(plugin_manager)
@@ -0,0 +1,70 @@
+from sqlalchemy.event import listen
+
+from tracim_backend.config import CFG
+from tracim_backend.lib.core.content import ContentApi
+from tracim_backend.lib.core.plugins import hookimpl
+from tracim_backend.lib.rq import RqQueueName
+from tracim_backend.lib.rq import get_rq_queue2
+from tracim_backend.lib.rq.worker import worker_context
+from tracim_backend.lib.utils.request import TracimContext
+from tracim_backend.models.data import Content
+from tracim_backend.models.tracim_session import TracimSession
+
+
+class RevisionPreviewMetadataHooks:
+    """
+    Compute preview information of uploaded files once, after upload.
+
+    Two execution modes: sync or async depending on jobs.processing_mode.
+    """
+
+    @hookimpl
+    def on_content_created(self, content: Content, context: TracimContext) -> None:
+        self._update_preview_metadata(content, context)
+
+    @hookimpl
+    def on_content_modified(self, content: Content, context: TracimContext) -> None:
+        self._update_preview_metadata(content, context)
+
+    def _update_preview_metadata(self, content: Content, context: TracimContext) -> None:
+        revision = content.current_revision
+        if not revision or not revision.depot_file:
+            return
+        content_api = self._get_content_api(context.dbsession, context.app_config)
+        if content_api.get_stored_preview_metadata(revision.revision_id):
+            return
+        revision_id = revision.revision_id
+        if context.app_config.JOBS__PROCESSING_MODE == CFG.CST.ASYNC:
+            queue = get_rq_queue2(context.app_config, RqQueueName.PREVIEW_METADATA)
+
+            def update_via_rq_worker(session: TracimSession, flush_context=None) -> None:
+                queue.enqueue(self._update_preview_metadata_from_revision_id, revision_id)
+
+            listen(context.dbsession, "after_commit", update_via_rq_worker, once=True)
+        else:
+            # INFO - nothing can be written in the request transaction once it is committed:
+            # the file is read when committing instead of in the flush which stored it.
+            def update_before_commit(session: TracimSession) -> None:
+                content_api = self._get_content_api(session, context.app_config)
+                content_api.update_preview_metadata(content_api.get_one_revision(revision_id))
+
+            listen(context.dbsession, "before_commit", update_before_commit, once=True)
+
+    def _update_preview_metadata_from_revision_id(self, revision_id: int) -> None:
+        """Compute preview information of the revision whose id is given.
+        Is exclusively made to be used inside a RQ DatabaseWorker()
+        """
+        with worker_context() as context:
+            content_api = self._get_content_api(context.dbsession, context.app_config)
+            content_api.update_preview_metadata(content_api.get_one_revision(revision_id))
+
+    @staticmethod
+    def _get_content_api(session: TracimSession, config: CFG) -> ContentApi:
+        return ContentApi(
+            session=session,
+            current_user=None,
+            config=config,
+            show_deleted=True,
+            show_archived=True,
+            show_temporary=True,
+        )
@@ -1,7 +1,12 @@
 from urllib.parse import urljoin
 from urllib.parse import urlparse
 
+from beaker.cache import Cache
+from beaker.cache import cache_regions
+from hashlib import sha256
+from paste.deploy.converters import asbool
 from requests.exceptions import InvalidURL
+import typing
 from typing import Optional
 from webpreview import MaxLengthResponse
 from webpreview import WebpreviewException
@@ -10,6 +15,10 @@
 
 from tracim_backend.config import CFG
 from tracim_backend.exceptions import UnavailableURLPreview
+from tracim_backend.lib.utils.logger import logger
+
+URL_PREVIEW_CACHE_REGION = "url_preview"
+URL_PREVIEW_ERROR_CACHE_REGION = "url_preview_error"
 
 # NOTE - SG - 2021-04-16: uncomment those lines to debug the request headers/response
 # import http.client
@@ -42,6 +51,56 @@ def __init__(self, title: Optional[str], description: Optional[str], image: Opti
         self.image = image
 
 
+def get_url_preview_cache_settings(config: CFG) -> typing.Dict[str, str]:
+    """
+    Beaker cache regions settings of URL previews:
+    - url_preview: previews of urls
+    - url_preview_error: messages of urls whose preview could not be fetched
+    An expire delay of 0 disables the region.
+    """
+    settings = {
+        "cache.enabled": "True",
+        "cache.regions": "{}, {}".format(URL_PREVIEW_CACHE_REGION, URL_PREVIEW_ERROR_CACHE_REGION),
+        "cache.type": config.URL_PREVIEW__CACHE__TYPE,
+        "cache.data_dir": config.URL_PREVIEW__CACHE__DATA_DIR,
+        "cache.lock_dir": config.URL_PREVIEW__CACHE__LOCK_DIR,
+    }
+    if config.URL_PREVIEW__CACHE__URL:
+        settings["cache.url"] = config.URL_PREVIEW__CACHE__URL
+    for region, expire in (
+        (URL_PREVIEW_CACHE_REGION, config.URL_PREVIEW__CACHE__EXPIRE),
+        (URL_PREVIEW_ERROR_CACHE_REGION, config.URL_PREVIEW__CACHE__ERROR_EXPIRE),
+    ):
+        settings["cache.{}.enabled".format(region)] = str(expire > 0)
+        settings["cache.{}.expire".format(region)] = str(expire)
+    return settings
+
+
+def get_url_cache(region: str) -> typing.Optional[Cache]:
+    """
+    Return the cache of the given region, None if the region is disabled.
+
+    All urls share the region namespace, see get_url_cache_key() for their keys.
+    """
+    region_settings = cache_regions.get(region)
+    if not region_settings or not asbool(region_settings.get("enabled", True)):
+        return None
+    region_settings = {
+        name: value
+        for name, value in region_settings.items()
+        if name != "enabled" and value is not None
+    }
+    return Cache(region, **region_settings)
+
+
+def get_url_cache_key(url: str) -> str:
+    """
+    Return the cache key of url, concurrent fetches of a same url are serialized by
+    the creation lock of this key.
+    """
+    return sha256(url.encode("utf-8")).hexdigest()
+
+
 class URLPreviewResponse(MaxLengthResponse):
     def __init__(self, response: MaxLengthResponse) -> None:
         self.__setstate__(response.__getstate__())
@@ -75,6 +134,51 @@ def __init__(
     ) -> None:
         self.app_config = config
 
+    def get_cached_preview(self, url: str) -> URLPreview:
+        """
+        Get the preview of url from the cache shared by Tracim processes, fetch it if needed.
+
+        A url is fetched by only one process at a time, others wait for its result.
+        Failures are cached too, for URL_PREVIEW__CACHE__ERROR_EXPIRE seconds.
+        """
+        preview_cache = get_url_cache(URL_PREVIEW_CACHE_REGION)
+        if preview_cache is None:
+            return self.get_preview(url)
+        error_cache = get_url_cache(URL_PREVIEW_ERROR_CACHE_REGION)
+        cache_key = get_url_cache_key(url)
+        fetched = False
+
+        def fetch_preview() -> URLPreview:
+            nonlocal fetched
+            # INFO - the fetch of a concurrent request may have failed while waiting for it
+            self._raise_cached_error(url, error_cache, cache_key)
+            fetched = True
+            logger.info(self, "URL preview cache miss for {}".format(url))
+            try:
+                return self.get_preview(url)
+            except UnavailableURLPreview as exc:
+                if error_cache is not None:
+                    error_cache.put(cache_key, str(exc))
+                raise
+
+        self._raise_cached_error(url, error_cache, cache_key)
+        preview = preview_cache.get(cache_key, createfunc=fetch_preview)
+        if not fetched:
+            logger.info(self, "URL preview cache hit for {}".format(url))
+        return preview
+
+    def _raise_cached_error(
+        self, url: str, error_cache: typing.Optional[Cache], cache_key: str
+    ) -> None:
+        if error_cache is None:
+            return
+        try:
+            message = error_cache.get(cache_key)
+        except KeyError:
+            return
+        logger.info(self, "URL preview cache hit (unavailable preview) for {}".format(url))
+        raise UnavailableURLPreview(message)
+
     def get_preview(self, url: str) -> URLPreview:
         try:
             response = URLPreviewResponse(
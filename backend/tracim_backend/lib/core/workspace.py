@@ -13,6 +13,7 @@
 from tracim_backend.exceptions import WorkspaceNotFound
 from tracim_backend.exceptions import WorkspacePublicDownloadDisabledException
 from tracim_backend.exceptions import WorkspacePublicUploadDisabledException
+from tracim_backend.lib.core.plugins import hookimpl
 from tracim_backend.lib.core.userworkspace import RoleApi
 from tracim_backend.lib.utils.translation import Translator
 from tracim_backend.lib.utils.utils import current_date_for_filename
@@ -20,6 +21,8 @@
 from tracim_backend.models.auth import Profile
 from tracim_backend.models.auth import User
 from tracim_backend.models.context_models import WorkspaceInContext
+from tracim_backend.models.data import Content
+from tracim_backend.models.data import ContentRevisionRO
 from tracim_backend.models.data import EmailNotificationType
 from tracim_backend.models.data import UserRoleInWorkspace
 from tracim_backend.models.data import Workspace
@@ -27,6 +30,9 @@
 from tracim_backend.models.roles import WorkspaceRoles
 from tracim_backend.models.tracim_session import TracimSession
 
+if typing.TYPE_CHECKING:
+    from tracim_backend.lib.utils.request import TracimContext
+
 __author__ = "damien"
 
 
@@ -339,12 +345,68 @@ def get_all_children(self, parent_ids: typing.List[int]) -> typing.List[Workspac
         workspaces = self._parent_id_filter(parent_ids=parent_ids, query=self._base_query())
         return self.default_order_workspace(workspaces).all()
 
+    def get_used_space(self, workspace: Workspace) -> int:
+        """
+        Return the used space of the workspace, computing it first when it is unknown.
+        """
+        if workspace.used_space is None:
+            self.update_used_space([workspace.workspace_id])
+        return workspace.used_space
+
     def get_user_used_space(self, user: User) -> int:
-        workspaces = self.get_all_for_user(user, include_owned=True, include_with_role=False)
-        used_space = 0
+        query = self._base_query().filter(Workspace.owner_id == user.user_id)
+        unknown_used_space_workspace_ids = [
+            row[0]
+            for row in query.filter(Workspace.used_space == None).with_entities(  # noqa: E711
+                Workspace.workspace_id
+            )
+        ]
+        if unknown_used_space_workspace_ids:
+            self.update_used_space(unknown_used_space_workspace_ids)
+        return query.with_entities(func.coalesce(func.sum(Workspace.used_space), 0)).scalar()
+
+    def update_used_space(self, workspace_ids: typing.List[int]) -> None:
+        """
+        Store the current size of given workspaces in Workspace.used_space.
+        Values are written with a bulk update query so this method can be used
+        in flush hooks without marking workspaces as modified.
+        """
+        workspaces = self._session.query(Workspace).filter(
+            Workspace.workspace_id.in_(workspace_ids)
+        )
         for workspace in workspaces:
-            used_space += workspace.get_size()
-        return used_space
+            self._session.query(Workspace).filter(
+                Workspace.workspace_id == workspace.workspace_id
+            ).update({Workspace.used_space: workspace.get_size()}, synchronize_session="evaluate")
+
+    def add_used_space(self, deltas: typing.Dict[int, int]) -> None:
+        """
+        Add the given size (in bytes, by workspace id) to the used space of workspaces.
+        An unknown used space stays unknown.
+        """
+        # INFO - workspaces are always updated in the same order so that concurrent transactions
+        # wait for each other instead of deadlocking.
+        for workspace_id, delta in sorted(deltas.items()):
+            if not delta:
+                continue
+            self._session.query(Workspace).filter(Workspace.workspace_id == workspace_id).update(
+                {Workspace.used_space: Workspace.used_space + delta},
+                # INFO - "evaluate" would add the delta to the updated value when the attribute
+                # is expired: expire it instead.
+                synchronize_session="fetch",
+            )
+
+    def invalidate_used_space(self, workspace_ids: typing.Iterable[int]) -> None:
+        """
+        Mark the used space of given workspaces as unknown,
+        it is computed again when read (see get_used_space()).
+        """
+        workspace_ids = sorted(set(workspace_ids))
+        if not workspace_ids:
+            return
+        self._session.query(Workspace).filter(Workspace.workspace_id.in_(workspace_ids)).update(
+            {Workspace.used_space: None}, synchronize_session="evaluate"
+        )
 
     def _get_workspaces_owned_by_user(self, user_id: int) -> typing.List[Workspace]:
         return self._base_query_without_roles().filter(Workspace.owner_id == user_id).all()
@@ -500,3 +562,78 @@ def generate_label(self) -> str:
         )
 
         return _("Space {}").format(query.count() + 1)
+
+
+class WorkspaceUsedSpaceHooks:
+    """
+    Keep Workspace.used_space up to date when file contents are created or modified.
+
+    Workspace.get_size() counts every revision in its own workspace as long as the current
+    revision of its content is neither deleted nor archived: only the size of the new revision
+    is added, unless the content has just been deleted/archived or restored.
+    Contents are only removed from database by CleanupLib which invalidates the used space.
+    """
+
+    @hookimpl
+    def on_content_created(self, content: Content, context: "TracimContext") -> None:
+        self._add_new_revision_used_space(content, context)
+
+    @hookimpl
+    def on_content_modified(self, content: Content, context: "TracimContext") -> None:
+        self._add_new_revision_used_space(content, context)
+
+    def _add_new_revision_used_space(self, content: Content, context: "TracimContext") -> None:
+        revision = content.current_revision
+        # INFO - the content can be modified without a new revision, e.g. when CleanupLib
+        # changes its current revision.
+        if not revision or revision not in context.dbsession.new:
+            return
+        session = context.dbsession
+        previous_revision_state = (
+            session.query(ContentRevisionRO.is_deleted, ContentRevisionRO.is_archived)
+            .filter(ContentRevisionRO.content_id == content.id)
+            .filter(ContentRevisionRO.revision_id < revision.revision_id)
+            .order_by(ContentRevisionRO.revision_id.desc())
+            .first()
+        )
+        was_counted = previous_revision_state is not None and not any(previous_revision_state)
+        is_counted = not revision.is_deleted and not revision.is_archived
+        if was_counted == is_counted:
+            if not is_counted or not revision.depot_file:
+                return
+            revisions_query = session.query(ContentRevisionRO).filter(
+                ContentRevisionRO.revision_id == revision.revision_id
+            )
+            sign = 1
+        else:
+            # INFO - the content has just been deleted/archived (or restored):
+            # all its previous revisions (and the new one) are removed from (or added to) sizes.
+            revisions_query = session.query(ContentRevisionRO).filter(
+                ContentRevisionRO.content_id == content.id
+            )
+            if was_counted:
+                revisions_query = revisions_query.filter(
+                    ContentRevisionRO.revision_id != revision.revision_id
+                )
+            sign = 1 if is_counted else -1
+
+        deltas = {}  # type: typing.Dict[int, int]
+        unknown_size_workspace_ids = set()  # type: typing.Set[int]
+        for workspace_id, size, unknown_sizes_count in (
+            revisions_query.filter(ContentRevisionRO.depot_file != None)  # noqa: E711
+            .group_by(ContentRevisionRO.workspace_id)
+            .with_entities(
+                ContentRevisionRO.workspace_id,
+                func.coalesce(func.sum(ContentRevisionRO.file_size), 0),
+                func.count() - func.count(ContentRevisionRO.file_size),
+            )
+        ):
+            # INFO - sizes of revisions created before file_size existed are not known
+            # until "tracimcli db update-used-space" is run.
+            if unknown_sizes_count:
+                unknown_size_workspace_ids.add(workspace_id)
+            else:
+                deltas[workspace_id] = sign * int(size)
+        wapi = WorkspaceApi(session=session, current_user=None, config=context.app_config)
+        wapi.add_used_space(deltas)
+        wapi.invalidate_used_space(unknown_size_workspace_ids)
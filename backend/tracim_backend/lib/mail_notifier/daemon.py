@@ -1,7 +1,8 @@
-from rq import Connection as RQConnection
-from rq import Worker as BaseRQWorker
+from rq import SimpleWorker as BaseRQWorker
 from rq.dummy import do_nothing
+from rq.timeouts import BaseDeathPenalty
 from rq.worker import StopRequested
+import threading
 import typing
 
 from tracim_backend.config import CFG
@@ -13,6 +14,14 @@
 
 
 class MailSenderDaemon(FakeDaemon):
+    """
+    Send emails of the mail sender queue.
+
+    One RQ worker thread is started per connection of the SMTP connection pool
+    (EMAIL__NOTIFICATION__SMTP__POOL_SIZE), jobs are performed in these threads so
+    that SMTP connections are kept open from one job to the next.
+    """
+
     # NOTE: use *args and **kwargs because parent __init__ use strange
     # * parameter
     def __init__(self, config: "CFG", burst=True, *args, **kwargs):
@@ -22,7 +31,7 @@ def __init__(self, config: "CFG", burst=True, *args, **kwargs):
         """
         super().__init__(*args, **kwargs)
         self.config = config
-        self.worker = None  # type: RQWorker
+        self.workers = []  # type: typing.List[RQWorker]
         self.burst = burst
 
     def append_thread_callback(self, callback: typing.Callable) -> None:
@@ -33,18 +42,44 @@ def stop(self) -> None:
         # When _stop_requested at False, tracim.lib.daemons.RQWorker
         # will raise StopRequested exception in worker thread after receive a
         # job.
-        self.worker._stop_requested = True
         redis_connection = get_redis_connection(self.config)
         queue = get_rq_queue(redis_connection, RqQueueName.MAIL_SENDER)
-        queue.enqueue(do_nothing)
+        for worker in self.workers:
+            worker._stop_requested = True
+            queue.enqueue(do_nothing)
 
     def run(self) -> None:
-        with RQConnection(get_redis_connection(self.config)):
-            self.worker = RQWorker([RqQueueName.MAIL_SENDER.value])
-            self.worker.work(burst=self.burst)
+        redis_connection = get_redis_connection(self.config)
+        self.workers = [
+            RQWorker([RqQueueName.MAIL_SENDER.value], connection=redis_connection)
+            for _ in range(self.config.EMAIL__NOTIFICATION__SMTP__POOL_SIZE)
+        ]
+        threads = [
+            threading.Thread(target=worker.work, kwargs={"burst": self.burst})
+            for worker in self.workers
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+
+class NoDeathPenalty(BaseDeathPenalty):
+    """
+    Job timeouts are implemented with SIGALRM which can only be used in the main thread:
+    mail sending jobs are bounded by SMTP connections timeout instead.
+    """
+
+    def setup_death_penalty(self) -> None:
+        pass
+
+    def cancel_death_penalty(self) -> None:
+        pass
 
 
 class RQWorker(BaseRQWorker):
+    death_penalty_class = NoDeathPenalty
+
     def _install_signal_handlers(self):
         # RQ Worker is designed to work in main thread
         # So we have to disable these signals (we implement server stop in
@@ -0,0 +1,16 @@
+# -*- coding: utf-8 -*-
+from tracim_backend.lib.mail_notifier.notifier import EmailManager
+from tracim_backend.lib.mail_notifier.utils import SmtpConfiguration
+from tracim_backend.lib.rq.worker import worker_context
+
+
+def notify_content_update(
+    smtp_config: SmtpConfiguration, event_actor_id: int, event_content_id: int
+) -> None:
+    """Create notification emails of a content update then enqueue them for sending.
+    Is exclusively made to be used inside a RQ DatabaseWorker()
+    """
+    with worker_context() as context:
+        EmailManager(smtp_config, context.app_config, context.dbsession).notify_content_update(
+            event_actor_id, event_content_id
+        )
@@ -1,8 +1,10 @@
 # -*- coding: utf-8 -*-
-import logging
+from mako.filters import html_escape
 from mako.template import Template
+from sqlalchemy.event import listen
 from sqlalchemy.orm import Session
 import typing
+import uuid
 
 from tracim_backend.app_models.contents import ContentTypeSlug
 from tracim_backend.app_models.contents import content_type_list
@@ -12,10 +14,14 @@
 from tracim_backend.lib.core.workspace import WorkspaceApi
 from tracim_backend.lib.mail_notifier.sender import EmailSender
 from tracim_backend.lib.mail_notifier.sender import send_email_through
+from tracim_backend.lib.mail_notifier.sender import send_emails_through
 from tracim_backend.lib.mail_notifier.utils import EST
 from tracim_backend.lib.mail_notifier.utils import EmailAddress
 from tracim_backend.lib.mail_notifier.utils import EmailNotificationMessage
 from tracim_backend.lib.mail_notifier.utils import SmtpConfiguration
+from tracim_backend.lib.mail_notifier.utils import log_email_notification
+from tracim_backend.lib.rq import RqQueueName
+from tracim_backend.lib.rq import get_rq_queue2
 from tracim_backend.lib.utils.logger import logger
 from tracim_backend.lib.utils.translation import Translator
 from tracim_backend.lib.utils.utils import get_email_logo_frontend_url
@@ -28,6 +34,10 @@
 from tracim_backend.models.data import Content
 from tracim_backend.models.data import UserRoleInWorkspace
 
+# INFO - the job is given by name: its module imports the RQ worker module,
+# which indirectly imports this one.
+NOTIFY_CONTENT_UPDATE_JOB = "tracim_backend.lib.mail_notifier.jobs.notify_content_update"
+
 
 class EmailNotifier(INotifier):
     """
@@ -109,15 +119,22 @@ def notify_content_update(self, content: Content):
         # (SQLA objects are related to a given thread/session)
         #
         try:
-            # TODO - D.A - 2014-11-06
-            # This feature must be implemented in order to be able to scale to large communities
             if self.config.JOBS__PROCESSING_MODE == self.config.CST.ASYNC:
-                logger.warning(self, "Creating mails in SYNC mode as ASYNC is not supported yet.")
+                logger.info(self, "Creating emails in ASYNC mode")
+                queue = get_rq_queue2(self.config, RqQueueName.MAIL_RENDER)
+                smtp_config = self._smtp_config
+                user_id = self._user.user_id
+                content_id = content.content_id
+
+                def render_via_rq_worker(session: Session, flush_context=None) -> None:
+                    queue.enqueue(NOTIFY_CONTENT_UPDATE_JOB, smtp_config, user_id, content_id)
+
+                listen(self.session, "after_commit", render_via_rq_worker, once=True)
             else:
                 logger.info(self, "Creating email in SYNC mode")
-            EmailManager(self._smtp_config, self.config, self.session).notify_content_update(
-                self._user.user_id, content.content_id
-            )
+                EmailManager(self._smtp_config, self.config, self.session).notify_content_update(
+                    self._user.user_id, content.content_id
+                )
         except Exception:
             logger.exception(self, "Exception has been caught during email notification")
 
@@ -167,25 +184,6 @@ def _get_sender(self, user: User = None) -> EmailAddress:
 
     # Content Notification
 
-    @staticmethod
-    def log_email_notification(
-        config: CFG,
-        msg: str,
-        action: str,
-        email_recipient: typing.Optional[str],
-        email_subject: typing.Optional[str],
-    ) -> None:
-        """Log notification metadata."""
-
-        infos = {
-            "action": action,
-            "recipient": email_recipient,
-            "subject": email_subject,
-            "network": "email",
-        }
-        email_notification_logger = logging.getLogger("tracim_email_notification")
-        email_notification_logger.info(msg=msg, extra=infos)
-
     def notify_content_update(self, event_actor_id: int, event_content_id: int) -> None:
         """
         Look for all users to be notified about the new content and send them an
@@ -244,6 +242,30 @@ def notify_content_update(self, event_actor_id: int, event_content_id: int) -> N
         email_sender = EmailSender(
             self.config, self._smtp_config, self.config.EMAIL__NOTIFICATION__ACTIVATED
         )
+        # INFO - G.M - 2017-11-15 - set content_id in header to permit reply
+        # references can have multiple values, but only one in this case.
+        reply_to_addr = self.config.EMAIL__NOTIFICATION__REPLY_TO__EMAIL.replace(
+            "{content_id}", str(main_content.content_id)
+        )
+        reference_addr = self.config.EMAIL__NOTIFICATION__REFERENCES__EMAIL.replace(
+            "{content_id}", str(main_content.content_id)
+        )
+        content_in_context = content_api.get_content_in_context(content)
+        parent_in_context = None
+        if content.parent_id:
+            parent_in_context = content_api.get_content_in_context(content.parent)
+        template_path = self.config.EMAIL__NOTIFICATION__CONTENT_UPDATE__TEMPLATE__HTML
+        from_header = self._get_sender(user)
+        # INFO - translators, subjects, reply-to labels and bodies only depend on the
+        # language of recipients (and their role for bodies): they are built once and
+        # shared by all recipients using the same language.
+        # Bodies are cached by (lang, template, content revision, role) as
+        # (recipient placeholder, shared body), shared body is None when the template
+        # can't be rendered once for all recipients.
+        translators = {}  # type: typing.Dict[typing.Optional[str], Translator]
+        subjects = {}  # type: typing.Dict[str, typing.Tuple[str, str]]
+        bodies = {}  # type: typing.Dict[tuple, tuple]
+        messages = []  # type: typing.List[EmailNotificationMessage]
         for role in notifiable_roles:
             logger.info(
                 self,
@@ -251,62 +273,72 @@ def notify_content_update(self, event_actor_id: int, event_content_id: int) -> N
                     content.content_id, role.user.email
                 ),
             )
-            translator = Translator(app_config=self.config, default_lang=role.user.lang)
-            _ = translator.get_translation
-            # INFO - G.M - 2017-11-15 - set content_id in header to permit reply
-            # references can have multiple values, but only one in this case.
-            reply_to_addr = self.config.EMAIL__NOTIFICATION__REPLY_TO__EMAIL.replace(
-                "{content_id}", str(main_content.content_id)
-            )
-
-            reference_addr = self.config.EMAIL__NOTIFICATION__REFERENCES__EMAIL.replace(
-                "{content_id}", str(main_content.content_id)
-            )
-            #
-            #  INFO - D.A. - 2014-11-06
-            # We do not use .format() here because the subject defined in the .ini file
-            # may not include all required labels. In order to avoid partial format() (which result in an exception)
-            # we do use replace and force the use of .__str__() in order to process LazyString objects
-            #
-            content_status = translator.get_translation(main_content.get_status().label)
-            translated_subject = translator.get_translation(
-                self.config.EMAIL__NOTIFICATION__CONTENT_UPDATE__SUBJECT
-            )
-            subject = translated_subject.replace(
-                EST.WEBSITE_TITLE, self.config.WEBSITE__TITLE.__str__()
-            )
-            subject = subject.replace(EST.WORKSPACE_LABEL, main_content.workspace.label.__str__())
-            subject = subject.replace(EST.CONTENT_LABEL, main_content.label.__str__())
-            subject = subject.replace(EST.CONTENT_STATUS_LABEL, content_status)
-            reply_to_label = _("{username} & all members of {workspace}").format(
-                username=user.display_name, workspace=main_content.workspace.label
-            )
-
-            content_in_context = content_api.get_content_in_context(content)
-            parent_in_context = None
-            if content.parent_id:
-                parent_in_context = content_api.get_content_in_context(content.parent)
-
-            body_html = self._build_email_body_for_content(
-                self.config.EMAIL__NOTIFICATION__CONTENT_UPDATE__TEMPLATE__HTML,
-                role,
-                content_in_context,
-                parent_in_context,
-                workspace_in_context,
-                user,
-                translator,
-            )
-
-            body_html = DescriptionMentionParser.get_email_html_from_html_with_mention_tags(
-                session=self.session,
-                cfg=self.config,
-                translator=translator,
-                html=body_html,
-            )
+            try:
+                translator = translators[role.user.lang]
+            except KeyError:
+                translator = Translator(app_config=self.config, default_lang=role.user.lang)
+                translators[role.user.lang] = translator
+            lang = translator.default_lang
+
+            if lang not in subjects:
+                subjects[lang] = self._build_subject_and_reply_to_label_for_content_update(
+                    main_content, user, translator
+                )
+            subject, reply_to_label = subjects[lang]
+
+            body_key = (lang, template_path, content.revision_id, role.role)
+            if body_key not in bodies:
+                recipient = RecipientPlaceholder()
+                body_html = self._build_email_body_for_content(
+                    template_path,
+                    role,
+                    content_in_context,
+                    parent_in_context,
+                    workspace_in_context,
+                    user,
+                    translator,
+                    recipient=recipient,
+                )
+                if recipient.uses_unsupported_field:
+                    logger.debug(
+                        self,
+                        "Template {} uses recipient fields which can't be substituted, "
+                        "rendering it for each recipient".format(template_path),
+                    )
+                    bodies[body_key] = (recipient, None)
+                else:
+                    bodies[body_key] = (
+                        recipient,
+                        DescriptionMentionParser.get_email_html_from_html_with_mention_tags(
+                            session=self.session,
+                            cfg=self.config,
+                            translator=translator,
+                            html=body_html,
+                        ),
+                    )
+            recipient, shared_body_html = bodies[body_key]
+            if shared_body_html is not None:
+                body_html = recipient.substitute(shared_body_html, role.user)
+            else:
+                body_html = self._build_email_body_for_content(
+                    template_path,
+                    role,
+                    content_in_context,
+                    parent_in_context,
+                    workspace_in_context,
+                    user,
+                    translator,
+                )
+                body_html = DescriptionMentionParser.get_email_html_from_html_with_mention_tags(
+                    session=self.session,
+                    cfg=self.config,
+                    translator=translator,
+                    html=body_html,
+                )
 
             message = EmailNotificationMessage(
                 subject=subject,
-                from_header=self._get_sender(user),
+                from_header=from_header,
                 to_header=EmailAddress(role.user.display_name, role.user.email),
                 reply_to=EmailAddress(reply_to_label, reply_to_addr),
                 # INFO - G.M - 2017-11-15
@@ -319,18 +351,19 @@ def notify_content_update(self, event_actor_id: int, event_content_id: int) -> N
                 # compat from parsing software
                 references=EmailAddress("", reference_addr, force_angle_bracket=True),
                 body_html=body_html,
-                lang=translator.default_lang,
+                lang=lang,
             )
 
-            self.log_email_notification(
+            log_email_notification(
                 msg="an email was created to {}".format(message["To"]),
                 action="{:8s}".format("CREATED"),
                 email_recipient=message["To"],
                 email_subject=message["Subject"],
                 config=self.config,
             )
+            messages.append(message)
 
-            send_email_through(self.config, email_sender.send_mail, message)
+        send_emails_through(self.config, email_sender.send_mails, messages)
 
     def notify_created_account(
         self,
@@ -464,6 +497,31 @@ def _render_template(
             logger.exception(self, "Failed to render email template")
             raise EmailTemplateError("Failed to render email template")
 
+    def _build_subject_and_reply_to_label_for_content_update(
+        self, main_content: Content, actor: User, translator: Translator
+    ) -> typing.Tuple[str, str]:
+        _ = translator.get_translation
+        #
+        #  INFO - D.A. - 2014-11-06
+        # We do not use .format() here because the subject defined in the .ini file
+        # may not include all required labels. In order to avoid partial format() (which result in an exception)
+        # we do use replace and force the use of .__str__() in order to process LazyString objects
+        #
+        content_status = translator.get_translation(main_content.get_status().label)
+        translated_subject = translator.get_translation(
+            self.config.EMAIL__NOTIFICATION__CONTENT_UPDATE__SUBJECT
+        )
+        subject = translated_subject.replace(
+            EST.WEBSITE_TITLE, self.config.WEBSITE__TITLE.__str__()
+        )
+        subject = subject.replace(EST.WORKSPACE_LABEL, main_content.workspace.label.__str__())
+        subject = subject.replace(EST.CONTENT_LABEL, main_content.label.__str__())
+        subject = subject.replace(EST.CONTENT_STATUS_LABEL, content_status)
+        reply_to_label = _("{username} & all members of {workspace}").format(
+            username=actor.display_name, workspace=main_content.workspace.label
+        )
+        return subject, reply_to_label
+
     def _build_context_for_content_update(
         self,
         role: UserRoleInWorkspace,
@@ -472,6 +530,7 @@ def _build_context_for_content_update(
         workspace_in_context: WorkspaceInContext,
         actor: User,
         translator: Translator,
+        recipient: typing.Optional["RecipientPlaceholder"] = None,
     ):
         _ = translator.get_translation
         content = content_in_context.content
@@ -483,7 +542,7 @@ def _build_context_for_content_update(
         logo_url = get_email_logo_frontend_url(self.config)
 
         return {
-            "user": role.user,
+            "user": recipient or role.user,
             "actor": actor,
             "action": action,
             "workspace": role.workspace,
@@ -506,6 +565,7 @@ def _build_email_body_for_content(
         workspace_in_context: WorkspaceInContext,
         actor: User,
         translator: Translator,
+        recipient: typing.Optional["RecipientPlaceholder"] = None,
     ) -> str:
         """
         Build an email body and return it as a string
@@ -519,6 +579,8 @@ def _build_email_body_for_content(
         notification
         :param actor: the user at the origin of the action / notification
         (for example the one who wrote a comment
+        :param recipient: if given, used instead of the user of the role in order to build
+        a body shared by several recipients
         :return: the built email body as string. In case of multipart email,
          this method must be called one time for text and one time for html
         """
@@ -533,6 +595,7 @@ def _build_email_body_for_content(
             workspace_in_context=workspace_in_context,
             actor=actor,
             translator=translator,
+            recipient=recipient,
         )
         body_content = self._render_template(
             mako_template_filepath=mako_template_filepath,
@@ -542,6 +605,37 @@ def _build_email_body_for_content(
         return body_content
 
 
+class RecipientPlaceholder(object):
+    """
+    Stand-in for the recipient of a content update email when rendering a body shared by
+    several recipients.
+
+    Supported fields are rendered as unique tokens then substituted with the html-escaped
+    values of each recipient. Using any other field marks the rendered body as not shareable.
+    """
+
+    FIELDS = ("display_name", "public_name", "email", "username")
+
+    def __init__(self) -> None:
+        self._token_prefix = "tracim-recipient-{}-".format(uuid.uuid4().hex)
+        self.uses_unsupported_field = False
+
+    def __getattr__(self, name: str) -> str:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        if name in self.FIELDS:
+            return self._token_prefix + name
+        self.uses_unsupported_field = True
+        return ""
+
+    def substitute(self, body_html: str, user: User) -> str:
+        for field in self.FIELDS:
+            body_html = body_html.replace(
+                self._token_prefix + field, html_escape(str(getattr(user, field) or ""))
+            )
+        return body_html
+
+
 def get_email_manager(config: CFG, session: Session):
     """
     :return: EmailManager instance
@@ -1,16 +1,24 @@
 # -*- coding: utf-8 -*-
+import contextlib
 from email.mime.multipart import MIMEMultipart
+from email.utils import parseaddr
 import smtplib
+import threading
+import time
 import typing
 
 from tracim_backend.config import CFG
 from tracim_backend.lib.mail_notifier.utils import SmtpConfiguration
 from tracim_backend.lib.mail_notifier.utils import SmtpEncryption
+from tracim_backend.lib.mail_notifier.utils import log_email_notification
 from tracim_backend.lib.rq import RqQueueName
 from tracim_backend.lib.rq import get_redis_connection
 from tracim_backend.lib.rq import get_rq_queue
 from tracim_backend.lib.utils.logger import logger
 
+# INFO - seconds before a blocking SMTP operation (connection, command) is aborted
+SMTP_TIMEOUT = 60
+
 
 def send_email_through(
     config: CFG,
@@ -45,106 +53,321 @@ def send_email_through(
         )
 
 
+def send_emails_through(
+    config: CFG,
+    sendmails_callable: typing.Callable[[typing.List[MIMEMultipart]], None],
+    messages: typing.List[MIMEMultipart],
+) -> None:
+    """
+    Send several mails in async or sync mode.
+
+    In async mode, messages are grouped by recipient domain in batches of at most
+    EMAIL__NOTIFICATION__SEND_BATCH_SIZE messages, one job is enqueued per batch.
+    :param config: system configuration
+    :param sendmails_callable: A callable who get a list of messages on first parameter
+    :param messages: The messages who have to be sent
+    """
+    if not messages:
+        return
+    if config.JOBS__PROCESSING_MODE == config.CST.SYNC:
+        logger.info(send_emails_through, "send {} emails synchronously".format(len(messages)))
+        sendmails_callable(messages)
+    elif config.JOBS__PROCESSING_MODE == config.CST.ASYNC:
+        redis_connection = get_redis_connection(config)
+        queue = get_rq_queue(redis_connection, RqQueueName.MAIL_SENDER)
+        batch_size = config.EMAIL__NOTIFICATION__SEND_BATCH_SIZE
+        batches_count = 0
+        for domain_messages in group_messages_by_domain(messages).values():
+            for batch_start in range(0, len(domain_messages), batch_size):
+                batch_end = batch_start + batch_size
+                queue.enqueue(sendmails_callable, domain_messages[batch_start:batch_end])
+                batches_count += 1
+        logger.info(
+            send_emails_through,
+            "send {} emails asynchronously: {} jobs stored in queue in wait for a "
+            "mail_notifier daemon".format(len(messages), batches_count),
+        )
+    else:
+        raise NotImplementedError(
+            "Mail sender processing mode {} is not implemented".format(config.JOBS__PROCESSING_MODE)
+        )
+
+
+def get_recipient_domain(message: MIMEMultipart) -> str:
+    return parseaddr(message["To"] or "")[1].rpartition("@")[2].lower()
+
+
+def group_messages_by_domain(
+    messages: typing.Iterable[MIMEMultipart],
+) -> typing.Dict[str, typing.List[MIMEMultipart]]:
+    messages_by_domain = {}  # type: typing.Dict[str, typing.List[MIMEMultipart]]
+    for message in messages:
+        messages_by_domain.setdefault(get_recipient_domain(message), []).append(message)
+    return messages_by_domain
+
+
+def is_temporary_smtp_error(exc: Exception) -> bool:
+    """Return True if sending the message again later could succeed."""
+    if isinstance(exc, smtplib.SMTPRecipientsRefused):
+        return all(400 <= code < 500 for code, _ in exc.recipients.values())
+    if isinstance(exc, smtplib.SMTPResponseException):
+        return 400 <= exc.smtp_code < 500
+    return isinstance(exc, (smtplib.SMTPServerDisconnected, OSError))
+
+
+def create_smtp_connection(smtp_config: SmtpConfiguration) -> smtplib.SMTP:
+    """Open a connection to the SMTP server, start TLS and authenticate as configured."""
+    log = "Connecting to SMTP server {}"
+    logger.info(create_smtp_connection, log.format(smtp_config.server))
+    if smtp_config.encryption == SmtpEncryption.SMTPS:
+        smtp_connection = smtplib.SMTP_SSL(
+            smtp_config.server, smtp_config.port, timeout=SMTP_TIMEOUT
+        )
+    else:
+        smtp_connection = smtplib.SMTP(smtp_config.server, smtp_config.port, timeout=SMTP_TIMEOUT)
+    smtp_connection.ehlo()
+
+    if smtp_config.encryption == SmtpEncryption.DEFAULT:
+        try:
+            starttls_result = smtp_connection.starttls()
+
+            if starttls_result[0] == 220:
+                logger.info(create_smtp_connection, "SMTP Start TLS OK")
+
+            log = "SMTP Start TLS return code: {} with message: {}"
+            logger.debug(
+                create_smtp_connection,
+                log.format(starttls_result[0], starttls_result[1].decode("utf-8")),
+            )
+        except smtplib.SMTPResponseException as exc:
+            log = "SMTP start TLS return error code: {} with message: {}"
+            logger.error(
+                create_smtp_connection, log.format(exc.smtp_code, exc.smtp_error.decode("utf-8"))
+            )
+        except Exception:
+            log = "Unexpected exception during SMTP start TLS process"
+            logger.exception(create_smtp_connection, log)
+
+    if smtp_config.authentication:
+        try:
+            login_res = smtp_connection.login(smtp_config.login, smtp_config.password)
+
+            if login_res[0] == 235:
+                logger.info(create_smtp_connection, "SMTP Authentication Successful")
+            if login_res[0] == 503:
+                logger.info(create_smtp_connection, "SMTP Already Authenticated")
+
+            log = "SMTP login return code: {} with message: {}"
+            logger.debug(
+                create_smtp_connection, log.format(login_res[0], login_res[1].decode("utf-8"))
+            )
+        except smtplib.SMTPAuthenticationError as exc:
+            log = "SMTP auth return error code: {} with message: {}"
+            logger.error(
+                create_smtp_connection, log.format(exc.smtp_code, exc.smtp_error.decode("utf-8"))
+            )
+            logger.error(
+                create_smtp_connection,
+                "check your auth params combinaison " "(login/password) for SMTP",
+            )
+        except smtplib.SMTPResponseException as exc:
+            log = "SMTP login return error code: {} with message: {}"
+            logger.error(
+                create_smtp_connection, log.format(exc.smtp_code, exc.smtp_error.decode("utf-8"))
+            )
+        except Exception:
+            log = "Unexpected exception during SMTP login"
+            logger.exception(create_smtp_connection, log)
+    return smtp_connection
+
+
+def close_smtp_connection(smtp_connection: smtplib.SMTP) -> None:
+    try:
+        smtp_connection.quit()
+    except (smtplib.SMTPException, OSError):
+        smtp_connection.close()
+
+
+class PooledSmtpConnection(object):
+    """A connection slot of a SmtpConnectionPool, (re)connected on demand."""
+
+    def __init__(
+        self, smtp_config: SmtpConfiguration, smtp_connection: typing.Optional[smtplib.SMTP]
+    ) -> None:
+        self._smtp_config = smtp_config
+        self.smtp_connection = smtp_connection
+
+    def get(self) -> smtplib.SMTP:
+        if not self.smtp_connection:
+            self.smtp_connection = create_smtp_connection(self._smtp_config)
+        return self.smtp_connection
+
+    def discard(self) -> None:
+        if self.smtp_connection:
+            close_smtp_connection(self.smtp_connection)
+            self.smtp_connection = None
+
+
+class SmtpConnectionPool(object):
+    """
+    Persistent authenticated SMTP connections shared by threads of a process.
+
+    At most size connections are used at once and at most max_connections_per_domain of
+    them send emails to a same recipient domain. Released connections are kept open
+    and checked before being used again.
+    """
+
+    def __init__(
+        self, smtp_config: SmtpConfiguration, size: int, max_connections_per_domain: int
+    ) -> None:
+        self._smtp_config = smtp_config
+        self._slots = threading.BoundedSemaphore(size)
+        self._max_connections_per_domain = max_connections_per_domain
+        self._domain_slots = {}  # type: typing.Dict[str, threading.BoundedSemaphore]
+        self._idle_connections = []  # type: typing.List[smtplib.SMTP]
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def connection(self, domain: str = "") -> typing.Generator[PooledSmtpConnection, None, None]:
+        """Get a connection to send emails to the given recipient domain."""
+        with self._lock:
+            domain_slot = self._domain_slots.setdefault(
+                domain, threading.BoundedSemaphore(self._max_connections_per_domain)
+            )
+        with domain_slot, self._slots:
+            pooled_connection = PooledSmtpConnection(self._smtp_config, self._get_idle_connection())
+            try:
+                yield pooled_connection
+            except Exception:
+                pooled_connection.discard()
+                raise
+            if pooled_connection.smtp_connection:
+                with self._lock:
+                    self._idle_connections.append(pooled_connection.smtp_connection)
+
+    def close(self) -> None:
+        """Close idle connections."""
+        with self._lock:
+            idle_connections = self._idle_connections
+            self._idle_connections = []
+        for smtp_connection in idle_connections:
+            log = "Disconnecting from SMTP server {}"
+            logger.info(self, log.format(self._smtp_config.server))
+            close_smtp_connection(smtp_connection)
+
+    def _get_idle_connection(self) -> typing.Optional[smtplib.SMTP]:
+        while True:
+            with self._lock:
+                if not self._idle_connections:
+                    return None
+                smtp_connection = self._idle_connections.pop()
+            # INFO - the server may have closed a connection idle for too long
+            try:
+                if smtp_connection.noop()[0] == 250:
+                    return smtp_connection
+            except (smtplib.SMTPException, OSError):
+                pass
+            close_smtp_connection(smtp_connection)
+
+
+_smtp_connection_pools = {}  # type: typing.Dict[typing.Tuple, SmtpConnectionPool]
+_smtp_connection_pools_lock = threading.Lock()
+
+
+def get_smtp_connection_pool(config: CFG, smtp_config: SmtpConfiguration) -> SmtpConnectionPool:
+    """Get the connection pool of this process for the given SMTP configuration."""
+    key = (
+        smtp_config.server,
+        smtp_config.port,
+        smtp_config.login,
+        smtp_config.encryption,
+        smtp_config.authentication,
+    )
+    with _smtp_connection_pools_lock:
+        try:
+            return _smtp_connection_pools[key]
+        except KeyError:
+            pool = SmtpConnectionPool(
+                smtp_config,
+                config.EMAIL__NOTIFICATION__SMTP__POOL_SIZE,
+                config.EMAIL__NOTIFICATION__SMTP__MAX_CONNECTIONS_PER_DOMAIN,
+            )
+            _smtp_connection_pools[key] = pool
+            return pool
+
+
 class EmailSender(object):
     """
     Independent email sender class.
 
     To allow its use in any thread, as an asyncjob_perform() call for
     example, it has no dependencies on SQLAlchemy nor tg HTTP request.
+
+    Emails are sent through the SMTP connection pool of the current process.
     """
 
     def __init__(self, config: CFG, smtp_config: SmtpConfiguration, really_send_messages) -> None:
         self._smtp_config = smtp_config
         self.config = config
-        self._smtp_connection = None
         self._is_active = really_send_messages
 
-    def connect(self):
-        if not self._smtp_connection:
-            log = "Connecting to SMTP server {}"
-            logger.info(self, log.format(self._smtp_config.server))
-            if self._smtp_config.encryption == SmtpEncryption.SMTPS:
-                self._smtp_connection = smtplib.SMTP_SSL(
-                    self._smtp_config.server, self._smtp_config.port
-                )
-            else:
-                self._smtp_connection = smtplib.SMTP(
-                    self._smtp_config.server, self._smtp_config.port
-                )
-            self._smtp_connection.ehlo()
-
-            if self._smtp_config.encryption == SmtpEncryption.DEFAULT:
-                try:
-                    starttls_result = self._smtp_connection.starttls()
-
-                    if starttls_result[0] == 220:
-                        logger.info(self, "SMTP Start TLS OK")
-
-                    log = "SMTP Start TLS return code: {} with message: {}"
-                    logger.debug(
-                        self,
-                        log.format(starttls_result[0], starttls_result[1].decode("utf-8")),
-                    )
-                except smtplib.SMTPResponseException as exc:
-                    log = "SMTP start TLS return error code: {} with message: {}"
-                    logger.error(self, log.format(exc.smtp_code, exc.smtp_error.decode("utf-8")))
-                except Exception:
-                    log = "Unexpected exception during SMTP start TLS process"
-                    logger.exception(self, log)
+    def _get_connection_pool(self) -> SmtpConnectionPool:
+        return get_smtp_connection_pool(self.config, self._smtp_config)
 
-            if self._smtp_config.authentication:
-                try:
-                    login_res = self._smtp_connection.login(
-                        self._smtp_config.login, self._smtp_config.password
-                    )
-
-                    if login_res[0] == 235:
-                        logger.info(self, "SMTP Authentication Successful")
-                    if login_res[0] == 503:
-                        logger.info(self, "SMTP Already Authenticated")
-
-                    log = "SMTP login return code: {} with message: {}"
-                    logger.debug(self, log.format(login_res[0], login_res[1].decode("utf-8")))
-                except smtplib.SMTPAuthenticationError as exc:
-                    log = "SMTP auth return error code: {} with message: {}"
-                    logger.error(self, log.format(exc.smtp_code, exc.smtp_error.decode("utf-8")))
-                    logger.error(
-                        self,
-                        "check your auth params combinaison " "(login/password) for SMTP",
-                    )
-                except smtplib.SMTPResponseException as exc:
-                    log = "SMTP login return error code: {} with message: {}"
-                    logger.error(self, log.format(exc.smtp_code, exc.smtp_error.decode("utf-8")))
-                except Exception:
-                    log = "Unexpected exception during SMTP login"
-                    logger.exception(self, log)
+    def connect(self):
+        """Open a connection to the SMTP server, kept in the pool for next emails."""
+        with self._get_connection_pool().connection() as pooled_connection:
+            pooled_connection.get()
 
     def disconnect(self):
-        if self._smtp_connection:
-            log = "Disconnecting from SMTP server {}"
-            logger.info(self, log.format(self._smtp_config.server))
-            self._smtp_connection.quit()
-            logger.info(self, "Connection closed.")
+        self._get_connection_pool().close()
+        logger.info(self, "Connection closed.")
 
     def send_mail(self, message: MIMEMultipart):
+        self.send_mails([message])
+
+    def send_mails(self, messages: typing.List[MIMEMultipart]) -> None:
+        """
+        Send messages, those of a same recipient domain one after the other through the same
+        connection. Sending a message is retried when the SMTP server fails temporarily.
+        """
         if not self._is_active:
-            log = "Not sending email to {} (service disabled)"
-            logger.info(self, log.format(message["To"]))
-        else:
-            self.connect()  # Actually, this connects to SMTP only if required
-            logger.info(self, "Sending email to {}".format(message["To"]))
-            # TODO - G.M - 2019-01-29 - optimisize this code, we should not send
-            # email if connection has failed.
-            send_action = "{:8s}".format("SENT")
-            failed_action = "{:8s}".format("SENDFAIL")
-            action = send_action
+            for message in messages:
+                log = "Not sending email to {} (service disabled)"
+                logger.info(self, log.format(message["To"]))
+            return
+        pool = self._get_connection_pool()
+        for domain, domain_messages in group_messages_by_domain(messages).items():
+            with pool.connection(domain) as pooled_connection:
+                for message in domain_messages:
+                    self._send_mail_with_retry(pooled_connection, message)
+
+    def _send_mail_with_retry(
+        self, pooled_connection: PooledSmtpConnection, message: MIMEMultipart
+    ) -> None:
+        logger.info(self, "Sending email to {}".format(message["To"]))
+        send_action = "{:8s}".format("SENT")
+        failed_action = "{:8s}".format("SENDFAIL")
+        action = failed_action
+        max_attempts = self.config.EMAIL__NOTIFICATION__SMTP__RETRY__MAX_ATTEMPTS
+        for attempt in range(max_attempts):
+            if attempt:
+                delay = self.config.EMAIL__NOTIFICATION__SMTP__RETRY__DELAY * 2 ** (attempt - 1)
+                logger.info(
+                    self,
+                    "Retrying to send email to {} in {}s ({}/{})".format(
+                        message["To"], delay, attempt + 1, max_attempts
+                    ),
+                )
+                time.sleep(delay)
             try:
-                send_message_result = self._smtp_connection.send_message(message)
+                send_message_result = pooled_connection.get().send_message(message)
                 # INFO - G.M - 2019-01-29 - send_message return if not failed,
                 # dict of refused recipients.
 
                 if send_message_result == {}:
                     logger.debug(self, "One mail correctly sent using SMTP.")
+                    action = send_action
                 else:
                     # INFO - G.M - 2019-01-29 - send_message_result != {}
                     # case should not happened
@@ -154,28 +377,26 @@ def send_mail(self, message: MIMEMultipart):
                     # TODO - G.M - 2019-01-29 - better support for multirecipient email
                     log = "Mail could not be send to some recipient: {}"
                     logger.debug(self, log.format(send_message_result))
-                    action = failed_action
+                break
+            except Exception as exc:
+                if not is_temporary_smtp_error(exc):
+                    log = "SMTP sending message return error"
+                    logger.exception(self, log)
+                    break
+                log = "SMTP sending message return temporary error"
+                logger.warning(self, log, exc_info=True)
+                # INFO - connection state is unknown after an error: use a new one
+                pooled_connection.discard()
 
-            except smtplib.SMTPException:
-                log = "SMTP sending message return error"
-                logger.exception(self, log)
-                action = failed_action
-            except Exception:
-                log = "Unexpected exception during sending email message using SMTP"
-                logger.exception(self, log)
-                action = failed_action
-
-            from tracim_backend.lib.mail_notifier.notifier import EmailManager
-
-            if action == send_action:
-                msg = "an email was sended to {}".format(message["To"])
-            else:
-                msg = "fail to send email to {}".format(message["To"])
-
-            EmailManager.log_email_notification(
-                msg=msg,
-                action=action,
-                email_recipient=message["To"],
-                email_subject=message["Subject"],
-                config=self.config,
-            )
+        if action == send_action:
+            msg = "an email was sended to {}".format(message["To"])
+        else:
+            msg = "fail to send email to {}".format(message["To"])
+
+        log_email_notification(
+            msg=msg,
+            action=action,
+            email_recipient=message["To"],
+            email_subject=message["Subject"],
+            config=self.config,
+        )
@@ -6,10 +6,14 @@
 from email.utils import parseaddr
 import enum
 import html2text
+import logging
 import typing
 
 from tracim_backend.lib.utils.sanitizer import HtmlSanitizer
 
+if typing.TYPE_CHECKING:
+    from tracim_backend.config import CFG
+
 
 class SmtpEncryption(str, enum.Enum):
     DEFAULT = "default"  # use starttls, fallback to unencrypted
@@ -136,3 +140,22 @@ def __init__(
         # in this case the HTML message, is best and preferred.
         self.attach(part1)
         self.attach(part2)
+
+
+def log_email_notification(
+    config: "CFG",
+    msg: str,
+    action: str,
+    email_recipient: typing.Optional[str],
+    email_subject: typing.Optional[str],
+) -> None:
+    """Log notification metadata."""
+
+    infos = {
+        "action": action,
+        "recipient": email_recipient,
+        "subject": email_subject,
+        "network": "email",
+    }
+    email_notification_logger = logging.getLogger("tracim_email_notification")
+    email_notification_logger.info(msg=msg, extra=infos)
@@ -1,11 +1,14 @@
 # coding: utf-8
 from urllib.parse import urljoin
+from urllib.parse import urlsplit
 
-import copy
+from http.cookiejar import DefaultCookiePolicy
 from pyramid.response import Response as PyramidResponse
 import requests
 from requests import Response as RequestsResponse
+from requests.adapters import HTTPAdapter
 from requests.auth import AuthBase
+import threading
 import typing
 
 from tracim_backend.lib.utils.request import TracimRequest
@@ -37,6 +40,76 @@
 )
 DEFAULT_REQUEST_HEADER_TO_DROP = HOP_BY_HOP_HEADER_HTTP + ("authorization",)
 
+DEFAULT_POOL_SIZE = 10
+# INFO - (connect, read) timeouts in seconds
+DEFAULT_TIMEOUT = (5.0, 60.0)
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# INFO - keep-alive sessions shared by all proxies to a same backend,
+# see get_backend_session()
+_backend_sessions = {}  # type: typing.Dict[typing.Tuple[str, str, int], requests.Session]
+_backend_sessions_lock = threading.Lock()
+
+
+def get_backend_session(base_address: str, pool_size: int) -> requests.Session:
+    """
+    Return the requests session used to reach the backend of base_address,
+    it keeps up to pool_size connections open between requests.
+    """
+    url = urlsplit(base_address)
+    key = (url.scheme, url.netloc, pool_size)
+    with _backend_sessions_lock:
+        session = _backend_sessions.get(key)
+        if session is None:
+            session = requests.Session()
+            # INFO - proxied requests should only depend on the given parameters,
+            # not on the environment (proxy, netrc…)
+            session.trust_env = False
+            # INFO - the session is shared by requests of all users: cookies set by the
+            # backend must not be stored and sent back with requests of other users
+            session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _backend_sessions[key] = session
+        return session
+
+
+class RequestBodyStream(object):
+    """
+    File-like request body of known length, sent by requests as it is read
+    instead of being buffered.
+    """
+
+    def __init__(self, body_file: typing.BinaryIO, length: int) -> None:
+        self._body_file = body_file
+        self._length = length
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __iter__(self) -> typing.Iterator[bytes]:
+        return iter(lambda: self.read(STREAM_CHUNK_SIZE), b"")
+
+    def read(self, size: int = -1) -> bytes:
+        return self._body_file.read(size)
+
+
+class ResponseBodyIterator(object):
+    """
+    WSGI iterable streaming the body of a backend response,
+    its connection goes back to the pool once the body is consumed or closed.
+    """
+
+    def __init__(self, response: RequestsResponse) -> None:
+        self._response = response
+
+    def __iter__(self) -> typing.Iterator[bytes]:
+        return self._response.iter_content(STREAM_CHUNK_SIZE)
+
+    def close(self) -> None:
+        self._response.close()
+
 
 class Proxy(object):
     def __init__(
@@ -45,55 +118,63 @@ def __init__(
         default_request_headers_to_drop: typing.List[str] = DEFAULT_REQUEST_HEADER_TO_DROP,
         default_response_headers_to_drop: typing.List[str] = DEFAULT_RESPONSE_HEADER_TO_DROP,
         auth: typing.Union[typing.Optional[typing.Tuple[str, str]], AuthBase] = None,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        timeout: typing.Tuple[float, float] = DEFAULT_TIMEOUT,
     ) -> None:
         """
         :param auth: should be a username,password tuple or AuthBase requests lib object
+        :param pool_size: number of keep-alive connections to the backend
+        :param timeout: (connect, read) timeouts in seconds of backend requests
         """
         self._base_address = base_address
         self.default_request_headers_to_drop = default_request_headers_to_drop
         self.default_response_headers_to_drop = default_response_headers_to_drop
         self.auth = auth
+        self._session = get_backend_session(base_address, pool_size)
+        self._timeout = timeout
 
     def _get_behind_response(
         self,
         method: str,
         headers: dict,
-        data: dict,
+        data: typing.Union[bytes, RequestBodyStream],
         url: str,
         auth: typing.Union[typing.Optional[typing.Tuple[str, str]], AuthBase],
     ) -> RequestsResponse:
         """
         :param auth: should be a username,password tuple or AuthBase requests lib object
         """
-        return requests.request(
+        return self._session.request(
             method=method,
             # FIXME BS 2018-11-29: Exclude some headers (like basic auth)
             headers=headers,
             data=data,
             url=url,
             auth=auth,
+            timeout=self._timeout,
+            stream=True,
         )
 
-    def _generate_proxy_response(self, status, headers: dict, body):
-        return PyramidResponse(status=status, headers=headers, body=body)
+    def _generate_proxy_response(self, status, headers: dict, app_iter: typing.Iterable[bytes]):
+        return PyramidResponse(status=status, headers=headers, app_iter=app_iter)
 
     def _add_extra_headers(self, headers: dict, extra_headers: dict):
-        extra_headers = copy.deepcopy(extra_headers)
-        new_headers = copy.deepcopy(headers)
+        # INFO - header names and values are strings, a shallow copy is enough
+        new_headers = dict(headers)
         new_headers.update(extra_headers)
         return new_headers
 
-    def _drop_request_headers(self, headers: dict) -> dict:
+    def _drop_request_headers(self, headers: typing.Mapping[str, str]) -> dict:
         new_headers = {}
-        for header_name, header_value in dict(headers).items():
+        for header_name, header_value in headers.items():
             if header_name.lower() in self.default_request_headers_to_drop:
                 continue
             new_headers[header_name] = header_value
         return new_headers
 
-    def _drop_response_headers(self, headers: dict) -> dict:
+    def _drop_response_headers(self, headers: typing.Mapping[str, str]) -> dict:
         new_headers = {}
-        for header_name, header_value in dict(headers).items():
+        for header_name, header_value in headers.items():
             if header_name.lower() in self.default_response_headers_to_drop:
                 continue
             new_headers[header_name] = header_value
@@ -107,9 +188,7 @@ def get_response_for_request(
         extra_response_headers: typing.Optional[dict] = None,
     ) -> PyramidResponse:
         # INFO - G.M - 2019-03-08 - Prepare behind request
-        request_headers = dict(request.headers)
-        extra_request_headers = extra_request_headers or {}
-        request_headers = self._drop_request_headers(request_headers)
+        request_headers = self._drop_request_headers(request.headers)
         if extra_request_headers:
             request_headers = self._add_extra_headers(request_headers, extra_request_headers)
         behind_url = urljoin(self._base_address, path)
@@ -117,19 +196,27 @@ def get_response_for_request(
         behind_response = self._get_behind_response(
             method=request.method,
             headers=request_headers,
-            data=request.body,
+            data=self._get_request_body(request),
             url=behind_url,
             auth=self.auth,
         )
 
         # INFO - G.M - 2019-03-08 - Prepare proxy response
-        response_headers = dict(behind_response.headers)
-        response_headers = self._drop_response_headers(response_headers)
+        response_headers = self._drop_response_headers(behind_response.headers)
         if extra_response_headers:
-            response_headers = self._add_extra_headers(request_headers, extra_response_headers)
+            response_headers = self._add_extra_headers(response_headers, extra_response_headers)
 
         return self._generate_proxy_response(
             status=behind_response.status_code,
             headers=response_headers,
-            body=behind_response.content,
+            app_iter=ResponseBodyIterator(behind_response),
         )
+
+    def _get_request_body(self, request: TracimRequest) -> typing.Union[bytes, RequestBodyStream]:
+        """
+        Stream the request body to the backend when its length is known,
+        chunked bodies are buffered as the backend may not support them.
+        """
+        if request.content_length and not request.is_body_seekable:
+            return RequestBodyStream(request.body_file, request.content_length)
+        return request.body
@@ -10,7 +10,9 @@ class RqQueueName(str, enum.Enum):
     DEFAULT = "default"
     EVENT = "event"
     MAIL_SENDER = "mail_sender"
+    MAIL_RENDER = "mail_render"
     ELASTICSEARCH_INDEXER = "elasticsearch_indexer"
+    PREVIEW_METADATA = "preview_metadata"
 
 
 def get_redis_connection(config: CFG) -> redis.Redis:
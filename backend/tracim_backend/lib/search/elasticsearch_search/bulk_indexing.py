@@ -0,0 +1,166 @@
+import multiprocessing
+from sqlalchemy.orm import Session
+from sqlalchemy.orm import joinedload
+from sqlalchemy.orm import selectinload
+import typing
+
+from tracim_backend.app_models.contents import content_type_list
+from tracim_backend.config import CFG
+from tracim_backend.lib.search.elasticsearch_search.elasticsearch_search import ESContentIndexer
+from tracim_backend.lib.search.elasticsearch_search.elasticsearch_search import ESSearchApi
+from tracim_backend.lib.utils.logger import logger
+from tracim_backend.models.data import Content
+from tracim_backend.models.data import ContentRevisionRO
+from tracim_backend.models.setup_models import get_engine
+from tracim_backend.models.setup_models import get_session_factory
+from tracim_backend.models.tag import TagOnContent
+
+DEFAULT_BATCH_SIZE = 500
+
+# INFO - state of pool worker processes, see _init_worker_process()
+_worker_config = None  # type: typing.Optional[CFG]
+_worker_session_factory = None
+
+
+class BatchIndexingResult(object):
+    def __init__(
+        self, last_content_id: int, indexed_count: int, failed_content_ids: typing.List[int]
+    ) -> None:
+        self.last_content_id = last_content_id
+        self.indexed_count = indexed_count
+        self.failed_content_ids = failed_content_ids
+
+
+class ESBulkContentIndexer(object):
+    """
+    Index all contents through the Elasticsearch bulk API.
+
+    Content ids are read by batches of batch_size with keyset pagination. Contents of a batch
+    are loaded with their revisions, owners, workspace and tags, then their documents are built
+    and sent by one of the processes_count worker processes.
+    Batches are reported in content id order: after a batch is reported, all contents up to its
+    last content id have been processed and indexing can be resumed from there.
+    """
+
+    def __init__(
+        self,
+        session: Session,
+        config: CFG,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        processes_count: int = 1,
+    ) -> None:
+        assert batch_size > 0
+        assert processes_count > 0
+        self._session = session
+        self._config = config
+        self._batch_size = batch_size
+        self._processes_count = processes_count
+
+    def get_contents_count(self, after_content_id: int = 0) -> int:
+        return self._get_content_ids_query(after_content_id).count()
+
+    def iter_content_id_batches(
+        self, after_content_id: int = 0
+    ) -> typing.Generator[typing.List[int], None, None]:
+        while True:
+            content_ids = [
+                content_id
+                for (content_id,) in self._get_content_ids_query(after_content_id)
+                .order_by(Content.id)
+                .limit(self._batch_size)
+            ]
+            if not content_ids:
+                return
+            yield content_ids
+            after_content_id = content_ids[-1]
+
+    def index_all(
+        self, after_content_id: int = 0
+    ) -> typing.Generator[BatchIndexingResult, None, None]:
+        """Index contents whose id is greater than after_content_id, yield result of batches."""
+        content_id_batches = self.iter_content_id_batches(after_content_id)
+        if self._processes_count == 1:
+            search_api = ESSearchApi(session=self._session, config=self._config, current_user=None)
+            for content_ids in content_id_batches:
+                yield index_content_batch(self._session, search_api, content_ids)
+                # INFO - keep the memory usage bounded, extracted texts are flushed before
+                self._session.flush()
+                self._session.expunge_all()
+            return
+
+        # INFO - worker processes are forked: they inherit the configuration and open their
+        # own database and Elasticsearch connections.
+        with multiprocessing.get_context("fork").Pool(
+            self._processes_count, initializer=_init_worker_process, initargs=(self._config,)
+        ) as pool:
+            yield from pool.imap(_index_content_batch_in_worker_process, content_id_batches)
+
+    def _get_content_ids_query(self, after_content_id: int):
+        # INFO - same contents as ContentApi(current_user=None).get_all() used by the
+        # legacy indexing: deleted, archived and temporary contents are not indexed
+        return (
+            self._session.query(Content.id)
+            .join(ContentRevisionRO, Content.cached_revision_id == ContentRevisionRO.revision_id)
+            .filter(ContentRevisionRO.type.in_(content_type_list.query_allowed_types_slugs()))
+            .filter(
+                ContentRevisionRO.type.notin_(
+                    [content_type.value for content_type in ESContentIndexer.EXCLUDED_CONTENT_TYPES]
+                )
+            )
+            .filter(ContentRevisionRO.is_deleted == False)  # noqa: E712
+            .filter(ContentRevisionRO.is_archived == False)  # noqa: E712
+            .filter(ContentRevisionRO.is_temporary == False)  # noqa: E712
+            .filter(Content.id > after_content_id)
+        )
+
+
+def index_content_batch(
+    session: Session, search_api: ESSearchApi, content_ids: typing.List[int]
+) -> BatchIndexingResult:
+    """Load contents of the given ids with what their documents need and index them."""
+    contents = (
+        session.query(Content)
+        .options(
+            joinedload(Content.current_revision).joinedload(ContentRevisionRO.workspace),
+            joinedload(Content.current_revision).selectinload(ContentRevisionRO.parent),
+            selectinload(Content.revisions).joinedload(ContentRevisionRO.owner),
+            selectinload(Content.tags).joinedload(TagOnContent.tag),
+        )
+        .filter(Content.id.in_(content_ids))
+        .order_by(Content.id)
+        .all()
+    )
+    failed_content_ids = search_api.bulk_index_contents(contents)
+    return BatchIndexingResult(
+        last_content_id=content_ids[-1],
+        indexed_count=len(contents) - len(failed_content_ids),
+        failed_content_ids=failed_content_ids,
+    )
+
+
+def _init_worker_process(config: CFG) -> None:
+    global _worker_config
+    global _worker_session_factory
+    _worker_config = config
+    _worker_session_factory = get_session_factory(get_engine(config))
+
+
+def _index_content_batch_in_worker_process(content_ids: typing.List[int]) -> BatchIndexingResult:
+    session = _worker_session_factory()
+    try:
+        search_api = ESSearchApi(session=session, config=_worker_config, current_user=None)
+        result = index_content_batch(session, search_api, content_ids)
+        # INFO - store texts extracted from files
+        session.commit()
+        return result
+    except Exception:
+        logger.exception(
+            _index_content_batch_in_worker_process,
+            "Exception while indexing contents {} to {}".format(content_ids[0], content_ids[-1]),
+        )
+        return BatchIndexingResult(
+            last_content_id=content_ids[-1], indexed_count=0, failed_content_ids=content_ids
+        )
+    finally:
+        session.rollback()
+        session.close()
@@ -3,13 +3,17 @@
 from elasticsearch import Elasticsearch
 from elasticsearch import NotFoundError
 from elasticsearch.client import IngestClient
+from elasticsearch.helpers import streaming_bulk
 from elasticsearch_dsl import Document
 from elasticsearch_dsl import Index
 from elasticsearch_dsl import InnerDoc
 from elasticsearch_dsl import Search
 from elasticsearch_dsl.response.aggs import Bucket
 import pluggy
+from slugify import slugify
 from sqlalchemy import inspect
+from sqlalchemy.dialects import mysql
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.event import listen
 from sqlalchemy.orm import Session
 import typing
@@ -56,6 +60,7 @@
 from tracim_backend.models.data import ContentRevisionRO
 from tracim_backend.models.data import UserRoleInWorkspace
 from tracim_backend.models.data import Workspace
+from tracim_backend.models.search import FileExtractedText
 from tracim_backend.models.tag import Tag
 from tracim_backend.models.tag import TagOnContent
 from tracim_backend.views.search_api.schemas import AdvancedContentSearchQuery
@@ -64,6 +69,19 @@
 FILE_PIPELINE_SOURCE_FIELD = "b64_file"
 FILE_PIPELINE_DESTINATION_FIELD = "file_data"
 FILE_PIPELINE_LANGS = ["en", "fr", "pt", "de", "ar", "es", "nb_NO"]
+# INFO - documents sent per bulk API request
+BULK_CHUNK_SIZE = 100
+# INFO - painless scripts used to update fields copied from ancestors in content documents
+UPDATE_PATH_COMPONENT_SCRIPT = """
+for (component in ctx._source.path) {
+    if (((Number) component.content_id).longValue() == params.content_id) {
+        component.label = params.label;
+        component.slug = params.slug;
+    }
+}
+"""
+UPDATE_WORKSPACE_LABEL_SCRIPT = "ctx._source.workspace.label = params.label"
+SET_FIELD_SCRIPT = "ctx._source[params.field] = params.value"
 
 DEFAULT_CONTENT_SEARCH_FIELDS = list(ContentSearchField)
 DEFAULT_USER_SEARCH_FIELDS = list(UserSearchField)
@@ -267,8 +285,23 @@ def index_content(self, content: Content) -> None:
         """
         Index/update a content into elastic_search engine
         """
+        logger.info(self, "Indexing content {}".format(content.content_id))
+        indexed_content, pipeline_id = self.get_indexed_content(content)
+        indexed_content.save(
+            using=self.es,
+            pipeline=pipeline_id,
+            index=self._get_index_parameters(IndexedContent).alias,
+            request_timeout=self._config.SEARCH__ELASTICSEARCH__REQUEST_TIMEOUT,
+        )
+
+    def get_indexed_content(
+        self, content: Content
+    ) -> typing.Tuple[IndexedContent, typing.Optional[str]]:
+        """
+        Build the document of a content.
+        :return: the document and the id of the ingest pipeline to use when indexing it
+        """
         content_in_context = ContentInContext(content, config=self._config, dbsession=self._session)
-        logger.info(self, "Indexing content {}".format(content_in_context.content_id))
         author = self._create_digest_user_from_user(content_in_context.author)
         last_modifier = self._create_digest_user_from_user(content_in_context.last_modifier)
         workspace = DigestWorkspace(
@@ -327,23 +360,157 @@ def index_content(self, content: Content) -> None:
             content_size=content_in_context.size,
         )
         indexed_content.meta.id = content_in_context.content_id
-        content_index_alias = self._get_index_parameters(IndexedContent).alias
         pipeline_id = None  # type: typing.Optional[str]
         if self._should_index_depot_file(content_in_context):
-            indexed_content.b64_file = content_in_context.get_b64_file()
-            pipeline_id = FILE_PIPELINE_ID
-        indexed_content.save(
-            using=self.es,
-            pipeline=pipeline_id,
-            index=content_index_alias,
+            file_data = self._get_file_data(content_in_context)
+            if file_data is not None:
+                indexed_content.file_data = file_data
+            else:
+                indexed_content.b64_file = content_in_context.get_b64_file()
+                pipeline_id = FILE_PIPELINE_ID
+        return indexed_content, pipeline_id
+
+    def _get_file_data(
+        self, content_in_context: ContentInContext
+    ) -> typing.Optional[typing.Dict[str, typing.Any]]:
+        """
+        Get what the ingest pipeline extracts from the file of the content.
+
+        Extraction is done once per file content: its result is stored and reused for
+        next indexations of all contents using the same file.
+        :return: extracted data, None if the file has no hash: the document must then be
+        indexed through the ingest pipeline
+        """
+        file_hash = content_in_context.content.file_hash
+        if not file_hash:
+            return None
+        extracted_text = self._session.query(FileExtractedText).get(file_hash)
+        if extracted_text:
+            return extracted_text.file_data
+
+        logger.info(
+            self, "Extracting text of the file of content {}".format(content_in_context.content_id)
+        )
+        response = IngestClient(self.es).simulate(
+            id=FILE_PIPELINE_ID,
+            body={
+                "docs": [
+                    {"_source": {FILE_PIPELINE_SOURCE_FIELD: content_in_context.get_b64_file()}}
+                ]
+            },
             request_timeout=self._config.SEARCH__ELASTICSEARCH__REQUEST_TIMEOUT,
         )
+        (document,) = response["docs"]
+        if "error" in document:
+            raise IndexingError(
+                "Cannot extract text of the file of content {}: {}".format(
+                    content_in_context.content_id, document["error"]
+                )
+            )
+        file_data = document["doc"]["_source"].get(FILE_PIPELINE_DESTINATION_FIELD, {})
+        self._store_file_data(file_hash, file_data)
+        return file_data
+
+    def _store_file_data(self, file_hash: str, file_data: typing.Dict[str, typing.Any]) -> None:
+        """
+        Store extracted data of a file unless it was stored meanwhile, for instance by
+        a concurrent indexation of a content with the same file: the current transaction
+        must not fail because of an already existing row.
+        """
+        table = FileExtractedText.__table__
+        values = {"file_hash": file_hash, "file_data": file_data}
+        dialect_name = self._session.get_bind().dialect.name
+        if dialect_name == "postgresql":
+            statement = (
+                postgresql.insert(table)
+                .values(values)
+                .on_conflict_do_nothing(index_elements=[table.c.file_hash])
+            )
+        elif dialect_name == "mysql":
+            statement = mysql.insert(table).values(values)
+            statement = statement.on_duplicate_key_update(file_hash=statement.inserted.file_hash)
+        else:
+            statement = table.insert().values(values).prefix_with("OR IGNORE")
+        self._session.execute(statement)
+
+    def delete_unused_file_data(self) -> int:
+        """
+        Delete stored extracted data of files which are not used by any revision anymore.
+        :return: number of deleted rows
+        """
+        used_file_hashes = self._session.query(ContentRevisionRO.file_hash).filter(
+            ContentRevisionRO.file_hash != None  # noqa: E711
+        )
+        return (
+            self._session.query(FileExtractedText)
+            .filter(~FileExtractedText.file_hash.in_(used_file_hashes))
+            .delete(synchronize_session=False)
+        )
 
     def index_contents(self, contents: typing.Iterable[Content]) -> None:
         """Index the given contents."""
         for content in contents:
             self.index_content(content)
 
+    def bulk_index_contents(self, contents: typing.Iterable[Content]) -> typing.List[int]:
+        """
+        Index the given contents through the bulk API, documents are sent in chunks
+        while being built.
+        :return: ids of contents which could not be indexed
+        """
+        failed_content_ids = []  # type: typing.List[int]
+
+        def actions() -> typing.Generator[typing.Dict[str, typing.Any], None, None]:
+            content_index_alias = self._get_index_parameters(IndexedContent).alias
+            for content in contents:
+                try:
+                    indexed_content, pipeline_id = self.get_indexed_content(content)
+                except Exception:
+                    logger.exception(
+                        self, "Exception while building document of content {}".format(content.id)
+                    )
+                    failed_content_ids.append(content.id)
+                    continue
+                action = indexed_content.to_dict(include_meta=True)
+                action["_index"] = content_index_alias
+                if pipeline_id:
+                    action["pipeline"] = pipeline_id
+                yield action
+
+        for ok, item in streaming_bulk(
+            self.es,
+            actions(),
+            chunk_size=BULK_CHUNK_SIZE,
+            raise_on_error=False,
+            raise_on_exception=False,
+            request_timeout=self._config.SEARCH__ELASTICSEARCH__REQUEST_TIMEOUT,
+        ):
+            if not ok:
+                (result,) = item.values()
+                logger.error(self, "Error while indexing content: {}".format(result))
+                failed_content_ids.append(int(result["_id"]))
+        return failed_content_ids
+
+    def update_contents_by_query(
+        self, query: typing.Dict[str, typing.Any], script: typing.Dict[str, typing.Any]
+    ) -> int:
+        """
+        Update the content documents matching query with the given painless script
+        in one request, documents are not rebuilt.
+        :return: number of updated documents
+        """
+        response = self.es.update_by_query(
+            index=self._get_index_parameters(IndexedContent).alias,
+            body={"query": query, "script": script},
+            conflicts="proceed",
+            request_timeout=self._config.SEARCH__ELASTICSEARCH__REQUEST_TIMEOUT,
+        )
+        if response["failures"]:
+            raise IndexingError(
+                "Got error(s) while updating contents: {}".format(response["failures"])
+            )
+        return response["updated"]
+
     def index_user(self, user: User) -> None:
         """Index the given user in the appropriate index."""
         user_in_context = UserInContext(user, dbsession=self._session, config=self._config)
@@ -950,6 +1117,14 @@ def _get_workspaces_known_to_user(self) -> typing.List[Workspace]:
         return wapi.get_all_accessible_by_user(self._user) + wapi.get_all_for_user(self._user)
 
 
+class ContentsUpdate:
+    """Partial update of the content documents matching query with a painless script."""
+
+    def __init__(self, query: typing.Dict[str, typing.Any], script: typing.Dict[str, typing.Any]):
+        self.query = query
+        self.script = script
+
+
 class ESContentIndexer:
     """Listen for events from database and trigger re-indexing of contents when needed."""
 
@@ -971,14 +1146,27 @@ def on_content_created(self, content: Content, context: TracimContext) -> None:
 
     @hookimpl
     def on_content_modified(self, content: Content, context: TracimContext) -> None:
-        """Index the given content and its children.
-
-        Children are indexed only if the content has changes influencing their index."""
+        """Index the given content and update its children.
+
+        Children are only updated if the content has changes influencing their index:
+        fields copied from the content are updated in place when it is renamed, deleted,
+        archived or restored, children are fully reindexed when it is moved."""
+        children_updates = []  # type: typing.List[ContentsUpdate]
+        reindex_children = False
+        if content.type not in self.EXCLUDED_CONTENT_TYPES:
+            previous_revision = content.get_previous_revision()
+            if previous_revision:
+                if self._is_moved(content.current_revision, previous_revision):
+                    reindex_children = True
+                else:
+                    children_updates = self._get_children_updates(content, previous_revision)
         content = self._get_main_content(content)
         try:
             self.index_contents([content], context)
-            if self._should_reindex_children(content.current_revision):
+            if reindex_children:
                 self.index_contents(content.recursive_children, context)
+            if children_updates:
+                self.update_contents(children_updates, context)
         except Exception:
             logger.exception(
                 self,
@@ -987,25 +1175,28 @@ def on_content_modified(self, content: Content, context: TracimContext) -> None:
 
     @hookimpl
     def on_workspace_modified(self, workspace: Workspace, context: TracimContext) -> None:
-        """Index the contents of the given workspace
+        """Update the workspace label in the documents of its contents if it has changed.
 
-        Contents are indexed only if the workspace has changes influencing their index.
-        """
-        if not self._should_reindex_children(workspace):
+        Content documents do not depend on other workspace fields."""
+        if not inspect(workspace).attrs.label.history.has_changes():
             return
-        content_api = ContentApi(
-            session=context.dbsession,
-            current_user=None,
-            config=context.app_config,
-            show_deleted=True,
-            show_archived=True,
-        )
         try:
-            self.index_contents(content_api.get_all_query(workspaces=[workspace]), context)
+            self.update_contents(
+                [
+                    ContentsUpdate(
+                        query={"term": {"workspace_id": workspace.workspace_id}},
+                        script={
+                            "source": UPDATE_WORKSPACE_LABEL_SCRIPT,
+                            "params": {"label": workspace.label},
+                        },
+                    )
+                ],
+                context,
+            )
         except IndexingError:
             logger.exception(
                 self,
-                "Exception while indexing modified contents of workspace {}".format(
+                "Exception while updating modified contents of workspace {}".format(
                     workspace.workspace_id
                 ),
             )
@@ -1103,6 +1294,36 @@ def _index_contents_from_ids(self, content_ids: typing.List[int]) -> None:
                     "Got error(s) while indexing content ids {}".format(content_ids)
                 )
 
+    def update_contents(self, updates: typing.List[ContentsUpdate], context: TracimContext) -> None:
+        """Apply the given updates to content documents, after commit in async mode."""
+        if context.app_config.JOBS__PROCESSING_MODE == CFG.CST.ASYNC:
+            queue = get_rq_queue2(context.app_config, RqQueueName.ELASTICSEARCH_INDEXER)
+            updates_parameters = [(update.query, update.script) for update in updates]
+
+            def update_via_rq_worker(session: Session, flush_context=None) -> None:
+                queue.enqueue(self._update_contents_from_parameters, updates_parameters)
+
+            listen(context.dbsession, "after_commit", update_via_rq_worker, once=True)
+        else:
+            search_api = ESSearchApi(
+                session=context.dbsession, config=context.app_config, current_user=None
+            )
+            for update in updates:
+                search_api.update_contents_by_query(update.query, update.script)
+
+    def _update_contents_from_parameters(
+        self, updates_parameters: typing.List[typing.Tuple[dict, dict]]
+    ) -> None:
+        """Apply the updates whose query and script are given.
+        Is exclusively made to be used inside a RQ DatabaseWorker()
+        """
+        with worker_context() as context:
+            search_api = ESSearchApi(
+                session=context.dbsession, config=context.app_config, current_user=None
+            )
+            for query, script in updates_parameters:
+                search_api.update_contents_by_query(query, script)
+
     @classmethod
     def _get_main_content(cls, content: Content) -> Content:
         """Find the first ancestor which has a type to be indexed."""
@@ -1111,20 +1332,87 @@ def _get_main_content(cls, content: Content) -> Content:
         assert content, "Got a sub-content without main content!"
         return content
 
-    @classmethod
-    def _should_reindex_children(cls, obj: typing.Union[ContentRevisionRO, Workspace]) -> bool:
-        """Changes on a content/workspace only have effect on their children if:
-        - their 'label' has changed
-        - their 'is_deleted' state has changed
-        - (for contents) their 'is_archived' state has changed
-        """
-        attribute_state = inspect(obj).attrs
+    @staticmethod
+    def _is_moved(revision: ContentRevisionRO, previous_revision: ContentRevisionRO) -> bool:
         return (
-            attribute_state.label.history.has_changes()
-            or attribute_state.is_deleted.history.has_changes()
-            or (isinstance(obj, Content) and attribute_state.is_archived.history.has_changes())
+            revision.parent_id != previous_revision.parent_id
+            or revision.workspace_id != previous_revision.workspace_id
         )
 
+    @classmethod
+    def _get_children_updates(
+        cls, content: Content, previous_revision: ContentRevisionRO
+    ) -> typing.List[ContentsUpdate]:
+        """Changes on a content only have effect on its children if:
+        - its 'label' has changed: it is in their path
+        - its 'is_deleted'/'is_archived' state has changed: it is the nearest
+          deleted/archived ancestor of some of them
+        """
+        revision = content.current_revision
+        updates = []  # type: typing.List[ContentsUpdate]
+        if revision.label != previous_revision.label:
+            updates.append(
+                ContentsUpdate(
+                    query=cls._get_descendants_query(content.content_id),
+                    script={
+                        "source": UPDATE_PATH_COMPONENT_SCRIPT,
+                        "params": {
+                            "content_id": content.content_id,
+                            "label": content.label,
+                            "slug": slugify(content.label),
+                        },
+                    },
+                )
+            )
+        for field, is_hidden, was_hidden, hidden_through_parent_id in (
+            (
+                "deleted_through_parent_id",
+                revision.is_deleted,
+                previous_revision.is_deleted,
+                content.deleted_through_parent_id,
+            ),
+            (
+                "archived_through_parent_id",
+                revision.is_archived,
+                previous_revision.is_archived,
+                content.archived_through_parent_id,
+            ),
+        ):
+            if is_hidden == was_hidden:
+                continue
+            # INFO - children hidden through the content are those whose value is the one
+            # inherited by the content (when hidden) or the content itself (when restored),
+            # values set by a nearer hidden ancestor are kept.
+            old_value, new_value = (
+                (hidden_through_parent_id, content.content_id)
+                if is_hidden
+                else (content.content_id, hidden_through_parent_id)
+            )
+            query = cls._get_descendants_query(content.content_id)
+            query["bool"]["filter"] = {"term": {field: old_value}}
+            updates.append(
+                ContentsUpdate(
+                    query=query,
+                    script={
+                        "source": SET_FIELD_SCRIPT,
+                        "params": {"field": field, "value": new_value},
+                    },
+                )
+            )
+        return updates
+
+    @staticmethod
+    def _get_descendants_query(content_id: int) -> typing.Dict[str, typing.Any]:
+        """Query matching the documents having the given content in their path."""
+        return {
+            "bool": {
+                "must": {
+                    "nested": {"path": "path", "query": {"term": {"path.content_id": content_id}}}
+                },
+                "must_not": {"term": {"content_id": content_id}},
+            }
+        }
+
     @classmethod
     def _filter_excluded_content_types(
         cls, contents: typing.Iterable[Content]
@@ -0,0 +1,229 @@
+from bs4 import BeautifulSoup
+import pluggy
+import re
+from sqlalchemy import asc
+from sqlalchemy import column
+from sqlalchemy import desc
+from sqlalchemy import func
+from sqlalchemy import literal_column
+from sqlalchemy import table
+from sqlalchemy import text
+from sqlalchemy.orm import Query
+from sqlalchemy.orm import Session
+import typing
+
+from tracim_backend.lib.core.content import ContentApi
+from tracim_backend.lib.core.plugins import hookimpl
+from tracim_backend.lib.core.tag import TagLib
+from tracim_backend.lib.search.simple_search.models import SimpleContentSearchResponse
+from tracim_backend.lib.search.simple_search.simple_search_api import SEARCH_DEFAULT_RESULT_NB
+from tracim_backend.lib.search.simple_search.simple_search_api import SimpleSearchApi
+from tracim_backend.lib.utils.request import TracimContext
+from tracim_backend.models.data import Content
+from tracim_backend.models.data import ContentRevisionRO
+from tracim_backend.models.search import CONTENT_SEARCH_FTS_TABLE
+from tracim_backend.models.search import ContentSearchIndex
+from tracim_backend.models.search import POSTGRESQL_TEXT_SEARCH_CONFIG
+from tracim_backend.models.tag import Tag
+from tracim_backend.models.tag import TagOnContent
+
+SEARCH_TERM_PATTERN = re.compile(r"\w+")
+
+
+class IndexedSearchApi(SimpleSearchApi):
+    """
+    Full-text search using the full-text index of the database:
+    - contents are indexed in content_search_index table, which is kept up to date
+      by IndexedContentIndexer.
+    - comments and todos are indexed with their main content.
+    - matching, ranking, filtering and pagination are done by the database.
+    - supports PostgreSQL, MySQL/MariaDB and SQLite (with FTS5).
+    """
+
+    def create_indices(self) -> None:
+        # INFO - content_search_index table and its full-text index are created with
+        # the database schema ("tracimcli db init" or migrations).
+        pass
+
+    def delete_indices(self) -> None:
+        self._session.query(ContentSearchIndex).delete(synchronize_session=False)
+
+    def index_content(self, content: Content) -> None:
+        IndexedContentIndexer().index_content(content, self._session)
+
+    def register_plugins(self, plugin_manager: pluggy.PluginManager) -> None:
+        plugin_manager.register(IndexedContentIndexer())
+
+    def get_search_terms(self, keywords: typing.List[str]) -> typing.List[str]:
+        """
+        Split keywords into words, dropping characters having a meaning
+        in full-text query syntax of databases.
+        """
+        search_terms = []
+        for keyword in keywords:
+            search_terms.extend(SEARCH_TERM_PATTERN.findall(keyword))
+        return search_terms
+
+    def search(
+        self,
+        content_api: ContentApi,
+        keywords: typing.List[str],
+        size: typing.Optional[int] = SEARCH_DEFAULT_RESULT_NB,
+        offset: typing.Optional[int] = None,
+        content_types: typing.Optional[typing.List[str]] = None,
+    ) -> SimpleContentSearchResponse:
+        search_terms = self.get_search_terms(keywords)
+        if not search_terms:
+            return SimpleContentSearchResponse(content_list=[], total_hits=0)
+        query = self._search_query(
+            keywords=search_terms, content_types=content_types, content_api=content_api
+        )
+        total_hits = query.order_by(None).count()
+        contents = query.limit(size).offset(offset).all()
+        return SimpleContentSearchResponse(
+            content_list=[content_api.get_content_in_context(content) for content in contents],
+            total_hits=total_hits,
+        )
+
+    def _search_query(
+        self,
+        keywords: typing.List[str],
+        content_api: ContentApi,
+        content_types: typing.Optional[typing.List[str]] = None,
+    ) -> Query:
+        """
+        :param keywords: search terms as returned by get_search_terms()
+        :return: a query of Content items sorted by relevance
+        """
+        dialect_name = self._session.get_bind().dialect.name
+        content_query = content_api.get_base_query(None).filter(
+            Content.type.notin_([slug.value for slug in self.EXCLUDED_CONTENT_TYPES])
+        )
+        if dialect_name == "sqlite":
+            fts_table = table(CONTENT_SEARCH_FTS_TABLE, column("rowid"))
+            fts_table_name = literal_column(CONTENT_SEARCH_FTS_TABLE)
+            match_query = " OR ".join('"{}"*'.format(term) for term in keywords)
+            content_query = content_query.join(
+                fts_table, fts_table.c.rowid == Content.content_id
+            ).filter(fts_table_name.op("MATCH")(match_query))
+            # INFO - bm25() returns better matches with lower values
+            ranking = asc(func.bm25(fts_table_name))
+        else:
+            content_query = content_query.join(
+                ContentSearchIndex, ContentSearchIndex.content_id == Content.content_id
+            )
+            if dialect_name == "postgresql":
+                # INFO - same expression as idx__content_search_index__document
+                # to allow using the GIN index.
+                text_search_config = literal_column("'{}'".format(POSTGRESQL_TEXT_SEARCH_CONFIG))
+                document_vector = func.to_tsvector(text_search_config, ContentSearchIndex.document)
+                match_query = func.to_tsquery(
+                    text_search_config, " | ".join("{}:*".format(term) for term in keywords)
+                )
+                content_query = content_query.filter(document_vector.op("@@")(match_query))
+                ranking = desc(func.ts_rank(document_vector, match_query))
+            else:
+                # INFO - MySQL/MariaDB, other databases are refused by configuration checks
+                # (see INDEXED_SEARCH_DATABASE_BACKENDS).
+                match_score = text(
+                    "MATCH (content_search_index.document) AGAINST (:match_query IN BOOLEAN MODE)"
+                ).bindparams(match_query=" ".join("{}*".format(term) for term in keywords))
+                content_query = content_query.filter(match_score)
+                ranking = desc(match_score)
+
+        if content_types:
+            content_query = content_query.filter(Content.type.in_(content_types))
+        content_query = content_api.exclude_hidden_through_parent(content_query)
+
+        return content_query.order_by(
+            ranking,
+            desc(Content.updated),
+            desc(Content.cached_revision_id),
+            desc(Content.content_id),
+        )
+
+
+class IndexedContentIndexer:
+    """Listen for events from database and update content_search_index table when needed."""
+
+    @hookimpl
+    def on_content_created(self, content: Content, context: TracimContext) -> None:
+        self.index_content(content, context.dbsession)
+
+    @hookimpl
+    def on_content_modified(self, content: Content, context: TracimContext) -> None:
+        self.index_content(content, context.dbsession)
+
+    @hookimpl
+    def on_content_deleted(self, content: Content, context: TracimContext) -> None:
+        if content.type in SimpleSearchApi.EXCLUDED_CONTENT_TYPES:
+            self.index_content(content, context.dbsession)
+            return
+        context.dbsession.query(ContentSearchIndex).filter(
+            ContentSearchIndex.content_id == content.content_id
+        ).delete(synchronize_session=False)
+
+    @hookimpl
+    def on_content_tag_created(self, content_tag: TagOnContent, context: TracimContext) -> None:
+        self.index_content(content_tag.content, context.dbsession)
+
+    @hookimpl
+    def on_content_tag_deleted(self, content_tag: TagOnContent, context: TracimContext) -> None:
+        self.index_content(content_tag.content, context.dbsession)
+
+    @hookimpl
+    def on_tag_modified(self, tag: Tag, context: TracimContext) -> None:
+        for content in TagLib(context.dbsession).get_contents(tag):
+            self.index_content(content, context.dbsession)
+
+    def index_content(self, content: Content, session: Session) -> None:
+        """
+        Index the given content, or its main content for comments and todos.
+        """
+        content = self._get_main_content(content)
+        if content.type in SimpleSearchApi.EXCLUDED_CONTENT_TYPES:
+            return
+        # INFO - merge() as hooks are called during the flush: the document is inserted
+        # or updated by the next flush, at the latest when the transaction is committed.
+        session.merge(
+            ContentSearchIndex(
+                content_id=content.content_id, document=self.get_document(content, session)
+            )
+        )
+
+    def get_document(self, content: Content, session: Session) -> str:
+        """
+        Text indexed for the given content: label, filename, description, text,
+        tags and the text of its comments and todos.
+        """
+        parts = [content.label, content.file_name, content.description]
+        parts.append(self._html_to_text(content.raw_content))
+        parts.extend(
+            tag_name
+            for tag_name, in session.query(Tag.tag_name)
+            .join(TagOnContent, TagOnContent.tag_id == Tag.tag_id)
+            .filter(TagOnContent.content_id == content.content_id)
+        )
+        parts.extend(
+            self._html_to_text(raw_content)
+            for raw_content, in session.query(ContentRevisionRO.raw_content)
+            .join(Content, Content.cached_revision_id == ContentRevisionRO.revision_id)
+            .filter(
+                ContentRevisionRO.parent_id == content.content_id,
+                ContentRevisionRO.type.in_(
+                    [slug.value for slug in SimpleSearchApi.EXCLUDED_CONTENT_TYPES]
+                ),
+                ContentRevisionRO.is_deleted == False,  # noqa: E712
+            )
+        )
+        return "\n".join(part for part in parts if part)
+
+    def _get_main_content(self, content: Content) -> Content:
+        if content.type in SimpleSearchApi.EXCLUDED_CONTENT_TYPES and content.parent:
+            return content.parent
+        return content
+
+    def _html_to_text(self, html: typing.Optional[str]) -> str:
+        if not html:
+            return ""
+        return BeautifulSoup(html, "html.parser").get_text(" ")
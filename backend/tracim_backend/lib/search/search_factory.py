@@ -7,6 +7,7 @@
 
 ELASTICSEARCH__SEARCH_ENGINE_SLUG = "elasticsearch"
 SIMPLE__SEARCH_ENGINE_SLUG = "simple"
+INDEXED__SEARCH_ENGINE_SLUG = "indexed"
 
 
 class SearchFactory(object):
@@ -21,7 +22,7 @@ def get_search_controller(cls, config: CFG):
             from tracim_backend.views.search_api.elasticsearch_controller import ESSearchController
 
             return ESSearchController()
-        elif config.SEARCH__ENGINE == SIMPLE__SEARCH_ENGINE_SLUG:
+        elif config.SEARCH__ENGINE in (SIMPLE__SEARCH_ENGINE_SLUG, INDEXED__SEARCH_ENGINE_SLUG):
             # TODO - G.M - 2019-05-22 - fix circular import
             from tracim_backend.views.search_api.simple_search_controller import (
                 SimpleSearchController,
@@ -53,16 +54,39 @@ def get_simple_search_api(
 
         return SimpleSearchApi(session=session, current_user=current_user, config=config)
 
+    @classmethod
+    def get_indexed_search_api(
+        cls, session: Session, current_user: typing.Optional[User], config: CFG
+    ) -> "IndexedSearchApi":  # noqa: F821
+        # TODO - G.M - 2019-05-22 - fix circular import
+        from tracim_backend.lib.search.indexed_search.indexed_search_api import IndexedSearchApi
+
+        return IndexedSearchApi(session=session, current_user=current_user, config=config)
+
+    @classmethod
+    def get_content_search_api(
+        cls, session: Session, current_user: typing.Optional[User], config: CFG
+    ) -> typing.Union["SimpleSearchApi", "IndexedSearchApi"]:  # noqa: F821
+        """
+        Search api used for the simple content search (not the advanced search).
+        """
+        if config.SEARCH__ENGINE == INDEXED__SEARCH_ENGINE_SLUG:
+            return cls.get_indexed_search_api(session, current_user, config)
+        return cls.get_simple_search_api(session, current_user, config)
+
     @classmethod
     def get_search_lib(
         cls, session: Session, current_user: typing.Optional[User], config: CFG
-    ) -> typing.Union["ESSearchApi", "SimpleSearchApi"]:  # noqa: F821
+    ) -> typing.Union["ESSearchApi", "SimpleSearchApi", "IndexedSearchApi"]:  # noqa: F821
         if config.SEARCH__ENGINE == ELASTICSEARCH__SEARCH_ENGINE_SLUG:
             return cls.get_elastic_search_api(session, current_user, config)
 
         if config.SEARCH__ENGINE == SIMPLE__SEARCH_ENGINE_SLUG:
             return cls.get_simple_search_api(session, current_user, config)
 
+        if config.SEARCH__ENGINE == INDEXED__SEARCH_ENGINE_SLUG:
+            return cls.get_indexed_search_api(session, current_user, config)
+
         raise NoValidSearchEngine(
             "Can't provide search lib"
             ' because the provided search engine "{}"'
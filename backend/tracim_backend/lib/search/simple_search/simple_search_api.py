@@ -77,12 +77,6 @@ def search(
         for content in query:
             if len(results) >= size:
                 break
-            if not content_api._show_deleted:
-                if content_api.get_deleted_parent_id(content):
-                    continue
-            if not content_api._show_archived:
-                if content_api.get_archived_parent_id(content):
-                    continue
             if content.type in self.EXCLUDED_CONTENT_TYPES:
                 # INFO - G.M - 2019-06-13 -  filter by content_types of parent for comment
                 # if correct content_type, content is parent.
@@ -169,7 +163,7 @@ def _search_query(
             searched_content_types = set(content_types + [content_type_list.Comment.slug])
             content_query = content_query.filter(Content.type.in_(searched_content_types))
 
-        return content_query
+        return content_api.exclude_hidden_through_parent(content_query)
 
     def search_content(self, search_parameters: ContentSearchQuery) -> ContentSearchResponse:
         """
@@ -8,6 +8,7 @@
 from colour import Color
 import datetime
 import email
+import hashlib
 import importlib
 import json
 import jsonschema
@@ -53,6 +54,7 @@
 RESET_PASSWORD_SUBPATH = "reset-password"
 UNKNOWN_BUILD_VERSION = "unknown"
 DEFAULT_NB_ITEM_PAGINATION = 10
+FILE_HASH_CHUNK_SIZE = 64 * 1024
 
 
 def generate_documentation_swagger_tag(*sections: str) -> str:
@@ -373,6 +375,79 @@ def is_dir_readable(path: str) -> bool:
     return True
 
 
+def get_file_hash(content: typing.Union[bytes, typing.BinaryIO]) -> Optional[str]:
+    """
+    Compute SHA-256 of given bytes or seekable binary file, reading the file by chunks and
+    rewinding it to its original position.
+    :return: hexadecimal hash, None if the file cannot be rewound after reading it.
+    """
+    file_hash = hashlib.sha256()
+    if isinstance(content, bytes):
+        file_hash.update(content)
+        return file_hash.hexdigest()
+    if not hasattr(content, "seekable") or not content.seekable():
+        return None
+    position = content.tell()
+    while True:
+        chunk = content.read(FILE_HASH_CHUNK_SIZE)
+        if not chunk:
+            break
+        file_hash.update(chunk)
+    content.seek(position)
+    return file_hash.hexdigest()
+
+
+class ChunksFileStream(object):
+    """
+    Read-only file-like object over an iterable of bytes chunks, allowing to stream
+    received data to the depot without a temporary file.
+
+    Size and SHA-256 hash of the data are computed while reading. check_size, if given,
+    is called with the size read so far after each chunk: the exception it raises stops
+    the stream (read() then returns end of file) and is kept in the error attribute.
+    """
+
+    def __init__(
+        self,
+        chunks: typing.Iterable[bytes],
+        check_size: typing.Optional[Callable[[int], None]] = None,
+    ) -> None:
+        self._chunks = iter(chunks)
+        self._check_size = check_size
+        self._buffer = bytearray()
+        self._hash = hashlib.sha256()
+        self.size = 0
+        self.error = None  # type: typing.Optional[Exception]
+
+    def read(self, size: int = -1) -> bytes:
+        while self.error is None and (size < 0 or len(self._buffer) < size):
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                break
+            self.size += len(chunk)
+            if self._check_size:
+                try:
+                    self._check_size(self.size)
+                except Exception as exc:
+                    self.error = exc
+                    break
+            self._hash.update(chunk)
+            self._buffer += chunk
+        if size < 0 or size > len(self._buffer):
+            size = len(self._buffer)
+        data = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        return data
+
+    def seekable(self) -> bool:
+        return False
+
+    @property
+    def file_hash(self) -> str:
+        """Hash of the data read so far"""
+        return self._hash.hexdigest()
+
+
 def is_file_exist(path: str) -> bool:
     if not os.path.isfile(path):
         raise NotAFileError("{} is not a file".format(path))
@@ -7,7 +7,6 @@
 from wsgidav.lock_manager import LockManager
 
 from tracim_backend.config import CFG
-from tracim_backend.exceptions import ContentNotFound
 from tracim_backend.exceptions import NotAuthenticated
 from tracim_backend.exceptions import WorkspaceNotFound
 from tracim_backend.lib.core.content import ContentApi
@@ -18,6 +17,8 @@
 from tracim_backend.lib.utils.utils import webdav_convert_file_name_to_bdd
 from tracim_backend.lib.webdav import resources
 from tracim_backend.lib.webdav.lock_storage import LockStorage
+from tracim_backend.lib.webdav.path_cache import ResolvedWebdavPath
+from tracim_backend.lib.webdav.path_cache import WebdavPathCache
 from tracim_backend.lib.webdav.resources import get_content_resource
 from tracim_backend.lib.webdav.resources import get_workspace_resource
 from tracim_backend.models.auth import User
@@ -40,7 +41,14 @@ class ProcessedWebdavPath(object):
     - provide useful properties to handle the WebDAV request
     """
 
-    def __init__(self, path: str, current_user: User, session: TracimSession, app_config: CFG):
+    def __init__(
+        self,
+        path: str,
+        current_user: User,
+        session: TracimSession,
+        app_config: CFG,
+        path_cache: typing.Optional[WebdavPathCache] = None,
+    ):
         self.path = path
         self.workspace_api = WorkspaceApi(
             current_user=current_user, session=session, config=app_config
@@ -49,7 +57,6 @@ def __init__(self, path: str, current_user: User, session: TracimSession, app_co
 
         self.workspaces = []
         self.contents = []
-        path_parts = self._path_splitter(self.path)
         # TODO - G.M - 2020-10-09 - Find a proper way to refactor this code to make easier to
         # understood. This code is a bit confusing because:
         # - distinction between invalid path, proper destination path (for move) and root is not so
@@ -59,13 +66,19 @@ def __init__(self, path: str, current_user: User, session: TracimSession, app_co
         if not path_parts:
             self.workspaces.append(None)
             return
+        filemanager_filenames = [webdav_convert_file_name_to_bdd(part) for part in path_parts]
+        resolved_path = path_cache.get(current_user.user_id, path) if path_cache else None
+        if resolved_path and self._load_resolved_path(filemanager_filenames, resolved_path):
+            return
+        self.workspaces = []
+        self.contents = []
+
         workspace_found = True
         current_part_index = 0
         # Build space hierarchy
         while workspace_found:
             try:
-                part = path_parts[current_part_index]
-                filemanager_filename = webdav_convert_file_name_to_bdd(part)
+                filemanager_filename = filemanager_filenames[current_part_index]
                 parent = self.workspaces[-1] if self.workspaces else None
                 self.workspaces.append(
                     self.workspace_api.get_one_by_filemanager_filename(
@@ -78,19 +91,104 @@ def __init__(self, path: str, current_user: User, session: TracimSession, app_co
 
         # Build content hierarchy
         if self.workspaces:
-            for part in path_parts[current_part_index:]:
-                try:
-                    filemanager_filename = webdav_convert_file_name_to_bdd(part)
-                    workspace = self.workspaces[-1]
-                    parent = self.contents[-1] if self.contents else None
-                    content = self.content_api.get_one_by_filename(
-                        filename=filemanager_filename,
-                        workspace=workspace,
-                        parent=parent,
-                    )
-                except ContentNotFound:
-                    content = None
-                self.contents.append(content)
+            self.contents = self._get_content_hierarchy(
+                self.workspaces[-1], filemanager_filenames[current_part_index:]
+            )
+
+        # INFO - only cache existing resources as missing ones are likely to be created soon
+        if path_cache and self.workspaces and None not in self.contents:
+            path_cache.set(
+                current_user.user_id,
+                path,
+                ResolvedWebdavPath(
+                    workspace_ids=tuple(workspace.workspace_id for workspace in self.workspaces),
+                    content_ids=tuple(content.content_id for content in self.contents),
+                ),
+            )
+
+    def _get_content_hierarchy(
+        self, workspace: Workspace, filemanager_filenames: typing.List[str]
+    ) -> typing.List[typing.Optional[Content]]:
+        """
+        Get contents matching the given filenames hierarchy in the workspace, with None for
+        each filename not found. All candidate contents are fetched with one query.
+        """
+        if not filemanager_filenames:
+            return []
+        candidates = (
+            self.content_api.get_base_query([workspace])
+            .filter(Content.file_name.in_(set(filemanager_filenames)))
+            .order_by(Content.cached_revision_id.desc())
+            .all()
+        )
+        contents_by_parent_and_filename = {}
+        for content in candidates:
+            contents_by_parent_and_filename.setdefault(
+                (content.parent_id, content.file_name), content
+            )
+
+        contents = []
+        parent_id = None
+        for filemanager_filename in filemanager_filenames:
+            content = None
+            if not contents or parent_id is not None:
+                content = contents_by_parent_and_filename.get((parent_id, filemanager_filename))
+            contents.append(content)
+            parent_id = content.content_id if content else None
+        return contents
+
+    def _load_resolved_path(
+        self, filemanager_filenames: typing.List[str], resolved_path: ResolvedWebdavPath
+    ) -> bool:
+        """
+        Load spaces and contents of a cached resolved path, checking they still match the path.
+        Spaces and contents are each loaded with one query whatever the depth of the path.
+        :return: False if the resolved path is outdated
+        """
+        workspace_count = len(resolved_path.workspace_ids)
+        if workspace_count + len(resolved_path.content_ids) != len(filemanager_filenames):
+            return False
+        workspaces_by_id = {
+            workspace.workspace_id: workspace
+            for workspace in self.workspace_api.get_base_query().filter(
+                Workspace.workspace_id.in_(resolved_path.workspace_ids)
+            )
+        }
+        parent_id = None
+        for workspace_id, filemanager_filename in zip(
+            resolved_path.workspace_ids, filemanager_filenames
+        ):
+            workspace = workspaces_by_id.get(workspace_id)
+            if (
+                not workspace
+                or workspace.filemanager_filename != filemanager_filename
+                or workspace.parent_id != parent_id
+            ):
+                return False
+            self.workspaces.append(workspace)
+            parent_id = workspace.workspace_id
+
+        if not resolved_path.content_ids:
+            return True
+        content_filenames = filemanager_filenames[workspace_count:]
+        contents_by_id = {
+            content.content_id: content
+            for content in self.content_api.get_base_query([self.workspaces[-1]]).filter(
+                Content.content_id.in_(resolved_path.content_ids)
+            )
+        }
+        parent_id = None
+        for content_id, filemanager_filename in zip(resolved_path.content_ids, content_filenames):
+            content = contents_by_id.get(content_id)
+            if (
+                not content
+                or content.file_name != filemanager_filename
+                or content.parent_id != parent_id
+            ):
+                return False
+            self.contents.append(content)
+            parent_id = content.content_id
+        return True
 
     def _path_splitter(self, path: str) -> typing.List[str]:
         path_parts = path.split("/")
@@ -148,9 +246,11 @@ def __init__(
         environ: typing.Dict[str, typing.Any],
         app_config: CFG,
         plugin_manager: PluginManager,
+        path_cache: typing.Optional[WebdavPathCache] = None,
     ):
         super().__init__()
         self.environ = environ
+        self._path_cache = path_cache
         self._candidate_parent_content = None
         self._app_config = app_config
         self._session = None
@@ -164,6 +264,7 @@ def set_path(self, path: str) -> None:
             current_user=self.current_user,
             session=self.dbsession,
             app_config=self.app_config,
+            path_cache=self._path_cache,
         )
 
     @property
@@ -225,6 +326,7 @@ def set_destpath(self, destpath: str) -> None:
             current_user=self.current_user,
             session=self.dbsession,
             app_config=self.app_config,
+            path_cache=self._path_cache,
         )
 
     @property
@@ -19,6 +19,8 @@
 from tracim_backend.config import CFG
 from tracim_backend.lib.core.plugins import init_plugin_manager
 from tracim_backend.lib.webdav.dav_provider import WebdavTracimContext
+from tracim_backend.lib.webdav.path_cache import WebdavPathCache
+from tracim_backend.lib.webdav.path_cache import WebdavPathCacheHooks
 from tracim_backend.models.auth import AuthType
 from tracim_backend.models.setup_models import create_dbsession_for_context
 from tracim_backend.models.setup_models import get_engine
@@ -265,6 +267,11 @@ def __init__(self, application, config):
         self.app_config = CFG(self.settings)
         self.app_config.configure_filedepot()
         self.plugin_manager = init_plugin_manager(self.app_config)
+        self.path_cache = WebdavPathCache(
+            ttl=self.app_config.WEBDAV__PATH_CACHE__TTL,
+            max_size=self.app_config.WEBDAV__PATH_CACHE__MAX_SIZE,
+        )
+        self.plugin_manager.register(WebdavPathCacheHooks(self.path_cache))
         self.engine = get_engine(self.app_config)
         self.session_factory = get_session_factory(self.engine)
 
@@ -277,7 +284,9 @@ def __call__(self, environ, start_response):
         if AuthType.LDAP in self.app_config.AUTH_TYPES:
             registry = self.setup_ldap(registry, self.app_config)
         environ["tracim_registry"] = registry
-        tracim_context = WebdavTracimContext(environ, self.app_config, self.plugin_manager)
+        tracim_context = WebdavTracimContext(
+            environ, self.app_config, self.plugin_manager, self.path_cache
+        )
         session = create_dbsession_for_context(
             self.session_factory, transaction.manager, tracim_context
         )
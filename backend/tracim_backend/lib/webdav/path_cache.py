@@ -0,0 +1,112 @@
+import threading
+import time
+import typing
+
+from tracim_backend.lib.core.plugins import hookimpl
+from tracim_backend.lib.utils.request import TracimContext
+from tracim_backend.models.data import Content
+from tracim_backend.models.data import UserRoleInWorkspace
+from tracim_backend.models.data import Workspace
+
+
+class ResolvedWebdavPath(typing.NamedTuple):
+    workspace_ids: typing.Tuple[int, ...]
+    content_ids: typing.Tuple[int, ...]
+
+
+_CacheEntry = typing.Tuple[float, ResolvedWebdavPath]
+
+
+class WebdavPathCache(object):
+    """
+    In-memory cache of resolved WebDAV paths: ids of the spaces and contents of a path
+    for a given user, kept for ttl seconds.
+
+    Cached ids are only a hint: they are checked against the database when used,
+    so an outdated entry costs the usual path resolution but never returns a wrong resource.
+    """
+
+    def __init__(self, ttl: int, max_size: int) -> None:
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries = {}  # type: typing.Dict[typing.Tuple[int, str], _CacheEntry]
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0 and self.max_size > 0
+
+    def get(self, user_id: int, path: str) -> typing.Optional[ResolvedWebdavPath]:
+        if not self.enabled:
+            return None
+        entry = self._entries.get((user_id, path))
+        if not entry:
+            return None
+        expiration, resolved_path = entry
+        if expiration < time.monotonic():
+            return None
+        return resolved_path
+
+    def set(self, user_id: int, path: str, resolved_path: ResolvedWebdavPath) -> None:
+        if not self.enabled:
+            return
+        now = time.monotonic()
+        with self._lock:
+            if len(self._entries) >= self.max_size:
+                self._entries = {
+                    key: entry for key, entry in self._entries.items() if entry[0] >= now
+                }
+            # INFO - entries are kept in insertion order, drop the oldest ones if still full
+            while len(self._entries) >= self.max_size:
+                del self._entries[next(iter(self._entries))]
+            self._entries[(user_id, path)] = (now + self.ttl, resolved_path)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries = {}
+
+
+class WebdavPathCacheHooks(object):
+    """
+    Clear the WebDAV path cache when contents, spaces or memberships are changed
+    by the process owning the cache.
+    """
+
+    def __init__(self, path_cache: WebdavPathCache) -> None:
+        self.path_cache = path_cache
+
+    @hookimpl
+    def on_content_created(self, content: Content, context: TracimContext) -> None:
+        self.path_cache.clear()
+
+    @hookimpl
+    def on_content_modified(self, content: Content, context: TracimContext) -> None:
+        self.path_cache.clear()
+
+    @hookimpl
+    def on_content_deleted(self, content: Content, context: TracimContext) -> None:
+        self.path_cache.clear()
+
+    @hookimpl
+    def on_workspace_created(self, workspace: Workspace, context: TracimContext) -> None:
+        self.path_cache.clear()
+
+    @hookimpl
+    def on_workspace_modified(self, workspace: Workspace, context: TracimContext) -> None:
+        self.path_cache.clear()
+
+    @hookimpl
+    def on_workspace_deleted(self, workspace: Workspace, context: TracimContext) -> None:
+        self.path_cache.clear()
+
+    @hookimpl
+    def on_user_role_in_workspace_created(
+        self, role: UserRoleInWorkspace, context: TracimContext
+    ) -> None:
+        self.path_cache.clear()
+
+    @hookimpl
+    def on_user_role_in_workspace_deleted(
+        self, role: UserRoleInWorkspace, context: TracimContext
+    ) -> None:
+        self.path_cache.clear()
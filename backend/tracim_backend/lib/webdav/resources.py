@@ -301,13 +301,20 @@ def __init__(
         self.session = tracim_context.dbsession
         self.label = label
         self.provider = provider
-        self.content_api = ContentApi(
-            current_user=self.user,
-            session=tracim_context.dbsession,
-            config=tracim_context.app_config,
-            show_temporary=True,
-            namespaces_filter=[ContentNamespaces.CONTENT],
-        )
+        self._content_api = None  # type: typing.Optional[ContentApi]
+
+    @property
+    def content_api(self) -> ContentApi:
+        # INFO - created lazily as resources are instantiated for each listed member
+        if self._content_api is None:
+            self._content_api = ContentApi(
+                current_user=self.user,
+                session=self.session,
+                config=self.tracim_context.app_config,
+                show_temporary=True,
+                namespaces_filter=[ContentNamespaces.CONTENT],
+            )
+        return self._content_api
 
     # Internal methods
     def _get_members(
@@ -365,7 +372,11 @@ def createEmptyResource(self, file_name: str):
         if resource:
             content = resource.content
         try:
-            self.content_api.check_upload_size(int(self.environ["CONTENT_LENGTH"]), self.workspace)
+            # INFO - chunked uploads have no content length, max file size is checked
+            # while receiving them
+            self.content_api.check_upload_size(
+                int(self.environ.get("CONTENT_LENGTH") or 0), self.workspace
+            )
         except (
             FileSizeOverMaxLimitation,
             FileSizeOverWorkspaceEmptySpace,
@@ -691,19 +702,26 @@ def __init__(
             tracim_context=tracim_context,
         )
         self.tracim_context = tracim_context
-        self.content_api = ContentApi(
-            current_user=tracim_context.current_user,
-            session=tracim_context.dbsession,
-            config=tracim_context.app_config,
-            show_temporary=True,
-            namespaces_filter=[ContentNamespaces.CONTENT],
-        )
+        self._content_api = None  # type: typing.Optional[ContentApi]
         self.content = content
         self.session = tracim_context.dbsession
 
     def __repr__(self) -> str:
         return "<DAVCollection: Folder (%s)>" % self.content.label
 
+    @property
+    def content_api(self) -> ContentApi:
+        # INFO - created lazily as resources are instantiated for each listed member
+        if self._content_api is None:
+            self._content_api = ContentApi(
+                current_user=self.tracim_context.current_user,
+                session=self.session,
+                config=self.tracim_context.app_config,
+                show_temporary=True,
+                namespaces_filter=[ContentNamespaces.CONTENT],
+            )
+        return self._content_api
+
     @webdav_check_right(is_reader)
     def getCreationDate(self) -> float:
         return mktime(self.content.created.timetuple())
@@ -841,12 +859,7 @@ def __init__(
         self.content = content
         self.user = tracim_context.current_user
         self.session = tracim_context.dbsession
-        self.content_api = ContentApi(
-            current_user=self.user,
-            config=tracim_context.app_config,
-            session=self.session,
-            namespaces_filter=[self.content.content_namespace],
-        )
+        self._content_api = None  # type: typing.Optional[ContentApi]
 
         # this is the property that windows client except to check if the file is read-write or read-only,
         # but i wasn't able to set this property so you'll have to look into it >.>
@@ -855,8 +868,24 @@ def __init__(
     def __repr__(self) -> str:
         return "<DAVNonCollection: FileResource (%d)>" % self.content.cached_revision_id
 
+    @property
+    def content_api(self) -> ContentApi:
+        # INFO - created lazily as resources are instantiated for each listed member
+        if self._content_api is None:
+            self._content_api = ContentApi(
+                current_user=self.user,
+                config=self.tracim_context.app_config,
+                session=self.session,
+                namespaces_filter=[self.content.content_namespace],
+            )
+        return self._content_api
+
     @webdav_check_right(is_reader)
     def getContentLength(self) -> int:
+        # INFO - use stored size to avoid opening the file, files uploaded before sizes
+        # were stored may not have one
+        if self.content.file_size is not None:
+            return self.content.file_size
         return self.content.depot_file.file.content_length
 
     @webdav_check_right(is_reader)
@@ -886,7 +915,7 @@ def getContent(self) -> typing.BinaryIO:
     def beginWrite(self, contentType: str = None) -> FakeFileStream:
         try:
             self.content_api.check_upload_size(
-                int(self.environ["CONTENT_LENGTH"]), self.content.workspace
+                int(self.environ.get("CONTENT_LENGTH") or 0), self.content.workspace
             )
         except (
             FileSizeOverMaxLimitation,
@@ -1085,7 +1114,7 @@ def __init__(
             path, environ, content, tracim_context=tracim_context
         )
         self.content_revision = self.content.revision
-        self.content_designed = self.design()
+        self._content_designed = None  # type: typing.Optional[str]
 
         # workaround for consistent request as we have to return a resource with a path ending with .html
         # when entering folder for windows, but only once because when we select it again it would have .html.html
@@ -1096,6 +1125,13 @@ def __init__(
     def __repr__(self) -> str:
         return "<DAVNonCollection: OtherFileResource (%s)" % self.content.file_name
 
+    @property
+    def content_designed(self) -> str:
+        # INFO - designed lazily as listing a collection does not always need it
+        if self._content_designed is None:
+            self._content_designed = self.design()
+        return self._content_designed
+
     @webdav_check_right(is_reader)
     def getContentLength(self) -> int:
         return len(self.content_designed)
@@ -1,14 +1,19 @@
 # -*- coding: utf-8 -*-
+from functools import partial
 from sqlalchemy.orm import Session
 import tempfile
 import transaction
+import typing
 from wsgidav import util
 from wsgidav.dav_error import DAVError
 from wsgidav.dav_error import HTTP_FORBIDDEN
+from wsgidav.dav_error import HTTP_REQUEST_ENTITY_TOO_LARGE
 
 from tracim_backend.app_models.contents import content_type_list
+from tracim_backend.exceptions import FileSizeOverMaxLimitation
 from tracim_backend.exceptions import TracimException
 from tracim_backend.lib.core.content import ContentApi
+from tracim_backend.lib.utils.utils import FILE_HASH_CHUNK_SIZE
 from tracim_backend.models.data import ActionDescription
 from tracim_backend.models.data import Content
 from tracim_backend.models.data import Workspace
@@ -62,12 +67,11 @@ def __init__(
         :param content:
         :param parent:
         """
-        # TODO - G.M - 2019-06-13 - use true streaming mechanism,
-        # instead of a true streaming mechanism we use
-        # a temporary file to avoid big file in memory without needing to refactor all
-        # upload mechanism of WebDAV
-        # see https://github.com/tracim/tracim/issues/1911
-        self.temp_file = tempfile.NamedTemporaryFile(suffix="tracim_webdav_upload_")
+        # INFO - request_server gives the request body to writelines() which streams it
+        # to the depot, see https://github.com/tracim/tracim/issues/1911.
+        # The temporary file is only used if content is given through write().
+        self.temp_file = None  # type: typing.Optional[typing.IO[bytes]]
+        self._is_written = False
         self._session = session
         self._file_name = file_name if file_name != "" else self._content.file_name
         self._content = content
@@ -98,29 +102,52 @@ def endWrite(self, withErrors: bool):
         """
         pass
 
-    def write(self, s: str):
+    def writelines(self, lines: typing.Iterable[bytes]) -> None:
+        """
+        Called by request_server, instead of write(), with a generator of the content chunks:
+        we either add a new content or create a new revision, streaming chunks to the depot
+        while they are received.
+        """
+        self._store_file(lines)
+
+    def write(self, s: bytes):
         """
         Called by request_server when writing content to files, we put it inside a filestream
         """
+        if self.temp_file is None:
+            self.temp_file = tempfile.NamedTemporaryFile(suffix="tracim_webdav_upload_")
         self.temp_file.write(s)
 
     def close(self):
         """
-        Called by request_server when the file content has been written. We either add a new content or create
-        a new revision
+        Called by request_server when the file content has been written. We either add a new
+        content or create a new revision if it was not done by writelines()
         """
-
-        self.temp_file.seek(0)
-
-        if self._content is None:
-            self.create_file()
-        else:
-            self.update_file()
+        if not self._is_written:
+            chunks = []  # type: typing.Iterable[bytes]
+            if self.temp_file is not None:
+                self.temp_file.seek(0)
+                chunks = iter(partial(self.temp_file.read, FILE_HASH_CHUNK_SIZE), b"")
+            self._store_file(chunks)
 
         transaction.commit()
-        self.temp_file.close()
+        if self.temp_file is not None:
+            self.temp_file.close()
 
-    def create_file(self):
+    def _store_file(self, chunks: typing.Iterable[bytes]) -> None:
+        self._is_written = True
+        try:
+            if self._content is None:
+                self.create_file(chunks)
+            else:
+                self.update_file(chunks)
+        except DAVError:
+            # INFO - abort to delete the file already stored in depot
+            # and not to commit a partially created content
+            transaction.abort()
+            raise
+
+    def create_file(self, chunks: typing.Iterable[bytes]):
         """
         Called when this is a new file; will create a new Content initialized with the correct content
         """
@@ -136,28 +163,32 @@ def create_file(self):
                     is_temporary=is_temporary,
                     do_save=False,
                 )
-                self._api.update_file_data(
+                self._api.update_file_data_from_chunks(
                     file,
                     self._file_name,
                     util.guessMimeType(self._file_name),
-                    self.temp_file,
+                    chunks,
                 )
+        except FileSizeOverMaxLimitation as exc:
+            raise DAVError(HTTP_REQUEST_ENTITY_TOO_LARGE, contextinfo=str(exc)) from exc
         except TracimException as exc:
             raise DAVError(HTTP_FORBIDDEN) from exc
         self._api.save(file, ActionDescription.CREATION)
 
-    def update_file(self):
+    def update_file(self, chunks: typing.Iterable[bytes]):
         """
         Called when we're updating an existing content; we create a new revision and update the file content
         """
         try:
             with new_revision(session=self._session, content=self._content, tm=transaction.manager):
-                self._api.update_file_data(
+                self._api.update_file_data_from_chunks(
                     self._content,
                     self._file_name,
                     util.guessMimeType(self._content.file_name),
-                    self.temp_file,
+                    chunks,
                 )
+        except FileSizeOverMaxLimitation as exc:
+            raise DAVError(HTTP_REQUEST_ENTITY_TOO_LARGE, contextinfo=str(exc)) from exc
         except TracimException as exc:
             raise DAVError(HTTP_FORBIDDEN) from exc
 
@@ -0,0 +1,37 @@
+"""add file size of revisions and used space of workspaces
+
+Revision ID: 3a9d6f2c8e41
+Revises: 27e6c43ac6e4
+Create Date: 2026-10-18 10:12:31.482051
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "3a9d6f2c8e41"
+down_revision = "27e6c43ac6e4"
+
+
+def upgrade():
+    # INFO - file sizes are stored in the depot, the migration cannot read them:
+    # fill the new columns with "tracimcli db update-used-space".
+    # Until then the used space of workspaces with files is unknown (NULL) and computed
+    # from depot files when read.
+    with op.batch_alter_table("content_revisions") as bop:
+        bop.add_column(sa.Column("file_size", sa.BigInteger(), nullable=True))
+    with op.batch_alter_table("workspaces") as bop:
+        bop.add_column(sa.Column("used_space", sa.BigInteger(), nullable=True))
+    op.execute(
+        "UPDATE workspaces SET used_space = 0 WHERE NOT EXISTS ("
+        "SELECT 1 FROM content_revisions"
+        " WHERE content_revisions.workspace_id = workspaces.workspace_id"
+        " AND content_revisions.depot_file IS NOT NULL)"
+    )
+
+
+def downgrade():
+    with op.batch_alter_table("workspaces") as bop:
+        bop.drop_column("used_space")
+    with op.batch_alter_table("content_revisions") as bop:
+        bop.drop_column("file_size")
@@ -0,0 +1,80 @@
+"""add deleted/archived through parent ids to content
+
+Revision ID: 5e7a0d3b9c62
+Revises: c4f1e9a27b3d
+Create Date: 2026-10-18 15:48:12.095316
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "5e7a0d3b9c62"
+down_revision = "c4f1e9a27b3d"
+
+content_table = sa.Table(
+    "content",
+    sa.MetaData(),
+    sa.Column("id", sa.Integer()),
+    sa.Column("deleted_through_parent_id", sa.Integer()),
+    sa.Column("archived_through_parent_id", sa.Integer()),
+)
+
+# INFO - walk down the content tree from root contents, computing for each content
+# the id of its nearest deleted/archived ancestor.
+HIDDEN_THROUGH_PARENT_IDS_QUERY = """
+WITH RECURSIVE content_tree(content_id, is_deleted, is_archived, deleted_through_parent_id, archived_through_parent_id) AS (
+    SELECT content.id, cr.is_deleted, cr.is_archived, 0, 0
+    FROM content JOIN content_revisions cr ON content.cached_revision_id = cr.revision_id
+    WHERE cr.parent_id IS NULL
+    UNION ALL
+    SELECT content.id, cr.is_deleted, cr.is_archived,
+        CASE WHEN t.is_deleted THEN t.content_id ELSE t.deleted_through_parent_id END,
+        CASE WHEN t.is_archived THEN t.content_id ELSE t.archived_through_parent_id END
+    FROM content JOIN content_revisions cr ON content.cached_revision_id = cr.revision_id
+        JOIN content_tree t ON cr.parent_id = t.content_id
+)
+SELECT content_id, deleted_through_parent_id, archived_through_parent_id
+FROM content_tree
+WHERE deleted_through_parent_id != 0 OR archived_through_parent_id != 0
+"""
+
+
+def upgrade():
+    with op.batch_alter_table("content") as bop:
+        bop.add_column(
+            sa.Column("deleted_through_parent_id", sa.Integer(), nullable=False, server_default="0")
+        )
+        bop.add_column(
+            sa.Column(
+                "archived_through_parent_id", sa.Integer(), nullable=False, server_default="0"
+            )
+        )
+
+    connection = op.get_bind()
+    rows = [
+        {
+            "b_content_id": content_id,
+            "b_deleted_through_parent_id": deleted_through_parent_id,
+            "b_archived_through_parent_id": archived_through_parent_id,
+        }
+        for content_id, deleted_through_parent_id, archived_through_parent_id in connection.execute(
+            sa.text(HIDDEN_THROUGH_PARENT_IDS_QUERY)
+        )
+    ]
+    if rows:
+        connection.execute(
+            content_table.update()
+            .where(content_table.c.id == sa.bindparam("b_content_id"))
+            .values(
+                deleted_through_parent_id=sa.bindparam("b_deleted_through_parent_id"),
+                archived_through_parent_id=sa.bindparam("b_archived_through_parent_id"),
+            ),
+            rows,
+        )
+
+
+def downgrade():
+    with op.batch_alter_table("content") as bop:
+        bop.drop_column("archived_through_parent_id")
+        bop.drop_column("deleted_through_parent_id")
@@ -0,0 +1,113 @@
+"""add user messages counters table
+
+Revision ID: 7b2e94c1d5f8
+Revises: a3d8f61b0e47
+Create Date: 2026-10-18 18:21:07.412985
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "7b2e94c1d5f8"
+down_revision = "a3d8f61b0e47"
+
+messages_table = sa.Table(
+    "messages",
+    sa.MetaData(),
+    sa.Column("receiver_id", sa.Integer()),
+    sa.Column("event_id", sa.Integer()),
+    sa.Column("sent", sa.DateTime()),
+    sa.Column("read", sa.DateTime()),
+)
+
+events_table = sa.Table(
+    "events",
+    sa.MetaData(),
+    sa.Column("event_id", sa.Integer()),
+    sa.Column("entity_type", sa.String()),
+    sa.Column("operation", sa.String()),
+    sa.Column("entity_subtype", sa.String()),
+    sa.Column("workspace_id", sa.Integer()),
+    sa.Column("author_id", sa.Integer()),
+)
+
+
+def upgrade():
+    counters_table = op.create_table(
+        "user_messages_counters",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("workspace_id", sa.Integer(), nullable=False),
+        sa.Column("entity_type", sa.String(length=32), nullable=False),
+        sa.Column("operation", sa.String(length=32), nullable=False),
+        sa.Column("entity_subtype", sa.String(length=100), nullable=False),
+        sa.Column("authored_by_user", sa.Boolean(), nullable=False),
+        sa.Column("messages_count", sa.Integer(), nullable=False),
+        sa.Column("unread_messages_count", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["user_id"],
+            ["users.user_id"],
+            name=op.f("fk_user_messages_counters_user_id_users"),
+            ondelete="CASCADE",
+        ),
+        sa.PrimaryKeyConstraint(
+            "user_id",
+            "workspace_id",
+            "entity_type",
+            "operation",
+            "entity_subtype",
+            "authored_by_user",
+            name=op.f("pk_user_messages_counters"),
+        ),
+    )
+
+    authored_by_user = sa.case(
+        [(events_table.c.author_id == messages_table.c.receiver_id, True)], else_=False
+    )
+    workspace_id = sa.func.coalesce(events_table.c.workspace_id, 0)
+    entity_subtype = sa.func.coalesce(events_table.c.entity_subtype, "")
+    counts_query = (
+        sa.select(
+            [
+                messages_table.c.receiver_id,
+                workspace_id,
+                events_table.c.entity_type,
+                events_table.c.operation,
+                entity_subtype,
+                authored_by_user,
+                sa.func.count(messages_table.c.event_id),
+                sa.func.sum(sa.case([(messages_table.c.read == None, 1)], else_=0)),  # noqa: E711
+            ]
+        )
+        .select_from(
+            messages_table.join(events_table, messages_table.c.event_id == events_table.c.event_id)
+        )
+        .where(messages_table.c.sent != None)  # noqa: E711
+        .group_by(
+            messages_table.c.receiver_id,
+            workspace_id,
+            events_table.c.entity_type,
+            events_table.c.operation,
+            entity_subtype,
+            authored_by_user,
+        )
+    )
+    op.get_bind().execute(
+        counters_table.insert().from_select(
+            [
+                "user_id",
+                "workspace_id",
+                "entity_type",
+                "operation",
+                "entity_subtype",
+                "authored_by_user",
+                "messages_count",
+                "unread_messages_count",
+            ],
+            counts_query,
+        )
+    )
+
+
+def downgrade():
+    op.drop_table("user_messages_counters")
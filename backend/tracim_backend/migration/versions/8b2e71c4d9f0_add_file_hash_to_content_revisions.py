@@ -0,0 +1,31 @@
+"""add file hash to content revisions
+
+Revision ID: 8b2e71c4d9f0
+Revises: 3a9d6f2c8e41
+Create Date: 2026-10-18 11:02:47.215306
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "8b2e71c4d9f0"
+down_revision = "3a9d6f2c8e41"
+
+
+def upgrade():
+    # INFO - existing files are hashed and deduplicated by "tracimcli db deduplicate-files"
+    with op.batch_alter_table("content_revisions") as bop:
+        bop.add_column(sa.Column("file_hash", sa.Unicode(64), nullable=True))
+    op.create_index(
+        "idx__content_revisions__file_hash",
+        "content_revisions",
+        ["file_hash"],
+        unique=False,
+    )
+
+
+def downgrade():
+    op.drop_index("idx__content_revisions__file_hash", table_name="content_revisions")
+    with op.batch_alter_table("content_revisions") as bop:
+        bop.drop_column("file_hash")
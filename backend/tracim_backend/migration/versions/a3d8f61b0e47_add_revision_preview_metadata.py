@@ -0,0 +1,37 @@
+"""add revision preview metadata table
+
+Revision ID: a3d8f61b0e47
+Revises: 5e7a0d3b9c62
+Create Date: 2026-10-18 17:02:41.518203
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "a3d8f61b0e47"
+down_revision = "5e7a0d3b9c62"
+
+
+def upgrade():
+    # INFO - information of existing files is computed by "tracimcli db update-preview-metadata"
+    # or on the fly when missing.
+    op.create_table(
+        "revision_preview_metadata",
+        sa.Column("revision_id", sa.Integer(), nullable=False),
+        sa.Column("page_nb", sa.Integer(), nullable=True),
+        sa.Column("has_pdf_preview", sa.Boolean(), nullable=False),
+        sa.Column("has_jpeg_preview", sa.Boolean(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["revision_id"],
+            ["content_revisions.revision_id"],
+            name=op.f("fk_revision_preview_metadata_revision_id_content_revisions"),
+            onupdate="CASCADE",
+            ondelete="CASCADE",
+        ),
+        sa.PrimaryKeyConstraint("revision_id", name=op.f("pk_revision_preview_metadata")),
+    )
+
+
+def downgrade():
+    op.drop_table("revision_preview_metadata")
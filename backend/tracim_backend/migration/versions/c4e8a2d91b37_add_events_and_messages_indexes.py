@@ -0,0 +1,33 @@
+"""add events and messages indexes
+
+Revision ID: c4e8a2d91b37
+Revises: 7b2e94c1d5f8
+Create Date: 2026-10-18 20:31:42.108734
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "c4e8a2d91b37"
+down_revision = "7b2e94c1d5f8"
+
+
+def upgrade():
+    op.create_index("ix__events__content_id", "events", ["content_id"], unique=False)
+    op.create_index("ix__events__parent_id", "events", ["parent_id"], unique=False)
+    op.create_index("ix__events__created", "events", ["created"], unique=False)
+    op.create_index(
+        "ix__messages__receiver_id__read__event_id",
+        "messages",
+        ["receiver_id", "read", "event_id"],
+        unique=False,
+    )
+    op.create_index("ix__messages__event_id", "messages", ["event_id"], unique=False)
+
+
+def downgrade():
+    op.drop_index("ix__messages__event_id", table_name="messages")
+    op.drop_index("ix__messages__receiver_id__read__event_id", table_name="messages")
+    op.drop_index("ix__events__created", table_name="events")
+    op.drop_index("ix__events__parent_id", table_name="events")
+    op.drop_index("ix__events__content_id", table_name="events")
@@ -0,0 +1,68 @@
+"""add content search index table
+
+Revision ID: c4f1e9a27b3d
+Revises: 8b2e71c4d9f0
+Create Date: 2026-10-18 14:21:05.734190
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "c4f1e9a27b3d"
+down_revision = "8b2e71c4d9f0"
+
+FULLTEXT_INDEX_DDL = {
+    "postgresql": [
+        "CREATE INDEX idx__content_search_index__document ON content_search_index "
+        "USING gin (to_tsvector('simple', document))"
+    ],
+    "mysql": [
+        "CREATE FULLTEXT INDEX idx__content_search_index__document "
+        "ON content_search_index (document)"
+    ],
+    "sqlite": [
+        "CREATE VIRTUAL TABLE IF NOT EXISTS content_search_fts USING fts5("
+        "document, content='content_search_index', content_rowid='content_id')",
+        "CREATE TRIGGER IF NOT EXISTS content_search_index__after_insert "
+        "AFTER INSERT ON content_search_index BEGIN "
+        "INSERT INTO content_search_fts(rowid, document) VALUES (new.content_id, new.document); END",
+        "CREATE TRIGGER IF NOT EXISTS content_search_index__after_delete "
+        "AFTER DELETE ON content_search_index BEGIN "
+        "INSERT INTO content_search_fts(content_search_fts, rowid, document) "
+        "VALUES ('delete', old.content_id, old.document); END",
+        "CREATE TRIGGER IF NOT EXISTS content_search_index__after_update "
+        "AFTER UPDATE ON content_search_index BEGIN "
+        "INSERT INTO content_search_fts(content_search_fts, rowid, document) "
+        "VALUES ('delete', old.content_id, old.document); "
+        "INSERT INTO content_search_fts(rowid, document) VALUES (new.content_id, new.document); END",
+    ],
+}
+
+
+def upgrade():
+    # INFO - existing contents are indexed by "tracimcli search index-populate"
+    # when the "indexed" search engine is enabled.
+    op.create_table(
+        "content_search_index",
+        sa.Column("content_id", sa.Integer(), nullable=False),
+        sa.Column("document", sa.Text(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["content_id"],
+            ["content.id"],
+            name=op.f("fk_content_search_index_content_id_content"),
+            onupdate="CASCADE",
+            ondelete="CASCADE",
+        ),
+        sa.PrimaryKeyConstraint("content_id", name=op.f("pk_content_search_index")),
+    )
+    dialect = op.get_context().dialect
+    for statement in FULLTEXT_INDEX_DDL.get(dialect.name, []):
+        op.execute(statement)
+
+
+def downgrade():
+    dialect = op.get_context().dialect
+    if dialect.name == "sqlite":
+        op.execute("DROP TABLE IF EXISTS content_search_fts")
+    op.drop_table("content_search_index")
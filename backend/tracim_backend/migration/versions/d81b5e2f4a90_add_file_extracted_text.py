@@ -0,0 +1,27 @@
+"""add file extracted text table
+
+Revision ID: d81b5e2f4a90
+Revises: c4e8a2d91b37
+Create Date: 2026-10-18 21:12:05.264817
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "d81b5e2f4a90"
+down_revision = "c4e8a2d91b37"
+
+
+def upgrade():
+    # INFO - texts are extracted from files when contents are (re)indexed.
+    op.create_table(
+        "file_extracted_text",
+        sa.Column("file_hash", sa.Unicode(length=64), nullable=False),
+        sa.Column("file_data", sa.JSON(), nullable=False),
+        sa.PrimaryKeyConstraint("file_hash", name=op.f("pk_file_extracted_text")),
+    )
+
+
+def downgrade():
+    op.drop_table("file_extracted_text")
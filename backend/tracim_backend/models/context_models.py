@@ -846,6 +846,7 @@ def __init__(
         workspace_ids: str = "",
         related_to_content_ids: str = "",
         include_not_sent: int = 0,
+        after_event_id: int = 0,
     ) -> None:
         super().__init__(count=count, page_token=page_token)
         self.read_status = ReadStatus(read_status)
@@ -855,6 +856,7 @@ def __init__(
         self.workspace_ids = string_to_list(workspace_ids, ",", int)
         self.include_not_sent = bool(include_not_sent)
         self.related_to_content_ids = string_to_list(related_to_content_ids, ",", int)
+        self.after_event_id = after_event_id
 
 
 class UserMessagesMarkAsReadQuery(object):
@@ -1134,7 +1136,10 @@ def created(self) -> datetime:
 
     @property
     def used_space(self) -> int:
-        return self.workspace.get_size()
+        from tracim_backend.lib.core.workspace import WorkspaceApi
+
+        wapi = WorkspaceApi(current_user=None, session=self.dbsession, config=self.config)
+        return wapi.get_used_space(self.workspace)
 
     @property
     def allowed_space(self) -> int:
@@ -1391,18 +1396,7 @@ def is_archived(self) -> bool:
 
     @property
     def archived_through_parent_id(self) -> Optional[int]:
-        from tracim_backend.lib.core.content import ContentApi
-
-        content_api = ContentApi(
-            current_user=self._user,
-            session=self.dbsession,
-            config=self.config,
-            show_deleted=True,
-            show_archived=True,
-            show_active=True,
-            show_temporary=True,
-        )
-        return content_api.get_archived_parent_id(self.content)
+        return self.content.archived_through_parent_id
 
     @property
     def is_deleted(self) -> bool:
@@ -1410,18 +1404,7 @@ def is_deleted(self) -> bool:
 
     @property
     def deleted_through_parent_id(self) -> Optional[int]:
-        from tracim_backend.lib.core.content import ContentApi
-
-        content_api = ContentApi(
-            current_user=self._user,
-            session=self.dbsession,
-            config=self.config,
-            show_deleted=True,
-            show_archived=True,
-            show_active=True,
-            show_temporary=True,
-        )
-        return content_api.get_deleted_parent_id(self.content)
+        return self.content.deleted_through_parent_id
 
     @property
     def is_active(self) -> bool:
@@ -29,6 +29,7 @@
 from sqlalchemy.orm.attributes import InstrumentedAttribute
 from sqlalchemy.orm.collections import attribute_mapped_collection
 from sqlalchemy.sql import func
+from sqlalchemy.types import BigInteger
 from sqlalchemy.types import Boolean
 from sqlalchemy.types import DateTime
 from sqlalchemy.types import Integer
@@ -58,6 +59,7 @@
 from tracim_backend.models.mixins import TrashableMixin
 from tracim_backend.models.mixins import UpdateDateMixin
 from tracim_backend.models.roles import WorkspaceRoles
+from tracim_backend.models.types import SharedUploadedFile
 from tracim_backend.models.types import TracimUploadedFileField
 from tracim_backend.models.utils import get_sort_expression
 
@@ -146,6 +148,10 @@ class Workspace(CreationDateMixin, UpdateDateMixin, TrashableMixin, DeclarativeB
 
     owner_id = Column(Integer, ForeignKey("users.user_id"), nullable=False)
     owner = relationship("User", remote_side=[User.user_id])
+    # INFO - size in bytes of the workspace as computed by get_size(), kept up to date by
+    # WorkspaceUsedSpaceHooks to avoid reading every revision file when checking quotas.
+    # NULL when unknown, it is then computed when read by WorkspaceApi.get_used_space().
+    used_space = Column(BigInteger, nullable=True, default=0)
 
     @property
     def recursive_children(self) -> List["Workspace"]:
@@ -215,13 +221,33 @@ def contents(self) -> List["Content"]:
         return contents
 
     def get_size(self, include_deleted: bool = False, include_archived: bool = False) -> int:
-        size = 0
-        for revision in self.revisions:
-            # INFO - G.M - 2019-09-02 - Don't count deleted and archived file.
-            if not include_deleted and revision.node.is_deleted:
-                continue
-            if not include_archived and revision.node.is_archived:
-                continue
+        """
+        Compute the size of all file revisions of the workspace.
+        Prefer used_space which stores this value for not deleted/archived contents.
+        """
+        session = object_session(self)
+        if not session or self.workspace_id is None:
+            return 0
+        current_revision = aliased(ContentRevisionRO)
+        query = (
+            session.query(ContentRevisionRO)
+            .join(Content, Content.id == ContentRevisionRO.content_id)
+            .join(current_revision, current_revision.revision_id == Content.cached_revision_id)
+            .filter(ContentRevisionRO.workspace_id == self.workspace_id)
+        )
+        # INFO - G.M - 2019-09-02 - Don't count deleted and archived file.
+        if not include_deleted:
+            query = query.filter(current_revision.is_deleted == False)  # noqa: E712
+        if not include_archived:
+            query = query.filter(current_revision.is_archived == False)  # noqa: E712
+        size = query.with_entities(func.coalesce(func.sum(ContentRevisionRO.file_size), 0)).scalar()
+        # NOTE - revisions created before file_size existed and not yet filled with
+        # "tracimcli db update-used-space" still need to read the file size in depot.
+        unknown_size_revisions = query.filter(
+            ContentRevisionRO.file_size == None,  # noqa: E711
+            ContentRevisionRO.depot_file != None,  # noqa: E711
+        )
+        for revision in unknown_size_revisions:
             if revision.depot_file:
                 try:
                     size += revision.depot_file.file.content_length
@@ -230,7 +256,7 @@ def get_size(self, include_deleted: bool = False, include_archived: bool = False
                         self,
                         "Cannot get depot_file {}".format(revision.depot_file.file_id),
                     )
-        return size
+        return int(size)
 
     def get_user_role(self, user: User) -> int:
         for role in user.roles:
@@ -517,6 +543,11 @@ class ContentRevisionRO(CreationDateMixin, UpdateDateMixin, TrashableMixin, Decl
     # http://depot.readthedocs.io/en/latest/#attaching-files-to-models
     # http://depot.readthedocs.io/en/latest/api.html#module-depot.fields
     depot_file = Column(TracimUploadedFileField, unique=False, nullable=True)
+    # INFO - size in bytes of depot_file, stored to avoid opening the file to get it.
+    file_size = Column(BigInteger, unique=False, nullable=True)
+    # INFO - SHA-256 of depot_file content: revisions with the same hash share the same
+    # stored file, which is deleted only when the last of them is deleted.
+    file_hash = Column(Unicode(64), unique=False, nullable=True)
     properties = Column("properties", JSON, unique=False, nullable=False, default={})
 
     # INFO - G.M - same type are used for FavoriteContent.
@@ -560,7 +591,9 @@ class ContentRevisionRO(CreationDateMixin, UpdateDateMixin, TrashableMixin, Decl
         "created",
         "description",
         "file_extension",
+        "file_hash",
         "file_mimetype",
+        "file_size",
         "is_archived",
         "is_deleted",
         "is_template",
@@ -624,7 +657,9 @@ def new_from(cls, revision: "ContentRevisionRO") -> "ContentRevisionRO":
             setattr(new_rev, column_name, column_value)
 
         new_rev.updated = datetime.utcnow()
-        if revision.depot_file:
+        if revision.depot_file and revision.file_hash:
+            new_rev.depot_file = SharedUploadedFile(revision.depot_file)
+        elif revision.depot_file:
             try:
                 new_rev.depot_file = FileIntent(
                     revision.depot_file.file, revision.file_name, revision.file_mimetype
@@ -666,7 +701,9 @@ def copy(
             setattr(copy_rev, column_name, column_value)
 
         # copy attached_file
-        if revision.depot_file:
+        if revision.depot_file and revision.file_hash:
+            copy_rev.depot_file = SharedUploadedFile(revision.depot_file)
+        elif revision.depot_file:
             try:
                 copy_rev.depot_file = FileIntent(
                     revision.depot_file.file, revision.file_name, revision.file_mimetype
@@ -761,6 +798,7 @@ def has_new_information_for(self, user: User) -> bool:
 # on foreign key.
 Index("idx__content_revisions__content_id", ContentRevisionRO.content_id)
 Index("idx__content_revisions__workspace_id", ContentRevisionRO.workspace_id)
+Index("idx__content_revisions__file_hash", ContentRevisionRO.file_hash)
 
 
 class Content(DeclarativeBase):
@@ -803,6 +841,11 @@ class Content(DeclarativeBase):
     cached_revision_id = Column(
         Integer, ForeignKey("content_revisions.revision_id", ondelete="RESTRICT")
     )
+    # INFO - id of the nearest deleted/archived ancestor of the content, 0 if none.
+    # Kept up to date by ContentHiddenAncestorsHooks, allow to filter contents hidden
+    # through one of their parents without walking the content tree.
+    deleted_through_parent_id = Column(Integer, nullable=False, default=0, server_default="0")
+    archived_through_parent_id = Column(Integer, nullable=False, default=0, server_default="0")
 
     current_revision = relationship(
         "ContentRevisionRO",
@@ -857,7 +900,9 @@ def revision_id(cls) -> InstrumentedAttribute:
 
     @property
     def revision(self) -> ContentRevisionRO:
-        if not self.revisions:
+        # INFO - current revision is usually loaded with the content, avoid loading all
+        # revisions of the content just to check it has some
+        if self.current_revision is None and not self.revisions:
             self.current_revision = ContentRevisionRO()
             self.current_revision.node = self
         return self.current_revision
@@ -1207,10 +1252,9 @@ def children(self) -> List["Content"]:
         )
 
     @property
-    def recursive_children(self) -> List["Content"]:
-        """typing.Listtyping.List
-        :return: list of children Content
-        :rtype Content
+    def recursive_children_ids(self) -> List[int]:
+        """
+        :return: ids of children Content, at any depth
         """
         # TODO - G.M - 2020-10-06 - Use SQLAlchemy SQL Expression Language instead of raw sql here,
         # see https://github.com/tracim/tracim/issues/3670
@@ -1228,9 +1272,17 @@ def recursive_children(self) -> List["Content"]:
         join children_id c on c.id = content.id;
             """
         )
-        children_ids = [
+        return [
             elem[0] for elem in object_session(self).execute(statement, {"content_id": self.id})
         ]
+
+    @property
+    def recursive_children(self) -> List["Content"]:
+        """typing.Listtyping.List
+        :return: list of children Content
+        :rtype Content
+        """
+        children_ids = self.recursive_children_ids
         if children_ids:
             return (
                 object_session(self)
@@ -1301,6 +1353,22 @@ def depot_file(self) -> UploadedFile:
     @depot_file.setter
     def depot_file(self, value):
         self.revision.depot_file = value
+        # INFO - depot_file is stored when set, its size is available now
+        self.revision.file_size = (
+            self.revision.depot_file.file.content_length if self.revision.depot_file else None
+        )
+
+    @property
+    def file_size(self) -> typing.Optional[int]:
+        return self.revision.file_size
+
+    @property
+    def file_hash(self) -> typing.Optional[str]:
+        return self.revision.file_hash
+
+    @file_hash.setter
+    def file_hash(self, value: typing.Optional[str]) -> None:
+        self.revision.file_hash = value
 
     def new_revision(self) -> ContentRevisionRO:
         """
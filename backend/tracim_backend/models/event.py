@@ -10,6 +10,7 @@
 from sqlalchemy import Sequence
 from sqlalchemy.ext.indexable import index_property
 from sqlalchemy.orm import relationship
+from sqlalchemy.types import Boolean
 from sqlalchemy.types import DateTime
 from sqlalchemy.types import Enum
 from sqlalchemy.types import Integer
@@ -184,6 +185,9 @@ def __repr__(self):
 
 
 Index("ix__events__event_id__workspace_id", Event.event_id, Event.workspace_id)
+Index("ix__events__content_id", Event.content_id)
+Index("ix__events__parent_id", Event.parent_id)
+Index("ix__events__created", Event.created)
 
 
 class Message(DeclarativeBase):
@@ -212,3 +216,56 @@ def event_type(self) -> str:
     @property
     def created(self) -> datetime:
         return self.event.created
+
+
+# INFO - messages of a user are always listed by descending event_id, mostly unread ones:
+# this index serves both without sorting (read IS NULL is an equality for b-tree indexes).
+Index(
+    "ix__messages__receiver_id__read__event_id", Message.receiver_id, Message.read, Message.event_id
+)
+# INFO - the primary key can't be used to find messages of an event (joins, cascading deletes)
+Index("ix__messages__event_id", Message.event_id)
+
+
+class UserMessagesCounter(DeclarativeBase):
+    """
+    Count of sent messages of a user and of unread ones, by space and type of event.
+
+    Kept up to date when messages are created, read or deleted, it allows counting
+    messages of a user without scanning their messages.
+    """
+
+    __tablename__ = "user_messages_counters"
+
+    NO_WORKSPACE_ID = 0
+    NO_ENTITY_SUBTYPE = ""
+
+    user_id = Column(Integer, ForeignKey("users.user_id", ondelete="CASCADE"), primary_key=True)
+    # INFO - workspace_id and entity_subtype are part of the primary key, events without
+    # workspace/subtype use NO_WORKSPACE_ID/NO_ENTITY_SUBTYPE instead of NULL
+    workspace_id = Column(Integer, primary_key=True, default=NO_WORKSPACE_ID)
+    # INFO - not native enums, to not require altering this table when event types are added
+    entity_type = Column(
+        Enum(EntityType, native_enum=False, create_constraint=False, length=32),
+        primary_key=True,
+    )
+    operation = Column(
+        Enum(OperationType, native_enum=False, create_constraint=False, length=32),
+        primary_key=True,
+    )
+    entity_subtype = Column(
+        String(length=Event._ENTITY_SUBTYPE_LENGTH), primary_key=True, default=NO_ENTITY_SUBTYPE
+    )
+    # INFO - whether the user is the author of the events, as user's own events are usually
+    # excluded from counts
+    authored_by_user = Column(Boolean, primary_key=True, default=False)
+    messages_count = Column(Integer, nullable=False, default=0)
+    unread_messages_count = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return "<UserMessagesCounter(user_id=%s, workspace_id=%s, type=%s.%s)>" % (
+            repr(self.user_id),
+            repr(self.workspace_id),
+            repr(self.entity_type),
+            repr(self.operation),
+        )
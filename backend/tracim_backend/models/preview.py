@@ -0,0 +1,30 @@
+from sqlalchemy import Boolean
+from sqlalchemy import Column
+from sqlalchemy import ForeignKey
+from sqlalchemy.types import Integer
+
+from tracim_backend.models.meta import DeclarativeBase
+
+
+class RevisionPreviewMetadata(DeclarativeBase):
+    """
+    Preview information of the file of a revision, as given by preview-generator.
+
+    Computed once after upload, it avoids getting the file from the depot
+    each time a content is serialized.
+    """
+
+    __tablename__ = "revision_preview_metadata"
+
+    revision_id = Column(
+        Integer,
+        ForeignKey("content_revisions.revision_id", onupdate="CASCADE", ondelete="CASCADE"),
+        nullable=False,
+        primary_key=True,
+    )
+    page_nb = Column(Integer, nullable=True)
+    has_pdf_preview = Column(Boolean, nullable=False, default=False)
+    has_jpeg_preview = Column(Boolean, nullable=False, default=False)
+
+    def __repr__(self):
+        return "<RevisionPreviewMetadata(revision_id=%s)>" % repr(self.revision_id)
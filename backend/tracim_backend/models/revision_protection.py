@@ -2,6 +2,7 @@
 from contextlib import contextmanager
 from sqlalchemy import inspect
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import get_history
 from sqlalchemy.orm.unitofwork import UOWTransaction
 from transaction import TransactionManager
 
@@ -28,6 +29,40 @@ def prevent_content_revision_delete(
                 )
 
 
+RELEASED_FILE_HASHES_KEY = "released_file_hashes"
+
+
+def collect_released_revision_files(session: TracimSession, flush_context: UOWTransaction) -> None:
+    """
+    Remember hashes of files no longer used by flushed revisions (deleted revisions or
+    replaced files), see keep_shared_revision_files.
+    """
+    for instance in session.deleted.union(session.dirty):
+        if not isinstance(instance, ContentRevisionRO) or not instance.file_hash:
+            continue
+        if instance in session.deleted or get_history(instance, "depot_file").deleted:
+            session.info.setdefault(RELEASED_FILE_HASHES_KEY, set()).add(instance.file_hash)
+
+
+def keep_shared_revision_files(session: TracimSession, flush_context: UOWTransaction) -> None:
+    """
+    Revisions with the same file_hash share the same stored file, filedepot deletes at commit
+    every file of deleted revisions: keep the ones still referenced by another revision.
+    """
+    file_hashes = session.info.pop(RELEASED_FILE_HASHES_KEY, None)
+    # NOTE - _depot_old is the set of files filedepot deletes once the session is committed,
+    # filled when revisions are flushed.
+    files_to_delete = getattr(session, "_depot_old", None)
+    if not file_hashes or not files_to_delete:
+        return
+    still_used_files = session.query(ContentRevisionRO.depot_file).filter(
+        ContentRevisionRO.file_hash.in_(file_hashes)
+    )
+    for (depot_file,) in still_used_files:
+        if depot_file:
+            files_to_delete.difference_update(depot_file.files)
+
+
 class RevisionsIntegrity(object):
     """
     Simple static used class to manage a list with list of ContentRevisionRO
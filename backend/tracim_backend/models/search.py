@@ -0,0 +1,100 @@
+from sqlalchemy import Column
+from sqlalchemy import DDL
+from sqlalchemy import ForeignKey
+from sqlalchemy import event
+from sqlalchemy.types import Integer
+from sqlalchemy.types import JSON
+from sqlalchemy.types import Text
+from sqlalchemy.types import Unicode
+
+from tracim_backend.models.meta import DeclarativeBase
+
+CONTENT_SEARCH_FTS_TABLE = "content_search_fts"
+# INFO - "simple" text search configuration does not depend on a language: no stemming,
+# no stop words, as the contents of a space can be written in any language.
+POSTGRESQL_TEXT_SEARCH_CONFIG = "simple"
+
+# INFO - full-text indexes can't be described with SQLAlchemy, they are created by
+# dialect specific statements, after the table, by metadata.create_all() and by migrations.
+FULLTEXT_INDEX_DDL = {
+    "postgresql": [
+        "CREATE INDEX idx__content_search_index__document ON content_search_index "
+        "USING gin (to_tsvector('{}', document))".format(POSTGRESQL_TEXT_SEARCH_CONFIG)
+    ],
+    "mysql": [
+        "CREATE FULLTEXT INDEX idx__content_search_index__document "
+        "ON content_search_index (document)"
+    ],
+    "sqlite": [
+        # INFO - external content FTS5 table: documents are only stored in content_search_index,
+        # triggers keep the FTS5 index in sync with it.
+        "CREATE VIRTUAL TABLE IF NOT EXISTS content_search_fts USING fts5("
+        "document, content='content_search_index', content_rowid='content_id')",
+        "CREATE TRIGGER IF NOT EXISTS content_search_index__after_insert "
+        "AFTER INSERT ON content_search_index BEGIN "
+        "INSERT INTO content_search_fts(rowid, document) VALUES (new.content_id, new.document); END",
+        "CREATE TRIGGER IF NOT EXISTS content_search_index__after_delete "
+        "AFTER DELETE ON content_search_index BEGIN "
+        "INSERT INTO content_search_fts(content_search_fts, rowid, document) "
+        "VALUES ('delete', old.content_id, old.document); END",
+        "CREATE TRIGGER IF NOT EXISTS content_search_index__after_update "
+        "AFTER UPDATE ON content_search_index BEGIN "
+        "INSERT INTO content_search_fts(content_search_fts, rowid, document) "
+        "VALUES ('delete', old.content_id, old.document); "
+        "INSERT INTO content_search_fts(rowid, document) VALUES (new.content_id, new.document); END",
+    ],
+}
+SQLITE_DROP_FTS_TABLE_DDL = "DROP TABLE IF EXISTS content_search_fts"
+
+
+class ContentSearchIndex(DeclarativeBase):
+    """
+    Searchable text of a content, used by the "indexed" search engine.
+
+    The document gathers the label, filename, description, text and tags of a content
+    and the text of its comments and todos.
+    """
+
+    __tablename__ = "content_search_index"
+
+    content_id = Column(
+        Integer,
+        ForeignKey("content.id", onupdate="CASCADE", ondelete="CASCADE"),
+        nullable=False,
+        primary_key=True,
+    )
+    document = Column(Text, nullable=False, default="")
+
+    def __repr__(self):
+        return "<ContentSearchIndex(content_id=%s)>" % repr(self.content_id)
+
+
+class FileExtractedText(DeclarativeBase):
+    """
+    Text and metadata extracted from a file by the Elasticsearch ingest pipeline.
+
+    Stored once per file content (see ContentRevisionRO.file_hash), it is indexed with
+    the contents using this file instead of sending the file to the pipeline again.
+    """
+
+    __tablename__ = "file_extracted_text"
+
+    file_hash = Column(Unicode(64), nullable=False, primary_key=True)
+    file_data = Column(JSON, nullable=False)
+
+    def __repr__(self):
+        return "<FileExtractedText(file_hash=%s)>" % repr(self.file_hash)
+
+
+for dialect_name, statements in FULLTEXT_INDEX_DDL.items():
+    for statement in statements:
+        event.listen(
+            ContentSearchIndex.__table__,
+            "after_create",
+            DDL(statement).execute_if(dialect=dialect_name),
+        )
+event.listen(
+    ContentSearchIndex.__table__,
+    "before_drop",
+    DDL(SQLITE_DROP_FTS_TABLE_DDL).execute_if(dialect="sqlite"),
+)
@@ -20,7 +20,9 @@
 from tracim_backend.models.data import ContentRevisionRO  # noqa: F401
 from tracim_backend.models.favorites import FavoriteContent  # noqa: F401
 from tracim_backend.models.meta import DeclarativeBase  # noqa: F401
+from tracim_backend.models.preview import RevisionPreviewMetadata  # noqa: F401
 from tracim_backend.models.reaction import Reaction  # noqa: F401
+from tracim_backend.models.search import ContentSearchIndex  # noqa: F401
 from tracim_backend.models.tracim_session import TracimSession
 
 if typing.TYPE_CHECKING:
@@ -93,9 +95,14 @@ def get_tm_session(session_factory, transaction_manager) -> Session:
     # troubles somewhere else.
     # see https://stackoverflow.com/questions/16152241/how-to-get-a-sqlalchemy-session-managed-by-zope-transaction-that-has-the-same-sc
     zope.sqlalchemy.register(dbsession, transaction_manager=transaction_manager, keep_session=True)
+    from tracim_backend.models.revision_protection import collect_released_revision_files
+    from tracim_backend.models.revision_protection import keep_shared_revision_files
     from tracim_backend.models.revision_protection import prevent_content_revision_delete
 
     listen(dbsession, "before_flush", prevent_content_revision_delete)
+    # INFO - files deleted by filedepot are known only once the flush is finalized
+    listen(dbsession, "after_flush", collect_released_revision_files)
+    listen(dbsession, "after_flush_postexec", keep_shared_revision_files)
     return dbsession
 
 
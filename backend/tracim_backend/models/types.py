@@ -1,5 +1,7 @@
 from depot.fields.sqlalchemy import UploadedFileField
+from depot.fields.upload import UploadedFile
 from sqlalchemy import types
+import typing
 
 
 class TracimUploadedFileField(UploadedFileField):
@@ -11,3 +13,16 @@ class TracimUploadedFileField(UploadedFileField):
 
     def load_dialect_impl(self, dialect):
         return dialect.type_descriptor(types.TEXT)
+
+
+class SharedUploadedFile(UploadedFile):
+    """
+    Reference to a file already stored in depot for another revision with the same content.
+
+    filedepot deletes files listed in "files" when the transaction adding them is rolled back,
+    this reference does not own the stored file so it does not list any.
+    """
+
+    @property
+    def files(self) -> typing.List[str]:
+        return []
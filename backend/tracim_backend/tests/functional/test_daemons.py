@@ -1,7 +1,11 @@
 import pytest
+import transaction
 
 from tracim_backend.lib.mail_fetcher.daemon import MailFetcherDaemon
 from tracim_backend.lib.mail_notifier.daemon import MailSenderDaemon
+from tracim_backend.lib.rq import RqQueueName
+from tracim_backend.lib.rq import get_rq_queue2
+from tracim_backend.lib.rq.worker import DatabaseWorker
 from tracim_backend.models.data import EmailNotificationType
 from tracim_backend.tests.fixtures import *  # noqa: F403,F40
 
@@ -83,6 +87,11 @@ def test_func__create_new_content_with_notification__ok__nominal_case(
             do_save=True,
             do_notify=True,
         )
+        transaction.commit()
+        # Render mails async from redis queue
+        render_queue = get_rq_queue2(app_config, RqQueueName.MAIL_RENDER)
+        render_worker = DatabaseWorker([render_queue], connection=render_queue.connection)
+        render_worker.work(burst=True, app_config=app_config)
         # Send mail async from redis queue with daemon
         daemon = MailSenderDaemon(app_config, burst=True)
         daemon.run()
@@ -1,4 +1,5 @@
 import contextlib
+from datetime import datetime
 import json
 import os
 import pytest
@@ -14,6 +15,10 @@
 from tracim_backend.lib.core.live_messages import LiveMessagesLib
 from tracim_backend.models.auth import User
 from tracim_backend.models.data import Content
+from tracim_backend.models.event import EntityType
+from tracim_backend.models.event import Event
+from tracim_backend.models.event import Message
+from tracim_backend.models.event import OperationType
 from tracim_backend.models.revision_protection import new_revision
 from tracim_backend.tests.fixtures import *  # noqa: F403,F40
 
@@ -198,6 +203,57 @@ def test_api__user_live_messages_endpoint_without_GRIP_proxy__err_400__no_accept
         assert "code" in res.json_body
         assert res.json_body["code"] == ErrorCode.GENERIC_SCHEMA_VALIDATION_ERROR
 
+    @pytest.mark.parametrize(
+        "config_section", [{"name": "functional_live_replay_test"}], indirect=True
+    )
+    def test_api__user_live_messages_endpoint_without_GRIP_proxy__ok_200__replay_resync(
+        self, web_testapp, admin_user, session
+    ):
+        events = [
+            Event(
+                entity_type=EntityType.USER,
+                operation=OperationType.MODIFIED,
+                fields={"author": None, "user": {"user_id": admin_user.user_id}},
+            )
+            for _ in range(4)
+        ]
+        session.add_all(events)
+        session.flush()
+        session.add_all(
+            [
+                Message(
+                    receiver_id=admin_user.user_id,
+                    event_id=event.event_id,
+                    sent=datetime.utcnow(),
+                )
+                for event in events
+            ]
+        )
+        event_ids = [event.event_id for event in events]
+        transaction.commit()
+
+        web_testapp.authorization = (
+            "Basic",
+            ("admin@admin.admin", "admin@admin.admin"),
+        )
+        res = web_testapp.get(
+            "/api/users/{}/live_messages?after_event_id={}".format(
+                admin_user.user_id, event_ids[0]
+            ),
+            status=200,
+            headers={"Accept": "text/event-stream"},
+        )
+        assert res.headers["Content-Length"] == str(len(res.body))
+        server_side_events = res.text.split("\n\n")
+        assert "event: stream-open" in server_side_events[0]
+        data_prefix_length = len("data:")
+        assert [
+            json.loads(server_side_event[data_prefix_length:])["event_id"]
+            for server_side_event in server_side_events[1:3]
+        ] == event_ids[1:3]
+        assert "event: resync" in server_side_events[3]
+        assert 'data: {"after_event_id": ' + str(event_ids[2]) in server_side_events[3]
+
     @pytest.mark.pushpin
     def test_api__user_live_messages_endpoint_with_GRIP_proxy__ok__nominal_case(
         self, pushpin, app_config
@@ -15,6 +15,7 @@
 from tracim_backend.lib.rq import RqQueueName
 from tracim_backend.lib.rq import get_redis_connection
 from tracim_backend.lib.rq import get_rq_queue
+from tracim_backend.lib.rq.worker import DatabaseWorker
 from tracim_backend.models.data import EmailNotificationType
 from tracim_backend.tests.fixtures import *  # noqa: F403,F40
 
@@ -378,8 +379,13 @@ def test_func__create_new_content_with_notification__ok__nominal_case(
             do_save=True,
             do_notify=True,
         )
-        # Send mail async from redis queue
+        transaction.commit()
+        # Render mails async from redis queue
         redis = get_redis_connection(app_config)
+        render_queue = get_rq_queue(redis, RqQueueName.MAIL_RENDER)
+        render_worker = DatabaseWorker([render_queue], connection=render_queue.connection)
+        render_worker.work(burst=True, app_config=app_config)
+        # Send mail async from redis queue
         queue = get_rq_queue(redis, RqQueueName.MAIL_SENDER)
         worker = SimpleWorker([queue], connection=queue.connection)
         worker.work(burst=True)
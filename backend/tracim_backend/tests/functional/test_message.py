@@ -302,6 +302,21 @@ def test_api__get_messages__ok_200__include_not_sent__no_sent_date_set(
                 "read": message.read.strftime(DATETIME_FORMAT) if message.read else None,
             } == message_dict
 
+    def test_api__get_messages__ok_200__after_event_id_filter(self, session, web_testapp) -> None:
+        messages = create_user_messages(session, sent_date=datetime.datetime.utcnow())
+        after_event_id = messages[-1].event_id
+        web_testapp.authorization = (
+            "Basic",
+            ("admin@admin.admin", "admin@admin.admin"),
+        )
+        result = web_testapp.get(
+            "/api/users/1/messages?after_event_id={}".format(after_event_id),
+            status=200,
+        ).json_body
+        event_ids = [message["event_id"] for message in result["items"]]
+        assert event_ids == [m.event_id for m in messages if m.event_id > after_event_id]
+        assert event_ids
+
     def test_api__get_messages__ok_200__exclude_author_ids_filter(
         self, session, web_testapp
     ) -> None:
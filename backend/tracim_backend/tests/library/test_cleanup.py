@@ -544,6 +544,53 @@ def test_unit__delete_revision__ok__delete_older_revision(
                 .one()
             )
 
+    def test_unit__delete_revision__ok__keep_shared_file(
+        self,
+        admin_user,
+        session,
+        app_config,
+        content_type_list,
+        content_api_factory,
+        workspace_api_factory,
+    ) -> None:
+        content_api = content_api_factory.get(
+            show_deleted=True, show_active=True, show_archived=True
+        )
+        workspace_api = workspace_api_factory.get()
+        test_workspace = workspace_api.create_workspace("test_workspace")
+        session.add(test_workspace)
+        file_ = content_api.create(
+            content_type_slug=content_type_list.File.slug,
+            workspace=test_workspace,
+            label="Test file",
+            do_save=True,
+            do_notify=False,
+        )
+        with new_revision(session=session, tm=transaction.manager, content=file_):
+            content_api.update_file_data(
+                file_,
+                "Test_file.txt",
+                new_mimetype="plain/text",
+                new_content=b"Test file",
+            )
+        with new_revision(session=session, tm=transaction.manager, content=file_):
+            content_api.update_content(file_, new_label="Renamed file")
+        file_id = file_.content_id
+        session.flush()
+        transaction.commit()
+        content = content_api.get_one(file_id, content_type=ContentTypeSlug.ANY)
+        file_revision, renamed_revision = content.revisions[1:]
+        assert file_revision.file_hash == renamed_revision.file_hash
+        assert file_revision.depot_file.file_id == renamed_revision.depot_file.file_id
+
+        with unprotected_content_revision(session) as unprotected_session:
+            cleanup_lib = CleanupLib(app_config=app_config, session=unprotected_session)
+            cleanup_lib.delete_revision(revision=file_revision)
+            session.flush()
+        transaction.commit()
+        content = content_api.get_one(file_id, content_type=ContentTypeSlug.ANY)
+        assert content.depot_file.file.read() == b"Test file"
+
     def test_safe_update__ok__nominal_case(self, session, app_config, admin_user) -> None:
         assert session.query(Workspace).all() == []
         cleanup_lib = CleanupLib(app_config=app_config, session=session, dry_run_mode=False)
@@ -1,4 +1,5 @@
 # -*- coding: utf-8 -*-
+from preview_generator.manager import PreviewManager
 import pytest
 import transaction
 import typing
@@ -2049,7 +2050,8 @@ def test_mark_read__workspace(
             eq_(user_b not in rev.read_by.keys(), True)
 
         # Set as read the workspace n°1
-        cont_api_b.mark_read__workspace(workspace=workspace1)
+        marked_content_ids = cont_api_b.mark_read__workspace(workspace=workspace1)
+        eq_(sorted(marked_content_ids), sorted([page_1.content_id, page_2.content_id]))
 
         for rev in page_1.revisions:
             eq_(user_b in rev.read_by.keys(), True)
@@ -2071,6 +2073,7 @@ def test_mark_read__workspace(
             eq_(user_b in rev.read_by.keys(), True)
         for rev in page_4.revisions:
             eq_(user_b in rev.read_by.keys(), True)
+        eq_(cont_api_b.mark_read__workspace(workspace=workspace2), [])
 
     def test_mark_read(
         self,
@@ -3587,6 +3590,148 @@ def test_unit__get_all_query__with_user(
         assert len(list(api.get_all_query(user=user))) == 1
         assert len(list(api.get_all_query(user=admin_user))) == 0
 
+    def test_unit__hidden_through_parent_ids__ok__updated_on_delete_archive_and_move(
+        self,
+        user_api_factory,
+        workspace_api_factory,
+        session,
+        app_config,
+        content_type_list,
+    ) -> None:
+        uapi = user_api_factory.get()
+        user = uapi.create_minimal_user(email="this.is@user", profile=Profile.ADMIN, save_now=True)
+        workspace = workspace_api_factory.get(current_user=user).create_workspace(
+            "test workspace", save_now=True
+        )
+        api = ContentApi(current_user=user, session=session, config=app_config)
+        folder_a = api.create(
+            content_type_slug=content_type_list.Folder.slug,
+            workspace=workspace,
+            label="folder a",
+            do_save=True,
+        )
+        folder_b = api.create(
+            content_type_slug=content_type_list.Folder.slug,
+            workspace=workspace,
+            parent=folder_a,
+            label="folder b",
+            do_save=True,
+        )
+        folder_c = api.create(
+            content_type_slug=content_type_list.Folder.slug,
+            workspace=workspace,
+            label="folder c",
+            do_save=True,
+        )
+        page = api.create(
+            content_type_slug=content_type_list.Page.slug,
+            workspace=workspace,
+            parent=folder_b,
+            label="page",
+            do_save=True,
+        )
+        assert (page.deleted_through_parent_id, page.archived_through_parent_id) == (0, 0)
+
+        with new_revision(session=session, tm=transaction.manager, content=folder_a):
+            api.delete(folder_a)
+        with new_revision(session=session, tm=transaction.manager, content=folder_b):
+            api.archive(folder_b)
+        transaction.commit()
+        assert folder_b.deleted_through_parent_id == folder_a.content_id
+        assert page.deleted_through_parent_id == folder_a.content_id
+        assert page.archived_through_parent_id == folder_b.content_id
+        assert api.get_content_in_context(page).deleted_through_parent_id == folder_a.content_id
+        assert not api.exclude_hidden_through_parent(
+            api.get_base_query(None).filter(Content.content_id == page.content_id)
+        ).all()
+
+        with new_revision(session=session, tm=transaction.manager, content=folder_b):
+            api.move(folder_b, new_parent=folder_c)
+        transaction.commit()
+        page = api.get_one(page.content_id, content_type=ContentTypeSlug.ANY.value)
+        assert folder_b.deleted_through_parent_id == 0
+        assert page.deleted_through_parent_id == 0
+        assert page.archived_through_parent_id == folder_b.content_id
+
+    def test_unit__preview_metadata__ok__stored_after_upload_and_reused_for_same_file(
+        self,
+        user_api_factory,
+        workspace_api_factory,
+        session,
+        app_config,
+        content_type_list,
+    ) -> None:
+        uapi = user_api_factory.get()
+        user = uapi.create_minimal_user(email="this.is@user", profile=Profile.ADMIN, save_now=True)
+        workspace = workspace_api_factory.get(current_user=user).create_workspace(
+            "test workspace", save_now=True
+        )
+        api = ContentApi(current_user=user, session=session, config=app_config)
+        with session.no_autoflush:
+            text_file = api.create(
+                content_type_slug=content_type_list.File.slug,
+                workspace=workspace,
+                label="test_file",
+                do_save=False,
+            )
+            api.update_file_data(text_file, "test_file.txt", "text/plain", b"test_content")
+        api.save(text_file, ActionDescription.CREATION)
+        session.flush()
+        # INFO - the file is only read when the transaction is committed
+        assert api.get_stored_preview_metadata(text_file.revision_id) is None
+        transaction.commit()
+        first_revision_id = text_file.revision_id
+        preview_metadata = api.get_stored_preview_metadata(first_revision_id)
+        assert preview_metadata
+        assert api.get_preview_page_nb(first_revision_id, ".txt") == preview_metadata.page_nb
+        assert api.has_pdf_preview(first_revision_id, ".txt") == preview_metadata.has_pdf_preview
+
+        with new_revision(session=session, tm=transaction.manager, content=text_file):
+            api.update_file_data(text_file, "test_file.txt", "text/plain", b"test_content")
+        transaction.commit()
+        assert text_file.revision_id != first_revision_id
+        same_file_preview_metadata = api.get_stored_preview_metadata(text_file.revision_id)
+        assert same_file_preview_metadata.page_nb == preview_metadata.page_nb
+        assert same_file_preview_metadata.has_jpeg_preview == preview_metadata.has_jpeg_preview
+
+    def test_unit__preview_metadata__ok__not_stored_on_preview_generator_error(
+        self,
+        user_api_factory,
+        workspace_api_factory,
+        session,
+        app_config,
+        content_type_list,
+        monkeypatch,
+    ) -> None:
+        uapi = user_api_factory.get()
+        user = uapi.create_minimal_user(email="this.is@user", profile=Profile.ADMIN, save_now=True)
+        workspace = workspace_api_factory.get(current_user=user).create_workspace(
+            "test workspace", save_now=True
+        )
+        api = ContentApi(current_user=user, session=session, config=app_config)
+
+        def failing_get_page_nb(*args, **kwargs) -> int:
+            raise OSError("Preview generator temporarily unavailable")
+
+        monkeypatch.setattr(PreviewManager, "get_page_nb", failing_get_page_nb)
+        with session.no_autoflush:
+            text_file = api.create(
+                content_type_slug=content_type_list.File.slug,
+                workspace=workspace,
+                label="test_file",
+                do_save=False,
+            )
+            api.update_file_data(text_file, "test_file.txt", "text/plain", b"test_content")
+        api.save(text_file, ActionDescription.CREATION)
+        transaction.commit()
+        revision = api.get_one_revision(text_file.revision_id)
+        assert api.get_stored_preview_metadata(revision.revision_id) is None
+
+        monkeypatch.undo()
+        api.update_preview_metadata(revision)
+        transaction.commit()
+        assert api.get_stored_preview_metadata(revision.revision_id)
+
 
 @pytest.mark.usefixtures("test_fixture")
 class TestContentApiSecurity(object):
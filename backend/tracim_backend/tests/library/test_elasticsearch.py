@@ -6,10 +6,16 @@
 from unittest.mock import PropertyMock
 from unittest.mock import patch
 
+from tracim_backend.lib.core.content import ContentApi
 from tracim_backend.lib.rq import RqQueueName
 from tracim_backend.lib.rq import get_rq_queue2
 from tracim_backend.lib.rq.worker import DatabaseWorker
+from tracim_backend.lib.search.elasticsearch_search.bulk_indexing import ESBulkContentIndexer
+from tracim_backend.lib.search.elasticsearch_search.elasticsearch_search import (
+    UPDATE_PATH_COMPONENT_SCRIPT,
+)
 from tracim_backend.lib.search.elasticsearch_search.elasticsearch_search import ESContentIndexer
+from tracim_backend.lib.search.elasticsearch_search.elasticsearch_search import ESSearchApi
 from tracim_backend.lib.search.elasticsearch_search.elasticsearch_search import ESUserIndexer
 from tracim_backend.lib.search.elasticsearch_search.elasticsearch_search import ESWorkspaceIndexer
 from tracim_backend.lib.search.elasticsearch_search.es_models import HtmlText
@@ -19,13 +25,29 @@
 from tracim_backend.lib.utils.request import TracimContext
 from tracim_backend.models.auth import User
 from tracim_backend.models.data import Content
+from tracim_backend.models.data import ContentRevisionRO
 from tracim_backend.models.data import UserRoleInWorkspace
 from tracim_backend.models.data import Workspace
+from tracim_backend.models.search import FileExtractedText
 from tracim_backend.tests.fixtures import *  # noqa: F403,F40
 
 
 def html_document() -> Content:
-    return Content(label="A content", type="html-document")
+    return Content(label="A content", type="html-document", is_deleted=False, is_archived=False)
+
+
+def a_previous_revision(content: Content, **changes: typing.Any) -> ContentRevisionRO:
+    """Create a previous revision of the given content, with the given changes."""
+    values = {
+        "label": content.label,
+        "type": content.type,
+        "parent_id": content.parent_id,
+        "workspace_id": content.workspace_id,
+        "is_deleted": content.is_deleted,
+        "is_archived": content.is_archived,
+    }
+    values.update(changes)
+    return ContentRevisionRO(**values)
 
 
 def content_with_parent(content_type: str, parent_type: str) -> Content:
@@ -150,7 +172,7 @@ def test_unit__on_content_modified__ok__simple_content(
         "config_section", [{"name": "test_elasticsearch_search"}], indirect=True
     )
     @pytest.mark.parametrize("content_type, indexed_count", [("comment", 1), ("file", 2)])
-    def test_unit__on_content_modified__ok__content_with_child(
+    def test_unit__on_content_modified__ok__moved_content_with_child(
         self,
         test_context: TracimContext,
         content_indexer_with_api_mock: ContentIndexerWithApiMock,
@@ -158,32 +180,107 @@ def test_unit__on_content_modified__ok__content_with_child(
         indexed_count: int,
     ) -> None:
         (indexer, index_content_mock, _) = content_indexer_with_api_mock
+        content = html_document()
         with patch.object(
             Content, "recursive_children", new_callable=PropertyMock
-        ) as recursive_children_mock:
+        ) as recursive_children_mock, patch.object(
+            Content,
+            "get_previous_revision",
+            return_value=a_previous_revision(content, parent_id=12),
+        ), patch.object(
+            ESSearchApi, "update_contents_by_query"
+        ) as update_contents_by_query_mock:
             recursive_children_mock.return_value = [Content(type=content_type)]
-            content = html_document()
             indexer.on_content_modified(content, test_context)
         assert index_content_mock.call_count == indexed_count
+        update_contents_by_query_mock.assert_not_called()
 
     @pytest.mark.parametrize(
         "config_section", [{"name": "test_elasticsearch_search"}], indirect=True
     )
     @pytest.mark.parametrize(
-        "workspace, indexed_count",
-        [(Workspace(label="A workspace"), 1), (Workspace(), 0)],
+        "previous_revision_changes, content_changes, updated_fields",
+        [
+            ({}, {}, []),
+            ({"label": "Old label"}, {}, ["path"]),
+            ({}, {"is_deleted": True}, ["deleted_through_parent_id"]),
+            ({"is_archived": True}, {}, ["archived_through_parent_id"]),
+            (
+                {"label": "Old label", "is_deleted": True},
+                {},
+                ["path", "deleted_through_parent_id"],
+            ),
+        ],
+    )
+    def test_unit__on_content_modified__ok__children_partial_update(
+        self,
+        test_context: TracimContext,
+        content_indexer_with_api_mock: ContentIndexerWithApiMock,
+        previous_revision_changes: typing.Dict[str, typing.Any],
+        content_changes: typing.Dict[str, typing.Any],
+        updated_fields: typing.List[str],
+    ) -> None:
+        (indexer, index_content_mock, _) = content_indexer_with_api_mock
+        content = html_document()
+        previous_revision = a_previous_revision(content, **previous_revision_changes)
+        for name, value in content_changes.items():
+            setattr(content, name, value)
+        with patch.object(
+            Content, "recursive_children", new_callable=PropertyMock
+        ) as recursive_children_mock, patch.object(
+            Content, "get_previous_revision", return_value=previous_revision
+        ), patch.object(
+            ESSearchApi, "update_contents_by_query"
+        ) as update_contents_by_query_mock:
+            indexer.on_content_modified(content, test_context)
+        index_content_mock.assert_called_once_with(content)
+        recursive_children_mock.assert_not_called()
+        scripts = [call.args[1] for call in update_contents_by_query_mock.call_args_list]
+        assert [
+            "path"
+            if script["source"] == UPDATE_PATH_COMPONENT_SCRIPT
+            else script["params"]["field"]
+            for script in scripts
+        ] == updated_fields
+
+    def test_unit__get_children_updates__ok__deleted_and_restored(self) -> None:
+        content = html_document()
+        content.content_id = 3
+        content.deleted_through_parent_id = 1
+        content.is_deleted = True
+        (update,) = ESContentIndexer._get_children_updates(content, a_previous_revision(content))
+        assert update.query["bool"]["filter"] == {"term": {"deleted_through_parent_id": 1}}
+        assert update.script["params"] == {"field": "deleted_through_parent_id", "value": 3}
+
+        restored_revision = a_previous_revision(content)
+        content.is_deleted = False
+        (update,) = ESContentIndexer._get_children_updates(content, restored_revision)
+        assert update.query["bool"]["filter"] == {"term": {"deleted_through_parent_id": 3}}
+        assert update.script["params"] == {"field": "deleted_through_parent_id", "value": 1}
+
+    @pytest.mark.parametrize(
+        "config_section", [{"name": "test_elasticsearch_search"}], indirect=True
+    )
+    @pytest.mark.parametrize(
+        "workspace, updated_count",
+        [(Workspace(workspace_id=42, label="A workspace"), 1), (Workspace(), 0)],
     )
     def test_unit__on_workspace_modified__ok__nominal_cases(
         self,
         test_context: TracimContext,
         content_indexer_with_api_mock: ContentIndexerWithApiMock,
         workspace: Workspace,
-        indexed_count: int,
+        updated_count: int,
     ) -> None:
-        (indexer, index_content_mock, content_api_mock) = content_indexer_with_api_mock
-        content_api_mock.get_all_query.return_value = [html_document()]
-        indexer.on_workspace_modified(workspace, test_context)
-        assert index_content_mock.call_count == indexed_count
+        (indexer, index_content_mock, _) = content_indexer_with_api_mock
+        with patch.object(ESSearchApi, "update_contents_by_query") as update_contents_by_query_mock:
+            indexer.on_workspace_modified(workspace, test_context)
+        index_content_mock.assert_not_called()
+        assert update_contents_by_query_mock.call_count == updated_count
+        if updated_count:
+            query, script = update_contents_by_query_mock.call_args.args
+            assert query == {"term": {"workspace_id": 42}}
+            assert script["params"] == {"label": "A workspace"}
 
     @pytest.mark.parametrize(
         "config_section", [{"name": "test_elasticsearch_search"}], indirect=True
@@ -396,6 +493,104 @@ def test_unit__index_user__ok__async(
         assert index_workspace_mock.call_count == 1
 
 
+@pytest.mark.usefixtures("base_fixture")
+@pytest.mark.usefixtures("default_content_fixture")
+@pytest.mark.parametrize("config_section", [{"name": "test_elasticsearch_search"}], indirect=True)
+class TestESBulkContentIndexer:
+    def _get_legacy_indexed_content_ids(self, session, app_config) -> typing.List[int]:
+        contents = ContentApi(current_user=None, session=session, config=app_config).get_all()
+        return sorted(
+            content.content_id
+            for content in ESContentIndexer._filter_excluded_content_types(contents)
+        )
+
+    def test_unit__get_contents_count__ok__same_contents_as_legacy_indexing(
+        self, session, app_config
+    ) -> None:
+        content_ids = self._get_legacy_indexed_content_ids(session, app_config)
+        all_content_ids = [content_id for (content_id,) in session.query(Content.id)]
+        assert len(all_content_ids) > len(content_ids)
+        bulk_indexer = ESBulkContentIndexer(session, app_config, batch_size=2)
+        assert bulk_indexer.get_contents_count() == len(content_ids)
+        assert [
+            content_id
+            for (content_id,) in bulk_indexer._get_content_ids_query(0).order_by(Content.id)
+        ] == content_ids
+
+    def test_unit__index_all__ok__batches_and_resume(self, session, app_config) -> None:
+        content_ids = self._get_legacy_indexed_content_ids(session, app_config)
+        assert len(content_ids) > 2
+        bulk_indexer = ESBulkContentIndexer(session, app_config, batch_size=2)
+        assert bulk_indexer.get_contents_count() == len(content_ids)
+        with patch(
+            "tracim_backend.lib.search.elasticsearch_search.elasticsearch_search.ESSearchApi.bulk_index_contents"
+        ) as bulk_index_contents_mock:
+            # INFO - the first content of each batch fails
+            bulk_index_contents_mock.side_effect = lambda contents: [contents[0].content_id]
+            results = list(bulk_indexer.index_all())
+            resumed_results = list(bulk_indexer.index_all(after_content_id=content_ids[-2]))
+
+        assert len(results) == (len(content_ids) + 1) // 2
+        assert results[-1].last_content_id == content_ids[-1]
+        assert sum(result.indexed_count for result in results) == len(content_ids) // 2
+        assert [
+            content_id for result in results for content_id in result.failed_content_ids
+        ] == content_ids[::2]
+        assert len(resumed_results) == 1
+        assert resumed_results[0].failed_content_ids == [content_ids[-1]]
+        assert resumed_results[0].indexed_count == 0
+
+
+@pytest.mark.usefixtures("base_fixture")
+@pytest.mark.parametrize("config_section", [{"name": "test_elasticsearch_search"}], indirect=True)
+class TestESSearchApiFileData:
+    def test_unit__get_file_data__ok__extracted_once_per_file_content(
+        self, session, app_config, workspace_api_factory, content_api_factory, content_type_list
+    ) -> None:
+        workspace = workspace_api_factory.get().create_workspace("test_workspace")
+        content_api = content_api_factory.get()
+        contents = []
+        for label in ("file1", "file2"):
+            with session.no_autoflush:
+                content = content_api.create(
+                    content_type_slug=content_type_list.File.slug,
+                    workspace=workspace,
+                    label=label,
+                    do_save=False,
+                )
+                content_api.update_file_data(
+                    content, "{}.txt".format(label), "text/plain", b"same text"
+                )
+            content_api.save(content)
+            contents.append(content)
+        assert contents[0].file_hash and contents[0].file_hash == contents[1].file_hash
+
+        file_data = {"content_en": "same text", "language": "en"}
+        with patch(
+            "tracim_backend.lib.search.elasticsearch_search.elasticsearch_search.IngestClient"
+        ) as ingest_client_class_mock:
+            simulate_mock = ingest_client_class_mock.return_value.simulate
+            simulate_mock.return_value = {"docs": [{"doc": {"_source": {"file_data": file_data}}}]}
+            search_api = ESSearchApi(session=session, config=app_config, current_user=None)
+            for content in contents:
+                content_in_context = content_api.get_content_in_context(content)
+                assert search_api._get_file_data(content_in_context) == file_data
+        assert simulate_mock.call_count == 1
+
+    def test_unit__store_file_data__ok__already_stored_then_deleted_once_unused(
+        self, session, app_config
+    ) -> None:
+        file_hash = "0" * 64
+        search_api = ESSearchApi(session=session, config=app_config, current_user=None)
+        search_api._store_file_data(file_hash, {"content_en": "first extraction"})
+        search_api._store_file_data(file_hash, {"content_en": "concurrent extraction"})
+        assert session.query(FileExtractedText).get(file_hash).file_data == {
+            "content_en": "first extraction"
+        }
+        assert search_api.delete_unused_file_data() == 1
+        assert session.query(FileExtractedText).count() == 0
+
+
 class TestUtils:
     @pytest.mark.parametrize(
         "schema,expected_field",
@@ -1,8 +1,16 @@
+from datetime import datetime
 import pytest
 import transaction
+import typing
 
 from tracim_backend.lib.core.event import BaseLiveMessageBuilder
 from tracim_backend.lib.core.event import EventApi
+from tracim_backend.lib.core.event import SyncLiveMessageBuilder
+from tracim_backend.lib.core.membership_cache import LocalMembershipVersionStore
+from tracim_backend.lib.core.membership_cache import MembershipCache
+from tracim_backend.lib.core.membership_cache import USERS_VERSION_KEY
+from tracim_backend.lib.core.membership_cache import workspace_version_key
+from tracim_backend.lib.core.messages_counters import MessagesCountersLib
 from tracim_backend.models.auth import Profile
 from tracim_backend.models.auth import User
 from tracim_backend.models.data import EmailNotificationType
@@ -10,7 +18,10 @@
 from tracim_backend.models.data import WorkspaceAccessType
 from tracim_backend.models.event import EntityType
 from tracim_backend.models.event import Event
+from tracim_backend.models.event import EventTypeDatabaseParameters
+from tracim_backend.models.event import Message
 from tracim_backend.models.event import OperationType
+from tracim_backend.models.event import ReadStatus
 from tracim_backend.models.revision_protection import new_revision
 from tracim_backend.models.tracim_session import TracimSession
 from tracim_backend.tests.fixtures import *  # noqa F403,F401
@@ -625,8 +636,230 @@ def test_unit__get_receiver_ids_workspace_subscription_event__reject_subscriptio
         assert other_user.user_id not in receivers_ids
 
 
+@pytest.mark.usefixtures("base_fixture")
+class TestLiveMessageBuilder:
+    def test_unit__publish_messages_for_events__ok__receivers_computed_once_per_space(
+        self, session, workspace_and_users, app_config, monkeypatch
+    ):
+        (my_workspace, same_workspace_user, _, _, event_initiator) = workspace_and_users
+        content_events = [
+            Event(
+                entity_type=EntityType.CONTENT,
+                operation=OperationType.CREATED,
+                fields={},
+                workspace_id=my_workspace.workspace_id,
+            )
+            for _ in range(3)
+        ]
+        user_event = Event(
+            entity_type=EntityType.USER_CALL,
+            operation=OperationType.CREATED,
+            fields={
+                "user_call": {
+                    "caller": {"user_id": event_initiator.user_id},
+                    "callee": {"user_id": same_workspace_user.user_id},
+                }
+            },
+        )
+        session.add_all(content_events + [user_event])
+        session.flush()
+        event_ids = [event.event_id for event in content_events + [user_event]]
+        get_receiver_ids = BaseLiveMessageBuilder.get_receiver_ids.__func__
+        receiver_ids_calls = []
+
+        def counting_get_receiver_ids(cls, event, session, config):
+            receiver_ids_calls.append(event.event_id)
+            return get_receiver_ids(cls, event, session, config)
+
+        monkeypatch.setattr(
+            BaseLiveMessageBuilder, "get_receiver_ids", classmethod(counting_get_receiver_ids)
+        )
+
+        SyncLiveMessageBuilder(context=session.context).publish_messages_for_events(event_ids)
+
+        assert receiver_ids_calls == [event_ids[0], event_ids[3]]
+        messages = (
+            session.query(Message)
+            .filter(Message.event_id.in_(event_ids))
+            .order_by(Message.event_id, Message.receiver_id)
+            .all()
+        )
+        assert [(message.event_id, message.receiver_id) for message in messages] == [
+            (event_id, user_id)
+            for event_id in event_ids
+            for user_id in sorted([event_initiator.user_id, same_workspace_user.user_id])
+        ]
+
+
+@pytest.mark.usefixtures("base_fixture")
+class TestMembershipCache:
+    def test_unit__workspace_member_ids__ok__cached_until_version_change(
+        self, session, workspace_and_users, role_api_factory, app_config
+    ):
+        (my_workspace, same_workspace_user, _, _, event_initiator) = workspace_and_users
+        version_store = LocalMembershipVersionStore()
+        membership_cache = MembershipCache(ttl=60, version_store=version_store)
+        workspace_id = my_workspace.workspace_id
+        expected_ids = {event_initiator.user_id, same_workspace_user.user_id}
+
+        assert membership_cache.get_workspace_member_ids(session, app_config, workspace_id) == (
+            expected_ids
+        )
+        assert membership_cache.get_workspace_member_ids(session, app_config, workspace_id) == (
+            expected_ids
+        )
+        assert (membership_cache.hits, membership_cache.misses) == (1, 1)
+
+        role_api_factory.get().delete_one(same_workspace_user.user_id, workspace_id)
+        transaction.commit()
+        # INFO - not invalidated: still cached
+        assert membership_cache.get_workspace_member_ids(session, app_config, workspace_id) == (
+            expected_ids
+        )
+        version_store.increment([workspace_version_key(workspace_id)])
+        assert membership_cache.get_workspace_member_ids(session, app_config, workspace_id) == {
+            event_initiator.user_id
+        }
+        assert (membership_cache.hits, membership_cache.misses) == (2, 2)
+
+    def test_unit__workspace_member_ids__ok__disabled_member_dropped(
+        self, session, workspace_and_users, user_api_factory, app_config
+    ):
+        (my_workspace, same_workspace_user, _, _, event_initiator) = workspace_and_users
+        version_store = LocalMembershipVersionStore()
+        membership_cache = MembershipCache(ttl=60, version_store=version_store)
+        workspace_id = my_workspace.workspace_id
+
+        assert membership_cache.get_workspace_member_ids(session, app_config, workspace_id) == {
+            event_initiator.user_id,
+            same_workspace_user.user_id,
+        }
+        user_api_factory.get().disable(same_workspace_user, do_save=True)
+        transaction.commit()
+        # INFO - MembershipCacheHooks.on_user_modified increments the users version
+        version_store.increment([USERS_VERSION_KEY])
+        assert membership_cache.get_workspace_member_ids(session, app_config, workspace_id) == {
+            event_initiator.user_id
+        }
+        assert (membership_cache.hits, membership_cache.misses) == (0, 2)
+
+    def test_unit__administrator_ids__ok__disabled_cache_always_fetch(
+        self, session, admin_user, app_config
+    ):
+        membership_cache = MembershipCache(ttl=0, version_store=LocalMembershipVersionStore())
+        assert membership_cache.get_administrator_ids(session, app_config) == {admin_user.user_id}
+        assert membership_cache.get_administrator_ids(session, app_config) == {admin_user.user_id}
+        assert (membership_cache.hits, membership_cache.misses) == (0, 0)
+
+
 @pytest.mark.usefixtures("base_fixture")
 class TestEventApi:
+    def test_unit__get_messages_count__ok__from_counters(
+        self, session, app_config, workspace_and_users
+    ):
+        (my_workspace, same_workspace_user, _, _, event_initiator) = workspace_and_users
+        user_id = same_workspace_user.user_id
+        events = [
+            Event(
+                entity_type=EntityType.CONTENT,
+                operation=OperationType.CREATED,
+                fields={},
+                workspace_id=my_workspace.workspace_id,
+                author_id=event_initiator.user_id,
+            )
+            for _ in range(3)
+        ] + [
+            Event(
+                entity_type=EntityType.CONTENT,
+                operation=OperationType.MODIFIED,
+                fields={},
+                workspace_id=my_workspace.workspace_id,
+                author_id=user_id,
+            )
+        ]
+        session.add_all(events)
+        session.flush()
+        SyncLiveMessageBuilder(context=session.context).publish_messages_for_events(
+            [event.event_id for event in events]
+        )
+        event_api = EventApi(current_user=None, session=session, config=app_config)
+        content_modified = [
+            EventTypeDatabaseParameters(EntityType.CONTENT, OperationType.MODIFIED, None)
+        ]
+        filters = [
+            {},
+            {"exclude_author_ids": [user_id]},
+            {"exclude_event_types": content_modified},
+            {"include_event_types": content_modified},
+            {"workspace_ids": [my_workspace.workspace_id + 1]},
+        ]
+
+        def get_counts(read_status: ReadStatus) -> typing.List[int]:
+            counts = [
+                event_api.get_messages_count(user_id, read_status, **kwargs) for kwargs in filters
+            ]
+            assert counts == [
+                event_api._base_query(user_id=user_id, read_status=read_status, **kwargs).count()
+                for kwargs in filters
+            ]
+            return counts
+
+        assert get_counts(ReadStatus.UNREAD) == [4, 3, 3, 1, 0]
+        assert get_counts(ReadStatus.READ) == [0, 0, 0, 0, 0]
+
+        event_api.mark_user_messages_as_read_or_unread(user_id, event_ids=[events[0].event_id])
+        event_api.mark_user_messages_as_read_or_unread(user_id, event_ids=[events[3].event_id])
+        assert get_counts(ReadStatus.UNREAD) == [2, 2, 2, 0, 0]
+        assert get_counts(ReadStatus.READ) == [2, 1, 1, 1, 0]
+
+        event_api.mark_user_message_as_read(events[0].event_id, user_id)
+        event_api.mark_user_messages_as_read_or_unread(user_id, event_ids=[events[3].event_id])
+        assert get_counts(ReadStatus.UNREAD) == [2, 2, 2, 0, 0]
+        assert get_counts(ReadStatus.READ) == [2, 1, 1, 1, 0]
+
+        MessagesCountersLib(session).rebuild_counters()
+        assert get_counts(ReadStatus.UNREAD) == [2, 2, 2, 0, 0]
+        assert get_counts(ReadStatus.READ) == [2, 1, 1, 1, 0]
+
+    def test_unit__mark_user_messages_as_read_or_unread__ok__return_marked_event_ids(
+        self, session, app_config, workspace_and_users
+    ):
+        (my_workspace, same_workspace_user, _, _, event_initiator) = workspace_and_users
+        user_id = same_workspace_user.user_id
+        events = [
+            Event(
+                entity_type=EntityType.CONTENT,
+                operation=OperationType.CREATED,
+                fields={},
+                workspace_id=my_workspace.workspace_id,
+                author_id=event_initiator.user_id,
+            )
+            for _ in range(3)
+        ]
+        session.add_all(events)
+        session.flush()
+        event_ids = [event.event_id for event in events]
+        SyncLiveMessageBuilder(context=session.context).publish_messages_for_events(event_ids)
+        event_api = EventApi(current_user=None, session=session, config=app_config)
+        loaded_message = event_api.get_one_message(event_ids[0], user_id)
+        assert loaded_message.read is None
+
+        marked_event_ids = event_api.mark_user_messages_as_read_or_unread(
+            user_id, event_ids=event_ids[:2]
+        )
+        assert sorted(marked_event_ids) == event_ids[:2]
+        assert loaded_message.read is not None
+        assert event_api.mark_user_messages_as_read_or_unread(user_id, event_ids=event_ids) == [
+            event_ids[2]
+        ]
+        assert event_api.mark_user_messages_as_read_or_unread(user_id) == []
+        assert event_api.get_messages_count(user_id, ReadStatus.UNREAD) == 0
+
+        marked_event_ids = event_api.mark_user_messages_as_read_or_unread(user_id, is_read=False)
+        assert sorted(marked_event_ids) == event_ids
+        assert loaded_message.read is None
+        assert event_api.get_messages_count(user_id, ReadStatus.UNREAD) == 3
+
     def test__message_delete_message_for_workspace__ok__add_leave_workspace(
         self,
         session,
@@ -980,3 +1213,139 @@ def test__create_messages_history_for_user_ok__not_positive_max_message(
             assert len(last_messages) == 4
         elif not max_message_generated:
             assert len(last_messages) == 0
+
+    @pytest.mark.parametrize(
+        "config_section",
+        [{"name": "base_test_historic_message_generation_disabled"}],
+        indirect=True,
+    )
+    def test__create_messages_history_for_user__ok__visibility_by_entity_type(
+        self,
+        session,
+        app_config,
+        admin_user,
+        workspace_and_users,
+        role_api_factory,
+    ):
+        (my_workspace, _, _, other_user, event_initiator) = workspace_and_users
+        role_api = role_api_factory.get(current_user=event_initiator)
+        role_api.create_one(
+            other_user,
+            my_workspace,
+            UserRoleInWorkspace.READER,
+            email_notification_type=EmailNotificationType.NONE,
+        )
+        transaction.commit()
+        workspace_fields = {"workspace": {"workspace_id": my_workspace.workspace_id}}
+
+        def create_subscription_event(author: User) -> Event:
+            fields = {"subscription": {"author": {"user_id": author.user_id}}}
+            fields.update(workspace_fields)
+            return Event(
+                entity_type=EntityType.WORKSPACE_SUBSCRIPTION,
+                operation=OperationType.CREATED,
+                fields=fields,
+                workspace_id=my_workspace.workspace_id,
+            )
+
+        content_event = Event(
+            entity_type=EntityType.CONTENT,
+            operation=OperationType.CREATED,
+            entity_subtype="html-document",
+            fields=workspace_fields,
+            workspace_id=my_workspace.workspace_id,
+        )
+        own_subscription_event = create_subscription_event(other_user)
+        other_subscription_event = create_subscription_event(event_initiator)
+        excluded_event = Event(
+            entity_type=EntityType.CONTENT,
+            operation=OperationType.MODIFIED,
+            entity_subtype="html-document",
+            fields=workspace_fields,
+            workspace_id=my_workspace.workspace_id,
+        )
+        session.add_all(
+            [content_event, own_subscription_event, other_subscription_event, excluded_event]
+        )
+        session.flush()
+
+        event_api = EventApi(current_user=admin_user, session=session, config=app_config)
+        messages = event_api.create_messages_history_for_user(
+            user_id=other_user.user_id,
+            workspace_ids=[my_workspace.workspace_id],
+            excluded_event_ids=[excluded_event.event_id],
+        )
+
+        event_ids = [message.event_id for message in messages]
+        assert content_event.event_id in event_ids
+        # INFO - subscriptions are only visible to their author and space managers
+        assert own_subscription_event.event_id in event_ids
+        assert other_subscription_event.event_id not in event_ids
+        assert excluded_event.event_id not in event_ids
+        assert event_ids == sorted(event_ids)
+        assert all(message.sent is None and message.read for message in messages)
+
+    def test__bulk_insert_messages__ok__nominal_case(
+        self, session, app_config, admin_user, workspace_and_users, message_helper
+    ) -> None:
+        (my_workspace, _, _, other_user, _) = workspace_and_users
+        events = (
+            session.query(Event)
+            .filter(Event.workspace_id == my_workspace.workspace_id)
+            .order_by(Event.event_id)
+            .all()
+        )
+        assert events
+        messages = [
+            Message(receiver_id=other_user.user_id, event=event, event_id=event.event_id)
+            for event in events
+        ]
+        event_api = EventApi(current_user=admin_user, session=session, config=app_config)
+        assert event_api.bulk_insert_messages(messages) == messages
+        assert not any(message in session for message in messages)
+        transaction.commit()
+        last_messages = message_helper.last_user_workspace_messages(
+            100, my_workspace.workspace_id, other_user.user_id
+        )
+        assert [message.event_id for message in last_messages] == [
+            event.event_id for event in events
+        ]
+
+    def test__bulk_insert_messages__ok__skip_existing_messages(
+        self, session, app_config, admin_user, workspace_and_users
+    ) -> None:
+        (my_workspace, _, _, other_user, event_initiator) = workspace_and_users
+        events = [
+            Event(
+                entity_type=EntityType.CONTENT,
+                operation=OperationType.CREATED,
+                fields={},
+                workspace_id=my_workspace.workspace_id,
+                author_id=event_initiator.user_id,
+            )
+            for _ in range(2)
+        ]
+        session.add_all(events)
+        session.flush()
+        event_api = EventApi(current_user=admin_user, session=session, config=app_config)
+        unread_count = event_api.get_messages_count(other_user.user_id, ReadStatus.UNREAD)
+
+        def create_message(event: Event) -> Message:
+            return Message(
+                receiver_id=other_user.user_id,
+                event=event,
+                event_id=event.event_id,
+                sent=datetime.utcnow(),
+            )
+
+        event_api.bulk_insert_messages([create_message(events[0])])
+        messages = [create_message(event) for event in events]
+        assert event_api.bulk_insert_messages(messages) == messages[1:]
+        assert event_api.bulk_insert_messages(messages) == []
+        assert (
+            event_api.get_messages_count(other_user.user_id, ReadStatus.UNREAD)
+            == unread_count + 2
+            == event_api._base_query(
+                user_id=other_user.user_id, read_status=ReadStatus.UNREAD
+            ).count()
+        )
@@ -0,0 +1,164 @@
+"""
+Query plans of the main EventApi queries.
+
+Checked on PostgreSQL only (run with "pytest --database postgresql"): events and
+messages are seeded at a scale where the planner prefers indexes, then each query
+is EXPLAINed and must not scan events or messages sequentially.
+"""
+from datetime import datetime
+from datetime import timedelta
+import pytest
+from sqlalchemy import case
+from sqlalchemy import literal
+from sqlalchemy import null
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement
+from sqlalchemy.sql.expression import Executable
+import typing
+
+from tracim_backend.lib.core.event import EventApi
+from tracim_backend.lib.utils.utils import DEFAULT_NB_ITEM_PAGINATION
+from tracim_backend.models.auth import User
+from tracim_backend.models.event import EntityType
+from tracim_backend.models.event import Event
+from tracim_backend.models.event import Message
+from tracim_backend.models.event import OperationType
+from tracim_backend.models.event import ReadStatus
+from tracim_backend.models.tracim_session import TracimSession
+from tracim_backend.tests.fixtures import *  # noqa F403,F401
+
+SEEDED_USERS_COUNT = 50
+SEEDED_EVENTS_COUNT = 20000
+# INFO - each event has a message for one user out of RECEIVERS_MODULO
+RECEIVERS_MODULO = 5
+CHECKED_TABLES = ("events", "messages")
+
+
+class Explain(Executable, ClauseElement):
+    def __init__(self, statement: ClauseElement) -> None:
+        self.statement = statement
+
+
+@compiles(Explain, "postgresql")
+def _compile_explain(element: Explain, compiler, **kwargs) -> str:
+    return "EXPLAIN (FORMAT JSON) {}".format(compiler.process(element.statement, **kwargs))
+
+
+def get_sequential_scans(plan: typing.Dict[str, typing.Any]) -> typing.List[str]:
+    """Return relations sequentially scanned by the given plan node or its children."""
+    relations = []
+    if plan["Node Type"] == "Seq Scan":
+        relations.append(plan["Relation Name"])
+    for child_plan in plan.get("Plans", []):
+        relations.extend(get_sequential_scans(child_plan))
+    return relations
+
+
+def seed(session: TracimSession) -> typing.List[int]:
+    """Create users, events and messages, return ids of created users."""
+    session.bulk_insert_mappings(
+        User,
+        [
+            {
+                "email": "planner{}@test.test".format(index),
+                "username": "planner{}".format(index),
+                "display_name": "planner {}".format(index),
+            }
+            for index in range(SEEDED_USERS_COUNT)
+        ],
+    )
+    user_ids = [user_id for (user_id,) in session.query(User.user_id)]
+    now = datetime.utcnow()
+    session.bulk_insert_mappings(
+        Event,
+        [
+            {
+                "entity_type": EntityType.CONTENT,
+                "operation": OperationType.MODIFIED,
+                "entity_subtype": "html-document",
+                "fields": {},
+                "workspace_id": index % 20 + 1,
+                "content_id": index % 5000 + 1,
+                "parent_id": index % 500 + 1,
+                "author_id": user_ids[index % len(user_ids)],
+                "created": now - timedelta(minutes=SEEDED_EVENTS_COUNT - index),
+            }
+            for index in range(SEEDED_EVENTS_COUNT)
+        ],
+    )
+    # INFO - one message out of 10 is unread
+    session.execute(
+        Message.__table__.insert().from_select(
+            ["receiver_id", "event_id", "sent", "read"],
+            session.query(
+                User.user_id,
+                Event.event_id,
+                literal(now),
+                case([(Event.event_id % 10 == 0, null())], else_=literal(now)),
+            )
+            .filter((User.user_id + Event.event_id) % RECEIVERS_MODULO == 0)
+            .subquery()
+            .select(),
+        )
+    )
+    session.execute("ANALYZE events")
+    session.execute("ANALYZE messages")
+    return user_ids
+
+
+@pytest.mark.parametrize("config_section", [{"name": "base_test"}], indirect=True)
+class TestEventQueryPlans:
+    @pytest.fixture
+    def seeded_session(self, session, sqlalchemy_database) -> TracimSession:
+        if sqlalchemy_database != "postgresql":
+            pytest.skip("Query plans are only checked with PostgreSQL")
+        seed(session)
+        return session
+
+    def test_unit__event_api_queries__ok__no_sequential_scan(self, seeded_session, app_config):
+        session = seeded_session
+        event_api = EventApi(current_user=None, session=session, config=app_config)
+        user_id = session.query(User.user_id).filter(User.username == "planner0").scalar()
+        queries = {
+            "unread messages page": event_api._base_query(
+                user_id=user_id, read_status=ReadStatus.UNREAD
+            )
+            .order_by(Message.event_id.desc())
+            .limit(DEFAULT_NB_ITEM_PAGINATION),
+            "messages page": event_api._base_query(user_id=user_id)
+            .order_by(Message.event_id.desc())
+            .limit(DEFAULT_NB_ITEM_PAGINATION),
+            "messages page excluding own ones": event_api._base_query(
+                user_id=user_id, exclude_author_ids=[user_id]
+            )
+            .order_by(Message.event_id.desc())
+            .limit(DEFAULT_NB_ITEM_PAGINATION),
+            "unread messages to mark as read": event_api._base_query(
+                user_id=user_id, read_status=ReadStatus.UNREAD
+            ),
+            "messages related to a content": event_api._base_query(
+                user_id=user_id, related_to_content_ids=[42]
+            ).order_by(Message.event_id.desc()),
+            "messages of a content and its children": event_api._base_query(
+                user_id=user_id, content_ids=[42], parent_ids=[42]
+            ),
+            "messages of a content for all users": event_api._base_query(content_ids=[42]),
+            "recent messages": event_api._base_query(user_id=user_id).filter(
+                Event.created >= datetime.utcnow() - timedelta(hours=1)
+            ),
+            "messages after an event": event_api._base_query(
+                user_id=user_id, after_event_id=SEEDED_EVENTS_COUNT - 100
+            ),
+        }
+
+        sequential_scans = {}
+        for name, query in queries.items():
+            ((plan,),) = session.execute(Explain(query.statement)).fetchall()
+            relations = [
+                relation
+                for relation in get_sequential_scans(plan[0]["Plan"])
+                if relation in CHECKED_TABLES
+            ]
+            if relations:
+                sequential_scans[name] = relations
+        assert sequential_scans == {}
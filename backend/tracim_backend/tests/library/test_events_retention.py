@@ -0,0 +1,176 @@
+from datetime import datetime
+from datetime import timedelta
+import gzip
+import json
+import pytest
+import transaction
+import typing
+
+from tracim_backend.lib.cleanup import events_retention
+from tracim_backend.lib.cleanup.events_retention import EventsRetentionLib
+from tracim_backend.lib.core.messages_counters import MessagesCountersLib
+from tracim_backend.models.auth import User
+from tracim_backend.models.event import EntityType
+from tracim_backend.models.event import Event
+from tracim_backend.models.event import Message
+from tracim_backend.models.event import OperationType
+from tracim_backend.models.event import UserMessagesCounter
+from tracim_backend.models.tracim_session import TracimSession
+from tracim_backend.tests.fixtures import *  # noqa F403,F401
+
+
+def create_events(
+    session: TracimSession, receiver: User, days_ago: int, count: int, read: bool = True
+) -> typing.List[Event]:
+    events = [
+        Event(
+            entity_type=EntityType.CONTENT,
+            operation=OperationType.CREATED,
+            fields={"workspace": {"workspace_id": 1}},
+            workspace_id=1,
+            created=datetime.utcnow() - timedelta(days=days_ago),
+        )
+        for _ in range(count)
+    ]
+    session.add_all(events)
+    session.flush()
+    session.add_all(
+        [
+            Message(
+                receiver_id=receiver.user_id,
+                event_id=event.event_id,
+                sent=event.created,
+                read=event.created if read else None,
+            )
+            for event in events
+        ]
+    )
+    session.flush()
+    return events
+
+
+def get_counters(session: TracimSession) -> typing.Dict[typing.Tuple, typing.Tuple[int, int]]:
+    return {
+        (user_id, entity_type, operation): (messages_count, unread_messages_count)
+        for (
+            user_id,
+            entity_type,
+            operation,
+            messages_count,
+            unread_messages_count,
+        ) in session.query(
+            UserMessagesCounter.user_id,
+            UserMessagesCounter.entity_type,
+            UserMessagesCounter.operation,
+            UserMessagesCounter.messages_count,
+            UserMessagesCounter.unread_messages_count,
+        )
+        if messages_count
+    }
+
+
+def get_message_event_ids(session: TracimSession) -> typing.List[int]:
+    return sorted(event_id for (event_id,) in session.query(Message.event_id))
+
+
+@pytest.mark.usefixtures("base_fixture")
+@pytest.mark.parametrize("config_section", [{"name": "base_test"}], indirect=True)
+class TestEventsRetentionLib:
+    def test_unit__prune_read_messages_by_age__ok__nominal_case(
+        self, session, app_config, admin_user
+    ):
+        old_read_events = create_events(session, admin_user, days_ago=40, count=3)
+        old_unread_events = create_events(session, admin_user, days_ago=40, count=2, read=False)
+        recent_events = create_events(session, admin_user, days_ago=1, count=2)
+        MessagesCountersLib(session).rebuild_counters()
+
+        retention_lib = EventsRetentionLib(session, app_config)
+        deleted_count = retention_lib.prune_read_messages_by_age(
+            datetime.utcnow() - timedelta(days=30)
+        )
+
+        assert deleted_count == len(old_read_events)
+        assert get_message_event_ids(session) == sorted(
+            event.event_id for event in old_unread_events + recent_events
+        )
+        counters = get_counters(session)
+        MessagesCountersLib(session).rebuild_counters()
+        assert counters == get_counters(session)
+
+    def test_unit__prune_read_messages_by_count__ok__keep_most_recent_ones(
+        self, session, app_config, admin_user
+    ):
+        read_events = create_events(session, admin_user, days_ago=10, count=5)
+        unread_events = create_events(session, admin_user, days_ago=5, count=2, read=False)
+        MessagesCountersLib(session).rebuild_counters()
+
+        retention_lib = EventsRetentionLib(session, app_config)
+        assert retention_lib.prune_read_messages_by_count(2) == 3
+        assert retention_lib.prune_read_messages_by_count(2) == 0
+
+        assert get_message_event_ids(session) == sorted(
+            event.event_id for event in read_events[-2:] + unread_events
+        )
+        counters = get_counters(session)
+        MessagesCountersLib(session).rebuild_counters()
+        assert counters == get_counters(session)
+
+    def test_unit__archive_events__ok__keep_history_events(
+        self, session, app_config, admin_user, tmp_path
+    ):
+        old_events = create_events(session, admin_user, days_ago=40, count=4, read=False)
+        recent_events = create_events(session, admin_user, days_ago=1, count=1)
+        MessagesCountersLib(session).rebuild_counters()
+        app_config.WORKSPACE__JOIN__MAX_MESSAGES_HISTORY_COUNT = 2
+
+        retention_lib = EventsRetentionLib(session, app_config)
+        result = retention_lib.archive_events(datetime.utcnow() - timedelta(days=30), str(tmp_path))
+
+        # INFO - the last old event is one of the 2 last events of the space, it is kept
+        archived_event_ids = [event.event_id for event in old_events[:3]]
+        assert result.archived_events_count == 3
+        with gzip.open(result.file_path, "rt", encoding="utf-8") as archive_file:
+            archived_events = [json.loads(line) for line in archive_file]
+        assert [event["event_id"] for event in archived_events] == archived_event_ids
+        assert archived_events[0]["event_type"] == "content.created"
+        assert archived_events[0]["fields"] == {"workspace": {"workspace_id": 1}}
+        assert session.query(Event).filter(Event.event_id.in_(archived_event_ids)).count() == 0
+        assert get_message_event_ids(session) == [
+            old_events[3].event_id,
+            recent_events[0].event_id,
+        ]
+        counters = get_counters(session)
+        MessagesCountersLib(session).rebuild_counters()
+        assert counters == get_counters(session)
+
+        assert (
+            retention_lib.archive_events(
+                datetime.utcnow() - timedelta(days=30), str(tmp_path)
+            ).archived_events_count
+            == 0
+        )
+
+    def test_unit__archive_events__ok__commit_each_batch(
+        self, session, app_config, admin_user, tmp_path, monkeypatch
+    ):
+        monkeypatch.setattr(events_retention, "ARCHIVE_BATCH_SIZE", 2)
+        old_events = create_events(session, admin_user, days_ago=40, count=5)
+        MessagesCountersLib(session).rebuild_counters()
+        transaction.commit()
+        app_config.WORKSPACE__JOIN__MAX_MESSAGES_HISTORY_COUNT = 0
+
+        retention_lib = EventsRetentionLib(session, app_config)
+        result = retention_lib.archive_events(
+            datetime.utcnow() - timedelta(days=30),
+            str(tmp_path),
+            transaction_manager=transaction.manager,
+        )
+        # INFO - deletions were committed batch after batch, nothing is left to roll back
+        transaction.abort()
+
+        old_event_ids = [event.event_id for event in old_events]
+        assert result.archived_events_count == 5
+        with gzip.open(result.file_path, "rt", encoding="utf-8") as archive_file:
+            assert [json.loads(line)["event_id"] for line in archive_file] == old_event_ids
+        assert session.query(Event).filter(Event.event_id.in_(old_event_ids)).count() == 0
+        assert not set(get_message_event_ids(session)) & set(old_event_ids)
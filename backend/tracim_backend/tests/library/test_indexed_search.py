@@ -0,0 +1,114 @@
+import pytest
+import transaction
+
+from tracim_backend.lib.core.tag import TagLib
+from tracim_backend.lib.search.indexed_search.indexed_search_api import IndexedSearchApi
+from tracim_backend.models.auth import Profile
+from tracim_backend.models.revision_protection import new_revision
+from tracim_backend.models.search import ContentSearchIndex
+from tracim_backend.tests.fixtures import *  # noqa F403,F401
+
+
+@pytest.mark.usefixtures("base_fixture")
+@pytest.mark.parametrize("config_section", [{"name": "test_indexed_search"}], indirect=True)
+class TestIndexedSearchApi(object):
+    def _create_user_and_workspace(self, user_api_factory, workspace_api_factory):
+        user = user_api_factory.get().create_minimal_user(
+            email="this.is@user", profile=Profile.ADMIN, save_now=True
+        )
+        workspace = workspace_api_factory.get(current_user=user).create_workspace(
+            "test workspace", save_now=True
+        )
+        return user, workspace
+
+    def test_unit__index_content__ok__comments_and_tags_in_main_content_document(
+        self,
+        user_api_factory,
+        workspace_api_factory,
+        session,
+        app_config,
+        content_api_factory,
+        content_type_list,
+    ):
+        user, workspace = self._create_user_and_workspace(user_api_factory, workspace_api_factory)
+        api = content_api_factory.get(user)
+        thread = api.create(
+            content_type_slug=content_type_list.Thread.slug,
+            workspace=workspace,
+            label="weekly meeting",
+            do_save=True,
+        )
+        comment = api.create_comment(
+            workspace=workspace,
+            parent=thread,
+            content="<p>about <b>pineapples</b></p>",
+            do_save=True,
+        )
+        TagLib(session).add_tag_to_content(user=user, content=thread, tag_name="fruits")
+        transaction.commit()
+
+        assert session.query(ContentSearchIndex).get(comment.content_id) is None
+        document = session.query(ContentSearchIndex).get(thread.content_id).document
+        assert "weekly meeting" in document
+        assert "pineapples" in document
+        assert "fruits" in document
+
+        search_api = IndexedSearchApi(current_user=user, session=session, config=app_config)
+        for keyword in ("pineapple", "fruits", "weekly"):
+            result = search_api.search(content_api=api, keywords=[keyword], size=10, offset=0)
+            assert result.total_hits == 1
+            assert [content.content_id for content in result.contents] == [thread.content_id]
+
+    def test_unit__search__ok__paginated_and_hidden_ancestors_filtered(
+        self,
+        user_api_factory,
+        workspace_api_factory,
+        session,
+        app_config,
+        content_api_factory,
+        content_type_list,
+    ):
+        user, workspace = self._create_user_and_workspace(user_api_factory, workspace_api_factory)
+        api = content_api_factory.get(user)
+        folder = api.create(
+            content_type_slug=content_type_list.Folder.slug,
+            workspace=workspace,
+            label="archives",
+            do_save=True,
+        )
+        hidden_page = api.create(
+            content_type_slug=content_type_list.Page.slug,
+            workspace=workspace,
+            parent=folder,
+            label="report 2019",
+            do_save=True,
+        )
+        pages = [
+            api.create(
+                content_type_slug=content_type_list.Page.slug,
+                workspace=workspace,
+                label="report {}".format(year),
+                do_save=True,
+            )
+            for year in (2020, 2021, 2022)
+        ]
+        with new_revision(session=session, tm=transaction.manager, content=folder):
+            api.delete(folder)
+        api.save(folder)
+        transaction.commit()
+
+        search_api = IndexedSearchApi(current_user=user, session=session, config=app_config)
+        first_page = search_api.search(content_api=api, keywords=["report"], size=2, offset=0)
+        second_page = search_api.search(content_api=api, keywords=["report"], size=2, offset=2)
+        assert first_page.total_hits == 3
+        assert len(first_page.contents) == 2
+        assert len(second_page.contents) == 1
+        found_ids = {content.content_id for content in first_page.contents + second_page.contents}
+        assert found_ids == {page.content_id for page in pages}
+
+        api_with_deleted = content_api_factory.get(user, show_deleted=True)
+        result = search_api.search(
+            content_api=api_with_deleted, keywords=["report"], size=10, offset=0
+        )
+        assert result.total_hits == 4
+        assert hidden_page.content_id in {content.content_id for content in result.contents}
@@ -0,0 +1,84 @@
+from datetime import datetime
+import json
+import pytest
+import typing
+
+from tracim_backend.lib.core import live_messages
+from tracim_backend.lib.core.live_messages import LiveMessagesLib
+from tracim_backend.models.event import EntityType
+from tracim_backend.models.event import Event
+from tracim_backend.models.event import Message
+from tracim_backend.models.event import OperationType
+from tracim_backend.tests.fixtures import *  # noqa F403,F401
+
+# INFO - test contexts replace publish_messages by a mock to avoid requiring pushpin,
+# keep the real implementation to test it.
+PUBLISH_MESSAGES = LiveMessagesLib.publish_messages
+
+
+class RecordingPubControl:
+    def __init__(self) -> None:
+        self.published = []  # type: typing.List[typing.Tuple[str, typing.Any, bool]]
+
+    def publish(self, channel, item, blocking=False, callback=None) -> None:
+        self.published.append((channel, item, blocking))
+
+
+@pytest.fixture
+def recording_pub_control(monkeypatch) -> RecordingPubControl:
+    pub_control = RecordingPubControl()
+    monkeypatch.setattr(live_messages, "_grip_pub_control", pub_control)
+    return pub_control
+
+
+def sse_data(item) -> typing.Dict[str, typing.Any]:
+    content = item.export()["http-stream"]["content"]
+    data_line = [line for line in content.split("\n") if line.startswith("data: ")][0]
+    prefix_length = len("data: ")
+    return json.loads(data_line[prefix_length:])
+
+
+class TestLiveMessagesLib:
+    def test_unit__publish_messages__ok__serialize_once_per_payload(
+        self, app_config, recording_pub_control, monkeypatch
+    ) -> None:
+        app_config.LIVE_MESSAGES__BLOCKING_PUBLISH = True
+        app_config.LIVE_MESSAGES__PUBLISH_BATCH_SIZE = 2
+        event = Event(
+            event_id=42,
+            entity_type=EntityType.USER,
+            operation=OperationType.MODIFIED,
+            fields={"author": None},
+            created=datetime(2020, 1, 1),
+        )
+        read_date = datetime(2020, 1, 2)
+        messages = [
+            Message(receiver_id=1, event=event, event_id=42),
+            Message(receiver_id=2, event=event, event_id=42),
+            Message(receiver_id=3, event=event, event_id=42),
+            Message(receiver_id=4, event=event, event_id=42, read=read_date),
+        ]
+        dumped_messages = []
+        original_message_as_dict = LiveMessagesLib.message_as_dict
+
+        def counting_message_as_dict(message: Message) -> typing.Dict[str, typing.Any]:
+            dumped_messages.append(message)
+            return original_message_as_dict(message)
+
+        monkeypatch.setattr(LiveMessagesLib, "message_as_dict", counting_message_as_dict)
+        monkeypatch.setattr(LiveMessagesLib, "publish_messages", PUBLISH_MESSAGES)
+        LiveMessagesLib(app_config).publish_messages(messages)
+
+        assert len(dumped_messages) == 2
+        assert [channel for channel, _, _ in recording_pub_control.published] == [
+            "user_1",
+            "user_2",
+            "user_3",
+            "user_4",
+        ]
+        assert all(blocking for _, _, blocking in recording_pub_control.published)
+        items = [item for _, item, _ in recording_pub_control.published]
+        assert items[0] is items[1] is items[2]
+        assert sse_data(items[0])["event_id"] == 42
+        assert sse_data(items[0])["read"] is None
+        assert sse_data(items[3])["read"] == "2020-01-02T00:00:00Z"
@@ -0,0 +1,21 @@
+from tracim_backend.lib.mail_notifier.notifier import RecipientPlaceholder
+from tracim_backend.models.auth import User
+
+
+class TestRecipientPlaceholder(object):
+    def test_unit__substitute__ok__nominal_case(self):
+        recipient = RecipientPlaceholder()
+        body_html = "<p>Hello {}, ({})</p>".format(recipient.display_name, recipient.email)
+        assert not recipient.uses_unsupported_field
+
+        bob = User(display_name="Bob <b>", email="bob@example.org")
+        alice = User(display_name="Alice", email="alice@example.org")
+        assert recipient.substitute(body_html, bob) == (
+            "<p>Hello Bob &lt;b&gt;, (bob@example.org)</p>"
+        )
+        assert recipient.substitute(body_html, alice) == "<p>Hello Alice, (alice@example.org)</p>"
+
+    def test_unit__getattr__ok__unsupported_field(self):
+        recipient = RecipientPlaceholder()
+        assert recipient.timezone == ""
+        assert recipient.uses_unsupported_field
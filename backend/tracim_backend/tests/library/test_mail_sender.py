@@ -0,0 +1,116 @@
+from email.mime.multipart import MIMEMultipart
+import pytest
+import smtplib
+from unittest.mock import MagicMock
+from unittest.mock import call
+from unittest.mock import patch
+
+from tracim_backend.config import CFG
+from tracim_backend.lib.mail_notifier.sender import EmailSender
+from tracim_backend.lib.mail_notifier.sender import group_messages_by_domain
+from tracim_backend.lib.mail_notifier.sender import is_temporary_smtp_error
+from tracim_backend.lib.mail_notifier.utils import SmtpConfiguration
+from tracim_backend.lib.mail_notifier.utils import SmtpEncryption
+from tracim_backend.tests.fixtures import *  # noqa: F403,F40
+
+
+def create_message(to: str) -> MIMEMultipart:
+    message = MIMEMultipart("alternative")
+    message["To"] = to
+    return message
+
+
+@pytest.fixture
+def smtp_connection_mock() -> MagicMock:
+    smtp_connection = MagicMock()
+    smtp_connection.noop.return_value = (250, b"OK")
+    smtp_connection.send_message.return_value = {}
+    return smtp_connection
+
+
+def create_email_sender(app_config: CFG, server: str) -> EmailSender:
+    # INFO - connection pools are shared by process for a SMTP configuration,
+    # a server name per test keeps them isolated.
+    smtp_config = SmtpConfiguration(
+        server, 25, "", "", encryption=SmtpEncryption.UNSECURE, authentication=False
+    )
+    return EmailSender(app_config, smtp_config, really_send_messages=True)
+
+
+class TestMailSender(object):
+    def test_unit__group_messages_by_domain__ok__nominal_case(self):
+        messages = [
+            create_message("Bob <bob@Example.org>"),
+            create_message("alice@other.org"),
+            create_message("john@example.org"),
+        ]
+        assert group_messages_by_domain(messages) == {
+            "example.org": [messages[0], messages[2]],
+            "other.org": [messages[1]],
+        }
+
+    def test_unit__is_temporary_smtp_error__ok__nominal_case(self):
+        assert is_temporary_smtp_error(smtplib.SMTPServerDisconnected())
+        assert is_temporary_smtp_error(ConnectionRefusedError())
+        assert is_temporary_smtp_error(smtplib.SMTPDataError(451, b"try again later"))
+        assert not is_temporary_smtp_error(smtplib.SMTPDataError(554, b"rejected"))
+        assert not is_temporary_smtp_error(
+            smtplib.SMTPRecipientsRefused({"bob@example.org": (550, b"unknown user")})
+        )
+        assert not is_temporary_smtp_error(ValueError())
+
+    def test_unit__send_mails__ok__pooled_connection_reused(
+        self, app_config: CFG, smtp_connection_mock: MagicMock
+    ):
+        email_sender = create_email_sender(app_config, "pool-reuse.smtp.invalid")
+        with patch(
+            "tracim_backend.lib.mail_notifier.sender.create_smtp_connection",
+            return_value=smtp_connection_mock,
+        ) as create_smtp_connection_mock:
+            email_sender.send_mails(
+                [create_message("bob@example.org"), create_message("alice@other.org")]
+            )
+            email_sender.send_mail(create_message("john@example.org"))
+            email_sender.disconnect()
+        create_smtp_connection_mock.assert_called_once()
+        assert smtp_connection_mock.send_message.call_count == 3
+        smtp_connection_mock.quit.assert_called_once()
+
+    def test_unit__send_mail__ok__temporary_error_retried_with_backoff(
+        self, app_config: CFG, smtp_connection_mock: MagicMock
+    ):
+        app_config.EMAIL__NOTIFICATION__SMTP__RETRY__MAX_ATTEMPTS = 3
+        app_config.EMAIL__NOTIFICATION__SMTP__RETRY__DELAY = 2.0
+        smtp_connection_mock.send_message.side_effect = [
+            smtplib.SMTPServerDisconnected(),
+            smtplib.SMTPDataError(451, b"try again later"),
+            {},
+        ]
+        email_sender = create_email_sender(app_config, "retry.smtp.invalid")
+        with patch(
+            "tracim_backend.lib.mail_notifier.sender.create_smtp_connection",
+            return_value=smtp_connection_mock,
+        ) as create_smtp_connection_mock, patch(
+            "tracim_backend.lib.mail_notifier.sender.time.sleep"
+        ) as sleep_mock:
+            email_sender.send_mail(create_message("bob@example.org"))
+            email_sender.disconnect()
+        assert sleep_mock.call_args_list == [call(2.0), call(4.0)]
+        assert smtp_connection_mock.send_message.call_count == 3
+        # INFO - a new connection is used after each error
+        assert create_smtp_connection_mock.call_count == 3
+
+    def test_unit__send_mail__ok__permanent_error_not_retried(
+        self, app_config: CFG, smtp_connection_mock: MagicMock
+    ):
+        app_config.EMAIL__NOTIFICATION__SMTP__RETRY__MAX_ATTEMPTS = 3
+        smtp_connection_mock.send_message.side_effect = smtplib.SMTPDataError(554, b"rejected")
+        email_sender = create_email_sender(app_config, "permanent-error.smtp.invalid")
+        with patch(
+            "tracim_backend.lib.mail_notifier.sender.create_smtp_connection",
+            return_value=smtp_connection_mock,
+        ), patch("tracim_backend.lib.mail_notifier.sender.time.sleep") as sleep_mock:
+            email_sender.send_mail(create_message("bob@example.org"))
+            email_sender.disconnect()
+        sleep_mock.assert_not_called()
+        smtp_connection_mock.send_message.assert_called_once()
@@ -1,8 +1,11 @@
 # -*- coding: utf-8 -*-
+from rq.utils import import_attribute
 
 from tracim_backend.lib.core.notifications import DummyNotifier
 from tracim_backend.lib.core.notifications import NotifierFactory
+from tracim_backend.lib.mail_notifier import jobs
 from tracim_backend.lib.mail_notifier.notifier import EmailNotifier
+from tracim_backend.lib.mail_notifier.notifier import NOTIFY_CONTENT_UPDATE_JOB
 from tracim_backend.models.auth import User
 from tracim_backend.models.data import Content
 from tracim_backend.tests.fixtures import *  # noqa: F403,F40
@@ -31,4 +34,6 @@ def test_notifier_factory_method(self, app_config):
 
 class TestEmailNotifier(object):
     # TODO - G.M - 04-03-2017 -  [emailNotif] - Restore test for email Notif
-    pass
+
+    def test_unit__notify_content_update_job__ok__importable_by_name(self):
+        assert import_attribute(NOTIFY_CONTENT_UPDATE_JOB) is jobs.notify_content_update
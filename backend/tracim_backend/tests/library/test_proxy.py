@@ -1,4 +1,9 @@
+import io
+import responses
+
 from tracim_backend.lib.proxy.proxy import Proxy
+from tracim_backend.lib.proxy.proxy import RequestBodyStream
+from tracim_backend.lib.proxy.proxy import ResponseBodyIterator
 
 
 class TestProxy(object):
@@ -68,11 +73,11 @@ def test_drop_response_headers__ok__nominal_case(self):
     def test_get_response_for_request__ok_nominal_case(self):
         proxy = Proxy("http://localhost:8080")
 
-        def mocked_generate_proxy_response(status, headers, body):
+        def mocked_generate_proxy_response(status, headers, app_iter):
             response = FakeResponse()
             response.headers = headers
             response.status_code = status
-            response.body = body
+            response.body = b"".join(app_iter)
             return response
 
         def mocked_get_behind_response(method, headers, data, url, auth):
@@ -88,9 +93,14 @@ def __init__(self):
                     "Connection": "keep-alive",
                 }
                 self.body = b"Nothing"
-                self.content = self.body
                 self.status_code = 200
 
+            def iter_content(self, chunk_size):
+                return iter([self.body[:3], self.body[3:]])
+
+            def close(self):
+                pass
+
         class FakeRequest(object):
             def __init__(self):
                 self.headers = {
@@ -101,6 +111,8 @@ def __init__(self):
                     "Connection": "keep-alive",
                 }
                 self.body = b"Nothing"
+                self.content_length = 0
+                self.is_body_seekable = True
                 self.method = "GET"
                 self.auth = None
 
@@ -119,3 +131,53 @@ def __init__(self):
         assert response.headers != test_fake_response.headers
         assert response.headers.get("extra_header") == "extra_header"
         assert response.status_code == test_fake_response.status_code
+
+    def test_unit__init__ok__backend_session_shared(self):
+        assert (
+            Proxy("http://localhost:8080")._session is Proxy("http://localhost:8080/dav")._session
+        )
+        assert (
+            Proxy("http://localhost:8080")._session is not Proxy("http://localhost:8081")._session
+        )
+
+    @responses.activate
+    def test_unit__get_behind_response__ok__backend_cookies_not_stored(self):
+        proxy = Proxy("http://localhost:8082", pool_size=3)
+        responses.add(
+            responses.GET, "http://localhost:8082/agenda/", headers={"Set-Cookie": "sid=42; Path=/"}
+        )
+        for _ in range(2):
+            proxy._get_behind_response(
+                method="GET", headers={}, data=b"", url="http://localhost:8082/agenda/", auth=None
+            ).close()
+        assert len(proxy._session.cookies) == 0
+        assert "Cookie" not in responses.calls[1].request.headers
+
+    def test_unit__get_request_body__ok__streamed_when_length_known(self):
+        proxy = Proxy("http://localhost:8080")
+
+        class FakeRequest(object):
+            content_length = 7
+            is_body_seekable = False
+            body_file = io.BytesIO(b"Nothing")
+
+        body = proxy._get_request_body(FakeRequest())
+        assert isinstance(body, RequestBodyStream)
+        assert len(body) == 7
+        assert b"".join(body) == b"Nothing"
+
+    def test_unit__response_body_iterator__ok__closes_response(self):
+        class FakeResponse(object):
+            closed = False
+
+            def iter_content(self, chunk_size):
+                return iter([b"Not", b"hing"])
+
+            def close(self):
+                self.closed = True
+
+        response = FakeResponse()
+        app_iter = ResponseBodyIterator(response)
+        assert b"".join(app_iter) == b"Nothing"
+        app_iter.close()
+        assert response.closed
@@ -0,0 +1,78 @@
+import pyramid_beaker
+import pytest
+from unittest.mock import patch
+
+from tracim_backend.config import CFG
+from tracim_backend.exceptions import UnavailableURLPreview
+from tracim_backend.lib.core.url_preview import URLPreview
+from tracim_backend.lib.core.url_preview import URLPreviewLib
+from tracim_backend.lib.core.url_preview import URL_PREVIEW_CACHE_REGION
+from tracim_backend.lib.core.url_preview import URL_PREVIEW_ERROR_CACHE_REGION
+from tracim_backend.lib.core.url_preview import get_url_cache
+from tracim_backend.lib.core.url_preview import get_url_cache_key
+from tracim_backend.lib.core.url_preview import get_url_preview_cache_settings
+from tracim_backend.tests.fixtures import *  # noqa: F403,F40
+
+
+@pytest.fixture
+def url_preview_lib(app_config: CFG) -> URLPreviewLib:
+    pyramid_beaker.set_cache_regions_from_settings(get_url_preview_cache_settings(app_config))
+    return URLPreviewLib(app_config)
+
+
+class TestURLPreviewLib(object):
+    def test_unit__get_url_preview_cache_settings__ok__nominal_case(self, app_config: CFG):
+        app_config.URL_PREVIEW__CACHE__TYPE = "ext:redis"
+        app_config.URL_PREVIEW__CACHE__URL = "redis://localhost:6379/1"
+        app_config.URL_PREVIEW__CACHE__ERROR_EXPIRE = 0
+        settings = get_url_preview_cache_settings(app_config)
+        assert settings["cache.type"] == "ext:redis"
+        assert settings["cache.url"] == "redis://localhost:6379/1"
+        assert settings["cache.{}.enabled".format(URL_PREVIEW_CACHE_REGION)] == "True"
+        assert settings["cache.{}.expire".format(URL_PREVIEW_CACHE_REGION)] == "1800"
+        assert settings["cache.{}.enabled".format(URL_PREVIEW_ERROR_CACHE_REGION)] == "False"
+
+    def test_unit__get_cached_preview__ok__fetched_once(self, url_preview_lib: URLPreviewLib):
+        url = "http://example.invalid/cached-preview"
+        preview = URLPreview(title="A title", description="A description", image=None)
+        with patch.object(URLPreviewLib, "get_preview", return_value=preview) as get_preview_mock:
+            first_preview = url_preview_lib.get_cached_preview(url)
+            second_preview = url_preview_lib.get_cached_preview(url)
+        get_preview_mock.assert_called_once_with(url)
+        assert first_preview.title == second_preview.title == "A title"
+
+    def test_unit__get_cached_preview__err__unavailable_preview_cached(
+        self, url_preview_lib: URLPreviewLib
+    ):
+        url = "http://example.invalid/unavailable-preview"
+        with patch.object(
+            URLPreviewLib, "get_preview", side_effect=UnavailableURLPreview("Unavailable")
+        ) as get_preview_mock:
+            with pytest.raises(UnavailableURLPreview):
+                url_preview_lib.get_cached_preview(url)
+            with pytest.raises(UnavailableURLPreview, match="Unavailable"):
+                url_preview_lib.get_cached_preview(url)
+        get_preview_mock.assert_called_once_with(url)
+
+    def test_unit__get_cached_preview__ok__shared_namespace(self, url_preview_lib: URLPreviewLib):
+        urls = ["http://example.invalid/first-preview", "http://example.invalid/second-preview"]
+        preview = URLPreview(title="A title", description="A description", image=None)
+        with patch.object(URLPreviewLib, "get_preview", return_value=preview):
+            for url in urls:
+                url_preview_lib.get_cached_preview(url)
+        preview_cache = get_url_cache(URL_PREVIEW_CACHE_REGION)
+        assert preview_cache.namespace_name == URL_PREVIEW_CACHE_REGION
+        for url in urls:
+            assert get_url_cache_key(url) in preview_cache
+
+    def test_unit__get_cached_preview__ok__cache_disabled(self, app_config: CFG):
+        app_config.URL_PREVIEW__CACHE__EXPIRE = 0
+        url_preview_lib = URLPreviewLib(app_config)
+        pyramid_beaker.set_cache_regions_from_settings(get_url_preview_cache_settings(app_config))
+        url = "http://example.invalid/uncached-preview"
+        preview = URLPreview(title="A title", description="A description", image=None)
+        with patch.object(URLPreviewLib, "get_preview", return_value=preview) as get_preview_mock:
+            url_preview_lib.get_cached_preview(url)
+            url_preview_lib.get_cached_preview(url)
+        assert get_preview_mock.call_count == 2
+        assert get_url_cache(URL_PREVIEW_CACHE_REGION) is None
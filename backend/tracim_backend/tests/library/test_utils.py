@@ -1,13 +1,16 @@
+import io
 import pytest
 
 from tracim_backend.exceptions import UnvalidCustomPropertiesSchema
 from tracim_backend.lib.mail_notifier.utils import EmailAddress
 from tracim_backend.lib.utils.dict_parsing import translate_dict
 from tracim_backend.lib.utils.utils import ALLOWED_AUTOGEN_PASSWORD_CHAR
+from tracim_backend.lib.utils.utils import ChunksFileStream
 from tracim_backend.lib.utils.utils import CustomPropertiesValidator
 from tracim_backend.lib.utils.utils import DEFAULT_PASSWORD_GEN_CHAR_LENGTH
 from tracim_backend.lib.utils.utils import ExtendedColor
 from tracim_backend.lib.utils.utils import clamp
+from tracim_backend.lib.utils.utils import get_file_hash
 from tracim_backend.lib.utils.utils import password_generator
 from tracim_backend.lib.utils.utils import string_to_list
 
@@ -30,6 +33,36 @@ def test_clamp_ok_nominal_case(self):
         assert clamp(126.1, 0.0, 255.0) == 126.1
 
 
+class TestGetFileHash(object):
+    def test_get_file_hash__ok__bytes_and_file(self):
+        expected_hash = "ed7002b439e9ac845f22357d822bac1444730fbdb6016d3ec9432297b9ec9f73"
+        assert get_file_hash(b"content") == expected_hash
+        file_ = io.BytesIO(b"content")
+        assert get_file_hash(file_) == expected_hash
+        assert file_.read() == b"content"
+
+
+class TestChunksFileStream(object):
+    def test_chunks_file_stream__ok__read_by_size_with_hash(self):
+        stream = ChunksFileStream(iter([b"con", b"te", b"nt"]))
+        assert stream.read(4) == b"cont"
+        assert stream.read() == b"ent"
+        assert stream.read(4) == b""
+        assert stream.size == 7
+        assert stream.file_hash == get_file_hash(b"content")
+
+    def test_chunks_file_stream__err__stopped_by_size_check(self):
+        def check_size(size: int) -> None:
+            if size > 5:
+                raise ValueError("too big")
+
+        chunks = iter([b"con", b"te", b"nt", b"never read"])
+        stream = ChunksFileStream(chunks, check_size=check_size)
+        assert stream.read() == b"conte"
+        assert isinstance(stream.error, ValueError)
+        assert next(chunks) == b"never read"
+
+
 class TestExtendedColor(object):
     def test_extended_color__init__ok_nominal_case(self):
         color = ExtendedColor("#FFFFFF")
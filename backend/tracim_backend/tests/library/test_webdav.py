@@ -1,16 +1,27 @@
 # -*- coding: utf-8 -*-
 import pytest
+from sqlalchemy import event
+import transaction
 from unittest.mock import MagicMock
+from wsgidav.dav_error import DAVError
 
 from tracim_backend import WebdavAppFactory
+from tracim_backend.lib.core.content import ContentApi
 from tracim_backend.lib.core.notifications import DummyNotifier
+from tracim_backend.lib.utils.utils import get_file_hash
 from tracim_backend.lib.webdav import TracimDavProvider
 from tracim_backend.lib.webdav import TracimDomainController
+from tracim_backend.lib.webdav.dav_provider import ProcessedWebdavPath
+from tracim_backend.lib.webdav.path_cache import ResolvedWebdavPath
+from tracim_backend.lib.webdav.path_cache import WebdavPathCache
+from tracim_backend.lib.webdav.resources import FileResource
 from tracim_backend.lib.webdav.resources import FolderResource
+from tracim_backend.lib.webdav.resources import OtherFileResource
 from tracim_backend.lib.webdav.resources import RootResource
 from tracim_backend.lib.webdav.resources import WorkspaceResource
 from tracim_backend.models.data import Content
 from tracim_backend.models.data import ContentRevisionRO
+from tracim_backend.models.revision_protection import new_revision
 from tracim_backend.tests.fixtures import *  # noqa: F403,F40
 from tracim_backend.tests.utils import eq_
 from tracim_backend.tests.utils import webdav_put_new_test_file_helper
@@ -168,6 +179,42 @@ def test_unit__list_content__ok(
             "Tiramisu Recipe.document.html" in content_names
         ), "Tiramisu Recipe.document.html should be in names ({0})".format(content_names)
 
+    def test_unit__list_content__ok__members_properties_without_query(
+        self, app_config, webdav_provider, user_api_factory, webdav_environ_factory, session
+    ):
+        Desserts_dir = webdav_provider.getResourceInst(
+            "/Recipes.space/Desserts",
+            webdav_environ_factory.get(user_api_factory.get().get_one_by_email("bob@fsf.local")),
+        )
+        session.expire_all()
+        children = [
+            child
+            for child in Desserts_dir.getMemberList()
+            if isinstance(child, (FileResource, FolderResource))
+            and not isinstance(child, OtherFileResource)
+        ]
+        assert len(children) == 3
+        # INFO - first access loads the roles of the user used to check rights
+        children[0].getCreationDate()
+
+        statements = []
+
+        def count_statement(conn, cursor, statement, *args) -> None:
+            statements.append(statement)
+
+        event.listen(session.get_bind(), "before_cursor_execute", count_statement)
+        try:
+            for child in children:
+                child.getDisplayName()
+                child.getCreationDate()
+                child.getLastModified()
+                if isinstance(child, FileResource):
+                    assert child.getContentLength() == child.content.file_size
+                    child.getContentType()
+        finally:
+            event.remove(session.get_bind(), "before_cursor_execute", count_statement)
+        assert statements == []
+
     def test_unit__get_content__ok(
         self,
         app_config,
@@ -522,3 +569,147 @@ def test_unit__update_content__ok(
             DummyNotifier.send_count,
             msg="DummyNotifier should send 1 mail, not {}".format(DummyNotifier.send_count),
         )
+
+    def test_unit__update_content__ok__streamed_chunks_and_size_limit(
+        self,
+        webdav_provider,
+        webdav_environ_factory,
+        app_config,
+        session,
+        user_api_factory,
+    ):
+        environ = webdav_environ_factory.get(
+            user_api_factory.get().get_one_by_email("admin@admin.admin")
+        )
+        result = webdav_put_new_test_file_helper(
+            webdav_provider,
+            environ,
+            "/Recipes.space/Salads/greek_salad.txt",
+            b"hello\n",
+        )
+
+        write_object = result.beginWrite(contentType="application/octet-stream")
+        write_object.writelines(iter([b"An other", b" line"]))
+        write_object.close()
+        result.endWrite(withErrors=False)
+        result = webdav_provider.getResourceInst("/Recipes.space/Salads/greek_salad.txt", environ)
+        assert result.content.depot_file.file.read() == b"An other line"
+        assert result.content.file_size == len(b"An other line")
+        assert result.content.file_hash == get_file_hash(b"An other line")
+
+        app_config.LIMITATION__CONTENT_LENGTH_FILE_SIZE = 10
+        read_chunks = []
+
+        def chunks():
+            for chunk in (b"too", b" big", b" for", b" limit"):
+                read_chunks.append(chunk)
+                yield chunk
+
+        write_object = result.beginWrite(contentType="application/octet-stream")
+        with pytest.raises(DAVError):
+            write_object.writelines(chunks())
+        # INFO - upload is stopped as soon as the limit is exceeded
+        assert read_chunks == [b"too", b" big", b" for"]
+        write_object.close()
+        result = webdav_provider.getResourceInst("/Recipes.space/Salads/greek_salad.txt", environ)
+        assert result.content.depot_file.file.read() == b"An other line"
+
+    def test_unit__processed_webdav_path__ok__cached_path_checked_before_use(
+        self,
+        session,
+        app_config,
+        user_api_factory,
+    ):
+        admin = user_api_factory.get().get_one_by_email("admin@admin.admin")
+        path_cache = WebdavPathCache(ttl=60, max_size=10)
+        processed_path = ProcessedWebdavPath(
+            "/Recipes.space/Desserts/Salads", admin, session, app_config, path_cache
+        )
+        assert processed_path.current_content is None
+        assert path_cache.get(admin.user_id, "/Recipes.space/Desserts/Salads") is None
+
+        processed_path = ProcessedWebdavPath(
+            "/Recipes.space/Salads", admin, session, app_config, path_cache
+        )
+        salads = processed_path.current_content
+        assert salads.label == "Salads"
+        assert path_cache.get(admin.user_id, "/Recipes.space/Salads") == ResolvedWebdavPath(
+            workspace_ids=(processed_path.current_workspace.workspace_id,),
+            content_ids=(salads.content_id,),
+        )
+        processed_path = ProcessedWebdavPath(
+            "/Recipes.space/Salads", admin, session, app_config, path_cache
+        )
+        assert processed_path.current_content == salads
+
+        # INFO - no hook clears the cache here, outdated entry must not be used
+        content_api = ContentApi(current_user=admin, session=session, config=app_config)
+        with new_revision(session=session, tm=transaction.manager, content=salads):
+            content_api.update_content(salads, new_label="Soups")
+        content_api.save(salads)
+        transaction.commit()
+        processed_path = ProcessedWebdavPath(
+            "/Recipes.space/Salads", admin, session, app_config, path_cache
+        )
+        assert processed_path.current_content is None
+        processed_path = ProcessedWebdavPath(
+            "/Recipes.space/Soups", admin, session, app_config, path_cache
+        )
+        assert processed_path.current_content.content_id == salads.content_id
+
+    def test_unit__processed_webdav_path__ok__cached_spaces_loaded_with_one_query(
+        self, session, app_config, user_api_factory, workspace_api_factory, content_type_list
+    ):
+        admin = user_api_factory.get().get_one_by_email("admin@admin.admin")
+        workspace_api = workspace_api_factory.get(current_user=admin)
+        parent = None
+        path = ""
+        for label in ("Level 1", "Level 2", "Level 3"):
+            parent = workspace_api.create_workspace(label, parent=parent, save_now=True)
+            path += "/" + parent.filemanager_filename
+        content_api = ContentApi(current_user=admin, session=session, config=app_config)
+        folder = content_api.create(
+            content_type_slug=content_type_list.Folder.slug,
+            workspace=parent,
+            label="Documents",
+            do_save=True,
+        )
+        path += "/" + folder.file_name
+        transaction.commit()
+        path_cache = WebdavPathCache(ttl=60, max_size=10)
+        # INFO - reload the committed user before counting statements
+        assert admin.user_id
+        statements = []
+
+        def count_statement(conn, cursor, statement, *args) -> None:
+            statements.append(statement)
+
+        event.listen(session.get_bind(), "before_cursor_execute", count_statement)
+        try:
+            processed_path = ProcessedWebdavPath(path, admin, session, app_config, path_cache)
+            resolution_statement_count = len(statements)
+            statements.clear()
+            cached_processed_path = ProcessedWebdavPath(
+                path, admin, session, app_config, path_cache
+            )
+        finally:
+            event.remove(session.get_bind(), "before_cursor_execute", count_statement)
+        assert processed_path.current_content.content_id == folder.content_id
+        assert cached_processed_path.workspaces == processed_path.workspaces
+        assert cached_processed_path.contents == processed_path.contents
+        # INFO - one query per space without cache, one for all spaces with it
+        assert resolution_statement_count - len(statements) == 2
+
+    def test_unit__webdav_path_cache__ok__expiration_and_max_size(self):
+        path_cache = WebdavPathCache(ttl=60, max_size=2)
+        for path in ("/a.space", "/b.space", "/c.space"):
+            path_cache.set(1, path, ResolvedWebdavPath(workspace_ids=(1,), content_ids=()))
+        assert path_cache.get(1, "/a.space") is None
+        assert path_cache.get(1, "/c.space")
+        assert path_cache.get(2, "/c.space") is None
+        path_cache.clear()
+        assert path_cache.get(1, "/c.space") is None
+
+        path_cache = WebdavPathCache(ttl=0, max_size=2)
+        path_cache.set(1, "/a.space", ResolvedWebdavPath(workspace_ids=(1,), content_ids=()))
+        assert path_cache.get(1, "/a.space") is None
@@ -2,6 +2,7 @@
 import pytest
 import transaction
 
+from tracim_backend.lib.core.workspace import WorkspaceApi
 from tracim_backend.models.data import ActionDescription
 from tracim_backend.models.data import Content
 from tracim_backend.models.data import Workspace
@@ -32,6 +33,7 @@ def test_unit__workspace_get_size(self, admin_user, session, content_type_list):
         assert workspace.get_size() == 4
         assert workspace.get_size(include_deleted=True) == 4
         assert workspace.get_size(include_archived=True) == 4
+        assert workspace.used_space == 4
         with new_revision(session=session, tm=transaction.manager, content=content):
             content.is_deleted = True
             content.is_archived = False
@@ -40,6 +42,7 @@ def test_unit__workspace_get_size(self, admin_user, session, content_type_list):
         assert workspace.get_size() == 0
         assert workspace.get_size(include_deleted=True) == 8
         assert workspace.get_size(include_archived=True) == 0
+        assert workspace.used_space == 0
         with new_revision(session=session, tm=transaction.manager, content=content):
             content.is_deleted = False
             content.is_archived = True
@@ -48,6 +51,84 @@ def test_unit__workspace_get_size(self, admin_user, session, content_type_list):
         assert workspace.get_size() == 0
         assert workspace.get_size(include_deleted=True) == 0
         assert workspace.get_size(include_archived=True) == 12
+        assert workspace.used_space == 0
+
+    @pytest.mark.usefixtures("base_fixture")
+    def test_unit__workspace_used_space__ok__file_size_stored(
+        self, admin_user, session, content_type_list
+    ):
+        workspace = Workspace(label="TEST_WORKSPACE_1", owner=admin_user)
+        session.add(workspace)
+        session.flush()
+        content = Content(
+            owner=admin_user,
+            workspace=workspace,
+            type=content_type_list.File.slug,
+            label="TEST_CONTENT_1",
+            revision_type=ActionDescription.CREATION,
+        )
+        content.depot_file = b"test"
+        session.add(content)
+        session.flush()
+        transaction.commit()
+        assert content.file_size == 4
+        assert workspace.used_space == 4
+
+        with new_revision(session=session, tm=transaction.manager, content=content):
+            content.label = "TEST_CONTENT_2"
+        session.flush()
+        transaction.commit()
+        assert content.file_size == 4
+        assert workspace.used_space == 8
+
+        with new_revision(session=session, tm=transaction.manager, content=content):
+            content.depot_file = b"new test"
+        session.flush()
+        transaction.commit()
+        assert content.file_size == 8
+        assert workspace.used_space == 16
+
+        with new_revision(session=session, tm=transaction.manager, content=content):
+            content.is_deleted = True
+        session.flush()
+        transaction.commit()
+        assert workspace.used_space == 0
+
+        with new_revision(session=session, tm=transaction.manager, content=content):
+            content.is_deleted = False
+        session.flush()
+        transaction.commit()
+        assert workspace.used_space == workspace.get_size() == 32
+
+    @pytest.mark.usefixtures("base_fixture")
+    def test_unit__workspace_used_space__ok__unknown_used_space(
+        self, admin_user, session, content_type_list, app_config
+    ):
+        workspace = Workspace(label="TEST_WORKSPACE_1", owner=admin_user)
+        session.add(workspace)
+        session.flush()
+        content = Content(
+            owner=admin_user,
+            workspace=workspace,
+            type=content_type_list.File.slug,
+            label="TEST_CONTENT_1",
+            revision_type=ActionDescription.CREATION,
+        )
+        content.depot_file = b"test"
+        session.add(content)
+        session.flush()
+        wapi = WorkspaceApi(session=session, current_user=None, config=app_config)
+        wapi.invalidate_used_space([workspace.workspace_id])
+        transaction.commit()
+        assert workspace.used_space is None
+
+        with new_revision(session=session, tm=transaction.manager, content=content):
+            content.label = "TEST_CONTENT_2"
+        session.flush()
+        assert workspace.used_space is None
+        assert wapi.get_used_space(workspace) == 8
+        assert workspace.used_space == 8
+        assert wapi.get_user_used_space(admin_user) == 8
 
     @pytest.mark.usefixtures("base_fixture")
     def test_unit__get_children__nominal_case(self, admin_user, session):
@@ -317,6 +317,7 @@ def __init__(
             # mock event publishing to avoid requiring a working
             # pushpin instance for every test
             LiveMessagesLib.publish_message_to_user = mock.Mock()
+            LiveMessagesLib.publish_messages = mock.Mock()
         else:
             self._plugin_manager = create_plugin_manager()
         self._dbsession = create_dbsession_for_context(session_factory, transaction.manager, self)
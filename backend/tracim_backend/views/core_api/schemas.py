@@ -2269,6 +2269,13 @@ class GetLiveMessageQuerySchema(BasePaginatedQuerySchema):
         description="comma separated list of content_ids for event: events unrelated to these content are not included."
         "event of content itself or of direct children will be provided.",
     )
+    after_event_id = marshmallow.fields.Int(
+        required=False,
+        missing=0,
+        example=42,
+        validator=positive_int_validator,
+        description="only return messages of events more recent than the given one",
+    )
 
     @post_load
     def live_message_query(self, data: typing.Dict[str, typing.Any]) -> LiveMessageQuery:
@@ -1,4 +1,3 @@
-from beaker.cache import cache_region
 from http import HTTPStatus
 from pyramid.config import Configurator
 
@@ -8,7 +7,6 @@
 from tracim_backend.lib.core.url_preview import URLPreviewLib
 from tracim_backend.lib.utils.authorization import check_right
 from tracim_backend.lib.utils.authorization import is_user
-from tracim_backend.lib.utils.logger import logger
 from tracim_backend.lib.utils.request import TracimRequest
 from tracim_backend.views.controllers import Controller
 from tracim_backend.views.core_api.schemas import UrlPreviewSchema
@@ -28,13 +26,7 @@ def url_preview(self, context, request: TracimRequest, hapic_data=None) -> URLPr
         Get url Preview
         """
         url_preview_lib = URLPreviewLib(request.app_config)
-
-        @cache_region("url_preview")
-        def get_cached_preview(url: str):
-            logger.debug(self, "getting url preview of {}".format(url))
-            return url_preview_lib.get_preview(url=url)
-
-        return get_cached_preview(hapic_data.query["url"])
+        return url_preview_lib.get_cached_preview(url=hapic_data.query["url"])
 
     def bind(self, configurator: Configurator) -> None:
         configurator.add_route(
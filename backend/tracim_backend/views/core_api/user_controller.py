@@ -40,6 +40,7 @@
 from tracim_backend.extensions import hapic
 from tracim_backend.lib.core.content import ContentApi
 from tracim_backend.lib.core.event import EventApi
+from tracim_backend.lib.core.event import MESSAGES_PAGE_SIZE
 from tracim_backend.lib.core.live_messages import LiveMessagesLib
 from tracim_backend.lib.core.live_messages import ServerSideEventType
 from tracim_backend.lib.core.subscription import SubscriptionLib
@@ -728,6 +729,7 @@ def get_user_messages(
                 workspace_ids=hapic_data.query.workspace_ids,
                 include_not_sent=hapic_data.query.include_not_sent,
                 related_to_content_ids=hapic_data.query.related_to_content_ids,
+                after_event_id=hapic_data.query.after_event_id,
             )
         )
 
@@ -902,24 +904,19 @@ def open_message_stream(self, context, request: TracimRequest, hapic_data) -> Re
                 headerlist=headers, charset="utf-8", status_code=200, body=response_body
             )
 
-        response_body = LiveMessagesLib.get_server_side_event_string(
-            event_type=ServerSideEventType.STREAM_OPEN,
-            data=None,
-            comment="Tracim Live Messages for user {}".format(request.candidate_user.user_id),
-        )
+        response_chunks = [
+            LiveMessagesLib.get_server_side_event_string(
+                event_type=ServerSideEventType.STREAM_OPEN,
+                data=None,
+                comment="Tracim Live Messages for user {}".format(request.candidate_user.user_id),
+            )
+        ]
         after_event_id = hapic_data.query["after_event_id"]  # type: int
         if after_event_id:
-            app_config = request.registry.settings["CFG"]  # type: CFG
-            event_api = EventApi(request.current_user, request.dbsession, app_config)
-            messages = event_api.get_messages_for_user(
-                request.candidate_user.user_id, after_event_id=after_event_id
-            )  # type: typing.List[Message]
-
-            response_body += "".join(
-                [
-                    "data:" + json.dumps(LiveMessagesLib.message_as_dict(message)) + "\n\n"
-                    for message in messages
-                ]
+            response_chunks.extend(
+                self._get_missed_messages_chunks(
+                    request, request.candidate_user.user_id, after_event_id
+                )
             )
 
         escaped_keepalive_event = "event: keep-alive\\ndata:\\n\\n"
@@ -942,7 +939,44 @@ def open_message_stream(self, context, request: TracimRequest, hapic_data) -> Re
             )
         )
 
-        return Response(headerlist=headers, charset="utf-8", status_code=200, body=response_body)
+        app_iter = [chunk.encode("utf-8") for chunk in response_chunks]
+        response = Response(headerlist=headers, charset="utf-8", status_code=200, app_iter=app_iter)
+        response.content_length = sum(len(chunk) for chunk in app_iter)
+        return response
+
+    def _get_missed_messages_chunks(
+        self, request: TracimRequest, user_id: int, after_event_id: int
+    ) -> typing.Generator[str, None, None]:
+        """
+        Generate server side events of messages sent after the given event, one chunk per
+        page of messages.
+
+        At most LIVE_MESSAGES__REPLAY_MAX_COUNT messages are generated, a resync event
+        giving the last generated message event id follows them if there are more messages.
+        """
+        app_config = request.registry.settings["CFG"]  # type: CFG
+        event_api = EventApi(request.current_user, request.dbsession, app_config)
+        max_count = app_config.LIVE_MESSAGES__REPLAY_MAX_COUNT
+        page = []  # type: typing.List[str]
+        for count, message in enumerate(
+            event_api.iter_messages_for_user(user_id, after_event_id=after_event_id), start=1
+        ):
+            if count > max_count:
+                if page:
+                    yield "".join(page)
+                yield LiveMessagesLib.get_server_side_event_string(
+                    event_type=ServerSideEventType.RESYNC,
+                    data={"after_event_id": after_event_id},
+                    comment="More than {} messages to replay".format(max_count),
+                )
+                return
+            page.append("data:" + json.dumps(LiveMessagesLib.message_as_dict(message)) + "\n\n")
+            after_event_id = message.event_id
+            if len(page) == MESSAGES_PAGE_SIZE:
+                yield "".join(page)
+                page = []
+        if page:
+            yield "".join(page)
 
     @hapic.with_api_doc(tags=[SWAGGER_TAG__USER_CONFIG_ENDPOINTS])
     @check_right(has_personal_access)
@@ -10,7 +10,7 @@
 from tracim_backend.lib.search.elasticsearch_search.models import WorkspaceSearchResponse
 from tracim_backend.lib.search.models import ContentSearchResponse
 from tracim_backend.lib.search.search_factory import ELASTICSEARCH__SEARCH_ENGINE_SLUG
-from tracim_backend.lib.search.simple_search.simple_search_api import SimpleSearchApi
+from tracim_backend.lib.search.search_factory import SearchFactory
 from tracim_backend.lib.utils.authorization import check_right
 from tracim_backend.lib.utils.authorization import is_user
 from tracim_backend.lib.utils.request import TracimRequest
@@ -39,7 +39,7 @@ def search_content(
         self, context, request: TracimRequest, hapic_data: HapicData = None
     ) -> ContentSearchResponse:
         app_config = request.registry.settings["CFG"]  # type: CFG
-        search = SimpleSearchApi(
+        search = SearchFactory.get_content_search_api(
             current_user=request.current_user,
             session=request.dbsession,
             config=app_config,
@@ -14,6 +14,7 @@ export const LIVE_MESSAGE_ERROR_CODE = {
 }
 // INFO - RJ - 2020-08-12  - increment this number each time the channel protocol is changed in an incompatible way
 const BROADCAST_CHANNEL_NAME = 'tracim-frontend-1'
+const MISSED_MESSAGES_PAGE_SIZE = 100
 
 /**
  * INFO - SG - 2020-07-02, RJ - 2020-08-12
@@ -134,6 +135,14 @@ export class LiveMessageManager {
       this.setStatus(LIVE_MESSAGE_STATUS.ERROR, error.code)
     })
 
+    // INFO - the backend only replays a limited number of missed messages, the other ones
+    // must be fetched using the messages API from the given event id
+    this.eventSource.addEventListener('resync', (e) => {
+      const resync = JSON.parse(e.data)
+      console.log('%c.:. TLM Resync after event ' + resync.after_event_id, 'color: #ccc0e2')
+      this.fetchMissedMessages(resync.after_event_id)
+    })
+
     this.eventSource.addEventListener('keep-alive', () => {
       console.log('%c.:. TLM KeepAlive: ', 'color: #ccc0e2')
       this.stopHeartbeatFailureTimer()
@@ -242,6 +251,38 @@ export class LiveMessageManager {
     }, this.reconnectionIntervalMs)
   }
 
+  // INFO - fetch every message more recent than the given event id, page by page,
+  // and dispatch them from the oldest to the most recent one
+  async fetchMissedMessages (afterEventId) {
+    const messageList = []
+    let pageToken = ''
+    try {
+      do {
+        const pageFilter = pageToken ? `&page_token=${encodeURIComponent(pageToken)}` : ''
+        const response = await fetch(
+          `${this.host}/users/${this.userId}/messages?after_event_id=${afterEventId}&count=${MISSED_MESSAGES_PAGE_SIZE}${pageFilter}`,
+          { credentials: 'include' }
+        )
+        if (!response.ok) {
+          console.log('%c.:. TLM Resync failed with status ' + response.status, 'color: #ccc0e2')
+          return
+        }
+        const page = await response.json()
+        messageList.push(...page.items)
+        pageToken = page.has_next ? page.next_page_token : ''
+      } while (pageToken)
+    } catch (e) {
+      console.log('%c.:. Got Error while fetching missed messages: ', 'color: #ccc0e2', e)
+      return
+    }
+
+    messageList.sort((a, b) => a.event_id - b.event_id)
+    for (const tlm of messageList) {
+      if (this.broadcastChannel) this.broadcastChannel.postMessage({ tlm })
+      this.dispatchLiveMessage(tlm)
+    }
+  }
+
   dispatchLiveMessage (tlm) {
     const isLeftover = this.leftoverEventIdList.includes(tlm.event_id)
     if (this.lastEventId >= tlm.event_id && !isLeftover) {
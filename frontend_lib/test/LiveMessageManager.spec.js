@@ -1,5 +1,10 @@
 import { expect } from 'chai'
-import { mockGetWhoami, mockGetWhoamiWithDelay, mockGetWhoamiFailure } from './apiMock.js'
+import {
+  mockGetUserMessages,
+  mockGetWhoami,
+  mockGetWhoamiWithDelay,
+  mockGetWhoamiFailure
+} from './apiMock.js'
 import { CUSTOM_EVENT } from '../src/customEvent.js'
 
 import {
@@ -300,6 +305,36 @@ describe('LiveMessageManager class', () => {
     })
   })
 
+  describe('the fetchMissedMessages method', () => {
+    it('should dispatch every message after the given event id, page by page', async () => {
+      const firstPageMock = mockGetUserMessages(
+        apiUrl,
+        userId,
+        { after_event_id: 42, count: 100 },
+        { items: [{ event_id: 46 }, { event_id: 45 }], has_next: true, next_page_token: '>i:45' }
+      )
+      const secondPageMock = mockGetUserMessages(
+        apiUrl,
+        userId,
+        { after_event_id: 42, count: 100, page_token: '>i:45' },
+        { items: [{ event_id: 44 }, { event_id: 43 }], has_next: false, next_page_token: '>i:43' }
+      )
+      const manager = createManager(30000, 0)
+      manager.openLiveMessageConnection(userId, apiUrl)
+      manager.dispatchLiveMessage({ event_id: 42 })
+
+      document.dispatchEvent.resetHistory()
+      await manager.fetchMissedMessages(42)
+      expect(firstPageMock.isDone()).to.be.equal(true)
+      expect(secondPageMock.isDone()).to.be.equal(true)
+      const dispatchedEventIds = document.dispatchEvent.args.map(args => args[0].detail.data.event_id)
+      expect(dispatchedEventIds).to.deep.equal([43, 44, 45, 46])
+      expect(manager.lastEventId).to.be.equal(46)
+
+      manager.closeLiveMessageConnection()
+    })
+  })
+
   after(() => {
     // NOTE SG 2020-07-03 - close all connections to clear timeouts so that mocha exits properly
     // NOTE RJ 2020-08-19 - and between tests, so that managers from different tests do not interact with each other
@@ -123,6 +123,13 @@ const mockGetWhoami = (apiUrl, status) => {
     .reply(status, '')
 }
 
+const mockGetUserMessages = (apiUrl, userId, query, page) => {
+  return nock(apiUrl)
+    .get(`/users/${userId}/messages`)
+    .query(query)
+    .reply(200, page)
+}
+
 const mockGetWhoamiWithDelay = (apiUrl, status, delay) => {
   return nock(apiUrl)
     .get('/auth/whoami')
@@ -150,6 +157,7 @@ export {
   mockGetUsernameAvailability200,
   mockGetReservedUsernames500,
   mockGetUsernameAvailability500,
+  mockGetUserMessages,
   mockGetWhoami,
   mockGetWhoamiWithDelay,
   mockGetWhoamiFailure,